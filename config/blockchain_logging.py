@@ -8,6 +8,7 @@ from pathlib import Path
 import os
 import time
 from typing import Optional
+from utils.logger import attach_handlers
 
 def setup_blockchain_logger(name: str = "BlockchainListener") -> logging.Logger:
     """
@@ -57,8 +58,7 @@ def setup_blockchain_logger(name: str = "BlockchainListener") -> logging.Logger:
     file_handler.setFormatter(blockchain_formatter)
     console_handler.setFormatter(blockchain_formatter)
     
-    blockchain_logger.addHandler(file_handler)
-    blockchain_logger.addHandler(console_handler)
+    attach_handlers(blockchain_logger, f"blockchain:{name}", [file_handler, console_handler])
     
     # Prevent propagation to root logger to avoid duplicate logs
     blockchain_logger.propagate = False
@@ -171,7 +171,7 @@ def setup_price_monitoring_logger(name: str = "PriceMonitoring") -> logging.Logg
     )
     
     file_handler.setFormatter(price_formatter)
-    logger.addHandler(file_handler)
+    attach_handlers(logger, f"price_monitoring:{name}", [file_handler])
     
     # This logger does NOT propagate to avoid duplicate logs in main log
     logger.propagate = False
@@ -9,6 +9,7 @@ from typing import List, Dict, Optional, Any, Union, TYPE_CHECKING
 from config.settings import Settings
 from utils.logger import get_logger
 from utils.proxy_manager import ProxyManager
+from utils.rate_governor import RequestPriority, get_rate_governor
 import json
 
 # Import Settings for type hinting only
@@ -64,6 +65,7 @@ class DexScreenerAPI:
         self.session: Optional[aiohttp.ClientSession] = None # Initialize as None
         self._logged_first_trending_token = False
         self._rate_limit_semaphore = asyncio.Semaphore(5) # Limit concurrent API calls
+        self.rate_governor = get_rate_governor(settings) # Shared request-rate budget across API clients
         
         logger.info(f"DexScreenerAPI initialized (Base: {self.base_url}, Timeout: {http_timeout_seconds}s)")
         
@@ -103,74 +105,92 @@ class DexScreenerAPI:
         # Session is created lazily by _get_session if needed
         return await self.test_connection()
             
-    async def _make_request(self, url: str, method: str = "GET", **kwargs) -> Union[Dict, List]:
-        """Make HTTP request with retry logic, semaphore, and proxy support."""
-        async with self._rate_limit_semaphore: # Acquire semaphore before making request
-            session = await self._get_session()
+    async def _make_request(self, url: str, method: str = "GET", priority: int = RequestPriority.NORMAL,
+                            endpoint_class: str = "tokens", **kwargs) -> Union[Dict, List]:
+        """
+        Make HTTP request with retry logic, semaphore, and proxy support.
+        
+        Each attempt first waits for a send slot from the shared rate governor
+        (keyed by endpoint class and proxy), so 429s seen here or by other
+        callers slow every DexScreener request on the same proxy. Rate-limited
+        attempts retry as soon as the governor grants the next slot.
+        
+        Args:
+            url: Request URL
+            method: HTTP method
+            priority: RequestPriority of the call (position pricing before discovery)
+            endpoint_class: Rate-limit class ("latest" for profile/boost feeds, "tokens" for pair lookups)
+        """
+        session = await self._get_session()
+        
+        for attempt in range(self.max_retries):
+            proxy = None
+            proxy_url_str = None # For logging/marking failure
+            if self.proxy_manager:
+                proxy_url_str = self.proxy_manager.get_proxy()
+                if proxy_url_str: proxy = proxy_url_str 
             
-            for attempt in range(self.max_retries):
-                proxy = None
-                proxy_url_str = None # For logging/marking failure
-                if self.proxy_manager:
-                    proxy_url_str = self.proxy_manager.get_proxy()
-                    if proxy_url_str: proxy = proxy_url_str 
-                
-                try:
-                    logger.debug(f"Attempt {attempt+1}/{self.max_retries}: {method} {url} (Proxy: {proxy_url_str or 'None'})")
-                    async with session.request(
-                        method, url, proxy=proxy, **kwargs
-                    ) as response:
-                        
-                        # Handle specific status codes for retry/failure
-                        if response.status == 429: # Rate limit
-                            logger.warning(f"Rate limit hit (429) on attempt {attempt+1} for {url}. Retrying after delay...")
-                            # Mark proxy failure only if rate limited?
-                            # if proxy_url_str and self.proxy_manager: self.proxy_manager.mark_proxy_failure(proxy_url_str)
-                        elif response.status >= 500: # Server errors
-                            logger.warning(f"Server error ({response.status}) on attempt {attempt+1} for {url}. Retrying after delay...")
-                            if proxy_url_str and self.proxy_manager: self.proxy_manager.mark_proxy_failure(proxy_url_str)
-                        else:
-                            response.raise_for_status() # Raise for other 4xx errors immediately
-                            # Success or non-retryable error
-                            try:
-                                data = await response.json()
-                                return data
-                            except aiohttp.ContentTypeError:
-                                text_response = await response.text()
-                                logger.error(f"Non-JSON response from {url}. Status: {response.status}. Response: {text_response[:500]}")
-                                raise aiohttp.ClientError("Non-JSON response")
+            rate_limited = False
+            try:
+                async with self.rate_governor.slot("dexscreener", endpoint_class, proxy_url_str, priority) as slot:
+                    async with self._rate_limit_semaphore: # Limit concurrent API calls
+                        logger.debug(f"Attempt {attempt+1}/{self.max_retries}: {method} {url} (Proxy: {proxy_url_str or 'None'})")
+                        async with session.request(
+                            method, url, proxy=proxy, **kwargs
+                        ) as response:
+                            slot.record(response.status, response.headers.get("Retry-After"))
+                            
+                            # Handle specific status codes for retry/failure
+                            if response.status == 429: # Rate limit
+                                rate_limited = True
+                                logger.warning(f"Rate limit hit (429) on attempt {attempt+1} for {url}. Retrying when the rate governor allows...")
+                            elif response.status >= 500: # Server errors
+                                logger.warning(f"Server error ({response.status}) on attempt {attempt+1} for {url}. Retrying after delay...")
+                                if proxy_url_str and self.proxy_manager: self.proxy_manager.mark_proxy_failure(proxy_url_str)
+                            else:
+                                response.raise_for_status() # Raise for other 4xx errors immediately
+                                # Success or non-retryable error
+                                try:
+                                    data = await response.json()
+                                    return data
+                                except aiohttp.ContentTypeError:
+                                    text_response = await response.text()
+                                    logger.error(f"Non-JSON response from {url}. Status: {response.status}. Response: {text_response[:500]}")
+                                    raise aiohttp.ClientError("Non-JSON response")
+
+                            if attempt >= self.max_retries - 1:
+                                logger.error(f"Request failed after {self.max_retries} attempts due to status {response.status}.")
+                                response.raise_for_status() # Raise the final error
 
-                        # If we need to retry (429 or 5xx)
-                        if attempt < self.max_retries - 1:
-                            wait_time = min(self.base_delay * (2 ** attempt) + random.uniform(0, 1), self.max_delay)
-                            logger.info(f"Waiting {wait_time:.1f}s before retry {attempt + 2}...")
-                            await asyncio.sleep(wait_time)
-                        else:
-                            logger.error(f"Request failed after {self.max_retries} attempts due to status {response.status}.")
-                            response.raise_for_status() # Raise the final error
+                # If we need to retry (429 or 5xx). 429s are paced by the governor, which
+                # has already cut the rate and honoured any Retry-After.
+                if not rate_limited or not self.rate_governor.enabled:
+                    wait_time = min(self.base_delay * (2 ** attempt) + random.uniform(0, 1), self.max_delay)
+                    logger.info(f"Waiting {wait_time:.1f}s before retry {attempt + 2}...")
+                    await asyncio.sleep(wait_time)
 
-                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
-                    logger.warning(f"Network/Timeout error on attempt {attempt+1} for {url}: {e}")
-                    if proxy_url_str and self.proxy_manager: self.proxy_manager.mark_proxy_failure(proxy_url_str)
-                    if attempt < self.max_retries - 1:
-                         wait_time = min(self.base_delay * (2 ** attempt) + random.uniform(0, 1), self.max_delay)
-                         logger.info(f"Waiting {wait_time:.1f}s before retry {attempt + 2}...")
-                         await asyncio.sleep(wait_time)
-                    else:
-                        logger.error(f"Request failed after {self.max_retries} attempts due to {type(e).__name__}.")
-                        raise # Re-raise the final error
-                except aiohttp.ClientResponseError as e: # Non-retryable client errors (e.g., 404)
-                    logger.error(f"Client response error for {url}: {e.status} {e.message}")
-                    raise # Don't retry 4xx errors unless specifically handled
-                except Exception as e:
-                    logger.error(f"Unexpected error during request to {url} (Attempt {attempt+1}): {e}", exc_info=True)
-                    # Decide if retry makes sense for unexpected errors
-                    if attempt < self.max_retries - 1:
-                         wait_time = min(self.base_delay * (2 ** attempt) + random.uniform(0, 1), self.max_delay)
-                         logger.info(f"Waiting {wait_time:.1f}s before retry {attempt + 2} due to unexpected error...")
-                         await asyncio.sleep(wait_time)
-                    else:
-                        raise # Re-raise unexpected errors after retries
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                logger.warning(f"Network/Timeout error on attempt {attempt+1} for {url}: {e}")
+                if proxy_url_str and self.proxy_manager: self.proxy_manager.mark_proxy_failure(proxy_url_str)
+                if attempt < self.max_retries - 1:
+                     wait_time = min(self.base_delay * (2 ** attempt) + random.uniform(0, 1), self.max_delay)
+                     logger.info(f"Waiting {wait_time:.1f}s before retry {attempt + 2}...")
+                     await asyncio.sleep(wait_time)
+                else:
+                    logger.error(f"Request failed after {self.max_retries} attempts due to {type(e).__name__}.")
+                    raise # Re-raise the final error
+            except aiohttp.ClientResponseError as e: # Non-retryable client errors (e.g., 404)
+                logger.error(f"Client response error for {url}: {e.status} {e.message}")
+                raise # Don't retry 4xx errors unless specifically handled
+            except Exception as e:
+                logger.error(f"Unexpected error during request to {url} (Attempt {attempt+1}): {e}", exc_info=True)
+                # Decide if retry makes sense for unexpected errors
+                if attempt < self.max_retries - 1:
+                     wait_time = min(self.base_delay * (2 ** attempt) + random.uniform(0, 1), self.max_delay)
+                     logger.info(f"Waiting {wait_time:.1f}s before retry {attempt + 2} due to unexpected error...")
+                     await asyncio.sleep(wait_time)
+                else:
+                    raise # Re-raise unexpected errors after retries
                         
         # This should ideally not be reached if raise occurs in loop
         logger.critical(f"Request failed for {url} after all retries and error handling.")
@@ -182,7 +202,7 @@ class DexScreenerAPI:
             test_url = self.trending_endpoint 
             logger.debug(f"Testing connection to DexScreener API: {test_url}")
             # Use _make_request to include retry/error handling
-            await self._make_request(test_url, method="GET")
+            await self._make_request(test_url, method="GET", priority=RequestPriority.DISCOVERY, endpoint_class="latest")
             logger.info("Successfully connected to DexScreener API")
             return True
         except Exception as e:
@@ -193,7 +213,7 @@ class DexScreenerAPI:
         """Get list of trending tokens from the DexScreener TRENDING endpoint."""
         try:
             logger.debug(f"Fetching trending tokens from: {self.trending_endpoint}")
-            response_data = await self._make_request(self.trending_endpoint)
+            response_data = await self._make_request(self.trending_endpoint, priority=RequestPriority.DISCOVERY, endpoint_class="latest")
 
             # The trending endpoint returns a list of pair objects directly
             if isinstance(response_data, list):
@@ -211,8 +231,13 @@ class DexScreenerAPI:
             logger.error(f"Error fetching trending tokens: {e}", exc_info=True)
             return [] # Explicitly return empty list on error
             
-    async def get_token_details(self, tokens: Union[str, List[str]]) -> Dict[str, Any]:
-        """Get detailed pair information for token(s). Always returns a Dict {'pairs': [...] }"""
+    async def get_token_details(self, tokens: Union[str, List[str]], priority: int = RequestPriority.NORMAL) -> Dict[str, Any]:
+        """Get detailed pair information for token(s). Always returns a Dict {'pairs': [...] }
+        
+        Args:
+            tokens: Mint address or list of mint addresses (max 30 per request)
+            priority: RequestPriority for the shared rate governor
+        """
         try:
             is_single_token_request = False
             if isinstance(tokens, list):
@@ -226,7 +251,7 @@ class DexScreenerAPI:
                 
             url = f"{self.details_endpoint}/{addresses_str}"
             logger.debug(f"Fetching token pair details: {url} (Single token request: {is_single_token_request})")
-            data = await self._make_request(url)
+            data = await self._make_request(url, priority=priority)
             
             # Log the raw response for debugging, especially for problematic tokens
             logger.debug(f"Raw response from DexScreener for {addresses_str}: {data}")
@@ -3,8 +3,10 @@ import os
 import sys
 from pathlib import Path
 from logging.handlers import RotatingFileHandler
+from typing import Dict
 from config.settings import Settings, outputs_dir
 from utils.colored_formatter import ColoredFormatter
+from utils.logger import attach_handlers
 
 # Set a basic formatter for early logging before setup_logging is called
 basic_formatter = logging.Formatter(
@@ -20,6 +22,53 @@ if not root_logger.handlers:
     root_logger.addHandler(console_handler)
     root_logger.setLevel(logging.INFO)
 
+# Minimum level a logger needs to reach supertradex.log, by logger-name prefix
+# (plain string prefix, as the old MainLogFilter matched). The longest matching
+# prefix wins; '' is the default for everything else.
+# INFO is admitted from the same modules as before. The old filter also let INFO
+# from other modules through when the message contained a keyword such as
+# 'initialized' or 'Trade executed'. Routing never formats the message, so those
+# records now need WARNING or one of the modules below.
+MAIN_LOG_ROUTES: Dict[str, int] = {
+    '': logging.WARNING,
+    # Blockchain flood (including data.token_scanner / data.market_data): only C/E/W
+    'data': logging.WARNING,
+    'FocusedMonitoring': logging.WARNING,
+    'BlockchainListener': logging.WARNING,
+    'HybridMonitoring': logging.WARNING,
+    # Main application modules keep their INFO
+    '__main__': logging.INFO,
+    'strategies': logging.INFO,
+    'execution': logging.INFO,
+    'wallet': logging.INFO,
+}
+
+
+class LoggerRouteFilter(logging.Filter):
+    """
+    Admit a record when its level reaches the threshold routed to its logger name.
+
+    Thresholds are resolved once per logger name (longest prefix in ``routes``)
+    and cached, so the per-record cost is one dict lookup and no message formatting.
+    """
+
+    def __init__(self, routes: Dict[str, int]):
+        super().__init__()
+        self.routes = dict(routes)
+        self._thresholds: Dict[str, int] = {}
+
+    def threshold_for(self, name: str) -> int:
+        threshold = self._thresholds.get(name)
+        if threshold is None:
+            matches = [prefix for prefix in self.routes if name.startswith(prefix)]
+            threshold = self.routes[max(matches, key=len)] if matches else logging.NOTSET
+            self._thresholds[name] = threshold
+        return threshold
+
+    def filter(self, record):
+        return record.levelno >= self.threshold_for(record.name)
+
+
 class LoggingConfig:
     """Configuration for logging in the trading system."""
     
@@ -35,7 +84,6 @@ class LoggingConfig:
         
         # Configure root logger
         root_logger = logging.getLogger()
-        root_logger.setLevel(logging.DEBUG)  # Allow all levels, filter at handler level
         
         # Remove existing handlers
         for handler in root_logger.handlers[:]:
@@ -55,91 +103,9 @@ class LoggingConfig:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(console_formatter)
         console_handler.setLevel(logging.INFO)
-        root_logger.addHandler(console_handler)
-        
-        # Main supertradex.log file handler - ONLY Critical, Error, Warning and Important Info
-        # Create a custom filter for main log to reduce flooding
-        class MainLogFilter(logging.Filter):
-            def filter(self, record):
-                # Allow all CRITICAL, ERROR, WARNING
-                if record.levelno >= logging.WARNING:
-                    return True
-                
-                # For INFO level, only allow important events (exclude blockchain flood)
-                if record.levelno == logging.INFO:
-                    # Exclude blockchain-related logs
-                    excluded_loggers = [
-                        'data.blockchain_listener',
-                        'data.websocket_connection_manager', 
-                        'data.message_dispatcher',
-                        'data',
-                        'FocusedMonitoring',
-                        'BlockchainListener',
-                        'HybridMonitoring'
-                    ]
-                    
-                    # Exclude logs from blockchain-related loggers
-                    for excluded in excluded_loggers:
-                        if record.name.startswith(excluded):
-                            return False
-                    
-                    # Exclude messages containing blockchain noise keywords
-                    noise_keywords = [
-                        'WebSocket message',
-                        'Processing logs for signature',
-                        'Pool Events:',
-                        'Account Events:',
-                        'BLOCKCHAIN PRICE:',
-                        'Blockchain USD vs PriceMonitor',
-                        'subscription confirmed',
-                        'WebSocket connection',
-                        'DEX program activity',
-                        'Swap detected'
-                    ]
-                    
-                    message = record.getMessage()
-                    for keyword in noise_keywords:
-                        if keyword.lower() in message.lower():
-                            return False
-                    
-                    # Allow important INFO messages
-                    important_keywords = [
-                        'initialized',
-                        'starting',
-                        'shutting down', 
-                        'error',
-                        'failed',
-                        'Paper trading',
-                        'Trade executed',
-                        'Strategy',
-                        'Alert',
-                        'Balance',
-                        'Position'
-                    ]
-                    
-                    for keyword in important_keywords:
-                        if keyword.lower() in message.lower():
-                            return True
-                    
-                    # Allow INFO from main application modules
-                    important_modules = [
-                        '__main__',
-                        'strategies',
-                        'execution',
-                        'wallet',
-                        'data.token_scanner',
-                        'data.market_data'
-                    ]
-                    
-                    for module in important_modules:
-                        if record.name.startswith(module):
-                            return True
-                    
-                    return False  # Block other INFO
-                
-                # Block DEBUG level from main log
-                return False
         
+        # Main supertradex.log file handler - ONLY Critical, Error, Warning and Important Info.
+        # Routing is by logger name (MAIN_LOG_ROUTES), resolved once per logger.
         main_file_handler = RotatingFileHandler(
             log_dir / 'supertradex.log',
             maxBytes=50*1024*1024,  # 50MB
@@ -148,8 +114,17 @@ class LoggingConfig:
         )
         main_file_handler.setFormatter(file_formatter)
         main_file_handler.setLevel(logging.INFO)
-        main_file_handler.addFilter(MainLogFilter())
-        root_logger.addHandler(main_file_handler)
+        main_file_handler.addFilter(LoggerRouteFilter(MAIN_LOG_ROUTES))
+        
+        # Formatting and file/console I/O happen on the queue listener thread;
+        # callers only enqueue the record
+        handlers = [console_handler, main_file_handler]
+        attach_handlers(root_logger, 'root', handlers, use_queue=getattr(settings, 'LOG_QUEUE_ENABLED', True))
+        
+        # Gate at the lowest level any root handler accepts so disabled
+        # levels are rejected by Logger.isEnabledFor before a record is built
+        gate_level = min(handler.level for handler in handlers)
+        root_logger.setLevel(gate_level)
         
         # Set specific loggers to appropriate levels
         # Reduce noise from websockets and asyncio
@@ -163,10 +138,11 @@ class LoggingConfig:
         logging.getLogger('execution').setLevel(logging.INFO)
         logging.getLogger('wallet').setLevel(logging.INFO)
         
-        # Blockchain-related loggers get their own dedicated loggers (setup separately)
-        logging.getLogger('data.blockchain_listener').setLevel(logging.DEBUG)
-        logging.getLogger('data.websocket_connection_manager').setLevel(logging.DEBUG)
-        logging.getLogger('data.message_dispatcher').setLevel(logging.DEBUG)
+        # Blockchain-related loggers only reach the root handlers, so DEBUG would be
+        # built and then dropped; dedicated loggers are set up in config.blockchain_logging
+        logging.getLogger('data.blockchain_listener').setLevel(gate_level)
+        logging.getLogger('data.websocket_connection_manager').setLevel(gate_level)
+        logging.getLogger('data.message_dispatcher').setLevel(gate_level)
         
         logging.info("Organized logging configuration initialized")
         logging.info("🔶 Main log: C/E/W + Important Info only")
@@ -193,7 +169,7 @@ def setup_specialized_loggers():
     price_handler = logging.FileHandler(f'{outputs_dir}/prices.log')
     price_formatter = logging.Formatter('%(asctime)s - %(message)s')
     price_handler.setFormatter(price_formatter)
-    price_logger.addHandler(price_handler)
+    attach_handlers(price_logger, 'prices', [price_handler])
     price_logger.propagate = False
     
     # Trade logger  
@@ -207,7 +183,7 @@ def setup_specialized_loggers():
     trade_handler = logging.FileHandler(f'{outputs_dir}/trades.log')
     trade_formatter = logging.Formatter('%(asctime)s - %(message)s')
     trade_handler.setFormatter(trade_formatter)
-    trade_logger.addHandler(trade_handler)
+    attach_handlers(trade_logger, 'trades', [trade_handler])
     trade_logger.propagate = False
     
     return price_logger, trade_logger
\ No newline at end of file
@@ -9,6 +9,8 @@ from typing import Dict, Any, Optional, List
 from config.settings import Settings
 from utils.logger import get_logger
 from utils.proxy_manager import ProxyManager
+from utils.rate_governor import RequestPriority, get_rate_governor
+from utils.report_cache import REPORT_NEGATIVE, REPORT_POSITIVE, get_risk_report_cache
 import httpx
 
 # Get logger for this module
@@ -29,6 +31,8 @@ class RugcheckAPI:
         self.max_retries = settings.API_MAX_RETRIES
         self.retry_delay = settings.API_RETRY_DELAY
         self.proxy_manager = proxy_manager
+        self.rate_governor = get_rate_governor(settings) # Shared request-rate budget across API clients
+        self.report_cache = get_risk_report_cache(settings) # Reports are reused across scan cycles
         
         self.logger.info(f"RugcheckAPI concurrency limit set to: {self.semaphore._value}")
         
@@ -64,8 +68,16 @@ class RugcheckAPI:
             await self.client.aclose()
             logger.info("RugcheckAPI httpx client closed.")
             
-    async def _make_request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None, initial_backoff: float = 1.0) -> Optional[Dict]:
-        """Makes an API request with proxy rotation and retry logic for 429 errors."""
+    async def _make_request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None,
+                            initial_backoff: float = 1.0, priority: int = RequestPriority.DISCOVERY,
+                            not_found_result: Optional[Dict] = None) -> Optional[Dict]:
+        """Makes an API request with proxy rotation and retry logic for 429 errors.
+        
+        Every attempt waits for a slot from the shared rate governor; 429 responses and
+        their Retry-After header are reported to it, so the retry is paced by the governor
+        (and every other Rugcheck caller on the same proxy slows down too).
+        A 404 returns a copy of ``not_found_result`` when one is given.
+        """
         url = f"{self.BASE_URL}/{endpoint}"
         current_retry = 0
         backoff_delay = initial_backoff
@@ -85,7 +97,9 @@ class RugcheckAPI:
                     self.logger.warning("Proxy manager enabled but no proxy available.")
 
             try:
-                response = await self.client.request(method, url, **client_kwargs)
+                async with self.rate_governor.slot("rugcheck", "default", proxy_url, priority) as slot:
+                    response = await self.client.request(method, url, **client_kwargs)
+                    slot.record(response.status_code, response.headers.get("Retry-After"))
                 
                 # Handle Rate Limiting (429)
                 if response.status_code == 429:
@@ -93,21 +107,15 @@ class RugcheckAPI:
                     if current_retry > retries:
                          self.logger.error(f"Rugcheck API rate limit exceeded after {retries} retries on {endpoint}. Giving up.")
                          return None
-                         
-                    retry_after = response.headers.get("Retry-After")
-                    wait_time = backoff_delay
-                    if retry_after:
-                        try:
-                            wait_time = max(float(retry_after), backoff_delay) # Use header if available and longer
-                        except ValueError:
-                            self.logger.warning(f"Invalid Retry-After header value: {retry_after}. Using default backoff.")
                     
                     self.logger.warning(
                         f"Rate limited by Rugcheck API (Status 429) on {endpoint}. "
-                        f"Retry {current_retry}/{retries} in {wait_time:.2f} seconds..."
+                        f"Retry {current_retry}/{retries} when the rate governor allows "
+                        f"(Retry-After: {response.headers.get('Retry-After', 'n/a')})..."
                     )
-                    await asyncio.sleep(wait_time)
-                    backoff_delay *= 2 # Exponential backoff
+                    if not self.rate_governor.enabled:
+                        await asyncio.sleep(backoff_delay)
+                        backoff_delay *= 2 # Exponential backoff
                     if proxy_url:
                         self.proxy_manager.report_failure(proxy_url) # Report failure on rate limit to rotate proxy
                     continue # Go to next retry iteration
@@ -119,6 +127,9 @@ class RugcheckAPI:
                 return response.json()
                         
             except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404 and not_found_result is not None:
+                    self.logger.info(f"Rugcheck API has no data for {endpoint} (404)")
+                    return dict(not_found_result)
                 self.logger.error(f"HTTP error calling Rugcheck API {endpoint}: {e.response.status_code} - {e.response.text}")
                 if proxy_url:
                     self.proxy_manager.report_failure(proxy_url) # Report failure on other HTTP errors too
@@ -160,6 +171,9 @@ class RugcheckAPI:
     async def get_token_score(self, token_address: str) -> Optional[Dict]:
         """Get rugcheck score for a token.
         
+        Reports (and 404 not-found results) are served from the shared risk report
+        cache while fresh; failed requests are not cached.
+
         Args:
             token_address: Token mint address
             
@@ -169,6 +183,24 @@ class RugcheckAPI:
         if not token_address:
             self.logger.warning("No token address provided")
             return None
+        return await self.report_cache.get_or_fetch(
+            "rugcheck", token_address, lambda: self._fetch_token_score(token_address),
+            self._classify_report, mint=token_address,
+        )
+
+    @staticmethod
+    def _classify_report(result: Optional[Dict]) -> Optional[str]:
+        """Cache successful reports and not-found results, never transient failures."""
+        if not isinstance(result, dict) or not result:
+            return None
+        if result.get("not_found"):
+            return REPORT_NEGATIVE
+        if result.get("api_error"):
+            return None
+        return REPORT_POSITIVE
+
+    async def _fetch_token_score(self, token_address: str) -> Optional[Dict]:
+        """Request the rugcheck report for a token (uncached)."""
 
         # Add base delay before making the request
         if self.settings.BASE_DELAY > 0:
@@ -177,7 +209,8 @@ class RugcheckAPI:
         try:
             endpoint = f"tokens/{token_address}/report"
             # Use general API retry delay as initial backoff in _make_request
-            result = await self._make_request("GET", endpoint, initial_backoff=self.retry_delay) 
+            result = await self._make_request("GET", endpoint, initial_backoff=self.retry_delay,
+                                              not_found_result={"api_error": True, "not_found": True})
             if result is None:
                 # Signal that the request failed after retries
                 self.logger.warning(f"API call failed for {token_address} after all retries.")
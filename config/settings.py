@@ -52,9 +52,18 @@ class Settings(BaseSettings):
     LOG_LEVEL: str
     LOG_FILE: str # Assuming LOG_FILE is also needed from env
     ENABLE_CONSOLE_LOGGING: bool = True # Assuming True is the desired default if not in env
+    LOG_QUEUE_ENABLED: bool = Field(default=True, description="Write log records from a background QueueListener thread instead of the logging caller")
 
     # --- Database ---
     DATABASE_URL_ENV: str = Field(alias='DATABASE_URL') # Use alias to avoid clash with property
+    DB_SQLITE_WAL: bool = Field(default=True, description="Run SQLite in WAL journal mode so readers never block the writer")
+    DB_SQLITE_SYNCHRONOUS: str = Field(default="NORMAL", description="SQLite synchronous pragma (OFF, NORMAL, FULL, EXTRA); NORMAL is durable in WAL mode")
+    DB_SQLITE_BUSY_TIMEOUT_MS: int = Field(default=5000, description="Milliseconds SQLite waits on a locked database before failing")
+    DB_SQLITE_CACHE_SIZE_KB: int = Field(default=65536, description="SQLite page cache size per connection, in KiB")
+    DB_SQLITE_MMAP_SIZE_MB: int = Field(default=256, description="SQLite memory-mapped I/O size, in MiB (0 disables)")
+    DB_WRITE_BEHIND_ENABLED: bool = Field(default=True, description="Buffer per-mint price/liquidity/volume writes and flush them in one transaction")
+    DB_WRITE_BEHIND_FLUSH_INTERVAL: float = Field(default=1.0, description="Max seconds a buffered market update waits before being written")
+    DB_WRITE_BEHIND_MAX_DIRTY: int = Field(default=500, description="Flush as soon as this many distinct mints are pending")
 
     # --- File Paths ---
     WHITELIST_FILE: str
@@ -130,6 +139,17 @@ class Settings(BaseSettings):
     FILTER_WHITELIST_ENABLED: bool = False
     FILTER_BLACKLIST_ENABLED: bool = False
     FILTER_BONDING_CURVE_ENABLED: bool = False
+    FILTER_ENGINE_CONCURRENT: bool = Field(default=True, description="Run independent network filters for a token concurrently instead of one after another")
+    FILTER_RUGCHECK_CONCURRENCY: int = Field(default=4, description="Max concurrent RugCheck filter calls across all tokens")
+    FILTER_SOLSNIFFER_CONCURRENCY: int = Field(default=2, description="Max concurrent SolSniffer filter calls across all tokens")
+    FILTER_TWITTER_CONCURRENCY: int = Field(default=2, description="Max concurrent social (Twitter) filter calls across all tokens")
+    FILTER_RPC_CONCURRENCY: int = Field(default=8, description="Max concurrent bonding-curve RPC calls across all tokens")
+    FILTER_COHORT_ENABLED: bool = Field(default=True, description="Evaluate threshold filters over the whole scan as vectorized masks before API calls")
+    SCAN_INCREMENTAL_ENABLED: bool = Field(default=True, description="Skip scanned mints whose DexScreener snapshot is unchanged since they were last processed")
+    SCAN_FINGERPRINT_PRECISION: int = Field(default=4, description="Significant digits numbers are compared at when fingerprinting a snapshot (0 = exact)")
+    SCAN_INCREMENTAL_MAX_AGE: int = Field(default=1800, description="Seconds after which an unchanged mint is fully re-processed anyway")
+    SCAN_FILTER_REUSE_MAX_AGE: int = Field(default=600, description="Seconds a passing network filter result (RugCheck, SolSniffer, social, bonding curve) is reused for a changed mint")
+    SCAN_STATE_TTL: int = Field(default=7200, description="Seconds a mint's scan fingerprint is kept after it was last seen in the trending list")
 
     # --- General Numeric Settings ---
     SOLSNIFFER_BATCH_SIZE: int
@@ -371,6 +391,104 @@ class Settings(BaseSettings):
     MAX_LISTEN_RETRIES: int = 10 # Max retries for the listen method's backoff
     WEBSOCKET_MAX_MESSAGE_SIZE: Optional[int] = 10 * 1024 * 1024 # Max message size in bytes (10MB)
 
+    # --- Tick Store (append-only on-chain swap ticks) ---
+    TICK_STORE_ENABLED: bool = Field(default=True, description="Persist every parsed swap to the memory-mapped tick store")
+    TICK_STORE_DIR: str = Field(default="outputs/ticks", description="Root directory of the tick store (relative to project root)")
+    TICK_STORE_SEGMENT_ROWS: int = Field(default=16384, description="Rows per tick segment before it rolls over")
+    TICK_STORE_SEGMENT_SECONDS: int = Field(default=3600, description="Seconds per tick segment before it rolls over")
+    TICK_STORE_RETENTION_HOURS: float = Field(default=24.0, description="Tick segments older than this are pruned")
+    TICK_OHLCV_MIN_BARS: int = Field(default=100, description="Bars the tick store must hold (capped at the requested count) before tick OHLCV replaces the API bars")
+
+    # --- Risk Report Cache ---
+    RISK_CACHE_ENABLED: bool = Field(default=True, description="Cache RugCheck/SolSniffer/SolanaTracker/Twitter reports across scan cycles")
+    RISK_CACHE_PATH: str = Field(default="outputs/risk_reports.db", description="SQLite file backing the risk report cache (relative to project root)")
+    RISK_CACHE_TTL_RUGCHECK: float = Field(default=900.0, description="Seconds a RugCheck report stays fresh")
+    RISK_CACHE_TTL_SOLSNIFFER: float = Field(default=1800.0, description="Seconds a SolSniffer score stays fresh")
+    RISK_CACHE_TTL_SOLANATRACKER: float = Field(default=300.0, description="Seconds SolanaTracker token data stays fresh")
+    RISK_CACHE_TTL_SOLANATRACKER_HOLDERS: float = Field(default=300.0, description="Seconds a SolanaTracker holder count stays fresh")
+    RISK_CACHE_TTL_TWITTER: float = Field(default=3600.0, description="Seconds a Twitter account check stays fresh")
+    RISK_CACHE_NEGATIVE_TTL: float = Field(default=600.0, description="Seconds a not-found result is cached")
+    RISK_CACHE_LIQUIDITY_CHANGE_PCT: float = Field(default=0.3, description="Relative liquidity move that invalidates a mint's cached reports")
+    RISK_CACHE_HOLDER_CHANGE_PCT: float = Field(default=0.25, description="Relative holder-count move that invalidates a mint's cached reports")
+    RISK_CACHE_FLUSH_INTERVAL: float = Field(default=2.0, description="Seconds cache writes are buffered before being flushed to SQLite")
+
+    # --- Event Pipeline (BlockchainListener -> parse -> aggregate -> persist) ---
+    EVENT_PIPELINE_ENABLED: bool = Field(default=True, description="Route listener events through the sharded bounded-queue pipeline instead of handling them inline")
+    EVENT_PIPELINE_SHARDS: int = Field(default=4, description="Number of worker shards (events are sharded by mint/pool hash)")
+    EVENT_PIPELINE_QUEUE_SIZE: int = Field(default=4096, description="Capacity of each pipeline stage queue")
+    EVENT_PIPELINE_FLUSH_INTERVAL: float = Field(default=1.0, description="Max seconds coalesced prices wait before being persisted")
+    EVENT_PIPELINE_MAX_BATCH: int = Field(default=256, description="Persist as soon as this many mints are pending in a shard")
+
+    # --- Mint Metadata (shared decimals/supply/authority cache) ---
+    MINT_METADATA_BATCH_WINDOW: float = Field(default=0.02, description="Seconds cold mint lookups wait to be batched into one getMultipleAccounts call")
+    MINT_METADATA_MAX_BATCH: int = Field(default=100, description="Max mints per getMultipleAccounts request (RPC limit is 100)")
+    MINT_METADATA_REQUEST_TIMEOUT: float = Field(default=10.0, description="Timeout in seconds for a mint metadata RPC request")
+    MINT_METADATA_NEGATIVE_TTL: float = Field(default=300.0, description="Seconds before a missing or non-mint account is queried again")
+
+    # --- Vault Balance Fetcher (batched V4 vault reads) ---
+    VAULT_FETCH_BATCH_WINDOW: float = Field(default=0.05, description="Seconds vault reads from all pools wait to be merged into one getMultipleAccounts call")
+    VAULT_FETCH_MAX_BATCH: int = Field(default=100, description="Max vaults per getMultipleAccounts request (RPC limit is 100)")
+    VAULT_FETCH_REQUEST_TIMEOUT: float = Field(default=10.0, description="Timeout in seconds for a vault balance RPC request")
+
+    # --- Message Dispatcher ---
+    DISPATCHER_FAST_PATH: bool = Field(default=True, description="Route raw decoded WebSocket frames and build pydantic models only for sampled or malformed frames")
+    DISPATCHER_VALIDATION_SAMPLE_RATE: float = Field(default=0.01, ge=0.0, le=1.0, description="Fraction of well-formed frames still validated with the pydantic model in fast-path mode (0 disables sampling)")
+
+    # --- Rate Governor (shared adaptive rate limits for outbound API calls) ---
+    RATE_GOVERNOR_ENABLED: bool = Field(default=True, description="Pace DexScreener/RugCheck/SolanaTracker/Jupiter/RPC requests through the shared token-bucket governor")
+    RATE_GOVERNOR_LIMITS: str = Field(default="dexscreener=5,dexscreener:latest=1,rugcheck=3,solanatracker=1,jupiter=1,helius=10", description="Per-provider request ceilings in requests/second as 'provider[:endpoint_class]=rps,...'")
+    RATE_GOVERNOR_DEFAULT_RPS: float = Field(default=5.0, description="Ceiling for providers not listed in RATE_GOVERNOR_LIMITS")
+    RATE_GOVERNOR_BURST_SECONDS: float = Field(default=1.0, description="Bucket capacity in seconds of ceiling rate (requests that may go back to back)")
+    RATE_GOVERNOR_MIN_RATE_FRACTION: float = Field(default=0.05, description="429s never cut a bucket's rate below this fraction of its ceiling")
+    RATE_GOVERNOR_INCREASE_RPS: float = Field(default=0.5, description="Additive increase of the rate (requests/s per second of successful traffic)")
+    RATE_GOVERNOR_DECREASE_FACTOR: float = Field(default=0.5, description="Multiplicative decrease of the rate on a 429")
+    RATE_GOVERNOR_COOLDOWN: float = Field(default=1.0, description="Minimum seconds between rate cuts, and before increases resume after a cut")
+    RATE_GOVERNOR_MAX_RETRY_AFTER: float = Field(default=120.0, description="Longest Retry-After pause honoured, in seconds")
+
+    # --- RPC Pool (latency-routed, hedged Solana RPC calls) ---
+    RPC_POOL_EXTRA_URLS: str = Field(default="", description="Additional HTTP RPC endpoints for the pool, comma-separated (SOLANA_RPC_URL and SOLANA_MAINNET_RPC are always included)")
+    RPC_POOL_HEDGING_ENABLED: bool = Field(default=True, description="Send a duplicate getTransaction/getSignatureStatuses to a second endpoint when the first is slower than its p90")
+    RPC_POOL_REQUEST_TIMEOUT: float = Field(default=10.0, description="Seconds per RPC attempt on one endpoint")
+    RPC_POOL_HEDGE_QUANTILE: float = Field(default=0.9, description="Latency quantile of the first endpoint after which the hedged duplicate is sent")
+    RPC_POOL_HEDGE_MIN_DELAY: float = Field(default=0.05, description="Lower bound on the hedge delay, in seconds")
+    RPC_POOL_HEDGE_MAX_DELAY: float = Field(default=2.0, description="Upper bound on the hedge delay, in seconds")
+    RPC_POOL_HEDGE_DEFAULT_DELAY: float = Field(default=0.5, description="Hedge delay (and initial latency estimate) before an endpoint has RPC_POOL_MIN_SAMPLES samples")
+    RPC_POOL_MIN_SAMPLES: int = Field(default=10, description="Latency samples needed before an endpoint's own quantile sets its hedge delay")
+    RPC_POOL_EWMA_ALPHA: float = Field(default=0.2, description="Smoothing factor of the per-endpoint latency and error EWMAs")
+    RPC_POOL_ERROR_WEIGHT: float = Field(default=4.0, description="How strongly the error EWMA inflates an endpoint's routing score")
+    RPC_POOL_MAX_CONSECUTIVE_ERRORS: int = Field(default=5, description="Consecutive failures after which an endpoint is benched")
+    RPC_POOL_ERROR_COOLDOWN: float = Field(default=30.0, description="Seconds a benched endpoint is only used as a last resort")
+
+    # --- Signature Poller (batched transaction confirmation) ---
+    SIGNATURE_POLLER_INTERVAL: float = Field(default=0.4, description="Seconds between batched getSignatureStatuses polls while any signature awaits confirmation")
+    SIGNATURE_POLLER_MAX_BATCH: int = Field(default=256, description="Signatures per getSignatureStatuses request (RPC maximum 256)")
+    SIGNATURE_POLLER_WS_ENABLED: bool = Field(default=False, description="Also watch pending signatures with signatureSubscribe on SOLANA_WSS_URL")
+
+    # --- Trade Queue ---
+    TRADE_QUEUE_MAX_CONCURRENCY: int = Field(default=4, description="Trades on distinct mints the TradeQueue executes concurrently (trades for one mint always run in order)")
+
+    # --- Swap Prefetch (pre-built Jupiter transactions for the active mint) ---
+    EXECUTION_PREFETCH_ENABLED: bool = Field(default=True, description="Pre-build SOL -> mint swap transactions for the active mint in live trading")
+    EXECUTION_PREFETCH_SIZES_SOL: str = Field(default="0.05,0.1", description="Comma-separated SOL buy sizes to pre-build swaps for; only trades of exactly these sizes use a template")
+    EXECUTION_PREFETCH_QUOTE_TTL: float = Field(default=5.0, description="Seconds a pre-built quote/transaction stays valid; templates are rebuilt at half this age")
+    EXECUTION_BLOCKHASH_REFRESH_INTERVAL: float = Field(default=2.0, description="Seconds between background getLatestBlockhash refreshes")
+    EXECUTION_BLOCKHASH_MAX_AGE: float = Field(default=30.0, description="Oldest cached blockhash (seconds) swapped into a pre-built transaction")
+
+    # --- Backtesting ---
+    SLIPPAGE_TOLERANCE: float = Field(default=0.5, description="Slippage tolerance in percent; also the per-fill slippage in backtests")
+    BACKTEST_FEE_PCT: float = Field(default=0.25, description="Swap fee per side in percent of notional for backtests")
+
+    # --- Market Replay (record WebSocket frames for offline load tests) ---
+    REPLAY_RECORD_PATH: str = Field(default="", description="Record raw WebSocket frames (and RPC responses) to this gzip file or directory; empty disables recording")
+    REPLAY_RECORD_RPC: bool = Field(default=True, description="Also record RPC pool responses so replays can answer getTransaction/getAccountInfo offline")
+
+    # --- MarketData Cache ---
+    MARKET_CACHE_MAX_ENTRIES: int = Field(default=5000, description="LRU entry limit per MarketData cache type (price, token_info, pair_data, ...)")
+    MARKET_CACHE_STALE_BUDGETS: str = Field(default="token_info=600,pair_data=120,price=5,historical_data=1800,market_data=30,blockchain_data=0", description="Seconds past its TTL a cached value may still be served while it is refreshed in the background, as 'cache_type=seconds,...'")
+
+    # --- Streaming Indicators ---
+    RSI_SMOOTHING: str = Field(default="sma", description="Streaming RSI smoothing: 'sma' matches the batch Indicators.rsi, 'wilder' uses Wilder's average")
+
     # --- Test/Debug Settings ---
     TEST_WEBSOCKET_ALL_FILTER_FOR_RAYDIUM: bool = Field(default=True, description="DIAGNOSTIC: Use 'all' filter for Raydium V4 in BlockchainListener instead of mentions.")
 
@@ -464,6 +582,18 @@ class Settings(BaseSettings):
         _ = self.DATABASE_FILE_PATH # Access property to trigger validation check
         return f"sqlite+aiosqlite:///{self._database_file_path}"
 
+    @property
+    def TICK_STORE_PATH(self) -> str:
+        """Returns TICK_STORE_DIR resolved against the project root."""
+        path = Path(self.TICK_STORE_DIR)
+        return str(path if path.is_absolute() else (BASE_DIR / path).resolve())
+
+    @property
+    def RISK_CACHE_FILE_PATH(self) -> str:
+        """Returns RISK_CACHE_PATH resolved against the project root."""
+        path = Path(self.RISK_CACHE_PATH)
+        return str(path if path.is_absolute() else (BASE_DIR / path).resolve())
+
     @property
     def DEX_PROGRAM_IDS(self) -> Dict[str, str]:
         """Returns DEX_PROGRAM_IDS_STR parsed as a dictionary."""
@@ -0,0 +1,230 @@
+"""
+Micro-batched ``getMultipleAccounts`` reads.
+
+Callers ask for single accounts; requests that arrive within ``batch_window``
+seconds of each other are merged, de-duplicated and sent as
+``getMultipleAccounts`` calls of at most 100 keys. Every caller waiting on the
+same key shares one future, whether the key is still queued or its batch is
+already in flight, so N concurrent reads of one vault cost a single slot in a
+single RPC.
+
+Nothing is cached across windows: each window reflects the account state at
+the time of its RPC. Services that want caching (``MintMetadataService``)
+layer it on top.
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from utils.logger import get_logger
+from utils.rate_governor import RequestPriority, get_rate_governor, provider_for_url
+
+logger = get_logger(__name__)
+
+# getMultipleAccounts accepts at most 100 pubkeys per request
+MAX_ACCOUNTS_PER_REQUEST = 100
+
+
+class MultipleAccountsBatcher:
+    """
+    Coalesces single-account reads into batched ``getMultipleAccounts`` RPCs.
+
+    Args:
+        rpc_url: JSON-RPC endpoint
+        http_client: Shared httpx.AsyncClient; one is created (and closed by ``close``) if omitted
+        batch_window: Seconds to wait for more keys before sending a batch
+        max_batch: Keys per request (capped at 100); a full batch is sent immediately
+        request_timeout: Timeout in seconds per RPC
+        encoding: Account data encoding requested from the RPC
+        name: Label used in logs
+        priority: RequestPriority of this batcher's RPCs in the shared rate governor
+    """
+
+    def __init__(self,
+                 rpc_url: str,
+                 http_client: Optional[httpx.AsyncClient] = None,
+                 batch_window: float = 0.02,
+                 max_batch: int = MAX_ACCOUNTS_PER_REQUEST,
+                 request_timeout: float = 10.0,
+                 encoding: str = "base64",
+                 name: str = "account_batcher",
+                 priority: int = RequestPriority.NORMAL):
+        if not rpc_url.startswith('http'):
+            rpc_url = f"https://{rpc_url}"
+        self.rpc_url = rpc_url
+        self.http_client = http_client
+        self._owns_client = http_client is None
+        self.batch_window = batch_window
+        self.max_batch = max(1, min(int(max_batch), MAX_ACCOUNTS_PER_REQUEST))
+        self.request_timeout = request_timeout
+        self.encoding = encoding
+        self.name = name
+        self.priority = priority
+        self.rate_governor = get_rate_governor()
+        self.provider = provider_for_url(rpc_url)
+
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Keys whose batch has been sent but not answered yet
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._batch_tasks: set = set()
+
+        self._counters: Dict[str, int] = {
+            'requested': 0,
+            'deduplicated': 0,
+            'rpc_batches': 0,
+            'rpc_accounts': 0,
+            'rpc_errors': 0,
+        }
+
+    async def load(self, pubkey: str) -> Optional[Dict[str, Any]]:
+        """
+        Account info for one pubkey, batched with other reads in the current window.
+
+        Args:
+            pubkey: Base58 account address
+
+        Returns:
+            Optional[Dict]: RPC account object (``data``, ``owner``, ``lamports``...),
+            or None if the account does not exist
+
+        Raises:
+            Exception: The RPC error of the batch this read was part of
+        """
+        # Shield so one cancelled caller does not cancel the read other callers share
+        return await asyncio.shield(self._enqueue(pubkey))
+
+    async def load_many(self, pubkeys: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Account info for many pubkeys (duplicates collapsed), all in the current window.
+
+        Returns:
+            Dict[str, Optional[Dict]]: pubkey -> account object or None
+        """
+        futures = {pubkey: self._enqueue(pubkey) for pubkey in dict.fromkeys(pubkeys)}
+        if not futures:
+            return {}
+        values = await asyncio.gather(*(asyncio.shield(f) for f in futures.values()))
+        return dict(zip(futures, values))
+
+    def _enqueue(self, pubkey: str) -> asyncio.Future:
+        self._counters['requested'] += 1
+        future = self._pending.get(pubkey) or self._in_flight.get(pubkey)
+        if future is not None:
+            self._counters['deduplicated'] += 1
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[pubkey] = future
+        if len(self._pending) >= self.max_batch:
+            self._start_batches()
+        elif self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_after_window())
+        return future
+
+    async def _flush_after_window(self):
+        try:
+            await asyncio.sleep(self.batch_window)
+        finally:
+            if self._flush_task is asyncio.current_task():
+                self._flush_task = None
+        self._start_batches()
+
+    def _start_batches(self):
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        keys = list(pending)
+        loop = asyncio.get_running_loop()
+        for start in range(0, len(keys), self.max_batch):
+            chunk = {key: pending[key] for key in keys[start:start + self.max_batch]}
+            self._in_flight.update(chunk)
+            task = loop.create_task(self._fetch_batch(chunk))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _fetch_batch(self, batch: Dict[str, asyncio.Future]):
+        try:
+            await self._resolve_batch(batch)
+        finally:
+            for key, future in batch.items():
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+    async def _resolve_batch(self, batch: Dict[str, asyncio.Future]):
+        try:
+            values = await self._get_multiple_accounts(list(batch))
+            self._counters['rpc_batches'] += 1
+            self._counters['rpc_accounts'] += len(batch)
+            for future, value in zip(batch.values(), values):
+                if not future.done():
+                    future.set_result(value)
+        except asyncio.CancelledError:
+            for future in batch.values():
+                if not future.done():
+                    future.cancel()
+            raise
+        except Exception as e:
+            self._counters['rpc_errors'] += 1
+            logger.warning(f"{self.name}: getMultipleAccounts failed for {len(batch)} accounts: {e}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Mark retrieved so callers that already gave up do not trigger "never retrieved" warnings
+                    future.exception()
+
+    async def _get_multiple_accounts(self, pubkeys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(timeout=self.request_timeout)
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getMultipleAccounts",
+            "params": [pubkeys, {"encoding": self.encoding}],
+        }
+        async with self.rate_governor.slot(self.provider, "rpc", None, self.priority) as slot:
+            response = await self.http_client.post(self.rpc_url, json=payload, timeout=self.request_timeout)
+            slot.record(response.status_code, response.headers.get("Retry-After"))
+        response.raise_for_status()
+        data = response.json()
+        if 'error' in data:
+            raise RuntimeError(f"RPC error: {data['error']}")
+        values = (data.get('result') or {}).get('value')
+        if not isinstance(values, list) or len(values) != len(pubkeys):
+            raise RuntimeError(f"Unexpected getMultipleAccounts response shape for {len(pubkeys)} accounts")
+        return values
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def close(self):
+        """Cancel queued and in-flight reads and close the HTTP client if this batcher created it."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.cancel()
+        for task in list(self._batch_tasks):
+            task.cancel()
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        if self._owns_client and self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pending keys and cumulative request/RPC counters."""
+        return {
+            'pending': len(self._pending),
+            'in_flight': len(self._in_flight),
+            'in_flight_batches': len(self._batch_tasks),
+            **self._counters,
+        }
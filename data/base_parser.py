@@ -3,15 +3,158 @@ Base parser class for DEX-specific blockchain data parsing
 Provides common interface for all DEX parsers
 """
 
+import re
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 import logging
 
+# Program/system accounts that show up in logs but are never the traded mint
+KNOWN_PROGRAM_IDS = frozenset({
+    '11111111111111111111111111111112',  # System Program
+    'So11111111111111111111111111111111112',  # SOL mint
+    '675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8',  # Raydium V4
+    'CAMMCzo5YL8w4VFF8KVHrK22GGUsp5VTaW7grrKgrWqK',  # Raydium CLMM
+    '6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P',   # PumpFun
+    'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA',   # Token Program
+    'ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL'    # Associated Token Program
+})
+
+# Rules every parser gets: program frames, event payloads, instruction names and base58 addresses.
+# Logs are scanned as one newline-joined string, so patterns use [ \t] rather than \s.
+# "Program <id> invoke/success/consumed/failed" frame lines are consumed whole, so program
+# IDs there are never reported as addresses.
+COMMON_LOG_RULES: Tuple[Tuple[str, str], ...] = (
+    ("program", r"^Program ([1-9A-HJ-NP-Za-km-z]{32,44}) (invoke|success|consumed|failed)\b.*$"),
+    ("program_data", r"^Program data: ([A-Za-z0-9+/=]+)"),
+    ("ray_log", r"ray_log: ([A-Za-z0-9+/=]+)"),
+    ("instruction", r"(?i:instruction):[ \t]*(\w+)"),
+    ("address", r"\b([1-9A-HJ-NP-Za-km-z]{32,44})\b"),
+)
+
+DEFAULT_SWAP_ACTIVITY_PATTERN = r"swap|trade|buy|sell|exchange"
+
+
+class LogScan:
+    """
+    Result of a single pass over a transaction's logs.
+
+    ``events`` holds ``(line_index, rule_name, value)`` tuples in log order, where
+    ``value`` is the rule's capture (a tuple for multi-group rules, None when the
+    optional group did not match).
+    """
+
+    __slots__ = ("logs", "events")
+
+    def __init__(self, logs: List[str], events: List[Tuple[int, str, Any]]):
+        self.logs = logs
+        self.events = events
+
+    def values(self, rule: str) -> List[Any]:
+        """All captured values for a rule, in log order."""
+        return [value for _, name, value in self.events if name == rule]
+
+    @property
+    def addresses(self) -> List[str]:
+        """Every base58 address in log order (duplicates kept)."""
+        return self.values("address")
+
+    @property
+    def program_data(self) -> List[str]:
+        """Base64 payloads from ``Program data:`` and ``ray_log:`` lines."""
+        return [value for _, name, value in self.events if name == "program_data" or name == "ray_log"]
+
+    def mints(self, exclude: frozenset = KNOWN_PROGRAM_IDS) -> List[str]:
+        """Unique candidate mint addresses (known program IDs removed), in first-seen order."""
+        return list(dict.fromkeys(a for a in self.addresses if a not in exclude))
+
+
+class LogPatternSet:
+    """
+    Named log rules compiled into one alternation regex.
+
+    Args:
+        rules: Ordered ``(name, pattern)`` pairs; earlier rules win at the same position
+        activity_pattern: Lowercase prefilter regex matched against the lowercased logs;
+            transactions that do not match it are skipped before any per-rule work
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, str]], activity_pattern: Optional[str] = DEFAULT_SWAP_ACTIVITY_PATTERN):
+        self.rules = tuple(rules)
+        # Matches may only start at a word boundary, which skips most positions cheaply
+        alternation = "|".join(f"(?P<{name}>{pattern})" for name, pattern in self.rules)
+        self.regex = re.compile(rf"(?=\w)\b(?:{alternation})", re.MULTILINE)
+        # Lowercasing once and matching case-sensitively is far cheaper than re.IGNORECASE
+        self.activity = re.compile(activity_pattern) if activity_pattern else None
+
+        # Capture-group indexes per rule, so values are read without groupdict()
+        self._value_groups: Dict[str, Tuple[int, ...]] = {}
+        for name, pattern in self.rules:
+            first = self.regex.groupindex[name] + 1
+            self._value_groups[name] = tuple(range(first, first + re.compile(pattern).groups))
+
+    def has_activity(self, logs: List[str]) -> bool:
+        """
+        Cheap prefilter: does any log line match the activity pattern?
+
+        Args:
+            logs: Transaction log lines
+
+        Returns:
+            bool: True if the transaction may contain a swap
+        """
+        if self.activity is None:
+            return True
+        return self.activity.search("\n".join(logs).lower()) is not None
+
+    def scan(self, logs: List[str], require_activity: bool = True) -> Optional[LogScan]:
+        """
+        Classify every matching fragment of the logs in one ``finditer`` pass.
+
+        Args:
+            logs: Transaction log lines
+            require_activity: Return None when the activity prefilter does not match
+
+        Returns:
+            Optional[LogScan]: Scan result, or None if the transaction was skipped
+        """
+        text = "\n".join(logs)
+        if require_activity and self.activity is not None and self.activity.search(text.lower()) is None:
+            return None
+
+        line_starts = [0]
+        if len(logs) > 1:
+            offset = 0
+            for log in logs[:-1]:
+                offset += len(log) + 1
+                line_starts.append(offset)
+
+        value_groups = self._value_groups
+        events = []
+        for match in self.regex.finditer(text):
+            name = match.lastgroup
+            groups = value_groups[name]
+            if not groups:
+                value = match.group(0)
+            elif len(groups) == 1:
+                value = match.group(groups[0])
+            else:
+                value = match.group(*groups)
+            events.append((bisect_right(line_starts, match.start()) - 1, name, value))
+        return LogScan(logs, events)
+
+
 class DexParser(ABC):
     """
     Abstract base class for DEX-specific parsers
     Defines the interface that all DEX parsers must implement
     """
+
+    # Parser-specific ``(name, pattern)`` log rules, compiled together with COMMON_LOG_RULES
+    LOG_RULES: Sequence[Tuple[str, str]] = ()
+    # Lowercase prefilter regex (matched against lowercased logs); logs that do not match are never scanned
+    SWAP_ACTIVITY_PATTERN: Optional[str] = DEFAULT_SWAP_ACTIVITY_PATTERN
     
     def __init__(self, settings, logger: Optional[logging.Logger] = None):
         """
@@ -71,4 +214,103 @@ class DexParser(ABC):
         Returns:
             bool: True if logs are valid for parsing
         """
-        return bool(logs) and all(isinstance(log, str) for log in logs) 
\ No newline at end of file
+        return bool(logs) and all(isinstance(log, str) for log in logs) 
+
+    @classmethod
+    def log_patterns(cls) -> LogPatternSet:
+        """
+        Compiled log rules for this parser class (built once, then cached on the class)
+
+        Returns:
+            LogPatternSet: The parser's rules followed by COMMON_LOG_RULES
+        """
+        patterns = cls.__dict__.get('_log_pattern_set')
+        if patterns is None:
+            patterns = LogPatternSet(tuple(cls.LOG_RULES) + COMMON_LOG_RULES, cls.SWAP_ACTIVITY_PATTERN)
+            cls._log_pattern_set = patterns
+        return patterns
+
+    def contains_swap_activity(self, logs: List[str]) -> bool:
+        """
+        Prefilter used to drop non-swap transactions before parsing
+
+        Args:
+            logs: List of log strings
+
+        Returns:
+            bool: True if the logs may contain a swap for this DEX
+        """
+        return self.log_patterns().has_activity(logs)
+
+    def scan_logs(self, logs: List[str], require_activity: bool = True) -> Optional[LogScan]:
+        """
+        Single-pass scan of transaction logs with this parser's compiled rules
+
+        Args:
+            logs: List of log strings
+            require_activity: Skip (return None) when the swap-activity prefilter does not match
+
+        Returns:
+            Optional[LogScan]: Classified log events, or None if the transaction was skipped
+        """
+        return self.log_patterns().scan(logs, require_activity)
+
+
+def benchmark_log_parsing(parsers: Dict[str, DexParser], fixtures: Dict[str, List[List[str]]],
+                          iterations: int = 200) -> Dict[str, Dict[str, float]]:
+    """
+    Throughput of ``parse_swap_logs`` over recorded log fixtures.
+
+    Args:
+        parsers: Fixture key (DEX id) -> parser instance
+        fixtures: Fixture key -> list of transactions, each a list of log lines
+        iterations: Passes over each fixture set
+
+    Returns:
+        Dict[str, Dict[str, float]]: Per DEX: transactions/s, lines/s and swaps found per pass
+    """
+    results = {}
+    for dex_id, transactions in fixtures.items():
+        parser = parsers.get(dex_id)
+        if parser is None or not transactions:
+            continue
+        line_count = sum(len(tx) for tx in transactions)
+        found = sum(1 for tx in transactions if parser.parse_swap_logs(tx))
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for tx in transactions:
+                parser.parse_swap_logs(tx)
+        elapsed = time.perf_counter() - start
+        tx_total = len(transactions) * iterations
+        results[dex_id] = {
+            "transactions_per_second": tx_total / elapsed if elapsed > 0 else float("inf"),
+            "lines_per_second": line_count * iterations / elapsed if elapsed > 0 else float("inf"),
+            "swaps_found": found,
+            "transactions": len(transactions),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    import json
+    import os
+    from types import SimpleNamespace
+    from data.raydium_v4_parser import RaydiumV4Parser
+    from data.raydium_clmm_parser import RaydiumClmmParser
+    from data.pumpswap_parser import PumpSwapParser
+
+    fixture_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'swap_logs.json')
+    with open(fixture_path) as f:
+        log_fixtures = json.load(f)
+
+    quiet = logging.getLogger('log_benchmark')
+    quiet.setLevel(logging.CRITICAL)
+    bench_settings = SimpleNamespace()
+    bench_parsers = {
+        'raydium_v4': RaydiumV4Parser(bench_settings, quiet),
+        'raydium_clmm': RaydiumClmmParser(bench_settings, quiet),
+        'pumpswap': PumpSwapParser(bench_settings, quiet),
+    }
+    for dex, stats in benchmark_log_parsing(bench_parsers, log_fixtures).items():
+        print(f"{dex:<14} {stats['transactions_per_second']:>10,.0f} tx/s  {stats['lines_per_second']:>12,.0f} lines/s  "
+              f"({stats['swaps_found']}/{stats['transactions']} swaps)")
@@ -95,7 +95,7 @@ class SwapEventHandler(BaseEventHandler):
             signature = event_data.get('signature', 'unknown')
             pool_address = event_data.get('pool_address', '')
             
-            self.logger.debug(f"Processing swap event for {dex_id} pool {pool_address}")
+            self.logger.debug("Processing swap event for %s pool %s", dex_id, pool_address)
             
             # Use the appropriate parser to extract swap information
             parser = self.parsers.get(dex_id)
@@ -166,7 +166,7 @@ class SwapEventHandler(BaseEventHandler):
             else:
                 # No swap found in logs - create unhandled event
                 self._increment_counter("no_swap_found", labels={"dex_id": dex_id})
-                self.logger.debug(f"No swap events found in {dex_id} logs for signature {signature[:8]}...")
+                self.logger.debug("No swap events found in %s logs for signature %.8s...", dex_id, signature)
                 return {
                     **event_data,
                     'event_type': EventType.UNHANDLED,
@@ -235,7 +235,7 @@ class AccountUpdateHandler(BaseEventHandler):
             dex_id = event_data.get('dex_id', '')
             slot = event_data.get('slot')
             
-            self.logger.debug(f"Processing account update for {dex_id} pool {pool_address} at slot {slot}")
+            self.logger.debug("Processing account update for %s pool %s at slot %s", dex_id, pool_address, slot)
             
             enriched_data = {
                 **event_data,
@@ -451,7 +451,7 @@ class EventRouter(SystemMonitoringMixin):
                             # Record successful routing
                             self._increment_counter("events_routed_successfully", labels={"handler": handler_name, "event_type": event_type})
                             
-                            self.logger.debug(f"Event routed to {handler_name}, type: {event_type}")
+                            self.logger.debug("Event routed to %s, type: %s", handler_name, event_type)
                             return result
                             
                     except Exception as e:
@@ -462,7 +462,7 @@ class EventRouter(SystemMonitoringMixin):
                 # No handler could process this event
                 self.event_stats['unhandled'] += 1
                 self._increment_counter("events_unhandled", labels={"source": event_data.get('source', 'unknown')})
-                self.logger.debug(f"No handler found for event from {event_data.get('source', 'unknown')}")
+                self.logger.debug("No handler found for event from %s", event_data.get('source', 'unknown'))
                 
                 return {
                     **event_data,
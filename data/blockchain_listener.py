@@ -257,10 +257,24 @@ class BlockchainListener:
             'raydium_clmm': RaydiumClmmParser(self.settings, self.blockchain_logger)
         }
         
+        # Vault balances for V4 account-update pricing, merged into batched getMultipleAccounts reads
+        from data.vault_fetcher import VaultBalanceFetcher
+        self.vault_fetcher = VaultBalanceFetcher(self.settings, http_client=self.http_client)
+        
         # Initialize message dispatcher for handling WebSocket messages
         from data.message_dispatcher import MessageDispatcher
         self.message_dispatcher = MessageDispatcher(self, self.logger)
         
+        # Optional capture of raw frames and RPC responses for offline replay (data/market_replay.py)
+        self.frame_recorder = None
+        record_path = getattr(self.settings, 'REPLAY_RECORD_PATH', '')
+        if record_path:
+            from data.market_replay import FrameRecorder, record_rpc_pool
+            self.frame_recorder = FrameRecorder(record_path)
+            if getattr(self.settings, 'REPLAY_RECORD_RPC', True):
+                from utils.rpc_pool import get_rpc_pool
+                record_rpc_pool(get_rpc_pool(self.settings), self.frame_recorder)
+        
         self.blockchain_logger.info(f"Initialized connection manager, {len(self.parsers)} DEX parsers, price monitoring aggregator, and message dispatcher: {list(self.parsers.keys())}")
         
         try:
@@ -560,6 +574,13 @@ class BlockchainListener:
                     await asyncio.gather(*self._listen_tasks.values(), return_exceptions=True)
                     self._listen_tasks.clear()
             
+            if getattr(self, 'vault_fetcher', None):
+                await self.vault_fetcher.close()
+            
+            if getattr(self, 'frame_recorder', None):
+                self.frame_recorder.close(self._active_subscriptions)
+                self.frame_recorder = None
+            
             self.blockchain_logger.info("BlockchainListener closed successfully")
             
         except Exception as e:
@@ -662,6 +683,9 @@ class BlockchainListener:
             async for message in ws:
                 if self._stop_event.is_set():
                     break
+                
+                if self.frame_recorder is not None:
+                    self.frame_recorder.record_frame(program_id_str, message)
                     
                 try:
                     data = json.loads(message)
@@ -746,11 +770,15 @@ class BlockchainListener:
         except Exception as e:
             self.blockchain_logger.error(f"Error processing swap logs: {e}")
 
+    async def _calculate_raydium_v4_price(self, base_vault: str, quote_vault: str,
+                                          base_decimal: int, quote_decimal: int) -> Optional[float]:
+        """Price of a V4 pool's base token in quote tokens, from batched vault-balance reads."""
+        return await self.vault_fetcher.calculate_raydium_v4_price(base_vault, quote_vault, base_decimal, quote_decimal)
+
     def _contains_swap_activity(self, logs: List[str]) -> bool:
-        """Check if logs contain swap-related activity."""
-        swap_keywords = ["swap", "trade", "buy", "sell", "exchange"]
-        log_text = " ".join(logs).lower()
-        return any(keyword in log_text for keyword in swap_keywords)
+        """Check if logs contain swap-related activity (shared precompiled prefilter)."""
+        from data.base_parser import DexParser
+        return DexParser.log_patterns().has_activity(logs)
 
     async def _check_connection_health(self):
         """Check the health of all WebSocket connections."""
@@ -0,0 +1,440 @@
+"""
+Sharded, bounded-queue event pipeline for blockchain updates.
+
+Stages::
+
+    submit() -> [decode queue] -> decode workers
+             -> [parse queue, per shard] -> parse worker   (calls parse_handler)
+    emit()   -> [aggregate queue, per shard] -> aggregate worker (coalesces per key)
+             -> [persist queue, per shard] -> persist worker (calls persist_handler)
+
+Every queue is a bounded ``asyncio.Queue`` and every intake call is
+non-blocking (``put_nowait``), so a slow persist step never stalls the
+WebSocket receive path. Events are sharded by a stable hash of their key
+(mint / pool address) so updates for the same key are handled in order by one
+worker.
+
+Overload policy, applied at intake in this order:
+
+1. Events with a coalesce key (e.g. account snapshots) are coalesced: only the
+   latest event per key is kept while one is already queued.
+2. Once a parse queue is above ``low_priority_watermark`` of its capacity,
+   events the ``is_significant`` predicate rejects are dropped.
+3. When a queue is full, the new event is dropped and counted.
+
+The aggregate stage never drops: when its queue is full, items are folded
+straight into the shard's pending map (latest value per key wins), and when
+the persist queue is full the aggregate worker waits up to ``flush_interval``
+for room, then keeps coalescing into the pending map until the persist worker
+catches up.
+"""
+
+import asyncio
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from data.json_codec import loads as json_loads
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ParseHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+PersistHandler = Callable[[List[Any]], Awaitable[None]]
+MergeFn = Callable[[Any, Any], Any]
+
+
+class _CoalescedMarker:
+    """Queue placeholder for the latest coalesced event of a key."""
+    __slots__ = ('key',)
+
+    def __init__(self, key: Any):
+        self.key = key
+
+
+class _Shard:
+    """Queues and pending state owned by one worker set."""
+
+    def __init__(self, index: int, queue_size: int, persist_queue_size: int):
+        self.index = index
+        self.parse_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.aggregate_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.persist_queue: asyncio.Queue = asyncio.Queue(maxsize=persist_queue_size)
+        self.coalesced: Dict[Any, Dict[str, Any]] = {}
+        self.pending: Dict[Any, Any] = {}
+        self.overflow: Dict[Any, Any] = {}
+        self.in_flight: Optional[List[Any]] = None  # Batch the persist worker is writing
+        self.max_parse_depth = 0
+
+
+class EventPipeline:
+    """
+    decode -> parse -> aggregate -> persist pipeline with backpressure.
+
+    Args:
+        parse_handler: Coroutine called once per decoded event (e.g. MarketData._handle_blockchain_update)
+        persist_handler: Coroutine called with a list of coalesced aggregate items
+        num_shards: Number of parse/aggregate/persist worker sets
+        queue_size: Capacity of the decode, parse and aggregate queues
+        persist_queue_size: Capacity (in batches) of each persist queue
+        flush_interval: Max seconds an aggregated item waits before persisting
+        max_batch: Flush a shard as soon as this many keys are pending
+        shard_key: Returns the routing key of a decoded event (None -> shard 0)
+        coalesce_key: Returns a key for events where only the latest matters, else None
+        is_significant: Returns False for events that may be shed under load
+        decoder: Turns raw (str/bytes) messages into dicts; defaults to data.json_codec.loads (orjson when installed)
+        low_priority_watermark: Fraction of parse-queue capacity above which
+            insignificant events are dropped
+        merge: Combines an existing pending item with a new one; default keeps the new one
+    """
+
+    def __init__(self,
+                 parse_handler: ParseHandler,
+                 persist_handler: PersistHandler,
+                 num_shards: int = 4,
+                 queue_size: int = 2048,
+                 persist_queue_size: int = 8,
+                 flush_interval: float = 1.0,
+                 max_batch: int = 256,
+                 shard_key: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 coalesce_key: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 is_significant: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                 decoder: Optional[Callable[[Any], Optional[Dict[str, Any]]]] = None,
+                 low_priority_watermark: float = 0.5,
+                 merge: Optional[MergeFn] = None,
+                 name: str = "event_pipeline"):
+        if num_shards < 1:
+            raise ValueError("num_shards must be >= 1")
+        self.name = name
+        self.parse_handler = parse_handler
+        self.persist_handler = persist_handler
+        self.num_shards = num_shards
+        self.queue_size = queue_size
+        self.persist_queue_size = persist_queue_size
+        self.flush_interval = flush_interval
+        # Max wait for persist-queue room before the aggregate worker goes back to coalescing
+        self._persist_wait = max(flush_interval, 0.01)
+        self.max_batch = max_batch
+        self.shard_key = shard_key
+        self.coalesce_key = coalesce_key
+        self.is_significant = is_significant
+        self.decoder = decoder or self._default_decoder
+        self.low_priority_watermark = low_priority_watermark
+        self.merge = merge
+
+        self._decode_queue: Optional[asyncio.Queue] = None
+        self._shards: List[_Shard] = []
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+
+        self._counters: Dict[str, int] = {
+            'submitted': 0,
+            'decoded': 0,
+            'decode_errors': 0,
+            'parsed': 0,
+            'parse_errors': 0,
+            'coalesced': 0,
+            'dropped_low_significance': 0,
+            'dropped_queue_full': 0,
+            'emitted': 0,
+            'aggregate_overflow': 0,
+            'persist_batches': 0,
+            'persisted_items': 0,
+            'persist_errors': 0,
+        }
+        self._last_persist_duration = 0.0
+
+    # --- Lifecycle ---
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    async def start(self):
+        """Create the queues and start all worker tasks."""
+        if self._running:
+            return
+        self._decode_queue = asyncio.Queue(maxsize=self.queue_size)
+        self._shards = [_Shard(i, self.queue_size, self.persist_queue_size) for i in range(self.num_shards)]
+        for i in range(self.num_shards):
+            shard = self._shards[i]
+            self._tasks.append(asyncio.create_task(self._decode_worker(), name=f"{self.name}-decode-{i}"))
+            self._tasks.append(asyncio.create_task(self._parse_worker(shard), name=f"{self.name}-parse-{i}"))
+            self._tasks.append(asyncio.create_task(self._aggregate_worker(shard), name=f"{self.name}-aggregate-{i}"))
+            self._tasks.append(asyncio.create_task(self._persist_worker(shard), name=f"{self.name}-persist-{i}"))
+        self._running = True
+        logger.info(f"{self.name} started with {self.num_shards} shards (queue size {self.queue_size})")
+
+    async def stop(self, drain_timeout: float = 5.0):
+        """
+        Stop intake, give queued work up to ``drain_timeout`` seconds to finish,
+        then cancel the workers and persist whatever is still pending.
+        """
+        if not self._running:
+            return
+        self._running = False
+        try:
+            await asyncio.wait_for(self._drain(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.name} did not drain within {drain_timeout}s; cancelling workers")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # Final flush of anything the workers did not get to
+        for shard in self._shards:
+            # A batch interrupted mid-write is persisted again (handlers upsert latest values)
+            leftovers: List[Any] = list(shard.in_flight or [])
+            shard.in_flight = None
+            while not shard.persist_queue.empty():
+                leftovers.extend(shard.persist_queue.get_nowait())
+            while not shard.aggregate_queue.empty():
+                key, item, merge = shard.aggregate_queue.get_nowait()
+                self._fold(shard.pending, key, item, merge)
+            self._fold_overflow(shard)
+            leftovers.extend(shard.pending.values())
+            shard.pending = {}
+            if leftovers:
+                await self._persist(leftovers)
+        logger.info(f"{self.name} stopped")
+
+    async def _drain(self):
+        await self._decode_queue.join()
+        for shard in self._shards:
+            await shard.parse_queue.join()
+        for shard in self._shards:
+            await shard.aggregate_queue.join()
+        for shard in self._shards:
+            await shard.persist_queue.join()
+
+    # --- Intake (non-blocking) ---
+
+    def submit(self, event: Any) -> bool:
+        """
+        Hand an event to the pipeline without blocking.
+
+        Dicts skip the decode stage; str/bytes messages are decoded by the
+        decode workers. Returns False if the event was dropped.
+        """
+        if not self._running:
+            return False
+        self._counters['submitted'] += 1
+        if isinstance(event, dict):
+            return self._route(event)
+        try:
+            self._decode_queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self._counters['dropped_queue_full'] += 1
+            return False
+
+    def emit(self, key: Any, item: Any, merge: Optional[MergeFn] = None) -> None:
+        """
+        Hand a parsed result to the aggregate stage (never blocks, never drops).
+
+        Items with the same key are coalesced before persistence using ``merge``
+        (or the pipeline default, which keeps the newest item).
+        """
+        if not self._shards:
+            return
+        shard = self._shards[self._shard_index(key)]
+        self._counters['emitted'] += 1
+        if shard.overflow:
+            # Keep arrival order: once overflowing, everything folds in after the queued items
+            self._counters['aggregate_overflow'] += 1
+            self._fold(shard.overflow, key, item, merge)
+            return
+        try:
+            shard.aggregate_queue.put_nowait((key, item, merge))
+        except asyncio.QueueFull:
+            self._counters['aggregate_overflow'] += 1
+            self._fold(shard.overflow, key, item, merge)
+
+    def _route(self, event: Dict[str, Any]) -> bool:
+        key = self.shard_key(event) if self.shard_key else None
+        shard = self._shards[self._shard_index(key)]
+        queue = shard.parse_queue
+
+        coalesce_key = self.coalesce_key(event) if self.coalesce_key else None
+        if coalesce_key is not None:
+            already_queued = coalesce_key in shard.coalesced
+            shard.coalesced[coalesce_key] = event
+            if already_queued:
+                self._counters['coalesced'] += 1
+                return True
+            item: Any = _CoalescedMarker(coalesce_key)
+        else:
+            item = event
+
+        depth = queue.qsize()
+        if (self.is_significant is not None
+                and depth >= self.low_priority_watermark * self.queue_size
+                and not self.is_significant(event)):
+            self._counters['dropped_low_significance'] += 1
+            if coalesce_key is not None:
+                shard.coalesced.pop(coalesce_key, None)
+            return False
+
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._counters['dropped_queue_full'] += 1
+            if coalesce_key is not None:
+                shard.coalesced.pop(coalesce_key, None)
+            return False
+        if depth + 1 > shard.max_parse_depth:
+            shard.max_parse_depth = depth + 1
+        return True
+
+    def _shard_index(self, key: Any) -> int:
+        if key is None or self.num_shards == 1:
+            return 0
+        if not isinstance(key, (bytes, bytearray)):
+            key = str(key).encode()
+        return zlib.crc32(key) % self.num_shards
+
+    @staticmethod
+    def _default_decoder(raw: Any) -> Optional[Dict[str, Any]]:
+        data = json_loads(raw)
+        return data if isinstance(data, dict) else None
+
+    def _fold(self, pending: Dict[Any, Any], key: Any, item: Any, merge: Optional[MergeFn]):
+        merge = merge or self.merge
+        if merge is not None and key in pending:
+            pending[key] = merge(pending[key], item)
+        else:
+            pending[key] = item
+
+    def _fold_overflow(self, shard: _Shard):
+        if shard.overflow:
+            overflow, shard.overflow = shard.overflow, {}
+            for key, item in overflow.items():
+                self._fold(shard.pending, key, item, None)
+
+    # --- Workers ---
+
+    async def _decode_worker(self):
+        while True:
+            raw = await self._decode_queue.get()
+            try:
+                event = self.decoder(raw)
+                if event is not None:
+                    self._counters['decoded'] += 1
+                    self._route(event)
+            except Exception as e:
+                self._counters['decode_errors'] += 1
+                logger.debug(f"{self.name}: failed to decode message: {e}")
+            finally:
+                self._decode_queue.task_done()
+
+    async def _parse_worker(self, shard: _Shard):
+        while True:
+            item = await shard.parse_queue.get()
+            try:
+                if isinstance(item, _CoalescedMarker):
+                    event = shard.coalesced.pop(item.key, None)
+                else:
+                    event = item
+                if event is not None:
+                    await self.parse_handler(event)
+                    self._counters['parsed'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._counters['parse_errors'] += 1
+                logger.error(f"{self.name}: parse handler failed on shard {shard.index}: {e}", exc_info=True)
+            finally:
+                shard.parse_queue.task_done()
+
+    async def _aggregate_worker(self, shard: _Shard):
+        last_flush = time.monotonic()
+        while True:
+            queue = shard.aggregate_queue
+            if queue.empty():
+                timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+                try:
+                    key, item, merge = await asyncio.wait_for(queue.get(), timeout=timeout)
+                    self._fold(shard.pending, key, item, merge)
+                    queue.task_done()
+                except asyncio.TimeoutError:
+                    pass
+            # Drain whatever is already queued without awaiting per item
+            while not queue.empty() and len(shard.pending) < self.max_batch:
+                key, item, merge = queue.get_nowait()
+                self._fold(shard.pending, key, item, merge)
+                queue.task_done()
+            if queue.empty():
+                # Overflow is newer than anything that was queued, so it folds in last
+                self._fold_overflow(shard)
+
+            due = time.monotonic() - last_flush >= self.flush_interval
+            if shard.pending and (due or len(shard.pending) >= self.max_batch):
+                batch = list(shard.pending.values())
+                try:
+                    shard.persist_queue.put_nowait(batch)
+                    shard.pending = {}
+                except asyncio.QueueFull:
+                    # Persist is behind: wait (bounded) for room instead of spinning on the
+                    # still-queued aggregate items; on timeout keep coalescing into pending
+                    try:
+                        await asyncio.wait_for(shard.persist_queue.put(batch), timeout=self._persist_wait)
+                        shard.pending = {}
+                    except asyncio.TimeoutError:
+                        pass
+                last_flush = time.monotonic()
+            elif due:
+                last_flush = time.monotonic()
+
+    async def _persist_worker(self, shard: _Shard):
+        while True:
+            batch = await shard.persist_queue.get()
+            shard.in_flight = batch
+            try:
+                await self._persist(batch)
+            finally:
+                shard.in_flight = None
+                shard.persist_queue.task_done()
+
+    async def _persist(self, batch: List[Any]):
+        started = time.monotonic()
+        try:
+            await self.persist_handler(batch)
+            self._counters['persist_batches'] += 1
+            self._counters['persisted_items'] += len(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._counters['persist_errors'] += 1
+            logger.error(f"{self.name}: persist handler failed for {len(batch)} items: {e}", exc_info=True)
+        finally:
+            self._last_persist_duration = time.monotonic() - started
+
+    # --- Gauges ---
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue-depth gauges per stage and shard plus cumulative counters."""
+        shards = [
+            {
+                'parse_depth': s.parse_queue.qsize(),
+                'parse_depth_max': s.max_parse_depth,
+                'coalesced_pending': len(s.coalesced),
+                'aggregate_depth': s.aggregate_queue.qsize(),
+                'aggregate_pending_keys': len(s.pending) + len(s.overflow),
+                'persist_depth': s.persist_queue.qsize(),
+            }
+            for s in self._shards
+        ]
+        return {
+            'running': self._running,
+            'num_shards': self.num_shards,
+            'queue_size': self.queue_size,
+            'decode_depth': self._decode_queue.qsize() if self._decode_queue else 0,
+            'parse_depth': sum(s['parse_depth'] for s in shards),
+            'aggregate_depth': sum(s['aggregate_depth'] for s in shards),
+            'persist_depth': sum(s['persist_depth'] for s in shards),
+            'last_persist_duration': self._last_persist_duration,
+            'shards': shards,
+            **self._counters,
+        }
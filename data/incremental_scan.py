@@ -0,0 +1,244 @@
+"""
+Change detection between TokenScanner cycles.
+
+Most of the trending list carries the same liquidity, volume and price from one
+scan to the next. ``IncrementalScanState`` keeps, per mint, a fingerprint of the
+last processed DexScreener snapshot together with the filter results and the
+fingerprint of each filter's inputs, so that a scan only pays for the churn:
+
+- a mint whose snapshot is unchanged (numbers compared at
+  ``SCAN_FINGERPRINT_PRECISION`` significant digits) is skipped entirely: no
+  prequalification, filters or database write, until its last processing is
+  ``SCAN_INCREMENTAL_MAX_AGE`` seconds old;
+- for a changed mint, passing results of the pure threshold filters are reused
+  when their own inputs are exactly unchanged (e.g. a price move re-runs
+  moonshot but not volume), and passing network results (RugCheck, SolSniffer,
+  social, bonding curve) are reused for ``SCAN_FILTER_REUSE_MAX_AGE`` seconds.
+
+Reused results are put on the token under their annotation key, which
+``FilterEngine`` treats as already done. Blacklist and whitelist are cheap and
+mutable, so they always run.
+"""
+
+import copy
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from filters.filter_engine import is_critical_failure, is_flagged, result_key
+from performance.metrics_registry import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# DexScreener pair fields that make up a mint's snapshot (dotted paths)
+SNAPSHOT_FIELDS: Tuple[str, ...] = (
+    'priceUsd', 'priceNative', 'liquidity.usd', 'volume.h24', 'volume.m5',
+    'marketCap', 'fdv', 'priceChange.h24', 'dexId', 'pairAddress',
+    'info.imageUrl', 'info.socials',
+)
+
+# Token fields each pure filter reads; a result is reused only if these are identical
+FILTER_INPUTS: Dict[str, Tuple[str, ...]] = {
+    'scam': ('contract_data',),
+    'liquidity': ('liquidity.usd', 'marketCap', 'market_cap'),
+    'volume': ('volume_24h', 'volume_5m'),
+    'dump': ('dump_score', 'dev_wallet_activity', 'liquidity_lock', 'ownership_renounced'),
+    'whale': ('top_holder_percentage', 'whale_holdings'),
+    'moonshot': ('price_change_24h', 'volume_change_24h', 'market_cap'),
+}
+
+# Reading mutable lists is cheap; never reuse these
+ALWAYS_RERUN = frozenset({'blacklist', 'whitelist'})
+
+Fingerprint = Tuple[str, ...]
+
+
+def _lookup(token: Dict[str, Any], path: str) -> Any:
+    value: Any = token
+    for part in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _normalize(value: Any, digits: int) -> str:
+    if isinstance(value, bool) or value is None:
+        return repr(value)
+    if isinstance(value, str) and digits:
+        try:
+            value = float(value)  # DexScreener sends prices as strings
+        except ValueError:
+            return value
+    if isinstance(value, (int, float)):
+        return f"{float(value):.{digits}g}" if digits else repr(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return repr(value)
+
+
+def fingerprint(token: Dict[str, Any], paths: Tuple[str, ...], digits: int = 0) -> Fingerprint:
+    """Normalized values of ``paths``; ``digits`` > 0 rounds numbers to that many significant digits."""
+    return tuple(_normalize(_lookup(token, path), digits) for path in paths)
+
+
+@dataclass
+class _FilterRecord:
+    result: Any
+    inputs: Optional[Fingerprint]
+    computed_at: float
+
+
+@dataclass
+class _MintRecord:
+    snapshot: Fingerprint
+    processed_at: float
+    seen_at: float
+    filters: Dict[str, _FilterRecord] = field(default_factory=dict)
+
+
+class IncrementalScanState:
+    """
+    Per-mint snapshot and filter-result memory for TokenScanner.
+
+    Call order per scan: ``begin_scan``, ``is_unchanged`` for every fetched
+    mint, ``reuse_filter_results`` before filtering, ``record`` once a token's
+    outcome is final (for passing tokens, after the database write), ``end_scan``.
+    """
+
+    def __init__(self, settings=None):
+        self.enabled = bool(getattr(settings, 'SCAN_INCREMENTAL_ENABLED', True))
+        self.digits = max(0, int(getattr(settings, 'SCAN_FINGERPRINT_PRECISION', 4)))
+        self.max_age = float(getattr(settings, 'SCAN_INCREMENTAL_MAX_AGE', 1800))
+        self.reuse_max_age = float(getattr(settings, 'SCAN_FILTER_REUSE_MAX_AGE', 600))
+        self.state_ttl = float(getattr(settings, 'SCAN_STATE_TTL', 7200))
+
+        self._records: Dict[str, _MintRecord] = {}
+        self._snapshots: Dict[str, Fingerprint] = {}  # This scan's snapshots, pending record()
+        self._reused: Dict[str, List[str]] = {}
+        self._now = time.time()
+        self._counts: Dict[str, int] = {}
+
+        registry = get_metrics_registry()
+        self._mints = registry.counter("scan_incremental_mints", "Scanned mints by change-detection outcome", ("result",))
+        self._reuse_counter = registry.counter("scan_incremental_filter_reuse", "Filter results reused from the previous scan", ("filter",))
+        self._tracked_gauge = registry.gauge("scan_incremental_tracked", "Mints with a remembered scan fingerprint")
+
+    def begin_scan(self):
+        self._now = time.time()
+        self._snapshots.clear()
+        self._reused.clear()
+        self._counts = {'new': 0, 'changed': 0, 'unchanged': 0, 'expired': 0}
+
+    def _count(self, result: str):
+        self._counts[result] = self._counts.get(result, 0) + 1
+        self._mints.labels(result).inc()
+
+    def is_unchanged(self, token: Dict[str, Any]) -> bool:
+        """Fingerprint a fetched pair; True if the mint can be skipped this scan."""
+        mint = token.get('mint')
+        if not mint:
+            return False
+        snapshot = fingerprint(token, SNAPSHOT_FIELDS, self.digits)
+        self._snapshots[mint] = snapshot
+        record = self._records.get(mint)
+        if record is not None:
+            record.seen_at = self._now
+        if not self.enabled:
+            return False
+        if record is None:
+            self._count('new')
+            return False
+        if record.snapshot != snapshot:
+            self._count('changed')
+            return False
+        if self._now - record.processed_at >= self.max_age:
+            self._count('expired')
+            return False
+        self._count('unchanged')
+        return True
+
+    def reuse_filter_results(self, token: Dict[str, Any]) -> List[str]:
+        """
+        Put still-valid passing results from the last scan on the token.
+
+        Returns:
+            Names of the reused filters
+        """
+        mint = token.get('mint')
+        record = self._records.get(mint) if self.enabled and mint else None
+        if record is None:
+            return []
+        reused = []
+        for name, previous in record.filters.items():
+            if name in ALWAYS_RERUN or result_key(name) in token:
+                continue
+            inputs = FILTER_INPUTS.get(name)
+            if inputs is not None:
+                if previous.inputs != fingerprint(token, inputs):
+                    continue
+            elif self._now - previous.computed_at >= self.reuse_max_age:
+                continue
+            result = copy.deepcopy(previous.result)
+            token[result_key(name)] = result
+            token.setdefault('filter_results', {})[name] = result
+            self._reuse_counter.labels(name).inc()
+            reused.append(name)
+        if reused:
+            self._reused[mint] = reused
+        return reused
+
+    def record(self, token: Dict[str, Any]):
+        """Remember a processed token's snapshot and its passing filter results (a filter error forgets the mint)."""
+        mint = token.get('mint')
+        snapshot = self._snapshots.get(mint) if mint else None
+        if snapshot is None:
+            return
+        filter_results = token.get('filter_results')
+        filter_results = filter_results if isinstance(filter_results, dict) else {}
+        if any(isinstance(result, dict) and result.get('status') == 'error' for result in filter_results.values()):
+            self.invalidate(mint)  # Possibly transient; process in full next scan
+            return
+        previous = self._records.get(mint)
+        reused = self._reused.get(mint, ())
+        filters = {}
+        for name, result in filter_results.items():
+            if name in ALWAYS_RERUN or is_flagged(name, result) or is_critical_failure(name, result):
+                continue
+            computed_at = self._now
+            if name in reused and previous is not None and name in previous.filters:
+                computed_at = previous.filters[name].computed_at  # Reuse does not extend the age limit
+            inputs = FILTER_INPUTS.get(name)
+            filters[name] = _FilterRecord(
+                result=copy.deepcopy(result),
+                inputs=fingerprint(token, inputs) if inputs is not None else None,
+                computed_at=computed_at,
+            )
+        self._records[mint] = _MintRecord(snapshot=snapshot, processed_at=self._now, seen_at=self._now, filters=filters)
+
+    def invalidate(self, mint: str):
+        """Forget a mint so the next scan processes it in full."""
+        self._records.pop(mint, None)
+
+    def end_scan(self) -> Dict[str, int]:
+        """Drop mints not seen for ``SCAN_STATE_TTL`` seconds; returns this scan's outcome counts."""
+        cutoff = self._now - self.state_ttl
+        stale = [mint for mint, record in self._records.items() if record.seen_at < cutoff]
+        for mint in stale:
+            del self._records[mint]
+        self._tracked_gauge.set(len(self._records))
+        reused = sum(len(names) for names in self._reused.values())
+        logger.info("Incremental scan: %d new, %d changed, %d unchanged (skipped), %d refreshed by age, %d filter results reused, %d mints tracked",
+                    self._counts.get('new', 0), self._counts.get('changed', 0), self._counts.get('unchanged', 0),
+                    self._counts.get('expired', 0), reused, len(self._records))
+        return dict(self._counts)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'tracked_mints': len(self._records),
+            'last_scan': dict(self._counts),
+            'filters_reused_last_scan': sum(len(names) for names in self._reused.values()),
+        }
@@ -0,0 +1,342 @@
+"""
+Batched, vectorized indicator kernel for many mints at once.
+
+``TechnicalIndicators.calculate_all`` used to run one finta pipeline per
+DataFrame. This module evaluates the same indicator set for every mint in one
+pass over a padded 2-D array (mints x bars): each recursive indicator (EMA,
+Wilder-style ``ewm``) is a single loop over the bar axis with NumPy operations
+across all mints, and rolling windows are computed with
+``sliding_window_view`` over the whole matrix.
+
+Rows are left-aligned: row ``i`` holds ``lengths[i]`` valid bars in columns
+``[0, lengths[i])`` and NaN padding after that. Every indicator is causal, so
+the padding never influences the valid region.
+
+The formulas reproduce finta (the library calculate_all used), including its
+pandas ``ewm(adjust=True)`` recursion, so the column names and values stay
+compatible with the previous per-DataFrame output.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Output columns in calculate_all order
+KERNEL_COLUMNS: Tuple[str, ...] = (
+    'SMA_10', 'SMA_20', 'SMA_50',
+    'RSI_14',
+    'MACD_12_26_9', 'MACDs_12_26_9', 'MACDh_12_26_9',
+    'BBL_20_2.0', 'BBM_20_2.0', 'BBU_20_2.0', 'BBB_20_2.0', 'BBP_20_2.0',
+    'VOL_SMA_20',
+    'ADX_14', 'DMP_14', 'DMN_14',
+)
+
+
+def pack_series(series: Sequence[Iterable[float]], dtype=np.float64) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack ragged per-mint series into a left-aligned, NaN-padded 2-D array.
+
+    Args:
+        series: One sequence of values per mint
+
+    Returns:
+        (values, lengths) where values has shape (n_mints, max_len)
+    """
+    arrays = [np.asarray(s, dtype=dtype).ravel() for s in series]
+    lengths = np.fromiter((len(a) for a in arrays), dtype=np.int64, count=len(arrays))
+    width = int(lengths.max()) if len(arrays) else 0
+    values = np.full((len(arrays), width), np.nan, dtype=dtype)
+    for row, arr in enumerate(arrays):
+        values[row, :len(arr)] = arr
+    return values, lengths
+
+
+def _shift(values: np.ndarray) -> np.ndarray:
+    """Shift one bar to the right along axis 1 (pandas ``shift()``)."""
+    out = np.empty_like(values)
+    out[:, 0] = np.nan
+    out[:, 1:] = values[:, :-1]
+    return out
+
+
+def _diff(values: np.ndarray) -> np.ndarray:
+    """pandas ``diff()`` along axis 1."""
+    return values - _shift(values)
+
+
+def rolling_mean(values: np.ndarray, period: int) -> np.ndarray:
+    """``rolling(window=period).mean()`` for every row; NaN inside a window yields NaN."""
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] >= period:
+        out[:, period - 1:] = sliding_window_view(values, period, axis=1).mean(axis=-1)
+    return out
+
+
+def rolling_std(values: np.ndarray, period: int) -> np.ndarray:
+    """``rolling(window=period).std()`` (ddof=1) for every row."""
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] >= period and period > 1:
+        out[:, period - 1:] = sliding_window_view(values, period, axis=1).std(axis=-1, ddof=1)
+    return out
+
+
+def ewm_mean(values: np.ndarray, alpha: float, adjust: bool = True) -> np.ndarray:
+    """
+    pandas ``ewm(alpha=alpha, adjust=adjust, ignore_na=False).mean()`` for every row.
+
+    Mirrors the pandas kernel step by step (including its NaN handling), so
+    results match the per-Series computation bit for bit in practice.
+    """
+    n_rows, width = values.shape
+    out = np.full(values.shape, np.nan)
+    if width == 0:
+        return out
+    old_wt_factor = 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+
+    weighted = values[:, 0].copy()
+    old_wt = np.ones(n_rows)
+    nobs = ~np.isnan(weighted)
+    out[:, 0] = np.where(nobs, weighted, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for col in range(1, width):
+            cur = values[:, col]
+            is_obs = ~np.isnan(cur)
+            nobs |= is_obs
+            started = ~np.isnan(weighted)
+            # ignore_na=False: weights decay on every bar once started
+            old_wt = np.where(started, old_wt * old_wt_factor, old_wt)
+            update = started & is_obs & (weighted != cur)
+            blended = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+            weighted = np.where(update, blended, weighted)
+            advance = started & is_obs
+            if adjust:
+                old_wt = np.where(advance, old_wt + new_wt, old_wt)
+            else:
+                old_wt = np.where(advance, 1.0, old_wt)
+            # Rows that have not started yet begin at their first observation
+            weighted = np.where(~started & is_obs, cur, weighted)
+            out[:, col] = np.where(nobs, weighted, np.nan)
+    return out
+
+
+def ema(values: np.ndarray, span: int, adjust: bool = True) -> np.ndarray:
+    return ewm_mean(values, 2.0 / (span + 1.0), adjust)
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """finta RSI: ewm(alpha=1/period) of gains and losses."""
+    delta = _diff(close)
+    up = np.where(delta < 0, 0.0, delta)
+    down = np.where(delta > 0, 0.0, delta)
+    gain = ewm_mean(up, 1.0 / period)
+    loss = ewm_mean(np.abs(down), 1.0 / period)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def bbands(close: np.ndarray, period: int = 20, std_multiplier: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(lower, middle, upper) Bollinger bands."""
+    std = rolling_std(close, period)
+    middle = rolling_mean(close, period)
+    return middle - (std_multiplier * std), middle, middle + (std_multiplier * std)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = _shift(close)
+    tr = np.stack([np.abs(high - low), np.abs(high - prev_close), np.abs(prev_close - low)])
+    # DataFrame.max(axis=1) skips NaN
+    with np.errstate(invalid='ignore'):
+        return np.fmax(np.fmax(tr[0], tr[1]), tr[2])
+
+
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """finta ADX/DMI: returns (adx, di_plus, di_minus)."""
+    up_move = _diff(high)
+    down_move = -_diff(low)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        plus = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+        atr = rolling_mean(true_range(high, low, close), period)
+        di_plus = 100 * ewm_mean(plus / atr, 1.0 / period)
+        di_minus = 100 * ewm_mean(minus / atr, 1.0 / period)
+        dx = np.abs(di_plus - di_minus) / (di_plus + di_minus)
+        return 100 * ewm_mean(dx, 1.0 / period), di_plus, di_minus
+
+
+class IndicatorBatch:
+    """
+    Result of compute_indicator_batch.
+
+    ``columns[name]`` is an (n_mints, max_len) array. Per-mint accessors return
+    row views trimmed to the mint's length, so existing consumers that expect a
+    dict of per-token series can read them without copying. The padded input
+    closes are kept as ``close``.
+    """
+
+    def __init__(self, mints: List[str], lengths: np.ndarray, columns: Dict[str, np.ndarray],
+                 close: Optional[np.ndarray] = None):
+        self.mints = mints
+        self.lengths = lengths
+        self.columns = columns
+        self.close = close
+        self._row = {mint: i for i, mint in enumerate(mints)}
+
+    def __len__(self) -> int:
+        return len(self.mints)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.mints)
+
+    def __contains__(self, mint: str) -> bool:
+        return mint in self._row
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def row(self, mint: str) -> Dict[str, np.ndarray]:
+        """All indicator series for one mint as zero-copy views."""
+        i = self._row[mint]
+        n = int(self.lengths[i])
+        return {name: values[i, :n] for name, values in self.columns.items()}
+
+    def latest(self, mint: str) -> Dict[str, Optional[float]]:
+        """Last-bar value of every indicator for one mint (None if NaN or no bars)."""
+        i = self._row[mint]
+        n = int(self.lengths[i])
+        result: Dict[str, Optional[float]] = {}
+        for name, values in self.columns.items():
+            value = values[i, n - 1] if n else np.nan
+            result[name] = None if np.isnan(value) else float(value)
+        return result
+
+    def last_values(self, column: str) -> np.ndarray:
+        """Last-bar value of ``column`` (or 'close') for every mint (NaN for empty rows)."""
+        values = self.close if column == 'close' else self.columns[column]
+        idx = np.maximum(self.lengths - 1, 0)
+        last = values[np.arange(len(self.mints)), idx] if values.shape[1] else np.full(len(self.mints), np.nan)
+        return np.where(self.lengths > 0, last, np.nan)
+
+    def to_frame(self, mint: str, index: Optional[pd.Index] = None) -> pd.DataFrame:
+        return pd.DataFrame(self.row(mint), index=index)
+
+
+def compute_indicator_batch(close: np.ndarray,
+                            lengths: np.ndarray,
+                            high: Optional[np.ndarray] = None,
+                            low: Optional[np.ndarray] = None,
+                            volume: Optional[np.ndarray] = None,
+                            mints: Optional[List[str]] = None) -> IndicatorBatch:
+    """
+    Compute the calculate_all indicator set for every mint in one pass.
+
+    Args:
+        close: (n_mints, max_len) left-aligned, NaN-padded closes
+        lengths: Valid bar count per row
+        high: Optional highs (same shape); ADX columns are skipped without high/low
+        low: Optional lows (same shape)
+        volume: Optional volumes (same shape) for VOL_SMA_20
+        mints: Row labels; defaults to "0".."n-1"
+
+    Returns:
+        IndicatorBatch with KERNEL_COLUMNS (minus any skipped optional ones)
+    """
+    close = np.asarray(close, dtype=np.float64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    if close.ndim != 2 or close.shape[0] != len(lengths):
+        raise ValueError("close must be 2-D with one row per entry in lengths")
+    if mints is None:
+        mints = [str(i) for i in range(close.shape[0])]
+
+    columns: Dict[str, np.ndarray] = {}
+    columns['SMA_10'] = rolling_mean(close, 10)
+    columns['SMA_20'] = rolling_mean(close, 20)
+    columns['SMA_50'] = rolling_mean(close, 50)
+    columns['RSI_14'] = rsi(close, 14)
+
+    macd_line, signal_line, histogram = macd(close, 12, 26, 9)
+    columns['MACD_12_26_9'] = macd_line
+    columns['MACDs_12_26_9'] = signal_line
+    columns['MACDh_12_26_9'] = histogram
+
+    lower, middle, upper = bbands(close, 20, 2.0)
+    columns['BBL_20_2.0'] = lower
+    columns['BBM_20_2.0'] = middle
+    columns['BBU_20_2.0'] = upper
+    with np.errstate(invalid='ignore', divide='ignore'):
+        columns['BBB_20_2.0'] = ((upper - lower) / middle) * 100
+        columns['BBP_20_2.0'] = (close - lower) / (upper - lower)
+
+    if volume is not None:
+        columns['VOL_SMA_20'] = rolling_mean(np.asarray(volume, dtype=np.float64), 20)
+
+    if high is not None and low is not None:
+        adx_values, di_plus, di_minus = adx(np.asarray(high, dtype=np.float64),
+                                            np.asarray(low, dtype=np.float64), close, 14)
+        columns['ADX_14'] = adx_values
+        columns['DMP_14'] = di_plus
+        columns['DMN_14'] = di_minus
+
+    return IndicatorBatch(list(mints), lengths, columns, close=close)
+
+
+def compute_indicator_batch_from_frames(frames: Mapping[str, pd.DataFrame]) -> IndicatorBatch:
+    """
+    Build a batch from per-mint OHLCV DataFrames (column names case-insensitive).
+
+    Rows with a non-numeric close are dropped per mint, as are rows with
+    missing high/low when every frame has those columns. Frames without a
+    close column are skipped.
+    """
+    mints: List[str] = []
+    closes, highs, lows, volumes = [], [], [], []
+    use_hl = True
+    use_volume = True
+    for mint, df in frames.items():
+        if df is None or df.empty:
+            continue
+        lower = {str(c).lower(): c for c in df.columns}
+        if 'close' not in lower:
+            logger.debug(f"Skipping {mint}: no 'close' column")
+            continue
+        close = pd.to_numeric(df[lower['close']], errors='coerce').to_numpy(dtype=np.float64)
+        high = pd.to_numeric(df[lower['high']], errors='coerce').to_numpy(dtype=np.float64) if 'high' in lower else None
+        low = pd.to_numeric(df[lower['low']], errors='coerce').to_numpy(dtype=np.float64) if 'low' in lower else None
+        volume = pd.to_numeric(df[lower['volume']], errors='coerce').to_numpy(dtype=np.float64) if 'volume' in lower else None
+        mints.append(mint)
+        closes.append(close)
+        highs.append(high)
+        lows.append(low)
+        volumes.append(volume)
+        use_hl = use_hl and high is not None and low is not None
+        use_volume = use_volume and volume is not None
+
+    for i in range(len(mints)):
+        keep = ~np.isnan(closes[i])
+        if use_hl:
+            keep &= ~np.isnan(highs[i]) & ~np.isnan(lows[i])
+        if not keep.all():
+            closes[i] = closes[i][keep]
+            if use_hl:
+                highs[i], lows[i] = highs[i][keep], lows[i][keep]
+            if use_volume:
+                volumes[i] = volumes[i][keep]
+
+    close, lengths = pack_series(closes)
+    high = pack_series(highs)[0] if use_hl and mints else None
+    low = pack_series(lows)[0] if use_hl and mints else None
+    volume = pack_series(volumes)[0] if use_volume and mints else None
+    return compute_indicator_batch(close, lengths, high=high, low=low, volume=volume, mints=mints)
@@ -9,11 +9,11 @@ from datetime import datetime, timedelta, timezone
 import sqlite3
 import httpx
 import asyncio
-from finta import TA
 
 from data.token_database import TokenDatabase
 from config.logging_config import LoggingConfig
 from utils.logger import get_logger
+from data.indicator_kernel import IndicatorBatch, compute_indicator_batch_from_frames
 from config.thresholds import Thresholds
 
 # Remove premature logging setup
@@ -26,6 +26,7 @@ if TYPE_CHECKING:
     # Add other necessary imports for hints if needed
     from data.token_database import TokenDatabase
     from config.thresholds import Thresholds # Add Thresholds hint
+    from data.tick_store import TickStore
 
 # REMOVE module-level get_env call
 # DEXSCREENER_API_URL = get_env("DEXSCREENER_API_URL")
@@ -37,7 +38,7 @@ class Indicators:
     Uses httpx client for fetching external data like OHLCV.
     """
 
-    def __init__(self, settings: 'Settings', thresholds: 'Thresholds', db: Optional['TokenDatabase'] = None, http_client: Optional[httpx.AsyncClient] = None):
+    def __init__(self, settings: 'Settings', thresholds: 'Thresholds', db: Optional['TokenDatabase'] = None, http_client: Optional[httpx.AsyncClient] = None, tick_store: Optional['TickStore'] = None):
         """
         Initializes the Indicators class.
 
@@ -46,11 +47,13 @@ class Indicators:
             thresholds: The application thresholds instance.
             db: An optional instance of TokenDatabase.
             http_client: An optional instance of httpx.AsyncClient for making API calls.
+            tick_store: An optional TickStore used to build OHLCV from recorded on-chain swaps.
         """
         self.settings = settings
         self.db = db
         self.http_client = http_client
         self.thresholds = thresholds
+        self.tick_store = tick_store
         logger.info("Indicators class instance created")
         
     async def initialize(self) -> bool:
@@ -550,6 +553,27 @@ class Indicators:
             logger.error(f"Error evaluating token {token_address}: {e}")
             return {"error": str(e)}
 
+    def _ohlcv_from_ticks(self, mint: str, bar_seconds: int = 300, limit: int = 100) -> Optional[pd.DataFrame]:
+        """
+        Builds an OHLCV DataFrame from the tick store, shaped like _fetch_ohlcv_data output.
+        Returns None when no tick store is attached or it holds fewer than
+        TICK_OHLCV_MIN_BARS bars (capped at ``limit``) for the mint.
+        """
+        if not self.tick_store or limit <= 0:
+            return None
+        try:
+            min_bars = getattr(self.settings, 'TICK_OHLCV_MIN_BARS', limit)
+            bars = self.tick_store.get_ohlcv(mint, bar_seconds, limit, min_bars=min_bars)
+        except Exception as e:
+            logger.warning(f"Error reading ticks for {mint}: {e}")
+            return None
+        if not bars:
+            return None
+        df = pd.DataFrame(bars)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s', utc=True)
+        df.set_index('timestamp', inplace=True)
+        return df[['open', 'high', 'low', 'close', 'volume']]
+
     async def get_category_specific_indicators(self, token_address: str, category: str, pair_address: str = None) -> Dict[str, Any]:
         """
         Get technical indicators specific to a token category.
@@ -563,9 +587,9 @@ class Indicators:
             Dict: Category-specific indicators
         """
         try:
-            # Fetch OHLCV data if pair_address is provided
-            ohlcv_df = None
-            if pair_address:
+            # Prefer 5m bars from recorded on-chain ticks, then DexScreener if pair_address is provided
+            ohlcv_df = self._ohlcv_from_ticks(token_address, bar_seconds=300, limit=100)
+            if ohlcv_df is None and pair_address:
                 ohlcv_df = await self._fetch_ohlcv_data(pair_address, timeframe='m5', limit=100)
             
             # Get category-specific parameters
@@ -779,84 +803,52 @@ class TechnicalIndicators(Indicators):
             logger.error(f"Missing required strategy parameter in settings: {e}")
 
     def calculate_all(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Calculate all supported technical indicators."""
-        if df.empty or 'close' not in df.columns:
+        """
+        Calculate all supported technical indicators for one OHLCV DataFrame.
+
+        Runs the batched kernel with a single mint. The input is not modified;
+        a copy with lowercase OHLCV columns plus the indicator columns is returned.
+        """
+        if df is None or df.empty or 'close' not in df.columns:
             logger.warning("DataFrame is empty or missing 'close' column for indicator calculation.")
             return df
 
         try:
-            # Ensure 'close' is float type
-            df['close'] = pd.to_numeric(df['close'], errors='coerce')
-            df.dropna(subset=['close'], inplace=True)
-            if df.empty:
+            batch = compute_indicator_batch_from_frames({'_': df})
+            if not len(batch) or not batch.lengths[0]:
                 logger.warning("DataFrame became empty after converting 'close' to numeric and dropping NaNs.")
-                return df
+                return df.iloc[0:0]
+            return self._frame_with_indicators(df, batch, '_')
+        except Exception as e:
+            logger.error(f"Error calculating technical indicators: {e}", exc_info=True)
+            return df
 
-            # Calculate indicators using finta
-            # Note: finta typically returns a Series, which needs to be assigned to the DataFrame.
-            # Input DataFrame for finta usually needs columns: 'open', 'high', 'low', 'close', 'volume' (case-insensitive)
-            # Let's ensure columns are lowercase for compatibility, although finta might handle it.
-            df.columns = map(str.lower, df.columns)
-
-            # Basic SMAs
-            # finta.TA.SMA(df, period=10) -> Returns a Series
-            df['SMA_10'] = TA.SMA(df, period=10)
-            df['SMA_20'] = TA.SMA(df, period=20)
-            df['SMA_50'] = TA.SMA(df, period=50)
-
-            # RSI
-            # finta.TA.RSI(df, period=14) -> Returns a Series
-            df['RSI_14'] = TA.RSI(df, period=14)
-
-            # MACD
-            # finta.TA.MACD(df, period_fast=12, period_slow=26, signal=9) -> Returns a DataFrame with 'MACD' and 'SIGNAL' columns
-            macd_df = TA.MACD(df, period_fast=12, period_slow=26, signal=9)
-            df['MACD_12_26_9'] = macd_df['MACD']
-            df['MACDs_12_26_9'] = macd_df['SIGNAL']
-            df['MACDh_12_26_9'] = df['MACD_12_26_9'] - df['MACDs_12_26_9'] # Calculate histogram manually
-
-            # Bollinger Bands
-            # finta.TA.BBANDS(df, period=20, std_multiplier=2) -> Returns a DataFrame with 'BB_UPPER', 'BB_MIDDLE', 'BB_LOWER'
-            # Note: finta uses 'std_multiplier', pandas-ta used 'std'
-            bbands_df = TA.BBANDS(df, period=20, std_multiplier=2.0)
-            df['BBL_20_2.0'] = bbands_df['BB_LOWER']
-            df['BBM_20_2.0'] = bbands_df['BB_MIDDLE']
-            df['BBU_20_2.0'] = bbands_df['BB_UPPER']
-            # pandas-ta also calculated BBB (bandwidth) and BBP (percent), finta doesn't directly.
-            # We can calculate them if needed:
-            df['BBB_20_2.0'] = ((df['BBU_20_2.0'] - df['BBL_20_2.0']) / df['BBM_20_2.0']) * 100
-            df['BBP_20_2.0'] = (df['close'] - df['BBL_20_2.0']) / (df['BBU_20_2.0'] - df['BBL_20_2.0'])
-
-            # Volume SMA (if available)
-            if 'volume' in df.columns:
-                df['volume'] = pd.to_numeric(df['volume'], errors='coerce')
-                # finta.TA.SMA(df, period=20, column='volume') -> Returns Series
-                df['VOL_SMA_20'] = TA.SMA(df, period=20, column='volume')
-            else:
-                logger.debug("'volume' column not found, skipping volume-based indicators.")
-
-            # ADX (if available)
-            # finta.TA.ADX(df, period=14) -> Returns a DataFrame with 'ADX', '+DI', '-DI'
-            if all(col in df.columns for col in ['high', 'low', 'close']):
-                for col in ['high', 'low']:
-                     df[col] = pd.to_numeric(df[col], errors='coerce')
-                df.dropna(subset=['high', 'low', 'close'], inplace=True) # Ensure close is also checked for dropna
-                if not df.empty:
-                     adx_df = TA.ADX(df, period=14)
-                     # pandas-ta named columns DMP_14, DMN_14. finta uses +DI, -DI.
-                     df['ADX_14'] = adx_df['ADX']
-                     df['DMP_14'] = adx_df['+DI'] # Renaming +DI to match previous convention
-                     df['DMN_14'] = adx_df['-DI'] # Renaming -DI to match previous convention
-            else:
-                 logger.debug("'high' or 'low' or 'close' columns not found or data insufficient, skipping ADX calculation.")
+    def calculate_all_batch(self, frames: Dict[str, pd.DataFrame]) -> IndicatorBatch:
+        """
+        Calculate the calculate_all indicator set for many mints in one vectorized pass.
 
-            logger.debug(f"Calculated indicators using finta. DataFrame shape: {df.shape}")
+        Args:
+            frames: Mapping of mint -> OHLCV DataFrame
 
-        except Exception as e:
-            logger.error(f"Error calculating technical indicators: {e}", exc_info=True)
-            # Return original df or df with successfully calculated indicators up to the error point
-        
-        return df
+        Returns:
+            IndicatorBatch; use ``batch.row(mint)`` for zero-copy per-mint series
+            or ``batch.latest(mint)`` for last-bar values.
+        """
+        batch = compute_indicator_batch_from_frames(frames)
+        logger.debug(f"Calculated batched indicators for {len(batch)} mints.")
+        return batch
+
+    @staticmethod
+    def _frame_with_indicators(df: pd.DataFrame, batch: IndicatorBatch, mint: str) -> pd.DataFrame:
+        """Rebuild the calculate_all DataFrame (cleaned input rows + indicator columns) for one mint."""
+        out = df.rename(columns=str.lower)
+        numeric = [c for c in ('close', 'high', 'low', 'volume') if c in out.columns]
+        out[numeric] = out[numeric].apply(pd.to_numeric, errors='coerce')
+        required = ['close'] + (['high', 'low'] if 'ADX_14' in batch.columns else [])
+        out = out.dropna(subset=required)
+        for name, values in batch.row(mint).items():
+            out[name] = values
+        return out
 
     def apply_stop_loss_take_profit(self, entry_price: float, current_price: float, position_type: str) -> tuple[Optional[float], Optional[float]]:
         """Calculate stop-loss and take-profit levels based on settings."""
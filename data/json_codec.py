@@ -0,0 +1,31 @@
+"""
+Fastest available JSON decoder for WebSocket frames.
+
+``loads`` is orjson's decoder when installed, then msgspec's, then the
+standard library's. All three return plain ``dict``/``list`` objects, so
+callers do not depend on the backend. Catch ``JSON_DECODE_ERRORS`` instead of
+``json.JSONDecodeError``: msgspec's error type does not derive from it.
+"""
+
+import json
+from typing import Any, Callable, Tuple, Type
+
+loads: Callable[[Any], Any]
+
+try:
+    import orjson
+
+    JSON_BACKEND = "orjson"
+    JSON_DECODE_ERRORS: Tuple[Type[Exception], ...] = (orjson.JSONDecodeError,)
+    loads = orjson.loads
+except ImportError:
+    try:
+        import msgspec
+
+        JSON_BACKEND = "msgspec"
+        JSON_DECODE_ERRORS = (msgspec.DecodeError, json.JSONDecodeError)
+        loads = msgspec.json.Decoder().decode
+    except ImportError:
+        JSON_BACKEND = "json"
+        JSON_DECODE_ERRORS = (json.JSONDecodeError,)
+        loads = json.loads
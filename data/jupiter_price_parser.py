@@ -8,6 +8,7 @@ import httpx
 import time
 from typing import Dict, Any, Optional, List, Set
 from .base_parser import DexParser
+from utils.rate_governor import RequestPriority, get_rate_governor
 
 
 class JupiterPriceParser(DexParser):
@@ -29,6 +30,7 @@ class JupiterPriceParser(DexParser):
         # HTTP client for API requests - use shared client if provided
         self.http_client = http_client
         self._owns_http_client = http_client is None  # Track if we created the client
+        self.rate_governor = get_rate_governor(settings)  # Shared request-rate budget across API clients
         
         # Tracking
         self.monitored_tokens: Set[str] = set()
@@ -94,6 +96,13 @@ class JupiterPriceParser(DexParser):
         """
         return None
     
+    async def _get(self, url: str, params: Dict[str, Any], priority: int = RequestPriority.POSITION) -> httpx.Response:
+        """GET through the shared rate governor (all Jupiter lite-api endpoints share one quota)"""
+        async with self.rate_governor.slot("jupiter", "default", None, priority) as slot:
+            response = await self.http_client.get(url, params=params)
+            slot.record(response.status_code, response.headers.get("Retry-After"))
+        return response
+    
     def add_token_to_monitor(self, mint_address: str):
         """Add a token to the monitoring list"""
         if mint_address and mint_address not in self.monitored_tokens:
@@ -176,7 +185,7 @@ class JupiterPriceParser(DexParser):
             if self.logger:
                 self.logger.debug(f"Fetching Jupiter prices for {len(self.monitored_tokens)} tokens")
             
-            response = await self.http_client.get(url, params=params)
+            response = await self._get(url, params)
             response.raise_for_status()
             
             data = response.json()
@@ -277,7 +286,7 @@ class JupiterPriceParser(DexParser):
                 "vsToken": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC mint for USD price
             }
             
-            response = await self.http_client.get(url, params=params)
+            response = await self._get(url, params)
             response.raise_for_status()
             
             data = response.json()
@@ -329,7 +338,7 @@ class JupiterPriceParser(DexParser):
                 self.logger.info(f"🔍 Jupiter API Debug - HTTP Client: {type(self.http_client)}")
                 self.logger.info(f"🔍 Jupiter API Debug - Client closed: {getattr(self.http_client, 'is_closed', 'unknown')}")
             
-            response = await self.http_client.get(url, params=params)
+            response = await self._get(url, params)
             response.raise_for_status()
             
             data = response.json()
@@ -382,7 +391,7 @@ class JupiterPriceParser(DexParser):
                 "slippageBps": "50"  # 0.5% slippage
             }
             
-            response = await self.http_client.get(quote_url, params=params)
+            response = await self._get(quote_url, params, RequestPriority.EXECUTION)
             response.raise_for_status()
             
             quote_data = response.json()
@@ -0,0 +1,292 @@
+"""
+Bounded, coalescing cache behind the MarketData accessors.
+
+Each cache type (``price``, ``token_info``, ``pair_data`` ...) is a
+``CacheRegion``: an LRU-ordered dict of ``(value, stored_at)`` entries with its
+own TTL, entry limit and staleness budget.
+
+- Entries younger than the TTL are served as hits.
+- Entries past the TTL but within ``ttl + stale_budget`` are served straight
+  away (stale-while-revalidate). A single background refresh is started for
+  the key.
+- Older entries count as misses. The caller awaits a fetch, and concurrent
+  callers for the same key share one in-flight task (single-flight) instead
+  of each calling the upstream API.
+
+Fetchers passed to ``get_or_fetch`` store their own results (through
+``MarketData._set_cached_data``), so the accessor keeps its rules about what
+is cacheable. Expired entries are kept until the LRU limit pushes them out;
+``get(..., allow_stale=True)`` returns them as an error fallback.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_STALE_BUDGETS = "token_info=600,pair_data=120,price=5,historical_data=1800,market_data=30,blockchain_data=0"
+
+
+def parse_budgets(spec: Optional[str]) -> Dict[str, float]:
+    """
+    Parse a ``type=seconds`` list such as ``"price=5,token_info=600"``.
+
+    Args:
+        spec: Comma-separated ``cache_type=seconds`` pairs
+
+    Returns:
+        Dict of cache type -> seconds (malformed pairs are skipped)
+    """
+    budgets: Dict[str, float] = {}
+    for part in (spec or "").split(","):
+        name, sep, value = part.partition("=")
+        if not sep:
+            continue
+        try:
+            budgets[name.strip()] = max(0.0, float(value))
+        except ValueError:
+            logger.warning(f"Ignoring malformed cache budget '{part.strip()}'")
+    return budgets
+
+
+class CacheRegion:
+    """LRU/TTL store and counters for one cache type."""
+
+    __slots__ = ('name', 'ttl', 'stale_budget', 'max_entries', 'entries', 'inflight',
+                 'hits', 'misses', 'stale_served', 'coalesced', 'refreshes',
+                 'refresh_errors', 'evictions')
+
+    def __init__(self, name: str, ttl: float, stale_budget: float, max_entries: int):
+        self.name = name
+        self.ttl = float(ttl)
+        self.stale_budget = float(stale_budget)
+        self.max_entries = max(1, int(max_entries))
+        self.entries: 'OrderedDict[Hashable, Tuple[Any, float]]' = OrderedDict()
+        self.inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+
+    def lookup(self, key: Hashable, now: float) -> Tuple[Any, Optional[str]]:
+        """
+        Classify the entry for a key without touching the counters.
+
+        Returns:
+            ``(value, state)`` where state is ``"fresh"``, ``"stale"``,
+            ``"expired"`` or None when the key is absent
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None, None
+        value, stored_at = entry
+        age = now - stored_at
+        if age <= self.ttl:
+            self.entries.move_to_end(key)
+            return value, "fresh"
+        if age <= self.ttl + self.stale_budget:
+            self.entries.move_to_end(key)
+            return value, "stale"
+        return value, "expired"
+
+    def store(self, key: Hashable, value: Any, now: float):
+        entries = self.entries
+        entries[key] = (value, now)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.stale_served
+        return {
+            'size': len(self.entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'stale_budget': self.stale_budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale_served': self.stale_served,
+            'coalesced': self.coalesced,
+            'refreshes': self.refreshes,
+            'refresh_errors': self.refresh_errors,
+            'evictions': self.evictions,
+            'inflight': len(self.inflight),
+            'hit_rate': (self.hits + self.stale_served) / lookups if lookups else 0.0,
+        }
+
+
+class MarketDataCache:
+    """
+    Per-type LRU/TTL cache with single-flight fetches and stale-while-revalidate.
+    """
+
+    def __init__(self, ttls: Dict[str, float], stale_budgets: Optional[Dict[str, float]] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            ttls: Cache type -> TTL in seconds. Only these types are accepted.
+            stale_budgets: Cache type -> seconds a value may be served past its TTL
+            max_entries: Entry limit per cache type
+        """
+        stale_budgets = stale_budgets or {}
+        self.regions: Dict[str, CacheRegion] = {
+            name: CacheRegion(name, ttl, stale_budgets.get(name, 0.0), max_entries)
+            for name, ttl in ttls.items()
+        }
+        self._refresh_tasks: set = set()
+
+    @classmethod
+    def from_settings(cls, settings, ttls: Dict[str, float]) -> 'MarketDataCache':
+        """Build a cache from ``MARKET_CACHE_*`` settings."""
+        budgets = parse_budgets(getattr(settings, 'MARKET_CACHE_STALE_BUDGETS', DEFAULT_STALE_BUDGETS))
+        max_entries = int(getattr(settings, 'MARKET_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+        return cls(ttls, budgets, max_entries)
+
+    def _region(self, cache_type: str) -> Optional[CacheRegion]:
+        region = self.regions.get(cache_type)
+        if region is None:
+            logger.warning(f"Invalid cache type: {cache_type}")
+        return region
+
+    def get(self, cache_type: str, key: Hashable, allow_stale: bool = False) -> Optional[Any]:
+        """
+        Synchronous read. Does not start a refresh.
+
+        Args:
+            cache_type: Cache type to read
+            key: Cache key
+            allow_stale: Also return any retained entry past its TTL (error fallback)
+
+        Returns:
+            Cached value or None
+        """
+        region = self._region(cache_type)
+        if region is None:
+            return None
+        value, state = region.lookup(key, time.monotonic())
+        if state == "fresh":
+            region.hits += 1
+            return value
+        if allow_stale:
+            # Error fallback: not a lookup of its own, so a miss is not counted again
+            if state is not None:
+                region.stale_served += 1
+            return value
+        region.misses += 1
+        return None
+
+    def set(self, cache_type: str, key: Hashable, value: Any):
+        region = self._region(cache_type)
+        if region is not None:
+            region.store(key, value, time.monotonic())
+
+    def invalidate(self, cache_type: str, key: Hashable):
+        region = self.regions.get(cache_type)
+        if region is not None:
+            region.entries.pop(key, None)
+
+    def clear(self, cache_type: Optional[str] = None):
+        regions = [self.regions[cache_type]] if cache_type in self.regions else (
+            self.regions.values() if cache_type is None else [])
+        for region in regions:
+            region.entries.clear()
+
+    async def get_or_fetch(self, cache_type: str, key: Hashable,
+                           fetcher: Callable[[], Awaitable[Any]],
+                           force_refresh: bool = False) -> Optional[Any]:
+        """
+        Return a cached value, or fetch it once for all concurrent callers.
+
+        Args:
+            cache_type: Cache type to read
+            key: Cache key
+            fetcher: Zero-argument coroutine factory. It must store its result
+                (the cache does not) and may raise.
+            force_refresh: Skip the cached value. Still joins an in-flight fetch.
+
+        Returns:
+            The cached or fetched value (None if the fetch returned None)
+
+        Raises:
+            Whatever the fetcher raised, for callers that awaited the fetch
+        """
+        region = self._region(cache_type)
+        if region is None:
+            return await fetcher()
+
+        if not force_refresh:
+            value, state = region.lookup(key, time.monotonic())
+            if state == "fresh":
+                region.hits += 1
+                return value
+            if state == "stale":
+                region.stale_served += 1
+                if key not in region.inflight:
+                    region.refreshes += 1
+                    task = self._start(region, key, fetcher)
+                    self._refresh_tasks.add(task)
+                    task.add_done_callback(lambda t, region=region: self._refresh_done(region, t))
+                return value
+
+        task = region.inflight.get(key)
+        if task is not None:
+            region.coalesced += 1
+        else:
+            region.misses += 1
+            task = self._start(region, key, fetcher)
+        # Shield so one cancelled caller does not cancel the fetch for everyone else
+        return await asyncio.shield(task)
+
+    def _start(self, region: CacheRegion, key: Hashable, fetcher: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.ensure_future(fetcher())
+        region.inflight[key] = task
+        task.add_done_callback(lambda t, region=region, key=key: self._fetch_done(region, key, t))
+        return task
+
+    @staticmethod
+    def _fetch_done(region: CacheRegion, key: Hashable, task: asyncio.Task):
+        if region.inflight.get(key) is task:
+            del region.inflight[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here too, in case every waiter was cancelled
+
+    def _refresh_done(self, region: CacheRegion, task: asyncio.Task):
+        self._refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            region.refresh_errors += 1
+            logger.debug(f"Background refresh of {region.name} failed: {task.exception()}")
+
+    async def close(self):
+        """Cancel background refreshes."""
+        tasks = list(self._refresh_tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._refresh_tasks.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Counters per cache type plus totals.
+
+        Returns:
+            Dict with ``totals`` and one entry per cache type
+        """
+        per_type = {name: region.get_stats() for name, region in self.regions.items()}
+        totals = {
+            counter: sum(stats[counter] for stats in per_type.values())
+            for counter in ('size', 'hits', 'misses', 'stale_served', 'coalesced',
+                            'refreshes', 'refresh_errors', 'evictions', 'inflight')
+        }
+        lookups = totals['hits'] + totals['misses'] + totals['stale_served']
+        totals['hit_rate'] = (totals['hits'] + totals['stale_served']) / lookups if lookups else 0.0
+        return {'totals': totals, **per_type}
@@ -10,7 +10,6 @@ import httpx
 import backoff # Add backoff import
 from dotenv import load_dotenv
 from solders.pubkey import Pubkey
-from solana.rpc.async_api import AsyncClient
 from solana.rpc.types import TokenAccountOpts
 from spl.token.instructions import get_associated_token_address
 import websockets # Use websockets library directly
@@ -21,11 +20,18 @@ from config.settings import Settings
 from config.dexscreener_api import DexScreenerAPI
 from utils.logger import get_logger
 from utils.circuit_breaker import CircuitBreaker, CircuitBreakerType
+from utils.rpc_pool import get_rpc_pool
 # Import existing data components
 from .data_fetcher import DataFetcher
 from .price_monitor import PriceMonitor
 from .blockchain_listener import BlockchainListener
 from .token_database import TokenDatabase
+from .tick_store import TickStore
+from .event_pipeline import EventPipeline
+from .write_behind import MarketWriteBehind
+from .account_layouts import decode_pumpfun_bonding_curve, decode_raydium_v4_pool
+from .mint_metadata import MintMetadataService, SOL_MINT, set_mint_metadata_service
+from .market_cache import MarketDataCache
 import base58 # Assuming base58 is available or add it to requirements
 import binascii
 import traceback # Add import for traceback
@@ -77,6 +83,8 @@ class MarketData:
         self.db = token_db  # Add this for backward compatibility
         self.http_client = http_client
         self.solana_client = solana_client
+        self.rpc_pool = get_rpc_pool(settings, primary_client=solana_client)  # Latency-routed, hedged RPC calls
+        self.mint_metadata: Optional[MintMetadataService] = None  # Created in initialize() once http_client exists
         
         # Initialize circuit breaker
         self.circuit_breaker = CircuitBreaker(
@@ -95,8 +103,6 @@ class MarketData:
             "errors": 0,
             "last_error": None,
             "last_error_time": None,
-            "cache_hits": 0,
-            "cache_misses": 0,
             "api_calls": 0,
             "primary": {
                 "connection_attempts": 0,
@@ -144,57 +150,15 @@ class MarketData:
             )
             self.logger.info("Defined _trade_event_layout using bc.")
             
-            # Define a schema for Bonding Curve (Pump.fun)
-            self._bonding_curve_layout = bc.CStruct(
-                "version" / bc.U8,
-                "is_frozen" / bc.Bool,
-                "tokens_outstanding" / bc.U64, 
-                "curve_owner" / bc.Bytes[32],
-                "treasury_owner" / bc.Bytes[32],
-                "token_mint" / bc.Bytes[32],
-                "token_pool" / bc.Bytes[32],
-                "usdc_pool" / bc.Bytes[32], 
-                "initial_slot" / bc.U64,
-                "virtual_sol_reserves" / bc.U64,
-                "virtual_token_reserves" / bc.U64,
-                "real_sol_reserves" / bc.U64,
-                "real_token_reserves" / bc.U64,
-                "target_sol_reserves" / bc.U64,
-                "complete" / bc.Bool,
-                "buy_fee_bps" / bc.U64,
-                "sell_fee_bps" / bc.U64
-            )
-            self.logger.info("Defined _bonding_curve_layout using bc.")
-            
-            # Define Raydium V4 pool layout
-            self._raydium_v4_pool_layout = bc.CStruct(
-                "status" / bc.U64,
-                "base_mint" / bc.Bytes[32],
-                "quote_mint" / bc.Bytes[32],
-                "lp_mint" / bc.Bytes[32],
-                "open_time" / bc.U64,
-                # "current_price" / bc.I64, # Removed as price is derived
-                "pool_base_vault" / bc.Bytes[32], # Added to match parsing logic
-                "pool_quote_vault" / bc.Bytes[32], # Added to match parsing logic
-                # "base_reserve" / bc.U64, # Removed to avoid conflict/confusion with vault fetching logic
-                # "quote_reserve" / bc.U64, # Removed to avoid conflict/confusion with vault fetching logic
-                "lp_supply" / bc.U64
-                # Potentially other fields from a complete Raydium AMM state are missing.
-                # This change aims to fix the immediate bug with vault address access based on current parsing logic.
-            )
-            self.logger.info("Defined Raydium V4 pool layout using bc.")
+            # Pump.fun bonding curve and Raydium V4 pool state are decoded by data.account_layouts
             self.logger.info("Successfully defined FULL Borsh layouts using aliased 'bc'.") # Updated log
 
         except NameError as ne:
             self.logger.error(f"NameError involving 'bc' for Borsh layouts: {ne}. This suggests 'import borsh_construct as bc' failed or was not recognized.", exc_info=True)
             self._trade_event_layout = None
-            self._bonding_curve_layout = None
-            self._raydium_v4_pool_layout = None
         except Exception as e: 
             self.logger.error(f"Error during Borsh layout definition phase: {e}", exc_info=True)
             self._trade_event_layout = None
-            self._bonding_curve_layout = None
-            self._raydium_v4_pool_layout = None
         
         # Initialize DEX-specific parsers using the new parser system
         from data import RaydiumV4Parser, PumpSwapParser, RaydiumClmmParser, RaydiumPriceParser, JupiterPriceParser
@@ -221,6 +185,29 @@ class MarketData:
         self.logger.info(f"DEX parsers: {list(self.parsers.keys())}")
         self.logger.info(f"Price parsers: {list(self.price_parsers.keys())}")
         
+        # Append-only tick store for every parsed swap (read back by indicators, backtests and web API)
+        self.tick_store: Optional[TickStore] = None
+        if getattr(self.settings, 'TICK_STORE_ENABLED', False):
+            try:
+                self.tick_store = TickStore(
+                    root_dir=self.settings.TICK_STORE_PATH,
+                    segment_rows=self.settings.TICK_STORE_SEGMENT_ROWS,
+                    segment_seconds=self.settings.TICK_STORE_SEGMENT_SECONDS,
+                    retention_seconds=self.settings.TICK_STORE_RETENTION_HOURS * 3600
+                )
+            except Exception as e:
+                self.logger.error(f"Failed to open tick store, swap ticks will not be persisted: {e}", exc_info=True)
+                self.tick_store = None
+        
+        # Coalescing write-behind buffer for per-mint price/liquidity/volume writes
+        self.write_behind: Optional[MarketWriteBehind] = None
+        if self.token_db is not None and getattr(self.settings, 'DB_WRITE_BEHIND_ENABLED', False):
+            self.write_behind = MarketWriteBehind(
+                self.token_db,
+                flush_interval=self.settings.DB_WRITE_BEHIND_FLUSH_INTERVAL,
+                max_dirty=self.settings.DB_WRITE_BEHIND_MAX_DIRTY
+            )
+        
         # Initialize required attributes
         self.price_monitor = None
         self.blockchain_listener = None
@@ -242,20 +229,14 @@ class MarketData:
         self.actively_streamed_mints = set() # Initialize actively_streamed_mints as a set
         self._realtime_pair_state = {} # Initialize _realtime_pair_state as a dictionary
         self._blockchain_listener_task: Optional[asyncio.Task] = None # Task for BlockchainListener.run_forever()
+        self._tick_store_task: Optional[asyncio.Task] = None # Task for periodic tick store flush/prune
+        self._event_pipeline: Optional[EventPipeline] = None # Staged decode/parse/aggregate/persist pipeline for listener events
         self._price_monitor_dex_api_client: Optional[DexScreenerAPI] = None # REMOVE THIS LINE
         
         # Initialize pool to tokens mapping for blockchain event processing
         self.pool_to_tokens = {} # Map pool_addresses -> {mint, base_token, etc.}
         
         # Initialize caches and related attributes
-        self.cache: Dict[str, Dict[str, Tuple[Any, float]]] = { # type: ignore
-            "token_info": {},
-            "pair_data": {},
-            "price": {},
-            "historical_data": {},
-            "market_data": {},
-            "blockchain_data": {}
-        }
         self.cache_ttl: Dict[str, int] = {
             "token_info": 300, # 5 minutes
             "pair_data": 300,
@@ -264,6 +245,8 @@ class MarketData:
             "market_data": 120, # 2 minutes
             "blockchain_data": 60
         }
+        # LRU/TTL per cache type, single-flight fetches, stale-while-revalidate
+        self.cache = MarketDataCache.from_settings(self.settings, self.cache_ttl)
         self.last_update_time: Dict[str, float] = {} # For get_token_price
         self._token_prices: Dict[str, Dict[str, Any]] = {} # For update_token_price
 
@@ -291,6 +274,12 @@ class MarketData:
                 from solana.rpc.async_api import AsyncClient
                 self.solana_client = AsyncClient(self.settings.SOLANA_RPC_URL)
                 self.logger.info("Created new Solana client for MarketData")
+                self.rpc_pool.adopt_client(self.settings.SOLANA_RPC_URL, self.solana_client)
+            
+            # Shared mint metadata (decimals etc.), warm-started from the DB and used by the parsers too
+            self.mint_metadata = MintMetadataService(self.settings, http_client=self.http_client, token_db=self.db)
+            await self.mint_metadata.warm_start()
+            set_mint_metadata_service(self.mint_metadata)
             
             # Initialize DataFetcher
             self.data_fetcher = DataFetcher(self.settings) # Pass only settings for now
@@ -384,6 +373,33 @@ class MarketData:
                     except Exception as e:
                         self.logger.error(f"Error closing {parser_name} price parser: {e}")
             
+            # Flush and unmap the tick store
+            if getattr(self, 'tick_store', None):
+                try:
+                    self.tick_store.close()
+                    self.logger.info("Closed tick store")
+                except Exception as e:
+                    self.logger.error(f"Error closing tick store: {e}")
+            
+            # Flush buffered market writes while the DB is still open
+            if getattr(self, 'write_behind', None):
+                try:
+                    await self.write_behind.stop()
+                    self.logger.info("Flushed write-behind market updates")
+                except Exception as e:
+                    self.logger.error(f"Error flushing write-behind market updates: {e}")
+            
+            # Stop background cache refreshes before their clients are closed
+            await self.cache.close()
+            
+            # Persist any unsaved mint metadata before the DB/HTTP client go away
+            if getattr(self, 'mint_metadata', None):
+                try:
+                    await self.mint_metadata.close()
+                    set_mint_metadata_service(None)
+                except Exception as e:
+                    self.logger.error(f"Error closing mint metadata service: {e}")
+            
             # Close BlockchainListener if it was initialized
             if self.blockchain_listener:
                 await self.blockchain_listener.close()
@@ -428,38 +444,20 @@ class MarketData:
 
     # --- Cache Management ---
 
-    def _get_cached_data(self, cache_type: str, key: str) -> Optional[Any]:
+    def _get_cached_data(self, cache_type: str, key: str, allow_stale: bool = False) -> Optional[Any]:
         """
         Get data from cache if it exists and is not expired.
         
         Args:
             cache_type: Type of cache to access
             key: Cache key
+            allow_stale: Also return an expired entry that has not been evicted yet
+                (used as a fallback when a fetch fails)
             
         Returns:
             Cached data if available and not expired, None otherwise
         """
-        if cache_type not in self.cache:
-            logger.warning(f"Invalid cache type: {cache_type}")
-            return None
-            
-        cache_entry = self.cache[cache_type].get(key)
-        if not cache_entry:
-            self.metrics["cache_misses"] += 1
-            return None
-            
-        data, timestamp = cache_entry
-        ttl = self.cache_ttl.get(cache_type, 60)  # Default 60 seconds
-        
-        # Check if cache is expired
-        if time.time() - timestamp > ttl:
-            logger.debug(f"Cache expired for {cache_type}:{key}")
-            self.metrics["cache_misses"] += 1
-            return None
-            
-        logger.debug(f"Cache hit for {cache_type}:{key}")
-        self.metrics["cache_hits"] += 1
-        return data
+        return self.cache.get(cache_type, key, allow_stale=allow_stale)
 
     def _set_cached_data(self, cache_type: str, key: str, data: Any):
         """
@@ -470,10 +468,6 @@ class MarketData:
             key: Cache key
             data: Data to cache
         """
-        if cache_type not in self.cache:
-            logger.warning(f"Invalid cache type: {cache_type}")
-            return
-            
         # --- Check if trying to cache data for an actively streamed token --- #
         # We generally want to avoid caching rapidly changing streamed data,
         # but allow caching for other types like 'token_info'.
@@ -483,8 +477,7 @@ class MarketData:
              return
         # --- End Check ---
 
-        self.cache[cache_type][key] = (data, time.time())
-        logger.debug(f"Cached data for {cache_type}:{key}")
+        self.cache.set(cache_type, key, data)
 
     def _clear_cache(self, cache_type: Optional[str] = None):
         """
@@ -493,16 +486,11 @@ class MarketData:
         Args:
             cache_type: Optional cache type to clear, or None to clear all
         """
-        if cache_type:
-            if cache_type in self.cache:
-                self.cache[cache_type] = {}
-                logger.info(f"Cleared cache for {cache_type}")
-            else:
-                logger.warning(f"Invalid cache type: {cache_type}")
-        else:
-            for cache_type_key in self.cache: # Renamed loop variable for clarity
-                self.cache[cache_type_key] = {}
-            logger.info("Cleared all caches")
+        if cache_type and cache_type not in self.cache.regions:
+            logger.warning(f"Invalid cache type: {cache_type}")
+            return
+        self.cache.clear(cache_type)
+        logger.info(f"Cleared cache for {cache_type}" if cache_type else "Cleared all caches")
 
     # --- Data Access Methods ---
 
@@ -553,46 +541,9 @@ class MarketData:
             logger.warning("Circuit breaker active. Using cached price data if available.")
             # Still try to return cached data even if circuit breaker is active
         
-        # Check standard time-based cache first if not forcing refresh (disabled to avoid indent error)
-        if not force_refresh:
-            pass
-        
-        # If not in cache or force_refresh is True, fetch fresh data
+        # Cached price if fresh (or within its staleness budget); concurrent misses share one fetch
         try:
-            self.metrics["api_calls"] += 1
-            # Note: price_monitor.fetch_prices might need adjustment if it caches internally
-            # Assuming it fetches fresh prices based on its own logic/cache TTL
-            prices = await self.price_monitor.fetch_prices([mint])
-            if mint in prices:
-                price_data = prices[mint]
-                # Ensure price_data is a dictionary
-                if isinstance(price_data, dict):
-                    price_data["source"] = "fetch"  # Add source info
-                else:
-                    logger.error(f"Fetched price data for {mint} is not a dictionary: {price_data}")
-                    return None
-                self._set_cached_data("price", mint, price_data)
-                self.last_update_time[mint] = time.time()
-                
-                # Record price for comparison aggregation
-                price_value = price_data.get('price')
-                if price_value and hasattr(self, 'price_aggregator'):
-                    self.price_aggregator.record_price_update(
-                        mint=mint, 
-                        price=float(price_value), 
-                        source='dexscreener'
-                    )
-                
-                # Notify subscribers
-                self._notify_subscribers("price_update", {
-                    "mint": mint,
-                    "price_data": price_data
-                })
-                return price_data
-            else:
-                logger.warning(f"No price data fetched for token {mint}")
-                return None
-                
+            return await self.cache.get_or_fetch("price", mint, lambda: self._fetch_token_price(mint), force_refresh)
         except Exception as e:
             logger.error(f"Error fetching price for token {mint}: {e}", exc_info=True)
             self.circuit_breaker.increment_failures()
@@ -601,7 +552,7 @@ class MarketData:
             self.metrics["last_error_time"] = datetime.now().isoformat()
             
             # Return cached data as fallback if available
-            cached_data = self._get_cached_data("price", mint)
+            cached_data = self._get_cached_data("price", mint, allow_stale=True)
             if cached_data:
                 logger.info(f"Using cached price data for {mint} due to error")
                 # Add source if missing
@@ -611,6 +562,50 @@ class MarketData:
                 
             return None
 
+    async def _fetch_token_price(self, mint: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a token price from the price monitor and cache it.
+        
+        Args:
+            mint: Token mint address
+            
+        Returns:
+            Token price data or None if not available
+        """
+        self.metrics["api_calls"] += 1
+        # Note: price_monitor.fetch_prices might need adjustment if it caches internally
+        # Assuming it fetches fresh prices based on its own logic/cache TTL
+        prices = await self.price_monitor.fetch_prices([mint])
+        if mint in prices:
+            price_data = prices[mint]
+            # Ensure price_data is a dictionary
+            if isinstance(price_data, dict):
+                price_data["source"] = "fetch"  # Add source info
+            else:
+                logger.error(f"Fetched price data for {mint} is not a dictionary: {price_data}")
+                return None
+            self._set_cached_data("price", mint, price_data)
+            self.last_update_time[mint] = time.time()
+
+            # Record price for comparison aggregation
+            price_value = price_data.get('price')
+            if price_value and hasattr(self, 'price_aggregator'):
+                self.price_aggregator.record_price_update(
+                    mint=mint, 
+                    price=float(price_value), 
+                    source='dexscreener'
+                )
+
+            # Notify subscribers
+            self._notify_subscribers("price_update", {
+                "mint": mint,
+                "price_data": price_data
+            })
+            return price_data
+        else:
+            logger.warning(f"No price data fetched for token {mint}")
+            return None
+
     async def get_token_info(self, mint: str, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
         """
         Get information about a token, using cache if available.
@@ -625,41 +620,9 @@ class MarketData:
         if self.circuit_breaker.check():
             logger.warning("Circuit breaker active. Using cached token info if available.")
         
-        # Check cache first if not forcing refresh
-        if not force_refresh:
-            cached_data = self._get_cached_data("token_info", mint)
-            if cached_data:
-                return cached_data
-        
         try:
-            # Try to get from database first
-            token_info = await self.db.get_token_info(mint)
-            if token_info:
-                self._set_cached_data("token_info", mint, token_info)
-                return token_info
-            
-            # If not in database, fetch from external source
-            self.metrics["api_calls"] += 1
-            dex_data = await self.data_fetcher.fetch_dex_screener_data(mint)
-            if dex_data and "pairs" in dex_data and dex_data["pairs"]:
-                # Process and store the data
-                processed_data = self._process_token_info(dex_data, mint)
-                if processed_data:
-                    # Store in database for future use
-                    await self.db.store_token_info(mint, processed_data)
-                    self._set_cached_data("token_info", mint, processed_data)
-                    
-                    # Notify subscribers
-                    self._notify_subscribers("token_update", {
-                        "mint": mint,
-                        "token_info": processed_data
-                    })
-                    
-                    return processed_data
-            
-            logger.warning(f"No token info found for {mint}")
-            return None
-                
+            return await self.cache.get_or_fetch("token_info", mint, lambda: self._fetch_token_info(mint), force_refresh)
+
         except Exception as e:
             logger.error(f"Error fetching token info for {mint}: {e}", exc_info=True)
             self.circuit_breaker.increment_failures()
@@ -668,13 +631,51 @@ class MarketData:
             self.metrics["last_error_time"] = datetime.now().isoformat()
             
             # Return cached data as fallback if available
-            cached_data = self._get_cached_data("token_info", mint)
+            cached_data = self._get_cached_data("token_info", mint, allow_stale=True)
             if cached_data:
                 logger.info(f"Using cached token info for {mint} due to error")
                 return cached_data
                 
             return None
 
+    async def _fetch_token_info(self, mint: str) -> Optional[Dict[str, Any]]:
+        """
+        Load token info from the database, or DexScreener if unknown, and cache it.
+        
+        Args:
+            mint: Token mint address
+            
+        Returns:
+            Token information or None if not available
+        """
+        # Try to get from database first
+        token_info = await self.db.get_token_info(mint)
+        if token_info:
+            self._set_cached_data("token_info", mint, token_info)
+            return token_info
+
+        # If not in database, fetch from external source
+        self.metrics["api_calls"] += 1
+        dex_data = await self.data_fetcher.fetch_dex_screener_data(mint)
+        if dex_data and "pairs" in dex_data and dex_data["pairs"]:
+            # Process and store the data
+            processed_data = self._process_token_info(dex_data, mint)
+            if processed_data:
+                # Store in database for future use
+                await self.db.store_token_info(mint, processed_data)
+                self._set_cached_data("token_info", mint, processed_data)
+
+                # Notify subscribers
+                self._notify_subscribers("token_update", {
+                    "mint": mint,
+                    "token_info": processed_data
+                })
+
+                return processed_data
+
+        logger.warning(f"No token info found for {mint}")
+        return None
+
     def _process_token_info(self, dex_data: Dict[str, Any], mint: str) -> Optional[Dict[str, Any]]:
         """
         Process raw token data from DexScreener into a standardized format.
@@ -747,24 +748,11 @@ class MarketData:
         cache_key = pair_address # Use pair_address as cache key
         cache_type = "pair_data" # Use renamed cache type
         
-        # Check cache first if not forcing refresh
-        if not force_refresh:
-            cached_data = self._get_cached_data(cache_type, cache_key) # Use updated cache type and key
-            if cached_data:
-                return cached_data
-        
         try:
-            # Fetch from Raydium
-            self.metrics["api_calls"] += 1
-            # Assuming data_fetcher.fetch_raydium_pool_data expects the pair address
-            pool_data = await self.data_fetcher.fetch_raydium_pool_data(pair_address) # Pass pair_address
-            if pool_data:
-                self._set_cached_data(cache_type, cache_key, pool_data) # Use updated cache type and key
-                return pool_data
-            
-            logger.warning(f"No pair data found for {pair_address}") # Updated log message
-            return None
-                
+            return await self.cache.get_or_fetch(
+                cache_type, cache_key, lambda: self._fetch_pool_data(pair_address), force_refresh
+            )
+
         except Exception as e:
             logger.error(f"Error fetching pair data for {pair_address}: {e}", exc_info=True) # Updated log message
             self.circuit_breaker.increment_failures()
@@ -773,13 +761,34 @@ class MarketData:
             self.metrics["last_error_time"] = datetime.now().isoformat()
             
             # Return cached data as fallback if available
-            cached_data = self._get_cached_data(cache_type, cache_key) # Use updated cache type and key
+            cached_data = self._get_cached_data(cache_type, cache_key, allow_stale=True)
             if cached_data:
                 logger.info(f"Using cached pair data for {pair_address} due to error") # Updated log message
                 return cached_data
                 
             return None
 
+    async def _fetch_pool_data(self, pair_address: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch pair data from Raydium and cache it.
+        
+        Args:
+            pair_address: Pair address (e.g., Raydium AMM ID)
+            
+        Returns:
+            Pair data or None if not available
+        """
+        # Fetch from Raydium
+        self.metrics["api_calls"] += 1
+        # Assuming data_fetcher.fetch_raydium_pool_data expects the pair address
+        pool_data = await self.data_fetcher.fetch_raydium_pool_data(pair_address) # Pass pair_address
+        if pool_data:
+            self._set_cached_data("pair_data", pair_address, pool_data)
+            return pool_data
+
+        logger.warning(f"No pair data found for {pair_address}") # Updated log message
+        return None
+
     async def get_historical_data(self, mint: str, timeframe: str = "1h", limit: int = 100) -> Optional[List[Dict[str, Any]]]:
         """
         Get historical price data for a token.
@@ -799,6 +808,11 @@ class MarketData:
         if cached_data:
             return cached_data
         
+        # Prefer bars built from our own on-chain ticks over another API round-trip
+        tick_bars = self.get_tick_ohlcv(mint, timeframe, limit)
+        if tick_bars:
+            return tick_bars
+        
         try:
             self.metrics["api_calls"] += 1
             
@@ -824,13 +838,57 @@ class MarketData:
             self.metrics["last_error_time"] = datetime.now().isoformat()
             
             # Return cached data as fallback if available
-            cached_data = self._get_cached_data("historical_data", cache_key)
+            cached_data = self._get_cached_data("historical_data", cache_key, allow_stale=True)
             if cached_data:
                 logger.info(f"Using cached historical data for {mint} due to error")
                 return cached_data
                 
             return None
 
+    def get_recent_ticks(self, mint: str, seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Get raw swap ticks for a token from the tick store.
+        
+        Args:
+            mint: Token mint address
+            seconds: How far back to read
+            
+        Returns:
+            Dict of column name -> NumPy array (zero-copy where possible), or None if no tick store
+        """
+        if not self.tick_store:
+            return None
+        return self.tick_store.read_recent(mint, seconds)
+
+    def get_tick_ohlcv(self, mint: str, timeframe: str = "1m", limit: int = 100) -> Optional[List[Dict[str, Any]]]:
+        """
+        Build OHLCV bars for a token from stored swap ticks.
+        
+        Args:
+            mint: Token mint address
+            timeframe: Bar width (e.g., "1m", "5m", "1h")
+            limit: Number of bars to return
+            
+        Returns:
+            List of bars (oldest first) or None if ticks do not cover the request
+            (fewer than TICK_OHLCV_MIN_BARS bars, capped at ``limit``)
+        """
+        if not self.tick_store or limit <= 0:
+            return None
+        units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+        try:
+            bar_seconds = int(timeframe[:-1]) * units[timeframe[-1].lower()]
+        except (ValueError, KeyError, IndexError):
+            self.logger.debug(f"Unsupported timeframe '{timeframe}' for tick OHLCV")
+            return None
+        try:
+            min_bars = getattr(self.settings, 'TICK_OHLCV_MIN_BARS', limit)
+            bars = self.tick_store.get_ohlcv(mint, bar_seconds, limit, min_bars=min_bars)
+        except Exception as e:
+            self.logger.warning(f"Error building tick OHLCV for {mint[:8]}...: {e}")
+            return None
+        return bars or None
+
     async def get_market_data(self, mint: str, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
         """
         Get comprehensive market data for a token, combining multiple data sources.
@@ -892,7 +950,7 @@ class MarketData:
             self.metrics["last_error_time"] = datetime.now().isoformat()
             
             # Return cached data as fallback if available
-            cached_data = self._get_cached_data("market_data", mint)
+            cached_data = self._get_cached_data("market_data", mint, allow_stale=True)
             if cached_data:
                 logger.info(f"Using cached market data for {mint} due to error")
                 return cached_data
@@ -924,9 +982,15 @@ class MarketData:
             
             # Set up the callback handler for blockchain events (critical for price updates)
             if self.blockchain_listener:
-                # Set the callback to our _handle_blockchain_update method
-                self.blockchain_listener.set_callback(self._handle_blockchain_update)
-                self.logger.info("Set blockchain listener callback to handle real-time updates")
+                if getattr(self.settings, 'EVENT_PIPELINE_ENABLED', False):
+                    # Intake only enqueues; parsing and DB writes run on sharded pipeline workers
+                    await self._start_event_pipeline()
+                    self.blockchain_listener.set_callback(self._enqueue_blockchain_update)
+                    self.logger.info("Set blockchain listener callback to the sharded event pipeline")
+                else:
+                    # Set the callback to our _handle_blockchain_update method
+                    self.blockchain_listener.set_callback(self._handle_blockchain_update)
+                    self.logger.info("Set blockchain listener callback to handle real-time updates")
             
                 # **FIXED: Initialize and start the blockchain listener properly**
                 # First initialize the listener with all program IDs
@@ -944,6 +1008,10 @@ class MarketData:
             else:
                 self.logger.info("Blockchain listener not enabled or failed to initialize")
             
+            # Periodically flush and prune the tick store
+            if self.tick_store and not (self._tick_store_task and not self._tick_store_task.done()):
+                self._tick_store_task = asyncio.create_task(self._tick_store_maintenance_loop())
+            
             # Mark monitoring as started
             self.is_monitoring = True
             self.logger.info("Market data monitoring successfully started")
@@ -959,6 +1027,14 @@ class MarketData:
         # Removed check for self.monitor_task as it's not set by start_monitoring
         # The relevant task, _blockchain_listener_task, is handled below.
 
+        if self._tick_store_task and not self._tick_store_task.done():
+            self._tick_store_task.cancel()
+            try:
+                await self._tick_store_task
+            except asyncio.CancelledError:
+                pass
+            self._tick_store_task = None
+
         if self._blockchain_listener_task and not self._blockchain_listener_task.done():
             self.logger.info("Attempting to cancel Blockchain Listener task...")
             self._blockchain_listener_task.cancel()
@@ -969,6 +1045,82 @@ class MarketData:
             except Exception as e_cancel:
                 self.logger.error(f"Error cancelling Blockchain Listener task: {e_cancel}")
 
+        if self._event_pipeline:
+            await self._event_pipeline.stop()
+            self._event_pipeline = None
+
+    async def _start_event_pipeline(self):
+        """Create and start the sharded event pipeline used for BlockchainListener updates."""
+        if self._event_pipeline and self._event_pipeline.running:
+            return
+        self._event_pipeline = EventPipeline(
+            parse_handler=self._handle_blockchain_update,
+            persist_handler=self._persist_price_batch,
+            num_shards=self.settings.EVENT_PIPELINE_SHARDS,
+            queue_size=self.settings.EVENT_PIPELINE_QUEUE_SIZE,
+            flush_interval=self.settings.EVENT_PIPELINE_FLUSH_INTERVAL,
+            max_batch=self.settings.EVENT_PIPELINE_MAX_BATCH,
+            shard_key=self._pipeline_shard_key,
+            coalesce_key=self._pipeline_coalesce_key,
+            is_significant=self._is_update_significant,
+            name="market_data_pipeline"
+        )
+        await self._event_pipeline.start()
+
+    async def _enqueue_blockchain_update(self, update_data: Dict):
+        """
+        BlockchainListener callback when the event pipeline is enabled.
+        Never awaits downstream work, so the WebSocket receive loop is not stalled by parsing or DB flushes.
+        """
+        if not self._event_pipeline or not self._event_pipeline.submit(update_data):
+            self.logger.debug(f"Event pipeline dropped {update_data.get('type')} update for {update_data.get('pool_address')}")
+
+    @staticmethod
+    def _pipeline_shard_key(update_data: Dict) -> Optional[str]:
+        """Shard by mint when known, otherwise by the subscribed pool/account address."""
+        return update_data.get('mint') or update_data.get('pool_address') or update_data.get('dex_id')
+
+    @staticmethod
+    def _pipeline_coalesce_key(update_data: Dict) -> Optional[Tuple[str, str]]:
+        """Account updates are full state snapshots, so only the latest per account matters."""
+        if update_data.get('type') == 'account_update' and update_data.get('pool_address'):
+            return ('account', update_data['pool_address'])
+        return None
+
+    def _is_update_significant(self, update_data: Dict) -> bool:
+        """Significance of a raw listener update, used to shed load when the parse queues back up."""
+        event_type = update_data.get('type')
+        if event_type == 'log_update' and not update_data.get('has_swap_activity', False):
+            return False
+        return self._is_event_significant(event_type, update_data.get('price'), update_data)
+
+    async def _persist_price_batch(self, items: List[Dict]):
+        """Persist stage of the event pipeline: write the coalesced latest price per mint in one transaction."""
+        prices = {item['mint']: item['price'] for item in items if item.get('mint') and item.get('price')}
+        if not prices or not self.db:
+            return
+        if self.write_behind:
+            for mint, price in prices.items():
+                self.write_behind.update_price(mint, price)
+        elif hasattr(self.db, 'update_token_prices'):
+            await self.db.update_token_prices(prices)
+        elif hasattr(self.db, 'update_token_price'):
+            for mint, price in prices.items():
+                await self.db.update_token_price(mint=mint, price=price)
+
+    async def _tick_store_maintenance_loop(self, interval: float = 60.0):
+        """Background task that flushes tick segments to disk and prunes expired ones."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    self.tick_store.flush()
+                    self.tick_store.prune()
+                except Exception as e:
+                    self.logger.warning(f"Tick store maintenance failed: {e}")
+        except asyncio.CancelledError:
+            self.logger.debug("Tick store maintenance task cancelled")
+
     async def _monitor_loop(self):
         """Background task that monitors tokens and updates data."""
         last_indicator_log = {}  # Track last log time per token
@@ -1386,8 +1538,10 @@ class MarketData:
             'timestamp': int(time.time())
         }
         
-        # Update the token database if available
-        if self.token_db:
+        # Update the token database if available (buffered when write-behind is enabled)
+        if self.write_behind:
+            self.write_behind.update_price(mint, price)
+        elif self.token_db:
             await self.token_db.update_token_price(mint, price)
             
         # Notify subscribers (this would be implemented based on your architecture)
@@ -1395,14 +1549,17 @@ class MarketData:
         
     async def update_token_liquidity(self, mint: str, liquidity: float):
         """Update token liquidity information in the database"""
-        if self.token_db:
-            await self.token_db.update_token_liquidity(mint, liquidity)
+        if self.write_behind:
+            self.write_behind.update_liquidity(mint, liquidity)
+        elif self.token_db:
+            await self.token_db.write_market_updates([{'mint': mint, 'liquidity': liquidity}])
             
     async def update_token_volume(self, mint: str, volume_increment: float):
-        """Update token volume information in the database"""
-        if self.token_db:
-            # This assumes your token DB has a method to increment volume rather than set it
-            await self.token_db.increment_token_volume(mint, volume_increment)
+        """Add traded volume to the token's volume_24h in the database"""
+        if self.write_behind:
+            self.write_behind.add_volume(mint, volume_increment)
+        elif self.token_db:
+            await self.token_db.write_market_updates([{'mint': mint, 'volume_increment': volume_increment}])
 
     async def health_check(self) -> Dict[str, Any]:
         """
@@ -2017,8 +2174,12 @@ class MarketData:
     # --- NEW: Helper for Fetching Transaction with Fallback & Retry ---
     async def _fetch_transaction_with_fallback(self, signature: str):
         """
-        Fetches transaction details using the primary RPC client with backoff retries,
-        then falls back to a single attempt on the public RPC if the primary fails.
+        Fetches transaction details through the RPC pool with backoff retries.
+
+        Each attempt goes to the best-scoring endpoint and is hedged to the next one
+        if it has not answered by the endpoint's p90 latency. Errors and ``None``
+        values (a node that has not seen the transaction yet) move on to the next
+        endpoint within the same attempt.
 
         Args:
             signature: The transaction signature string.
@@ -2027,8 +2188,6 @@ class MarketData:
             The RpcResponse containing transaction details, or None if all attempts fail.
         """
         tx_sig_obj = Signature.from_string(signature)
-        primary_client = self.solana_client
-        fallback_client = None
         # Define errors that should trigger backoff/retries
         RECOVERABLE_ERRORS = (SolanaRpcException, httpx.HTTPStatusError, httpx.RequestError, asyncio.TimeoutError) # Added TimeoutError
 
@@ -2048,116 +2207,35 @@ class MarketData:
             on_giveup=lambda details: logger.error(f"Giving up fetch for Sig {signature} after {details['tries']} attempts due to non-recoverable error: {repr(details['exception'])}")
             # --- END MODIFIED LOGGING ---
         )
-        async def _attempt_get_transaction(client, sig, rpc_name):
-            # Log which RPC is being attempted
-            # Use the internal attribute _provider.endpoint_uri to access the URL
-            rpc_url = getattr(client._provider, 'endpoint_uri', 'Unknown RPC URL')
-            logger.debug(f"Attempting get_transaction via {rpc_name} RPC ({rpc_url}) for Sig: {sig}")
-            # --- ADDED DEBUG LOGGING ---
-            logger.debug(f"BEFORE await client.get_transaction for Sig: {sig}")
-            # --- END ADDED DEBUG LOGGING ---
-            response = await client.get_transaction(
+        async def _attempt_get_transaction(sig):
+            logger.debug(f"Attempting get_transaction via RPC pool for Sig: {sig}")
+            return await self.rpc_pool.call(
+                "get_transaction",
                 sig,
                 encoding="jsonParsed",
-                max_supported_transaction_version=0
+                max_supported_transaction_version=0,
+                hedge=True,
+                accept=lambda response: response is not None and response.value is not None,
             )
-            # --- ADDED DEBUG LOGGING ---
-            logger.debug(f"AFTER await client.get_transaction for Sig: {sig}. Response received: {response is not None}")
-            # --- END ADDED DEBUG LOGGING ---
-
-            logger.debug(f"get_transaction via {rpc_name} successful for Sig: {sig}")
-            return response
 
-        tx_response = None
         try:
-            # --- Try Primary RPC with Backoff ---
-            tx_response = await _attempt_get_transaction(primary_client, tx_sig_obj, "Primary")
-            # If successful, return immediately
-            # Check for None value *after* successful fetch (if not raised inside decorator)
-            # --- ADDED LOGGING ---
-            if tx_response:
-                logger.warning(f"Primary RPC fetch response (before None check): {tx_response}")
-            # --- END ADDED LOGGING ---
-            if tx_response and tx_response.value is None:
-                logger.warning(f"Primary RPC fetch for Sig {signature} returned None value. Treating as failure.")
-                tx_response = None # Set to None to trigger fallback attempt below
-            
-            if tx_response:
+            tx_response = await _attempt_get_transaction(tx_sig_obj)
+            if tx_response and tx_response.value is not None:
                 return tx_response
-            
-            # If tx_response is None here, it means the fetch succeeded but value was None. Fall through to fallback.
-            logger.warning(f"Primary RPC fetch for Sig: {signature} succeeded but returned None value. Attempting fallback...")
-
 
-        # Catch errors *after* backoff finishes retrying the primary
-        except RECOVERABLE_ERRORS as e_primary:
-            logger.warning(f"Primary RPC fetch failed after {max_retries} retries for Sig: {signature}. Error: {e_primary}. Attempting fallback...")
-            # Fall through to fallback block
+            logger.error(f"No RPC endpoint returned transaction data for Sig: {signature}. Giving up.")
+            self.circuit_breaker.increment_failures()
+            return None
 
-        except Exception as e_primary_unexpected:
-            # Catch unexpected errors from the primary attempt (after backoff)
-            logger.exception(f"Unexpected error during primary RPC fetch (after retries) for Sig {signature}: {e_primary_unexpected}")
+        # Catch errors *after* backoff finishes retrying
+        except RECOVERABLE_ERRORS as e:
+            logger.error(f"RPC pool fetch failed after {max_retries} retries for Sig: {signature}. Error: {e}. Giving up.")
+            self.circuit_breaker.increment_failures()
+            return None
+        except Exception as e_unexpected:
+            logger.exception(f"Unexpected error during RPC pool fetch (after retries) for Sig {signature}: {e_unexpected}")
             self.circuit_breaker.increment_failures() # Increment on unexpected error
             return None # Give up fetch
-
-        # --- Try Fallback RPC (Single Attempt) ---
-        # This block is reached if primary succeeded with None value, OR if primary failed after all retries
-        if tx_response is None: # Check again in case it was set to None just above
-            try:
-                fallback_rpc_url = self.settings.SOLANA_MAINNET_RPC # Get from settings
-                if not fallback_rpc_url:
-                    logger.error(f"Fallback RPC URL (SOLANA_MAINNET_RPC) not configured. Cannot attempt fallback for Sig: {signature}")
-                    self.circuit_breaker.increment_failures() # Increment as we cannot proceed
-                    return None
-                
-                fallback_client = AsyncClient(fallback_rpc_url)
-                logger.debug(f"Attempting fallback RPC ({fallback_rpc_url}) for Sig: {signature}")
-
-                # Use the decorated function with max_tries=1 for a single attempt
-                # Or call get_transaction directly if backoff isn't needed/desired for fallback
-                # Let's call directly for simplicity and to match original logic intent
-                tx_response = await fallback_client.get_transaction(
-                    tx_sig_obj,
-                    encoding="jsonParsed",
-                    max_supported_transaction_version=0
-                )
-
-                # Check for None value after fallback attempt
-                # --- ADDED LOGGING ---
-                if tx_response:
-                    logger.warning(f"Fallback RPC fetch response (before None check): {tx_response}")
-                # --- END ADDED LOGGING ---
-                if tx_response and tx_response.value is None:
-                    logger.warning(f"Fallback RPC fetch for Sig {signature} returned None value.")
-                    tx_response = None # Treat as failure
-
-                if tx_response:
-                    logger.info(f"Fallback RPC fetch successful for Sig: {signature}")
-                    return tx_response # Return successful fallback response
-                else:
-                    logger.error(f"Fallback RPC fetch also failed or returned None for Sig: {signature}. Giving up.")
-                    self.circuit_breaker.increment_failures() # Increment after fallback failure
-                    return None # Give up
-
-            except RECOVERABLE_ERRORS as e_fallback:
-                logger.error(f"Fallback RPC fetch failed for Sig: {signature}. Error: {e_fallback}. Giving up.")
-                self.circuit_breaker.increment_failures() # Increment after fallback failure
-                return None # Give up
-            except Exception as e_fallback_unexpected:
-                logger.exception(f"Unexpected error during fallback RPC attempt for Sig {signature}: {e_fallback_unexpected}")
-                self.circuit_breaker.increment_failures() # Increment on unexpected error
-                return None # Give up
-            finally:
-                if fallback_client:
-                    try:
-                        await fallback_client.close()
-                        logger.debug(f"Closed fallback client for Sig: {signature}")
-                    except Exception as close_err:
-                        logger.warning(f"Error closing fallback client for Sig {signature}: {close_err}")
-
-        # Failsafe return if logic somehow reaches here without returning
-        logger.error(f"Reached end of _fetch_transaction_with_fallback unexpectedly for Sig: {signature}. Returning None.")
-        return None
     # --- END Helper --- 
 
     async def _log_token_price(self, mint: str):
@@ -2367,9 +2445,10 @@ class MarketData:
                         
                         if virtual_token_reserves and virtual_sol_reserves and virtual_token_reserves > 0:
                             # Calculate price from reserves (SOL per token) with proper decimal handling
-                            # Most PumpSwap tokens use 6 decimals, SOL uses 9 decimals
+                            # Use on-chain decimals when already known (never blocks); otherwise assume 6 and test
                             sol_decimals = 9
-                            token_decimals = 6  # Default for most meme tokens
+                            known_decimals = self.mint_metadata.get_decimals_cached(mint_address) if (self.mint_metadata and mint_address) else None
+                            token_decimals = known_decimals if known_decimals is not None else 6
                             
                             # Normalize reserves to actual amounts
                             sol_amount = virtual_sol_reserves / (10 ** sol_decimals)
@@ -2379,7 +2458,7 @@ class MarketData:
                                 calculated_price = sol_amount / token_amount
                                 
                                 # Sanity check: price should be reasonable (0.000001 to 10 SOL)
-                                if not (0.000001 <= calculated_price <= 10.0):
+                                if known_decimals is None and not (0.000001 <= calculated_price <= 10.0):
                                     # Try different decimal combinations
                                     for test_token_decimals in [6, 9, 4, 8, 3]:
                                         test_token_amount = virtual_token_reserves / (10 ** test_token_decimals)
@@ -2394,6 +2473,7 @@ class MarketData:
                             
                             # Try to get mint address from swap data first
                             if mint_address:
+                                self._record_swap_tick(mint_address, calculated_price, swap_info)
                                 await self._update_realtime_token_state(
                                     mint_address=mint_address,
                                     event_type='swap',
@@ -2407,6 +2487,7 @@ class MarketData:
                                 token_pair_map = getattr(self, 'token_pair_map', {})
                                 for mint, pair_addr in token_pair_map.items():
                                     if pair_addr == subscribed_item_address:
+                                        self._record_swap_tick(mint, calculated_price, swap_info)
                                         await self._update_realtime_token_state(
                                             mint_address=mint,
                                             event_type='swap',
@@ -2534,17 +2615,23 @@ class MarketData:
                 self.logger.error(f"Error decoding base64 account data for {account_address}: {e}", exc_info=True)
                 return
 
-            if program_id_for_parsing == self.settings.PUMPFUN_PROGRAM_ID and self._bonding_curve_layout:
+            if program_id_for_parsing == self.settings.PUMPFUN_PROGRAM_ID:
                 try:
-                    parsed_state = self._bonding_curve_layout.parse(decoded_data)
-                    token_mint_pubkey = Pubkey(parsed_state.token_mint)
-                    token_mint_str = str(token_mint_pubkey)
-                    
+                    parsed_state = decode_pumpfun_bonding_curve(decoded_data)
+                    if parsed_state is None:
+                        self.logger.warning(f"Pump.fun bonding curve account data for {account_address} too short: {len(decoded_data)} bytes")
+                        return
+                    # The bonding curve account does not store its mint; resolve it from the subscription
+                    token_mint_str = self._get_target_mint_for_pool(account_address)
+                    if not token_mint_str:
+                        self.logger.warning(f"No target mint found for Pump.fun bonding curve account update: {account_address}")
+                        return
+
                     pump_fun_assumed_decimals = await self._fetch_token_decimals(token_mint_str) or 6 # Fetch or default
                     sol_decimals = 9
 
-                    virtual_sol_reserves = parsed_state.virtual_sol_reserves
-                    virtual_token_reserves = parsed_state.virtual_token_reserves
+                    virtual_sol_reserves = parsed_state['virtual_sol_reserves']
+                    virtual_token_reserves = parsed_state['virtual_token_reserves']
 
                     price = None
                     if virtual_token_reserves > 0 and virtual_sol_reserves > 0 :
@@ -2556,10 +2643,10 @@ class MarketData:
                         mint_address=token_mint_str,
                         event_type='account_update_pumpfun',
                         price=price,
-                        raw_event_data=parsed_state._asdict() if hasattr(parsed_state, '_asdict') else vars(parsed_state),
+                        raw_event_data=parsed_state,
                         dex_id='pumpfun', # Use canonical name
                         pair_address=account_address, # This is the bonding curve address
-                        liquidity_sol = parsed_state.real_sol_reserves / (10**sol_decimals) if hasattr(parsed_state, 'real_sol_reserves') and parsed_state.real_sol_reserves else 0
+                        liquidity_sol = parsed_state['real_sol_reserves'] / (10**sol_decimals)
                     )
                 except Exception as e:
                     self.logger.error(f"Error parsing Pump.fun bonding curve account data for {account_address}: {e}", exc_info=True)
@@ -2568,44 +2655,44 @@ class MarketData:
                 self.logger.info(f"Received account update for PumpSwap AMM program ({program_id_for_parsing}) account {account_address}. Parsing for specific layout not yet implemented.")
                 # TODO: Implement PumpSwap AMM account state parsing if layout (e.g., self._pumpswap_amm_layout) is available.
 
-            elif program_id_for_parsing == self.settings.RAYDIUM_V4_PROGRAM_ID and self._raydium_v4_pool_layout:
+            elif program_id_for_parsing == self.settings.RAYDIUM_V4_PROGRAM_ID:
                 try:
-                    parsed_state = self._raydium_v4_pool_layout.parse(decoded_data)
+                    parsed_state = decode_raydium_v4_pool(decoded_data)
+                    if parsed_state is None:
+                        self.logger.warning(f"Raydium V4 pool account data for {account_address} too short: {len(decoded_data)} bytes")
+                        return
                     # Extract base_mint, quote_mint from parsed_state
-                    base_mint_str = str(Pubkey(parsed_state.base_mint))
-                    quote_mint_str = str(Pubkey(parsed_state.quote_mint))
+                    base_mint_str = parsed_state['base_mint']
+                    quote_mint_str = parsed_state['quote_mint']
                     
-                    # Determine target mint (this might need more context, e.g. which token we are tracking for this pool)
-                    # For now, let's assume we might update state for both if they are being tracked.
-                    # This part requires careful handling of which mint's price we're calculating.
-                    # The _fetch_initial_pool_state has more complete logic for this.
-                    # Here, we'd update reserves and recalculate price.
-
-                    # Example: Fetch decimals and vault balances (similar to _fetch_initial_pool_state)
-                    # This can be simplified if BlockchainListener can provide vault addresses or if state has direct reserves
+                    self.logger.info(f"Raydium V4 Account Update for {account_address}: BaseMint: {base_mint_str}, QuoteMint: {quote_mint_str}, LP Reserve: {parsed_state['lp_reserve']}")
                     
-                    # For now, just log parsed fields
-                    self.logger.info(f"Raydium V4 Account Update for {account_address}: BaseMint: {base_mint_str}, QuoteMint: {quote_mint_str}, LP Supply: {parsed_state.lp_supply}")
-                    # TODO: Implement full price update logic based on new reserves/state.
-                    # Requires fetching decimals and vault balances if not directly in the account state.
-                    # This part needs to be robust.
-                    # For example, one would need to identify which mint is SOL or USDC to get a USD price.
-                    # And then update the relevant token via _update_realtime_token_state
-                    
-                    # Placeholder: try to get mint_address related to this pool_address from local mapping
+                    # Find the tracked mint for this pool from the local mapping
                     target_mint_for_update = None
                     for mint, pair_addr in self.token_pair_map.items():
                         if pair_addr == account_address:
                             target_mint_for_update = mint
                             break
                     
+                    # Price of the tracked mint in SOL from vault balances (reads are batched across pools)
+                    price_in_sol = None
+                    vault_fetcher = getattr(self.blockchain_listener, 'vault_fetcher', None)
+                    if target_mint_for_update and vault_fetcher and SOL_MINT in (base_mint_str, quote_mint_str):
+                        reserves = await vault_fetcher.get_pool_reserves(parsed_state['pool_base_vault'], parsed_state['pool_quote_vault'])
+                        if reserves and reserves[0] > 0 and reserves[1] > 0:
+                            base_amount = reserves[0] / (10 ** parsed_state['base_decimal'])
+                            quote_amount = reserves[1] / (10 ** parsed_state['quote_decimal'])
+                            if target_mint_for_update == base_mint_str and quote_mint_str == SOL_MINT:
+                                price_in_sol = quote_amount / base_amount
+                            elif target_mint_for_update == quote_mint_str and base_mint_str == SOL_MINT:
+                                price_in_sol = base_amount / quote_amount
+                    
                     if target_mint_for_update:
-                         # Simplified update: mark that state changed, actual price recalc needs more
                         await self._update_realtime_token_state(
                             mint_address=target_mint_for_update,
                             event_type='account_update_raydium_v4',
-                            price=None, # Price calculation from raw pool state is complex here
-                            raw_event_data=parsed_state._asdict() if hasattr(parsed_state, '_asdict') else vars(parsed_state),
+                            price=price_in_sol,
+                            raw_event_data=parsed_state,
                             dex_id='raydium_v4',
                             pair_address=account_address
                         )
@@ -3254,7 +3341,15 @@ class MarketData:
             self.logger.debug(f"💰 BLOCKCHAIN PRICE: {mint_address[:8]}... = {sol_price_str} {usd_price_str} | Source: {dex_id.upper()}")
             
             # Store in database with SOL price as primary
-            if self.db and hasattr(self.db, 'update_token_price'):
+            if self._event_pipeline and self._event_pipeline.running:
+                # Coalesced per mint and written by the pipeline's persist stage
+                self._event_pipeline.emit(mint_address, {
+                    'mint': mint_address,
+                    'price': price_sol,
+                    'timestamp': current_state['last_update'],
+                    'source': f"realtime_{dex_id}"
+                })
+            elif self.db and hasattr(self.db, 'update_token_price'):
                 try:
                     await self.db.update_token_price(
                         mint=mint_address,
@@ -3380,76 +3475,31 @@ class MarketData:
 
     async def _fetch_token_decimals(self, mint_address: str) -> Optional[int]:
         """
-        Fetch actual token decimals from Helius API.
+        Fetch actual token decimals through the shared mint metadata service.
+        
+        Lookups are cached (and persisted) by MintMetadataService, concurrent requests
+        for the same mint share one RPC, and cold mints are batched via getMultipleAccounts.
         
         Args:
             mint_address: Token mint address
             
         Returns:
-            int: Token decimals or None if fetch fails
+            int: Token decimals, or 6 if they could not be resolved
         """
-        # **ADDED: Confirm method is being called**
-        self.logger.info(f"🎯 Fetching decimals for token {mint_address[:8]}...")
+        fallback_decimals = 6  # Most meme tokens use 6 decimals
+        if not self.mint_metadata:
+            self.logger.warning(f"Mint metadata service not initialized; using fallback decimals for {mint_address[:8]}...")
+            return fallback_decimals
         
         try:
-            # Check if we have cached decimals first
-            if hasattr(self, '_decimal_cache'):
-                if mint_address in self._decimal_cache:
-                    cached_value = self._decimal_cache[mint_address]
-                    self.logger.info(f"💾 Using cached decimals for {mint_address[:8]}...: {cached_value}")
-                    return cached_value
-            else:
-                self._decimal_cache = {}
-            
-            # Try to get from Helius using getAccountInfo
-            if hasattr(self, 'http_client') and self.http_client:
-                payload = {
-                    "jsonrpc": "2.0",
-                    "id": 1,
-                    "method": "getAccountInfo",
-                    "params": [
-                        mint_address,
-                        {
-                            "encoding": "jsonParsed"
-                        }
-                    ]
-                }
-                
-                # Use Helius RPC URL from settings
-                rpc_url = getattr(self.settings, 'SOLANA_RPC_URL', 'https://mainnet.helius-rpc.com')
-                if not rpc_url.startswith('http'):
-                    rpc_url = f"https://{rpc_url}"
-                
-                self.logger.info(f"🌐 Making Helius API call for {mint_address[:8]}... to {rpc_url[:30]}...")
-                response = await self.http_client.post(rpc_url, json=payload, timeout=10.0)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                if "result" in data and data["result"] and "value" in data["result"]:
-                    account_info = data["result"]["value"]
-                    if account_info and "data" in account_info:
-                        parsed_data = account_info["data"]
-                        if "parsed" in parsed_data and "info" in parsed_data["parsed"]:
-                            decimals = parsed_data["parsed"]["info"].get("decimals")
-                            if decimals is not None:
-                                self._decimal_cache[mint_address] = decimals
-                                self.logger.info(f"✅ HELIUS SUCCESS: {mint_address[:8]}... has {decimals} decimals")
-                                return decimals
-                
-                # If we couldn't parse, log and fall back
-                self.logger.warning(f"❌ Could not parse token decimals from Helius response for {mint_address[:8]}...")
-                    
+            decimals = await self.mint_metadata.get_decimals(mint_address)
+            if decimals is not None:
+                return decimals
+            self.logger.warning(f"❌ Could not resolve decimals for {mint_address[:8]}...")
         except Exception as e:
-            self.logger.warning(f"❌ Error fetching decimals from Helius for {mint_address[:8]}...: {e}")
-        
-        # Fallback to common values based on token patterns
-        fallback_decimals = 6  # Most meme tokens use 6 decimals
-        
-        # Store fallback in cache to avoid repeated API calls
-        if hasattr(self, '_decimal_cache'):
-            self._decimal_cache[mint_address] = fallback_decimals
+            self.logger.warning(f"❌ Error fetching decimals for {mint_address[:8]}...: {e}")
         
+        # The fallback is not cached, so a later lookup can still resolve the real value
         self.logger.info(f"📊 Using fallback decimals for {mint_address[:8]}...: {fallback_decimals}")
         return fallback_decimals
 
@@ -3492,7 +3542,19 @@ class MarketData:
     async def _queue_for_batch_processing(self, event_data: Dict):
         """
         Queue events for efficient batch processing.
-        """
+        When the event pipeline is running, price events go to its aggregate stage instead (non-blocking).
+        """
+        if self._event_pipeline and self._event_pipeline.running:
+            mint_address = event_data.get('mint_address')
+            if mint_address and event_data.get('price') and event_data.get('event_type') in ['trade', 'swap']:
+                self._event_pipeline.emit(mint_address, {
+                    'mint': mint_address,
+                    'price': event_data['price'],
+                    'timestamp': event_data.get('timestamp', time.time()),
+                    'source': f"realtime_{event_data.get('dex_id', 'unknown')}"
+                })
+            return
+
         if not hasattr(self, '_batch_queue'):
             self._batch_queue = []
             self._last_batch_process = time.time()
@@ -3722,6 +3784,17 @@ class MarketData:
             'batch_queue_size': len(getattr(self, '_batch_queue', [])),
         }
         
+        if self.tick_store:
+            metrics['tick_store'] = self.tick_store.get_stats()
+        
+        if self._event_pipeline:
+            metrics['event_pipeline'] = self._event_pipeline.get_stats()
+        
+        if self.mint_metadata:
+            metrics['mint_metadata'] = self.mint_metadata.get_stats()
+        
+        metrics['cache'] = self.cache.get_stats()
+        
         if hasattr(self, '_analytics'):
             metrics.update({
                 'total_events_processed': self._analytics['events_processed_total'],
@@ -3742,6 +3815,17 @@ class MarketData:
         
         return metrics
 
+    def _record_swap_tick(self, mint: str, price_sol: float, swap_info: Dict):
+        """
+        Append a parsed swap to the tick store before it is folded into real-time state.
+        """
+        if not self.tick_store:
+            return
+        try:
+            self.tick_store.append_swap(mint, price_sol, swap_info)
+        except Exception as e:
+            self.logger.warning(f"Failed to record swap tick for {mint[:8]}...: {e}")
+
     async def _process_parsed_swap(self, swap_info: Dict, subscribed_item_address: Optional[str], dex_id: str):
         """
         Process parsed swap information from any DEX parser in a generic way.
@@ -3781,6 +3865,7 @@ class MarketData:
             
             # Update real-time state if we have sufficient data
             if mint_address and price:
+                self._record_swap_tick(mint_address, price, swap_info)
                 await self._update_realtime_token_state(
                     mint_address=mint_address,
                     event_type='swap',
@@ -3794,6 +3879,7 @@ class MarketData:
                 token_pair_map = getattr(self, 'token_pair_map', {})
                 for mint, pair_addr in token_pair_map.items():
                     if pair_addr == subscribed_item_address:
+                        self._record_swap_tick(mint, price, swap_info)
                         await self._update_realtime_token_state(
                             mint_address=mint,
                             event_type='swap',
@@ -0,0 +1,662 @@
+"""
+Record and replay of BlockchainListener traffic for offline load tests.
+
+Record mode is on when ``REPLAY_RECORD_PATH`` is set. BlockchainListener hands
+every raw WebSocket frame to a ``FrameRecorder``, and the RPC pool's clients
+are wrapped so every response (``getTransaction``, ``getAccountInfo``, ...) is
+recorded with its latency. Entries are only queued on the receive path; a
+writer thread serializes them into a gzip-compressed JSON-lines file.
+
+Replay mode needs no network. ``ReplaySession`` serves a recording through
+in-process ``ReplayWebSocket`` stand-ins placed in the listener's connection
+manager, so frames go through the listener's real receive loop (or through
+``MessageDispatcher.dispatch_message`` with ``via_dispatcher=True``) and on
+into MarketData and the strategy. A ``ReplayRpcClient`` answers the RPC pool
+from the recorded responses. Frames are replayed at the recorded pace, N times
+faster, or as fast as the pipeline consumes them.
+
+Each frame's arrival time is kept in a context variable. The latency probes
+measure from that time to:
+- ``frame``: the listener being ready for the next frame
+- ``callback``: the listener callback (e.g. MarketData) returning
+- ``price_update``: MarketData publishing ``realtime_price_update``
+- ``signal``: ``StrategyEvaluator.process_trade_signal``
+
+Context variables follow awaits and tasks created while a frame is handled.
+Events handed to the sharded EventPipeline workers are counted in throughput
+but not in the latency stages.
+
+Usage:
+    python -m data.market_replay outputs/replay/session.jsonl.gz --speed max
+    python -m data.market_replay session.jsonl.gz --speed 10 --max-p99-ms 50 --min-fps 2000
+    python -m data.market_replay session.jsonl.gz --mint <mint> --pool <pool> --max-signal-p99-ms 100
+"""
+
+import asyncio
+import contextvars
+import gzip
+import importlib
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from websockets.protocol import State
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RECORDING_VERSION = 1
+REPLAY_PROVIDER = "replay"
+STAGES = ('frame', 'callback', 'price_update', 'signal')
+
+# perf_counter() at which the frame being handled was delivered by the replay stand-in
+_frame_arrival: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('replay_frame_arrival', default=None)
+
+
+def rpc_key(method: str, args: Tuple) -> str:
+    """Lookup key for a recorded RPC response (method plus positional args, e.g. the signature)."""
+    return "|".join([method, *(str(arg) for arg in args)])
+
+
+def _encode_response(response: Any) -> Optional[Tuple[str, Any]]:
+    to_json = getattr(response, 'to_json', None)
+    if to_json is not None:
+        response_type = type(response)
+        return f"{response_type.__module__}:{response_type.__qualname__}", to_json()
+    try:
+        json.dumps(response)
+    except (TypeError, ValueError):
+        return None
+    return "json", response
+
+
+def _decode_response(kind: str, payload: Any) -> Any:
+    if kind == "json":
+        return payload
+    module_name, _, class_name = kind.partition(":")
+    return getattr(importlib.import_module(module_name), class_name).from_json(payload)
+
+
+# --- Recording ---
+
+class FrameRecorder:
+    """
+    Appends raw frames and RPC responses to a gzip-compressed JSON-lines file.
+
+    The ``record_*`` methods only enqueue. A writer thread serializes and
+    compresses, so the WebSocket receive loop never waits on zlib or the disk.
+
+    Args:
+        path: Output file, or an existing directory to create a timestamped file in
+        compresslevel: gzip level (1 is fastest)
+    """
+
+    def __init__(self, path: str, compresslevel: int = 6):
+        if os.path.isdir(path):
+            path = os.path.join(path, f"session_{time.strftime('%Y%m%d_%H%M%S')}.jsonl.gz")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.frames = 0
+        self.rpc_responses = 0
+        self._started = time.monotonic()
+        self._closed = False
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._file = gzip.open(path, 'wt', encoding='utf-8', compresslevel=compresslevel)
+        self._write({'k': 'meta', 'version': RECORDING_VERSION, 'started_at': time.time()})
+        self._thread = threading.Thread(target=self._writer, name="frame-recorder", daemon=True)
+        self._thread.start()
+        logger.info(f"FrameRecorder: recording WebSocket frames to {path}")
+
+    def record_frame(self, stream: str, frame: Any) -> None:
+        """Queue one raw frame received on ``stream`` (the listener's program ID)."""
+        if self._closed:
+            return
+        if isinstance(frame, (bytes, bytearray)):
+            frame = bytes(frame).decode('utf-8', 'replace')
+        self.frames += 1
+        self._queue.put({'k': 'frame', 't': time.monotonic() - self._started, 's': stream, 'd': frame})
+
+    def record_rpc(self, method: str, args: Tuple, response: Any, latency: float) -> None:
+        """Queue one RPC response; it is converted to JSON on the writer thread."""
+        if self._closed:
+            return
+        self.rpc_responses += 1
+        self._queue.put({'k': 'rpc', 't': time.monotonic() - self._started, 'm': method,
+                         'key': rpc_key(method, args), 'ms': latency * 1000, 'response': response})
+
+    def record_subscriptions(self, subscriptions: Dict[int, Tuple[str, str, str]]) -> None:
+        """Queue the subscription ID -> (address, dex_id, type) map that notifications refer to."""
+        self._queue.put({'k': 'subs', 't': time.monotonic() - self._started,
+                         'd': {str(sub_id): list(target) for sub_id, target in subscriptions.items()}})
+
+    def _write(self, item: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(item, separators=(',', ':')))
+        self._file.write('\n')
+
+    def _writer(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                if item['k'] == 'rpc':
+                    encoded = _encode_response(item.pop('response'))
+                    if encoded is None:
+                        continue
+                    item['type'], item['d'] = encoded
+                self._write(item)
+            except Exception as e:
+                logger.warning(f"FrameRecorder: could not write {item.get('k')} entry: {e}")
+        self._file.close()
+
+    def close(self, subscriptions: Optional[Dict[int, Tuple[str, str, str]]] = None) -> None:
+        """Write the subscription map, flush and close the file."""
+        if self._closed:
+            return
+        if subscriptions:
+            self.record_subscriptions(subscriptions)
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=30)
+        logger.info(f"FrameRecorder: wrote {self.frames} frames and {self.rpc_responses} RPC responses to {self.path}")
+
+
+class RecordingRpcClient:
+    """Wraps an ``AsyncClient``; every coroutine method's result is passed through and recorded."""
+
+    def __init__(self, client, recorder: FrameRecorder):
+        self._client = client
+        self._recorder = recorder
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name.startswith('_') or not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            started = time.monotonic()
+            result = await attr(*args, **kwargs)
+            self._recorder.record_rpc(name, args, result, time.monotonic() - started)
+            return result
+        return call
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+def record_rpc_pool(pool, recorder: FrameRecorder) -> None:
+    """Wrap the clients of every endpoint currently in ``pool`` so their responses are recorded."""
+    for endpoint in pool.endpoints:
+        if not isinstance(endpoint.client, RecordingRpcClient):
+            endpoint.client = RecordingRpcClient(endpoint.get_client(), recorder)
+
+
+# --- Loading ---
+
+@dataclass
+class Recording:
+    """A loaded recording: frames in arrival order, RPC responses by key, subscription map."""
+    frames: List[Tuple[float, str, str]] = field(default_factory=list)
+    rpc: Dict[str, List[Tuple[str, Any, float]]] = field(default_factory=dict)
+    subscriptions: Dict[int, Tuple[str, str, str]] = field(default_factory=dict)
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.frames[-1][0] - self.frames[0][0] if self.frames else 0.0
+
+    @property
+    def streams(self) -> List[str]:
+        return list(dict.fromkeys(stream for _, stream, _ in self.frames))
+
+
+def load_recording(path: str) -> Recording:
+    """Read a recording; a file cut short (process killed while recording) is read up to the damage."""
+    recording = Recording()
+    rpc: Dict[str, List[Tuple[str, Any, float]]] = defaultdict(list)
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                item = json.loads(line)
+                kind = item.get('k')
+                if kind == 'frame':
+                    recording.frames.append((item['t'], item['s'], item['d']))
+                elif kind == 'rpc':
+                    rpc[item['key']].append((item['type'], item['d'], item.get('ms', 0.0)))
+                elif kind == 'subs':
+                    recording.subscriptions.update(
+                        {int(sub_id): tuple(target) for sub_id, target in item['d'].items()})
+                elif kind == 'meta':
+                    recording.meta = item
+    except (EOFError, zlib.error, gzip.BadGzipFile, json.JSONDecodeError) as e:
+        logger.warning(f"Recording {path} is truncated ({e}); replaying {len(recording.frames)} frames read so far")
+    recording.rpc = dict(rpc)
+    recording.frames.sort(key=lambda frame: frame[0])
+    return recording
+
+
+# --- Replay ---
+
+class ReplayRpcClient:
+    """
+    ``AsyncClient`` stand-in that answers from recorded responses.
+
+    Repeated calls with the same key step through the recorded answers and then
+    keep returning the last one. Unknown calls return None.
+
+    Args:
+        recording: Loaded recording
+        latency_scale: Multiplier on the recorded latency slept before answering (0 answers at once)
+    """
+
+    def __init__(self, recording: Recording, latency_scale: float = 0.0):
+        self._responses = recording.rpc
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self._decoded: Dict[Tuple[str, int], Any] = {}
+        self.latency_scale = latency_scale
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name: str) -> Callable:
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            return await self._respond(name, args)
+        return call
+
+    async def _respond(self, method: str, args: Tuple) -> Any:
+        key = rpc_key(method, args)
+        entries = self._responses.get(key)
+        if not entries:
+            self.misses += 1
+            return None
+        index = min(self._cursor[key], len(entries) - 1)
+        self._cursor[key] += 1
+        kind, payload, latency_ms = entries[index]
+        if self.latency_scale > 0 and latency_ms:
+            await asyncio.sleep(latency_ms / 1000 * self.latency_scale)
+        self.hits += 1
+        if (key, index) not in self._decoded:
+            self._decoded[(key, index)] = _decode_response(kind, payload)
+        return self._decoded[(key, index)]
+
+    async def is_connected(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        pass
+
+
+def install_replay_rpc(pool, client: ReplayRpcClient) -> None:
+    """Point ``pool`` at a single replay endpoint, exempt from the rate governor's per-host limits."""
+    from utils.rate_governor import get_rate_governor
+    from utils.rpc_pool import RpcEndpoint
+
+    pool.endpoints = [RpcEndpoint(REPLAY_PROVIDER, REPLAY_PROVIDER, client=client, initial_latency=0.001)]
+    get_rate_governor().limits[(REPLAY_PROVIDER, None)] = 1e9
+
+
+class ReplayWebSocket:
+    """In-process WebSocket stand-in that yields one stream's recorded frames on the session clock."""
+
+    def __init__(self, session: 'ReplaySession', frames: List[Tuple[float, str]]):
+        self.state = State.OPEN
+        self.sent: List[str] = []
+        self._session = session
+        self._frames = frames
+        self._index = 0
+        self._delivered_at: Optional[float] = None
+
+    async def send(self, message: str) -> None:
+        self.sent.append(message)
+
+    async def close(self) -> None:
+        self.state = State.CLOSED
+
+    def __aiter__(self) -> 'ReplayWebSocket':
+        return self
+
+    async def __anext__(self) -> str:
+        if self._delivered_at is not None:
+            # Asking for the next frame means the listener is done with the previous one
+            self._session._observe('frame', time.perf_counter() - self._delivered_at)
+            self._delivered_at = None
+        if self.state is not State.OPEN or self._index >= len(self._frames):
+            self.state = State.CLOSED
+            raise StopAsyncIteration
+        offset, frame = self._frames[self._index]
+        self._index += 1
+        await self._session._wait_until(offset)
+        self._delivered_at = self._session._deliver()
+        return frame
+
+
+@dataclass
+class ReplayReport:
+    """Throughput and per-stage latency of one replay run."""
+    frames: int
+    elapsed_s: float
+    recorded_s: float
+    speed: Optional[float]
+    frames_per_second: float
+    max_lag_s: float
+    stages: Dict[str, Dict[str, float]]
+    rpc_hits: int = 0
+    rpc_misses: int = 0
+    unattributed: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def format(self) -> str:
+        pace = "max speed" if self.speed is None else f"{self.speed:g}x"
+        rate = "max sustainable" if self.speed is None else "achieved"
+        lines = [
+            f"Replayed {self.frames} frames ({self.recorded_s:.1f}s recorded) in {self.elapsed_s:.2f}s at {pace}",
+            f"{rate}: {self.frames_per_second:,.0f} frames/s, max lag behind schedule {self.max_lag_s * 1000:.1f} ms",
+            f"RPC replay: {self.rpc_hits} hits, {self.rpc_misses} misses",
+        ]
+        for stage, stats in self.stages.items():
+            lines.append(f"{stage:<13} n={stats['count']:<8} p50 {stats['p50_ms']:8.3f} ms  "
+                         f"p95 {stats['p95_ms']:8.3f} ms  p99 {stats['p99_ms']:8.3f} ms  max {stats['max_ms']:8.3f} ms")
+        return "\n".join(lines)
+
+
+class ReplaySession:
+    """
+    Feeds a recording through a BlockchainListener and measures the pipeline behind it.
+
+    Args:
+        listener: BlockchainListener to drive. Its callback (e.g. MarketData) sees the frames as live traffic.
+        recording: Loaded recording
+        speed: Multiplier on the recorded pace; None replays as fast as the pipeline consumes
+        market_data: MarketData to probe for ``realtime_price_update`` events
+        strategy_evaluator: StrategyEvaluator to probe for trade signals
+        rpc_client: Replay client installed into ``rpc_pool``
+        rpc_pool: RpcPool to point at ``rpc_client`` (e.g. ``get_rpc_pool()``)
+        via_dispatcher: Route frames through ``listener.message_dispatcher.dispatch_message``
+            instead of the listener's receive loop
+        drain_seconds: Wait after the last frame for tasks it spawned to finish
+    """
+
+    def __init__(self, listener, recording: Recording, speed: Optional[float] = None,
+                 market_data=None, strategy_evaluator=None, rpc_client: Optional[ReplayRpcClient] = None,
+                 rpc_pool=None, via_dispatcher: bool = False, drain_seconds: float = 0.5):
+        self.listener = listener
+        self.recording = recording
+        self.speed = speed if speed and speed > 0 else None
+        self.market_data = market_data
+        self.strategy_evaluator = strategy_evaluator
+        self.rpc_client = rpc_client
+        self.rpc_pool = rpc_pool
+        self.via_dispatcher = via_dispatcher
+        self.drain_seconds = drain_seconds
+
+        self._latencies: Dict[str, List[float]] = defaultdict(list)
+        self._unattributed = 0
+        self._delivered = 0
+        self._max_lag = 0.0
+        self._clock_start = 0.0
+        self._first_offset = recording.frames[0][0] if recording.frames else 0.0
+
+    # --- Clock ---
+
+    async def _wait_until(self, offset: float) -> None:
+        if self.speed is None:
+            # Still yield, so other streams and spawned tasks get a turn
+            await asyncio.sleep(0)
+            return
+        delay = self._clock_start + (offset - self._first_offset) / self.speed - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            self._max_lag = max(self._max_lag, -delay)
+
+    def _deliver(self) -> float:
+        arrival = time.perf_counter()
+        _frame_arrival.set(arrival)
+        self._delivered += 1
+        return arrival
+
+    # --- Probes ---
+
+    def _observe(self, stage: str, seconds: float) -> None:
+        self._latencies[stage].append(seconds)
+
+    def _observe_since_arrival(self, stage: str) -> None:
+        arrival = _frame_arrival.get()
+        if arrival is None:
+            self._unattributed += 1
+        else:
+            self._observe(stage, time.perf_counter() - arrival)
+
+    def _install_probes(self) -> Callable[[], None]:
+        """Wrap the listener callback and subscribe probes; returns the undo function."""
+        undo: List[Callable[[], None]] = []
+
+        callback = getattr(self.listener, '_callback', None)
+        if callback is not None:
+            async def callback_probe(event_data):
+                try:
+                    return await callback(event_data)
+                finally:
+                    self._observe_since_arrival('callback')
+            self.listener._callback = callback_probe
+            undo.append(lambda: setattr(self.listener, '_callback', callback))
+
+        if self.market_data is not None:
+            def price_probe(event_data):
+                self._observe_since_arrival('price_update')
+            self.market_data.subscribe('realtime_price_update', price_probe)
+            undo.append(lambda: self.market_data.unsubscribe('realtime_price_update', price_probe))
+
+        if self.strategy_evaluator is not None:
+            process_trade_signal = self.strategy_evaluator.process_trade_signal
+
+            async def signal_probe(signal):
+                self._observe_since_arrival('signal')
+                return await process_trade_signal(signal)
+            self.strategy_evaluator.process_trade_signal = signal_probe
+            undo.append(lambda: vars(self.strategy_evaluator).pop('process_trade_signal', None))
+
+        def restore():
+            for step in reversed(undo):
+                step()
+        return restore
+
+    # --- Run ---
+
+    async def _dispatch_stream(self, stream: str, frames: List[Tuple[float, str]]) -> None:
+        dispatcher = self.listener.message_dispatcher
+        for offset, frame in frames:
+            await self._wait_until(offset)
+            arrival = self._deliver()
+            await dispatcher.dispatch_message(frame, stream)
+            self._observe('frame', time.perf_counter() - arrival)
+
+    async def run(self) -> ReplayReport:
+        """Replay every frame, wait ``drain_seconds`` for spawned work, and report."""
+        if self.rpc_client is not None and self.rpc_pool is not None:
+            install_replay_rpc(self.rpc_pool, self.rpc_client)
+
+        by_stream: Dict[str, List[Tuple[float, str]]] = defaultdict(list)
+        for offset, stream, frame in self.recording.frames:
+            by_stream[stream].append((offset, frame))
+        # Notifications are matched to pools through the recorded subscription IDs
+        self.listener._active_subscriptions.update(self.recording.subscriptions)
+
+        restore = self._install_probes()
+        try:
+            self._clock_start = time.perf_counter()
+            if self.via_dispatcher:
+                tasks = [asyncio.create_task(self._dispatch_stream(stream, frames))
+                         for stream, frames in by_stream.items()]
+            else:
+                connections = self.listener.connection_manager.connections
+                for stream, frames in by_stream.items():
+                    connections[stream] = ReplayWebSocket(self, frames)
+                tasks = [asyncio.create_task(self.listener._listen_to_program(stream)) for stream in by_stream]
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - self._clock_start
+            await asyncio.sleep(self.drain_seconds)
+        finally:
+            restore()
+
+        return ReplayReport(
+            frames=self._delivered,
+            elapsed_s=elapsed,
+            recorded_s=self.recording.duration,
+            speed=self.speed,
+            frames_per_second=self._delivered / elapsed if elapsed > 0 else 0.0,
+            max_lag_s=self._max_lag,
+            stages={stage: _latency_stats(self._latencies[stage]) for stage in STAGES if stage in self._latencies},
+            rpc_hits=self.rpc_client.hits if self.rpc_client else 0,
+            rpc_misses=self.rpc_client.misses if self.rpc_client else 0,
+            unattributed=self._unattributed,
+        )
+
+
+def _latency_stats(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    n = len(ordered)
+
+    def quantile(q: float) -> float:
+        return ordered[min(n - 1, int(n * q))] * 1000 if n else 0.0
+    return {
+        'count': n,
+        'p50_ms': quantile(0.5),
+        'p95_ms': quantile(0.95),
+        'p99_ms': quantile(0.99),
+        'max_ms': ordered[-1] * 1000 if n else 0.0,
+    }
+
+
+def _regressions(report: ReplayReport, args) -> List[str]:
+    """Gate failures for a finished replay; a gated stage with no samples fails too."""
+    failures = []
+    limits = [(args.stage, args.max_p99_ms), ('signal', args.max_signal_p99_ms)]
+    for stage, limit in limits:
+        if limit is None:
+            continue
+        p99 = report.stages.get(stage, {}).get('p99_ms')
+        if p99 is None:
+            failures.append(f"no {stage} samples")
+        elif p99 > limit:
+            failures.append(f"{stage} p99 {p99:.3f} ms > {limit} ms")
+    if args.min_fps is not None and report.frames_per_second < args.min_fps:
+        failures.append(f"{report.frames_per_second:.0f} frames/s < {args.min_fps}")
+    return failures
+
+
+async def _replay_main(args) -> int:
+    import tempfile
+
+    from config.settings import Settings
+    from config.thresholds import Thresholds
+    from data.blockchain_listener import BlockchainListener
+    from data.market_data import MarketData
+    from data.token_database import TokenDatabase
+    from strategies.entry_exit import EntryExitStrategy
+    from strategies.strategy_evaluator import StrategyEvaluator
+    from utils.rpc_pool import get_rpc_pool
+
+    recording = load_recording(args.recording)
+    if not recording.frames:
+        logger.error(f"No frames in {args.recording}")
+        return 1
+    dex_id = None
+    if args.mint:
+        dex_id = next((dex for pool, dex, _ in recording.subscriptions.values() if pool == args.pool), None)
+        if dex_id is None:
+            logger.error(f"Pool {args.pool} is not subscribed in {args.recording}")
+            return 1
+
+    settings = Settings(REPLAY_RECORD_PATH="")  # never re-record a replay
+    thresholds = Thresholds(settings=settings)
+    pool = get_rpc_pool(settings)
+    rpc_client = ReplayRpcClient(recording, latency_scale=args.rpc_latency)
+    install_replay_rpc(pool, rpc_client)
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="replay_"), "replay.db")
+    db = await TokenDatabase.create(db_path, settings)
+    market_data = MarketData(settings, dexscreener_api=None, token_db=db)
+    listener = BlockchainListener(settings=settings)
+    market_data.blockchain_listener = listener
+    listener.set_callback(market_data._handle_blockchain_update)
+
+    # Signal generation mode: no trade queue, executor or wallet, so a replay never trades
+    entry_exit = EntryExitStrategy(settings, db, trade_queue=None, market_data=market_data, thresholds=thresholds)
+    strategy_evaluator = StrategyEvaluator(
+        market_data=market_data, db=db, settings=settings, thresholds=thresholds,
+        trade_executor=None, wallet_manager=None, entry_exit_strategy=entry_exit,
+    )
+    await strategy_evaluator.initialize_strategies()
+    if args.mint:
+        strategy_evaluator.start_evaluating_token(args.mint, args.pool, dex_id)
+
+    async def discard_signal(signal):
+        pass
+    strategy_evaluator.process_trade_signal = discard_signal  # Timed by the signal probe, then dropped
+
+    session = ReplaySession(
+        listener, recording,
+        speed=None if args.speed == "max" else float(args.speed),
+        market_data=market_data, strategy_evaluator=strategy_evaluator,
+        rpc_client=rpc_client, rpc_pool=pool,
+        via_dispatcher=args.dispatcher, drain_seconds=args.drain,
+    )
+    try:
+        report = await session.run()
+    finally:
+        await strategy_evaluator.close()
+        await listener.close()
+        await db.close()
+
+    print(report.format())
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.to_dict(), f, indent=2)
+
+    failures = _regressions(report, args)
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+
+def main():
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Replay recorded WebSocket frames through the live pipeline")
+    parser.add_argument("recording", help="Recording written with REPLAY_RECORD_PATH")
+    parser.add_argument("--speed", default="max", help="'max' or a multiplier on the recorded pace (1 = real time)")
+    parser.add_argument("--dispatcher", action="store_true", help="Route frames through MessageDispatcher")
+    parser.add_argument("--rpc-latency", type=float, default=0.0, help="Multiplier on recorded RPC latency (0 = instant)")
+    parser.add_argument("--drain", type=float, default=0.5, help="Seconds to wait for spawned work after the last frame")
+    parser.add_argument("--db", default=None, help="TokenDatabase file (default: a temporary database)")
+    parser.add_argument("--json", default=None, help="Also write the report as JSON to this path")
+    parser.add_argument("--stage", default="callback", help="Stage checked by --max-p99-ms")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="Fail if the stage's p99 latency is higher")
+    parser.add_argument("--min-fps", type=float, default=None, help="Fail if throughput is lower")
+    parser.add_argument("--mint", default=None, help="Mint the StrategyEvaluator evaluates during the replay")
+    parser.add_argument("--pool", default=None, help="Recorded pool of --mint")
+    parser.add_argument("--max-signal-p99-ms", type=float, default=None,
+                        help="Fail if the frame-to-signal p99 latency is higher (needs --mint)")
+    args = parser.parse_args()
+    if args.mint and not args.pool:
+        parser.error("--mint needs --pool")
+    if args.max_signal_p99_ms is not None and not args.mint:
+        parser.error("--max-signal-p99-ms needs --mint: the StrategyEvaluator only signals for its active mint")
+    sys.exit(asyncio.run(_replay_main(args)))
+
+
+if __name__ == "__main__":
+    main()
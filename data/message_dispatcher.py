@@ -1,18 +1,31 @@
 """
 Message Dispatcher for WebSocket Messages
 Handles routing and processing of different WebSocket message types
+
+In fast-path mode (``DISPATCHER_FAST_PATH``, the default) frames are decoded
+with ``data.json_codec`` (orjson/msgspec when installed) and routed on the raw
+``id``/``result``/``error``/``method`` keys. The pydantic ``WebSocketMessage``
+model is built only for a sample of frames (``DISPATCHER_VALIDATION_SAMPLE_RATE``)
+and for frames that fail the cheap structural check. With the fast path off,
+every frame is validated and converted back to a dict as before.
+
+Run ``python -m data.message_dispatcher`` to benchmark both modes and the
+log-call overhead of the dispatch path under each logging backend.
 """
 
 import json
+import os
 import time
 import logging
-from typing import Dict, Any, Optional, Callable, Awaitable
+from typing import Dict, Any, List, Optional, Callable, Awaitable
 from datetime import datetime, timezone
 
 from utils.logger import get_logger
 from performance import get_system_monitor, SystemMonitoringMixin
 from performance.decorators import monitor_message_processing
 from performance.system_monitor import record_message_processing_time
+from data.account_layouts import decode_pumpswap_pool, decode_raydium_v4_pool
+from data.json_codec import loads as json_loads, JSON_BACKEND, JSON_DECODE_ERRORS
 from data.blockchain_models import (
     validate_websocket_message, validate_blockchain_event,
     WebSocketMessage, MessageSource, EventType
@@ -33,6 +46,16 @@ class MessageDispatcher(SystemMonitoringMixin):
         self.blockchain_listener = blockchain_listener
         self.logger = logger or get_logger(__name__)
         
+        # Fast path: route raw decoded dicts, build pydantic models only for sampled/malformed frames
+        settings = getattr(blockchain_listener, 'settings', None)
+        self.fast_path = bool(getattr(settings, 'DISPATCHER_FAST_PATH', True))
+        sample_rate = float(getattr(settings, 'DISPATCHER_VALIDATION_SAMPLE_RATE', 0.01))
+        if not 0.0 <= sample_rate <= 1.0:
+            self.logger.warning(f"DISPATCHER_VALIDATION_SAMPLE_RATE must be within [0, 1], got {sample_rate}; clamping")
+            sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self._validation_sample_rate = sample_rate
+        self._messages_decoded = 0
+        
         # Message type handlers
         self.handlers = {
             'subscription_confirmation': self._handle_subscription_confirmation,
@@ -89,16 +112,7 @@ class MessageDispatcher(SystemMonitoringMixin):
             # Track message processing attempt
             self._increment_counter("messages_received", labels={"program": program_id_str})
             
-            message_data = json.loads(message_str)
-            
-            # Validate the WebSocket message structure
-            try:
-                validated_message = validate_websocket_message(message_data)
-                message = validated_message.dict()
-            except Exception as validation_error:
-                self.logger.warning(f"WebSocket message validation failed: {validation_error}")
-                self._increment_counter("validation_failures", labels={"program": program_id_str})
-                message = message_data  # Fall back to raw data
+            message = self._decode_message(message_str, program_id_str)
             
             message_type = self._determine_message_type(message)
             
@@ -121,7 +135,7 @@ class MessageDispatcher(SystemMonitoringMixin):
                 self._increment_counter("unknown_message_types", labels={"message_type": message_type, "program": program_id_str})
                 return False
                 
-        except json.JSONDecodeError:
+        except JSON_DECODE_ERRORS:
             self.logger.error(f"Failed to decode JSON from WebSocket message for {program_id_str}: {message_str[:500]}")
             self._increment_counter("json_decode_failures", labels={"program": program_id_str})
             return False
@@ -143,6 +157,57 @@ class MessageDispatcher(SystemMonitoringMixin):
                 self._last_health_update = time.time()
                 self._update_health_status("healthy", {"last_message_processed": time.time()})
     
+    def _decode_message(self, message_str: str, program_id_str: str) -> Any:
+        """
+        Decode a raw frame, validating it according to the dispatcher mode
+        
+        Args:
+            message_str: Raw WebSocket message (str or bytes)
+            program_id_str: Program ID context for counters
+            
+        Returns:
+            The message dict to route (raw or validated)
+            
+        Raises:
+            JSON_DECODE_ERRORS: If the frame is not valid JSON
+        """
+        message_data = json_loads(message_str)
+        if not self.fast_path:
+            return self._validate_message(message_data, program_id_str)
+        
+        self._messages_decoded += 1
+        if not self._is_well_formed(message_data):
+            # Build the model to log the real validation error; the raw data is still routed
+            return self._validate_message(message_data, program_id_str)
+        if self._is_sampled(self._messages_decoded):
+            self._validate_message(message_data, program_id_str)
+        return message_data
+    
+    def _is_sampled(self, n: int) -> bool:
+        """True for exactly ``floor(n * rate)`` of the first ``n`` frames, spread evenly"""
+        rate = self._validation_sample_rate
+        return int(n * rate) != int((n - 1) * rate)
+    
+    @staticmethod
+    def _is_well_formed(message: Any) -> bool:
+        """Cheap equivalent of the WebSocketMessage check: a response or a notification"""
+        if type(message) is not dict:
+            return False
+        if message.get('result') is not None or message.get('error') is not None:
+            return True
+        return message.get('method') is not None and message.get('params') is not None
+    
+    def _validate_message(self, message_data: Any, program_id_str: str) -> Any:
+        """Validate with the pydantic model; returns the validated dict, or the raw data on failure"""
+        try:
+            validated_message = validate_websocket_message(message_data)
+            # Drop the model's None defaults (e.g. 'error') so routing matches the raw frame
+            return validated_message.model_dump(exclude_none=True)
+        except Exception as validation_error:
+            self.logger.warning(f"WebSocket message validation failed: {validation_error}")
+            self._increment_counter("validation_failures", labels={"program": program_id_str})
+            return message_data  # Fall back to raw data
+    
     def _determine_message_type(self, message: Dict[str, Any]) -> str:
         """
         Determine the type of WebSocket message based on its structure
@@ -257,8 +322,8 @@ class MessageDispatcher(SystemMonitoringMixin):
                 pool_address, dex_id, sub_type = self.blockchain_listener._active_subscriptions[sub_id]
                 
                 self.blockchain_listener.blockchain_logger.debug(
-                    f"Log notification for {sub_type} sub {sub_id} ({pool_address}, {dex_id}): "
-                    f"Slot {slot}, Sig {signature}, Logs: {len(logs)}"
+                    "Log notification for %s sub %s (%s, %s): Slot %s, Sig %s, Logs: %d",
+                    sub_type, sub_id, pool_address, dex_id, slot, signature, len(logs)
                 )
                 
                 # Create callback data
@@ -282,7 +347,7 @@ class MessageDispatcher(SystemMonitoringMixin):
                         price = swap_info.get('price')
                         if price:
                             self.blockchain_listener.blockchain_logger.info(
-                                f"Extracted swap price from {dex_id} logs: {price} (signature: {signature[:8]}...)"
+                                "Extracted swap price from %s logs: %s (signature: %.8s...)", dex_id, price, signature
                             )
                             
                             # Record price for aggregation
@@ -328,7 +393,7 @@ class MessageDispatcher(SystemMonitoringMixin):
                 pool_address, dex_id, sub_type = self.blockchain_listener._active_subscriptions[sub_id]
                 
                 self.blockchain_listener.blockchain_logger.debug(
-                    f"Account notification for {sub_type} sub {sub_id} ({pool_address}, {dex_id}): Slot {slot}"
+                    "Account notification for %s sub %s (%s, %s): Slot %s", sub_type, sub_id, pool_address, dex_id, slot
                 )
                 
                 callback_data = {
@@ -386,19 +451,16 @@ class MessageDispatcher(SystemMonitoringMixin):
     async def _process_pumpswap_account_data(self, callback_data: Dict[str, Any], raw_data: str, pool_address: str):
         """Process PumpSwap account data to extract price"""
         try:
-            if not self.blockchain_listener._pumpswap_amm_layout:
-                self.logger.error("PumpSwap AMM layout not available for parsing")
+            parsed_state = decode_pumpswap_pool(raw_data)
+            if parsed_state is None:
+                self.logger.warning(f"PumpSwap pool {pool_address} account data missing or too short")
                 return
-            
-            import base64
-            decoded_data = base64.b64decode(raw_data)
-            parsed_state = self.blockchain_listener._pumpswap_amm_layout.parse(decoded_data)
-            
-            token_decimals = parsed_state.decimals
+
+            token_decimals = parsed_state['decimals']
             sol_decimals = 9
-            token_balance_raw = parsed_state.token_balance
-            sol_balance_raw = parsed_state.sol_balance
-            
+            token_balance_raw = parsed_state['token_balance']
+            sol_balance_raw = parsed_state['sol_balance']
+
             if token_balance_raw > 0 and sol_balance_raw > 0 and token_decimals is not None:
                 price = (sol_balance_raw / (10**sol_decimals)) / (token_balance_raw / (10**token_decimals))
                 callback_data['price'] = price
@@ -406,97 +468,219 @@ class MessageDispatcher(SystemMonitoringMixin):
                 callback_data['token_reserve_raw'] = token_balance_raw
                 callback_data['sol_reserve_raw'] = sol_balance_raw
                 callback_data['token_decimals_from_amm'] = token_decimals
-                
+
                 self.logger.info(f"Parsed PumpSwap ({pool_address}) live data. Price: {price}, SOL Liquidity: {callback_data['liquidity_sol']}")
             else:
                 self.logger.warning(f"Insufficient data in PumpSwap state for {pool_address} to calculate price")
-                
+
         except Exception as e:
             self.logger.error(f"Error parsing PumpSwap account data for {pool_address}: {e}", exc_info=True)
-    
+
     async def _process_raydium_v4_account_data(self, callback_data: Dict[str, Any], raw_data: str, pool_address: str):
-        """Process Raydium V4 account data to extract price"""
+        """Process Raydium V4 account data to extract vaults, decimals and (when possible) price"""
         try:
-            import base64
-            decoded_data = base64.b64decode(raw_data)
-            
-            if len(decoded_data) < 752:  # Raydium V4 pool state is 752 bytes
-                self.logger.warning(f"Raydium V4 pool {pool_address} account data too short: {len(decoded_data)} bytes")
+            state = decode_raydium_v4_pool(raw_data)
+            if state is None:  # Raydium V4 pool state is 752 bytes
+                self.logger.warning(f"Raydium V4 pool {pool_address} account data missing or too short")
                 return
-            
-            # Try to use the Raydium V4 pool layout if available
-            if hasattr(self.blockchain_listener, '_raydium_v4_pool_layout') and self.blockchain_listener._raydium_v4_pool_layout:
-                parsed_state = self.blockchain_listener._raydium_v4_pool_layout.parse(decoded_data)
-                
-                # Extract vault addresses and decimals
-                base_vault = bytes(parsed_state.pool_base_vault)
-                quote_vault = bytes(parsed_state.pool_quote_vault)
-                base_decimal = parsed_state.base_decimal
-                quote_decimal = parsed_state.quote_decimal
-                
-                # Calculate price using vault balances
-                price = await self.blockchain_listener._calculate_raydium_v4_price(
-                    base_vault, quote_vault, base_decimal, quote_decimal
-                )
-                
-                if price and price > 0:
-                    callback_data['price'] = price
-                    callback_data['base_decimal'] = base_decimal
-                    callback_data['quote_decimal'] = quote_decimal
-                    callback_data['pool_base_vault'] = base_vault.hex()
-                    callback_data['pool_quote_vault'] = quote_vault.hex()
-                    
-                    self.logger.info(f"Calculated Raydium V4 price for {pool_address}: {price}")
-                else:
-                    self.logger.warning(f"Could not calculate valid price for Raydium V4 pool {pool_address}")
+
+            base_vault = state['pool_base_vault']
+            quote_vault = state['pool_quote_vault']
+            base_decimal = state['base_decimal']
+            quote_decimal = state['quote_decimal']
+
+            callback_data['base_decimal'] = base_decimal
+            callback_data['quote_decimal'] = quote_decimal
+            callback_data['pool_base_vault'] = base_vault
+            callback_data['pool_quote_vault'] = quote_vault
+            callback_data['base_mint'] = state['base_mint']
+            callback_data['quote_mint'] = state['quote_mint']
+
+            # Price needs vault balances; the listener batches those reads across pools
+            calculate_price = getattr(self.blockchain_listener, '_calculate_raydium_v4_price', None)
+            if not calculate_price:
+                callback_data['requires_vault_fetch'] = True
+                return
+
+            price = await calculate_price(base_vault, quote_vault, base_decimal, quote_decimal)
+            if price and price > 0:
+                callback_data['price'] = price
+                self.logger.info(f"Calculated Raydium V4 price for {pool_address}: {price}")
             else:
-                # Fallback parsing if layout not available
-                await self._fallback_raydium_v4_parsing(callback_data, decoded_data, pool_address)
-                
+                callback_data['requires_vault_fetch'] = True
+                self.logger.warning(f"Could not calculate valid price for Raydium V4 pool {pool_address}")
+
         except Exception as e:
             self.logger.error(f"Error processing Raydium V4 account data for {pool_address}: {e}", exc_info=True)
+
+    def get_event_router_statistics(self) -> Dict[str, Any]:
+        """Get statistics from the event router"""
+        if self.event_router:
+            return self.event_router.get_statistics()
+        else:
+            return {"error": "Event router not available"}
+
+async def benchmark_dispatch(frames: List[str], iterations: int = 20) -> Dict[str, Dict[str, float]]:
+    """
+    Dispatch throughput and latency in validated vs fast-path mode.
     
-    async def _fallback_raydium_v4_parsing(self, callback_data: Dict[str, Any], decoded_data: bytes, pool_address: str):
-        """Fallback parsing for Raydium V4 when layout is not available"""
-        try:
-            import struct
+    Handlers are replaced with no-ops, so the numbers cover decoding, validation,
+    routing and the dispatcher's own monitoring overhead only.
+    
+    Args:
+        frames: Raw WebSocket frames (JSON strings)
+        iterations: Passes over ``frames`` per mode
+        
+    Returns:
+        Dict[str, Dict[str, float]]: Per mode: messages/s, p50 and p99 latency in microseconds
+    """
+    from types import SimpleNamespace
+    
+    async def _noop_handler(message, program_id_str):
+        return True
+    
+    quiet = logging.getLogger('dispatch_benchmark')
+    quiet.setLevel(logging.CRITICAL)
+    results = {}
+    for mode, fast_path in (('validated', False), ('fast_path', True)):
+        listener = SimpleNamespace(settings=SimpleNamespace(DISPATCHER_FAST_PATH=fast_path), parsers={})
+        dispatcher = MessageDispatcher(listener, quiet)
+        dispatcher.handlers = {name: _noop_handler for name in dispatcher.handlers}
+        
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for frame in frames:
+                t0 = time.perf_counter()
+                await dispatcher.dispatch_message(frame, 'benchmark')
+                latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        results[mode] = {
+            'messages_per_second': len(latencies) / elapsed if elapsed > 0 else float('inf'),
+            'p50_us': latencies[len(latencies) // 2] * 1e6,
+            'p99_us': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6,
+        }
+    return results
+
+
+async def benchmark_log_overhead(frames: List[str], iterations: int = 20) -> Dict[str, Dict[str, float]]:
+    """
+    Cost of the dispatch path's log calls under different logging backends.
+    
+    Log notifications run through the real ``_handle_logs_notification`` (which
+    logs on every frame) against a stub listener; other handlers are no-ops.
+    Modes: ``disabled`` (level above INFO), ``sync_debug`` (DEBUG written by a
+    FileHandler in the caller), ``queued_debug`` (DEBUG behind the
+    QueueHandler/QueueListener backend) and ``queued_info`` (production gating).
+    
+    Args:
+        frames: Raw WebSocket frames (JSON strings)
+        iterations: Passes over ``frames`` per mode
+        
+    Returns:
+        Dict[str, Dict[str, float]]: Per mode: messages/s, p50/p99 latency and
+        mean per-message overhead over ``disabled``, in microseconds
+    """
+    import tempfile
+    from types import SimpleNamespace
+    from utils.logger import QueueLoggingBackend
+    
+    async def _noop_handler(message, program_id_str):
+        return True
+    
+    async def _extract_price(logs, dex_id, signature):
+        return {'price': 1.0}
+    
+    subscriptions = {}
+    for frame in frames:
+        sub_id = json_loads(frame).get('params', {}).get('subscription')
+        subscriptions.setdefault(sub_id, (f"pool{sub_id}".ljust(44, '1'), 'raydium_v4', 'logs'))
+    
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(name)s] - %(message)s')
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode, level, queued in (('disabled', logging.WARNING, False), ('sync_debug', logging.DEBUG, False),
+                                    ('queued_debug', logging.DEBUG, True), ('queued_info', logging.INFO, True)):
+            bench_logger = logging.getLogger(f'dispatch_log_benchmark.{mode}')
+            bench_logger.setLevel(level)
+            bench_logger.propagate = False
+            file_handler = logging.FileHandler(os.path.join(tmp_dir, f'{mode}.log'), encoding='utf-8')
+            file_handler.setFormatter(formatter)
+            backend = QueueLoggingBackend() if queued else None
+            bench_logger.addHandler(backend.set_route(mode, [file_handler]) if backend else file_handler)
             
-            # Extract decimals from known offsets
-            base_decimal = struct.unpack('<Q', decoded_data[32:40])[0]
-            quote_decimal = struct.unpack('<Q', decoded_data[40:48])[0]
+            listener = SimpleNamespace(
+                settings=SimpleNamespace(DISPATCHER_FAST_PATH=True), parsers={},
+                _active_subscriptions=subscriptions, blockchain_logger=bench_logger,
+                _extract_price_from_logs=_extract_price, _callback=None,
+                price_aggregator=SimpleNamespace(record_price_update=lambda **kwargs: None),
+            )
+            dispatcher = MessageDispatcher(listener, bench_logger)
+            dispatcher.handlers = {name: (handler if name == 'logs_notification' else _noop_handler)
+                                   for name, handler in dispatcher.handlers.items()}
             
-            # Extract vault addresses from known offsets
-            base_vault_offset = 296
-            quote_vault_offset = 328
+            latencies = []
+            started = time.perf_counter()
+            for _ in range(iterations):
+                for frame in frames:
+                    t0 = time.perf_counter()
+                    await dispatcher.dispatch_message(frame, 'benchmark')
+                    latencies.append(time.perf_counter() - t0)
+            elapsed = time.perf_counter() - started
             
-            if len(decoded_data) >= base_vault_offset + 32 and len(decoded_data) >= quote_vault_offset + 32:
-                base_vault = decoded_data[base_vault_offset:base_vault_offset + 32]
-                quote_vault = decoded_data[quote_vault_offset:quote_vault_offset + 32]
-                
-                # Calculate price using vault balances
-                price = await self.blockchain_listener._calculate_raydium_v4_price(
-                    base_vault, quote_vault, base_decimal, quote_decimal
-                )
-                
-                if price and price > 0:
-                    callback_data['price'] = price
-                    callback_data['base_decimal'] = base_decimal
-                    callback_data['quote_decimal'] = quote_decimal
-                    callback_data['pool_base_vault'] = base_vault.hex()
-                    callback_data['pool_quote_vault'] = quote_vault.hex()
-                    
-                    self.logger.info(f"Calculated Raydium V4 price for {pool_address}: {price} (fallback parsing)")
-                else:
-                    self.logger.warning(f"Could not calculate valid price for Raydium V4 pool {pool_address} (fallback)")
+            if backend:
+                backend.stop()
             else:
-                self.logger.warning(f"Insufficient data to extract vault addresses for Raydium V4 pool {pool_address}")
-                
-        except Exception as e:
-            self.logger.error(f"Error in fallback Raydium V4 parsing for {pool_address}: {e}", exc_info=True)
+                file_handler.close()
+            bench_logger.handlers.clear()
+            latencies.sort()
+            results[mode] = {
+                'messages_per_second': len(latencies) / elapsed if elapsed > 0 else float('inf'),
+                'p50_us': latencies[len(latencies) // 2] * 1e6,
+                'p99_us': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6,
+                'mean_us': elapsed / len(latencies) * 1e6,
+            }
+    baseline = results['disabled']['mean_us']
+    for stats in results.values():
+        stats['overhead_us'] = stats['mean_us'] - baseline
+    return results
+
+
+if __name__ == "__main__":
+    import asyncio
+    import base64
     
-    def get_event_router_statistics(self) -> Dict[str, Any]:
-        """Get statistics from the event router"""
-        if self.event_router:
-            return self.event_router.get_statistics()
-        else:
-            return {"error": "Event router not available"}
\ No newline at end of file
+    fixture_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'swap_logs.json')
+    with open(fixture_path) as f:
+        log_fixtures = json.load(f)
+    
+    bench_frames = []
+    for subscription, transactions in enumerate(log_fixtures.values(), start=1):
+        for i, logs in enumerate(transactions):
+            bench_frames.append(json.dumps({
+                "jsonrpc": "2.0",
+                "method": "logsNotification",
+                "params": {
+                    "result": {"context": {"slot": 250_000_000 + i}, "value": {"signature": f"sig{subscription}_{i}", "err": None, "logs": logs}},
+                    "subscription": subscription,
+                },
+            }))
+    for i in range(len(bench_frames) // 4):
+        bench_frames.append(json.dumps({
+            "jsonrpc": "2.0",
+            "method": "accountNotification",
+            "params": {
+                "result": {"context": {"slot": 250_000_000 + i}, "value": {"data": [base64.b64encode(os.urandom(752)).decode(), "base64"], "owner": "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8", "lamports": 6124800, "executable": False, "rentEpoch": 0}},
+                "subscription": 99,
+            },
+        }))
+    
+    print(f"JSON backend: {JSON_BACKEND}, {len(bench_frames)} frames")
+    for mode, stats in asyncio.run(benchmark_dispatch(bench_frames)).items():
+        print(f"{mode:<10} {stats['messages_per_second']:>10,.0f} msg/s  p50 {stats['p50_us']:>8.1f} us  p99 {stats['p99_us']:>8.1f} us")
+    
+    print("Log-call overhead on the dispatch path:")
+    for mode, stats in asyncio.run(benchmark_log_overhead(bench_frames)).items():
+        print(f"{mode:<12} {stats['messages_per_second']:>10,.0f} msg/s  p50 {stats['p50_us']:>8.1f} us  p99 {stats['p99_us']:>8.1f} us  "
+              f"overhead {stats['overhead_us']:>7.1f} us/msg")
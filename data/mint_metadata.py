@@ -0,0 +1,388 @@
+"""
+Shared mint metadata service: decimals, supply, authorities and owning token program.
+
+One in-memory map serves every consumer (MarketData, the DEX parsers,
+TransactionBuilder), so a mint is looked up on-chain at most once per process
+and, through the ``mint_metadata`` table, at most once across restarts.
+
+- ``get_cached`` / ``get_decimals_cached`` are synchronous dict lookups for the
+  parse hot path. A miss never blocks: it schedules a background fetch and
+  returns None.
+- ``get`` / ``get_many`` await the metadata. Concurrent lookups of the same
+  mint share one in-flight future (single-flight), and cold mints requested
+  within ``batch_window`` seconds of each other are fetched together with one
+  ``getMultipleAccounts`` call (up to 100 accounts per request) through
+  ``MultipleAccountsBatcher``.
+- Fetched rows are written back to the database in the background;
+  ``warm_start`` loads them on startup.
+
+Mint accounts are decoded with ``SPL_MINT_LAYOUT`` from ``account_layouts``
+(SPL Token and Token-2022 share the 82-byte base state).
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from data.account_batcher import MAX_ACCOUNTS_PER_REQUEST, MultipleAccountsBatcher
+from data.account_layouts import decode_spl_mint
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SOL_MINT = 'So11111111111111111111111111111111111111112'
+TOKEN_PROGRAM_ID = 'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA'
+TOKEN_2022_PROGRAM_ID = 'TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb'
+TOKEN_PROGRAM_IDS = frozenset({TOKEN_PROGRAM_ID, TOKEN_2022_PROGRAM_ID})
+
+
+@dataclass
+class MintMetadata:
+    """Decoded mint account state."""
+    mint: str
+    decimals: int
+    supply: Optional[int] = None
+    mint_authority: Optional[str] = None
+    freeze_authority: Optional[str] = None
+    program_owner: Optional[str] = None
+    is_initialized: bool = True
+    fetched_at: Optional[datetime] = None
+
+    @property
+    def is_token_2022(self) -> bool:
+        return self.program_owner == TOKEN_2022_PROGRAM_ID
+
+    def to_record(self) -> Dict[str, Any]:
+        """Row dict for ``TokenDatabase.upsert_mint_metadata``."""
+        return {
+            'mint': self.mint,
+            'decimals': self.decimals,
+            'supply': self.supply,
+            'mint_authority': self.mint_authority,
+            'freeze_authority': self.freeze_authority,
+            'program_owner': self.program_owner,
+            'is_initialized': self.is_initialized,
+            'fetched_at': self.fetched_at,
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> 'MintMetadata':
+        return cls(
+            mint=record['mint'],
+            decimals=int(record['decimals']),
+            supply=record.get('supply'),
+            mint_authority=record.get('mint_authority'),
+            freeze_authority=record.get('freeze_authority'),
+            program_owner=record.get('program_owner'),
+            is_initialized=bool(record.get('is_initialized', True)),
+            fetched_at=record.get('fetched_at'),
+        )
+
+
+class MintMetadataService:
+    """
+    Process-wide mint metadata cache with batched, coalesced RPC lookups.
+
+    Args:
+        settings: Application settings (RPC URL and ``MINT_METADATA_*`` values)
+        http_client: Shared httpx.AsyncClient used for JSON-RPC calls
+        token_db: Optional TokenDatabase for warm start and write-back
+        rpc_url: Overrides ``settings.SOLANA_RPC_URL``
+    """
+
+    def __init__(self, settings, http_client=None, token_db=None, rpc_url: Optional[str] = None):
+        self.settings = settings
+        self.token_db = token_db
+        self.negative_ttl = float(getattr(settings, 'MINT_METADATA_NEGATIVE_TTL', 300.0))
+        self.batcher = MultipleAccountsBatcher(
+            rpc_url or getattr(settings, 'SOLANA_RPC_URL', 'https://mainnet.helius-rpc.com'),
+            http_client=http_client,
+            batch_window=float(getattr(settings, 'MINT_METADATA_BATCH_WINDOW', 0.02)),
+            max_batch=int(getattr(settings, 'MINT_METADATA_MAX_BATCH', MAX_ACCOUNTS_PER_REQUEST)),
+            request_timeout=float(getattr(settings, 'MINT_METADATA_REQUEST_TIMEOUT', 10.0)),
+            name="mint_metadata",
+        )
+
+        self._cache: Dict[str, MintMetadata] = {
+            SOL_MINT: MintMetadata(mint=SOL_MINT, decimals=9, program_owner=TOKEN_PROGRAM_ID),
+        }
+        # mint -> monotonic time until which a missing/non-mint account is not re-queried
+        self._missing: Dict[str, float] = {}
+        # mint -> task resolving it; covers both the batching window and the RPC itself
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._dirty: Dict[str, MintMetadata] = {}
+        self._persist_task: Optional[asyncio.Task] = None
+
+        self._counters: Dict[str, int] = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'fetched': 0,
+            'fetch_errors': 0,
+            'not_found': 0,
+            'warm_loaded': 0,
+            'persisted': 0,
+        }
+
+    # --- Lifecycle ---
+
+    async def warm_start(self) -> int:
+        """
+        Load persisted metadata into memory.
+
+        Returns:
+            int: Number of mints loaded
+        """
+        if not self.token_db or not hasattr(self.token_db, 'get_all_mint_metadata'):
+            return 0
+        try:
+            records = await self.token_db.get_all_mint_metadata()
+        except Exception as e:
+            logger.warning(f"Mint metadata warm start failed: {e}")
+            return 0
+        loaded = 0
+        for record in records:
+            try:
+                self._cache.setdefault(record['mint'], MintMetadata.from_record(record))
+                loaded += 1
+            except (KeyError, TypeError, ValueError) as e:
+                logger.debug(f"Skipping malformed mint metadata row {record!r}: {e}")
+        self._counters['warm_loaded'] += loaded
+        logger.info(f"Mint metadata warm start: {loaded} mints loaded from the database")
+        return loaded
+
+    async def close(self):
+        """Cancel pending fetches and write any unsaved metadata to the database."""
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._inflight.clear()
+        await self.batcher.close()
+
+        if self._persist_task is not None and not self._persist_task.done():
+            await asyncio.gather(self._persist_task, return_exceptions=True)
+        await self._persist_dirty()
+
+    # --- Synchronous (hot path) lookups ---
+
+    def get_cached(self, mint: str, prefetch: bool = True) -> Optional[MintMetadata]:
+        """
+        Cached metadata for a mint without ever awaiting an RPC.
+
+        Args:
+            mint: Mint address
+            prefetch: On a miss, schedule a background fetch (requires a running event loop)
+
+        Returns:
+            Optional[MintMetadata]: Metadata if already known, else None
+        """
+        metadata = self._cache.get(mint)
+        if metadata is not None:
+            self._counters['hits'] += 1
+            return metadata
+        self._counters['misses'] += 1
+        if prefetch and mint:
+            self.prefetch([mint])
+        return None
+
+    def get_decimals_cached(self, mint: str, prefetch: bool = True) -> Optional[int]:
+        """Cached decimals for a mint, or None (see ``get_cached``)."""
+        metadata = self.get_cached(mint, prefetch)
+        return metadata.decimals if metadata is not None else None
+
+    def prefetch(self, mints: Iterable[str]):
+        """
+        Queue background fetches for mints not yet cached; never blocks.
+
+        Does nothing when called outside a running event loop.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        for mint in mints:
+            if mint and mint not in self._cache:
+                self._enqueue(mint)
+
+    def remember(self, mint: str, decimals: int, program_owner: Optional[str] = None):
+        """
+        Record decimals learned from another source (e.g. a decoded pool account) without an RPC.
+
+        Existing entries are left untouched; a partial entry is persisted only once a
+        full fetch replaces it.
+        """
+        if mint and mint not in self._cache:
+            self._cache[mint] = MintMetadata(mint=mint, decimals=int(decimals), program_owner=program_owner)
+
+    # --- Async lookups ---
+
+    async def get(self, mint: str) -> Optional[MintMetadata]:
+        """
+        Metadata for one mint, fetching it on a miss.
+
+        Args:
+            mint: Mint address
+
+        Returns:
+            Optional[MintMetadata]: None if the account is missing, not a mint, or the RPC failed
+        """
+        metadata = self._cache.get(mint)
+        if metadata is not None:
+            self._counters['hits'] += 1
+            return metadata
+        self._counters['misses'] += 1
+        future = self._enqueue(mint)
+        if future is None:
+            return None
+        # Shield so one cancelled caller does not cancel the fetch other callers share
+        return await asyncio.shield(future)
+
+    async def get_many(self, mints: Iterable[str]) -> Dict[str, MintMetadata]:
+        """
+        Metadata for many mints; cold mints are fetched in as few RPC calls as possible.
+
+        Returns:
+            Dict[str, MintMetadata]: Only mints whose metadata could be resolved
+        """
+        result: Dict[str, MintMetadata] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        for mint in dict.fromkeys(mints):
+            metadata = self._cache.get(mint)
+            if metadata is not None:
+                self._counters['hits'] += 1
+                result[mint] = metadata
+                continue
+            self._counters['misses'] += 1
+            future = self._enqueue(mint)
+            if future is not None:
+                waiting[mint] = future
+        if waiting:
+            resolved = await asyncio.gather(*(asyncio.shield(f) for f in waiting.values()))
+            for mint, metadata in zip(waiting, resolved):
+                if metadata is not None:
+                    result[mint] = metadata
+        return result
+
+    async def get_decimals(self, mint: str, default: Optional[int] = None) -> Optional[int]:
+        """Decimals for a mint, fetching on a miss; ``default`` if unresolvable."""
+        metadata = await self.get(mint)
+        return metadata.decimals if metadata is not None else default
+
+    # --- Single-flight fetches ---
+
+    def _enqueue(self, mint: str) -> Optional[asyncio.Task]:
+        task = self._inflight.get(mint)
+        if task is not None:
+            self._counters['coalesced'] += 1
+            return task
+        retry_at = self._missing.get(mint)
+        if retry_at is not None:
+            if time.monotonic() < retry_at:
+                return None
+            del self._missing[mint]
+
+        task = asyncio.get_running_loop().create_task(self._fetch(mint))
+        self._inflight[mint] = task
+        task.add_done_callback(lambda _, mint=mint: self._inflight.pop(mint, None))
+        return task
+
+    async def _fetch(self, mint: str) -> Optional[MintMetadata]:
+        try:
+            account = await self.batcher.load(mint)
+        except asyncio.CancelledError:
+            return None
+        except Exception as e:
+            # Not negative-cached: the next lookup retries
+            self._counters['fetch_errors'] += 1
+            logger.debug(f"Mint metadata fetch failed for {mint[:8]}...: {e}")
+            return None
+
+        metadata = self._decode_account(mint, account, datetime.now(timezone.utc))
+        if metadata is None:
+            self._counters['not_found'] += 1
+            self._missing[mint] = time.monotonic() + self.negative_ttl
+            return None
+        self._counters['fetched'] += 1
+        self._cache[mint] = metadata
+        self._dirty[mint] = metadata
+        self._schedule_persist()
+        return metadata
+
+    @staticmethod
+    def _decode_account(mint: str, account: Optional[Dict[str, Any]], fetched_at: datetime) -> Optional[MintMetadata]:
+        if not account:
+            return None
+        owner = account.get('owner')
+        if owner not in TOKEN_PROGRAM_IDS:
+            logger.debug(f"Account {mint[:8]}... is owned by {owner}, not a token program")
+            return None
+        decoded = decode_spl_mint(account.get('data'))
+        if decoded is None or not decoded['is_initialized']:
+            return None
+        return MintMetadata(
+            mint=mint,
+            decimals=decoded['decimals'],
+            supply=decoded['supply'],
+            mint_authority=decoded['mint_authority'],
+            freeze_authority=decoded['freeze_authority'],
+            program_owner=owner,
+            is_initialized=decoded['is_initialized'],
+            fetched_at=fetched_at,
+        )
+
+    # --- Write-back ---
+
+    def _schedule_persist(self):
+        if not self.token_db or not hasattr(self.token_db, 'upsert_mint_metadata'):
+            self._dirty.clear()
+            return
+        if self._persist_task is None or self._persist_task.done():
+            self._persist_task = asyncio.get_running_loop().create_task(self._persist_dirty())
+
+    async def _persist_dirty(self):
+        while self._dirty and self.token_db and hasattr(self.token_db, 'upsert_mint_metadata'):
+            dirty, self._dirty = self._dirty, {}
+            try:
+                written = await self.token_db.upsert_mint_metadata([m.to_record() for m in dirty.values()])
+            except Exception as e:
+                logger.warning(f"Failed to persist metadata for {len(dirty)} mints: {e}")
+                written = 0
+            if not written:
+                # Keep the rows for the next attempt (newer fetches win)
+                for mint, metadata in dirty.items():
+                    self._dirty.setdefault(mint, metadata)
+                break
+            self._counters['persisted'] += written
+
+    # --- Gauges ---
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache size, in-flight/queued lookups and cumulative counters."""
+        return {
+            'cached_mints': len(self._cache),
+            'negative_cached': len(self._missing),
+            'inflight': len(self._inflight),
+            'pending_persist': len(self._dirty),
+            'rpc': self.batcher.get_stats(),
+            **self._counters,
+        }
+
+
+# Process-wide instance shared by MarketData, the DEX parsers and TransactionBuilder
+_mint_metadata_service: Optional[MintMetadataService] = None
+
+
+def get_mint_metadata_service() -> Optional[MintMetadataService]:
+    """Get the shared mint metadata service (None until MarketData has initialized it)"""
+    return _mint_metadata_service
+
+
+def set_mint_metadata_service(service: Optional[MintMetadataService]) -> Optional[MintMetadataService]:
+    """Register (or clear, with None) the shared mint metadata service"""
+    global _mint_metadata_service
+    _mint_metadata_service = service
+    return service
@@ -290,6 +290,21 @@ class PaperWalletSummary(AsyncAttrs, Base):
     def __repr__(self):
         return f"<PaperWalletSummary key={self.key} value_float={self.value_float} value_str={self.value_str}>"
 
+class TokenMintMetadata(AsyncAttrs, Base):
+    """On-chain mint account metadata, persisted so MintMetadataService can warm-start."""
+    __tablename__ = 'mint_metadata'
+    mint = Column(String(64), primary_key=True)
+    decimals = Column(Integer, nullable=False)
+    supply = Column(String(40), nullable=True)  # u64 kept as text; SQLite INTEGER is signed 64-bit
+    mint_authority = Column(String(64), nullable=True)
+    freeze_authority = Column(String(64), nullable=True)
+    program_owner = Column(String(64), nullable=True)
+    is_initialized = Column(Boolean, nullable=False, default=True)
+    fetched_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TokenMintMetadata mint={self.mint} decimals={self.decimals} owner={self.program_owner}>"
+
 def main():
     # ... (load settings, data etc.) ...
 
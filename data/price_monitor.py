@@ -12,6 +12,7 @@ from config.settings import Settings
 from config.logging_config import LoggingConfig
 from config.dexscreener_api import DexScreenerAPI
 from utils.logger import get_logger
+from utils.rate_governor import RequestPriority
 from config.blockchain_logging import setup_price_monitoring_logger
 from data.jupiter_price_parser import JupiterPriceParser
 from data.raydium_price_parser import RaydiumPriceParser
@@ -415,7 +416,7 @@ class PriceMonitor:
         """Fallback to DexScreener API with SOL conversion"""
         try:
             # Use existing DexScreener fetch
-            api_response = await self.dex_api_client.get_token_details(mints)
+            api_response = await self.dex_api_client.get_token_details(mints, priority=RequestPriority.POSITION)
             
             if not api_response or not isinstance(api_response, dict) or "pairs" not in api_response:
                 return {}
@@ -479,7 +480,7 @@ class PriceMonitor:
             # Try DexScreener first
             try:
                 sol_mint = self.settings.SOL_MINT
-                api_response = await self.dex_api_client.get_token_details([sol_mint])
+                api_response = await self.dex_api_client.get_token_details([sol_mint], priority=RequestPriority.POSITION)
                 if api_response and "pairs" in api_response and api_response["pairs"]:
                     pair_data = api_response["pairs"][0]
                     sol_price = float(pair_data.get("priceUsd", 0))
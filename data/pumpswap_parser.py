@@ -4,21 +4,35 @@ Consolidates parsing logic from blockchain_listener.py and market_data.py
 """
 
 import re
-import base64
 import borsh_construct as bc
 import asyncio
 import json
 import time
 import websockets
 from websockets.exceptions import WebSocketException, ConnectionClosed
-from typing import List, Dict, Any, Optional, Callable
-from .base_parser import DexParser
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from .base_parser import DexParser, LogScan
+from .account_layouts import decode_pumpswap_pool, to_buffer
+from .mint_metadata import get_mint_metadata_service
+from utils.logger import lazy
 
 class PumpSwapParser(DexParser):
     """Parser for PumpSwap AMM pools"""
     
     DEX_ID = 'pumpswap'
     
+    LOG_RULES = (
+        ("pump_balance", r"(?i:pump[ \t]+b:)[ \t]*(\d+),?[ \t]*(?i:s:)[ \t]*(\d+)"),
+        ("reserve", r"(?i:reserves?)[ \t]*[:\-]?[ \t]*(\d+)"),
+        ("token_amount", r"(?i:tokens?)[ \t]*[:\-]?[ \t]*(\d+)"),
+        ("amount", r"(?i:amount)\w*[: \t]+(\d+)"),
+        ("price", r"(?i:price)[: \t]*(\d+(?:\.\d+)?)"),
+    )
+    SWAP_ACTIVITY_PATTERN = r"swap|buy|sell|pump|pamm|price"
+    
+    _PUMP_KEYWORD = re.compile(r"pAMM|(?i:pump)")
+    _LOG_ANALYSIS_KEYWORDS = re.compile(r"pAMM|(?i:pump|swap)")
+    
     def __init__(self, settings, logger=None):
         super().__init__(settings, logger)
         
@@ -103,9 +117,14 @@ class PumpSwapParser(DexParser):
         try:
             if not self.validate_logs(logs):
                 return None
+
+            # Single pass over all log lines; None when the swap prefilter does not match
+            scan = self.scan_logs(logs)
+            if scan is None:
+                return None
                 
             # **ADDED: Extract token mint address for accurate decimal fetching**
-            token_mint = self._extract_token_mint_from_logs(logs, signature)
+            token_mint = self._extract_token_mint_from_logs(logs, signature, scan)
             
             # Enhanced swap info structure
             swap_info = {
@@ -121,7 +140,8 @@ class PumpSwapParser(DexParser):
                 "signature": signature,
                 "source": "pumpswap_log",
                 "dex_id": self.DEX_ID,
-                "token_mint": token_mint  # **ADDED: Store extracted mint**
+                "token_mint": token_mint,  # **ADDED: Store extracted mint**
+                "program_data": scan.program_data  # base64 Program data payloads
             }
             
             # **ADDED: Fetch actual decimals from Helius if we have a mint**
@@ -140,134 +160,10 @@ class PumpSwapParser(DexParser):
             if self.logger and signature:
                 self.logger.info(f"🔍 PUMPSWAP LOG ANALYSIS for {signature[:8]}...")
                 for i, log in enumerate(logs):
-                    if "pAMM" in log or "pump" in log.lower() or "swap" in log.lower():
+                    if self._LOG_ANALYSIS_KEYWORDS.search(log):
                         self.logger.info(f"  📄 Log {i}: {log}")
 
-            for log in logs:
-                log_lower = log.lower()
-                
-                # ✅ ENHANCED: Look for more PumpSwap patterns
-                # Standard instruction patterns
-                if any(pattern in log_lower for pattern in ["instruction: buy", "instruction: sell", "instruction: swap"]):
-                    swap_info["found_swap"] = True
-                    if "buy" in log_lower:
-                        swap_info["instruction_type"] = "buy"
-                    elif "sell" in log_lower:
-                        swap_info["instruction_type"] = "sell"
-                    else:
-                        swap_info["instruction_type"] = "swap"
-                    if self.logger:
-                        self.logger.info(f"✅ Found PumpSwap {swap_info['instruction_type']} instruction: {log}")
-                
-                # ✅ ENHANCED: Look for PumpSwap AMM specific patterns
-                # Pattern 1: "Pump B: X, S: Y" (balance updates)
-                pump_balance_match = re.search(r'pump\s+b:\s*(\d+),?\s*s:\s*(\d+)', log_lower)
-                if pump_balance_match:
-                    swap_info["found_swap"] = True
-                    swap_info["instruction_type"] = "balance_update"
-                    buy_amount_raw = int(pump_balance_match.group(1))
-                    sell_amount_raw = int(pump_balance_match.group(2))
-                    swap_info["buy_amount"] = buy_amount_raw
-                    swap_info["sell_amount"] = sell_amount_raw
-                    
-                    if self.logger:
-                        self.logger.info(f"✅ Found PumpSwap balance update: B={buy_amount_raw}, S={sell_amount_raw}")
-                    
-                    # Calculate price immediately
-                    if buy_amount_raw > 0 and sell_amount_raw > 0:
-                        price_sol, token_decimals_used, calc_method = self._calculate_price_with_actual_decimals(
-                            sol_lamports=buy_amount_raw,
-                            token_raw_amount=sell_amount_raw,
-                            actual_token_decimals=actual_token_decimals,
-                            token_mint=token_mint
-                        )
-                        
-                        if price_sol is not None:
-                            swap_info["price"] = price_sol
-                            swap_info["price_ratio"] = price_sol
-                            swap_info["calculation_method"] = calc_method
-                            swap_info["token_decimals_used"] = token_decimals_used
-                            if self.logger:
-                                method_desc = "🎯 HELIUS API" if actual_token_decimals is not None else "📊 FALLBACK"
-                                self.logger.info(f"{method_desc} PumpSwap price: {price_sol:.8f} SOL (decimals: {token_decimals_used})")
-                
-                # ✅ ENHANCED: Pattern 2: Look for reserve/liquidity updates
-                reserve_match = re.search(r'reserve[s]?\s*[:\-]?\s*(\d+)', log_lower)
-                if reserve_match and not swap_info.get("buy_amount"):
-                    reserve_amount = int(reserve_match.group(1))
-                    if reserve_amount > 1000000:  # Likely SOL in lamports
-                        swap_info["buy_amount"] = reserve_amount
-                        if self.logger:
-                            self.logger.info(f"✅ Found reserve amount: {reserve_amount}")
-                
-                # ✅ ENHANCED: Pattern 3: Look for token amounts
-                token_amount_match = re.search(r'token[s]?\s*[:\-]?\s*(\d+)', log_lower)
-                if token_amount_match and not swap_info.get("sell_amount"):
-                    token_amount = int(token_amount_match.group(1))
-                    if token_amount > 1000:  # Reasonable token amount
-                        swap_info["sell_amount"] = token_amount
-                        if self.logger:
-                            self.logger.info(f"✅ Found token amount: {token_amount}")
-                
-                # ✅ ENHANCED: Pattern 4: Look for any numeric patterns that might be amounts
-                if "amount" in log_lower:
-                    amount_matches = re.findall(r'amount[_\w]*[:\s]+(\d+)', log, re.IGNORECASE)
-                    for amount_str in amount_matches:
-                        amount = int(amount_str)
-                        if amount > 1000:  # Filter out small numbers
-                            if swap_info["amount_in"] is None:
-                                swap_info["amount_in"] = amount
-                                if self.logger:
-                                    self.logger.info(f"✅ Found amount_in: {amount}")
-                            elif swap_info["amount_out"] is None:
-                                swap_info["amount_out"] = amount
-                                if self.logger:
-                                    self.logger.info(f"✅ Found amount_out: {amount}")
-                
-                # ✅ ENHANCED: Pattern 5: Look for program invocations
-                if "program" in log_lower and ("invoke" in log_lower or "success" in log_lower):
-                    swap_info["program_interactions"].append(log.strip())
-                    if "pAMM" in log or "pump" in log_lower:
-                        swap_info["found_swap"] = True
-                        if self.logger:
-                            self.logger.info(f"✅ Found PumpSwap program interaction: {log}")
-                
-                # ✅ ENHANCED: Pattern 6: Look for explicit price mentions
-                price_pattern = r'price[:\s]*(\d+(?:\.\d+)?)'
-                price_match = re.search(price_pattern, log, re.IGNORECASE)
-                if price_match:
-                    try:
-                        explicit_price = float(price_match.group(1))
-                        swap_info["price"] = explicit_price
-                        swap_info["found_swap"] = True
-                        if self.logger:
-                            self.logger.info(f"✅ Found explicit price: {explicit_price}")
-                    except ValueError:
-                        pass
-                
-                # Try to extract amounts from generic patterns
-                if "amount" in log_lower:
-                    try:
-                        amount_matches = re.findall(r'amount[_\w]*[:\s]+(\d+)', log, re.IGNORECASE)
-                        for amount_str in amount_matches:
-                            amount = int(amount_str)
-                            if amount > 1000:  # Filter out small numbers
-                                if swap_info["amount_in"] is None:
-                                    swap_info["amount_in"] = amount
-                                elif swap_info["amount_out"] is None:
-                                    swap_info["amount_out"] = amount
-                    except Exception:
-                        pass
-                        
-                # Look for explicit price patterns
-                price_pattern = r'price[:\s]*(\d+(?:\.\d+)?)'
-                price_match = re.search(price_pattern, log, re.IGNORECASE)
-                if price_match:
-                    try:
-                        swap_info["price"] = float(price_match.group(1))
-                        swap_info["found_swap"] = True
-                    except ValueError:
-                        pass
+            self._apply_log_scan(scan, swap_info, lambda: actual_token_decimals, token_mint, ("🎯 HELIUS API", "📊 FALLBACK"))
             
             # Calculate price from amounts if not already found
             if not swap_info["price"] and swap_info["amount_in"] and swap_info["amount_out"]:
@@ -319,36 +215,48 @@ class PumpSwapParser(DexParser):
         For full Helius API support, use parse_swap_logs_async().
         """
         try:
+            if not self.validate_logs(logs):
+                return None
+            
+            # Single pass over all log lines; None when the swap prefilter does not match
+            scan = self.scan_logs(logs)
+            if scan is None:
+                return None
+            
             # Extract mint for debugging or use provided target_mint
-            token_mint = target_mint or self._extract_token_mint_from_logs(logs, signature)
+            token_mint = target_mint or self._extract_token_mint_from_logs(logs, signature, scan)
             if self.logger and token_mint:
                 self.logger.debug(f"🔍 Target mint: {token_mint}")
             
             # For now, fall back to the old sync method but with improved logging
-            return self._parse_swap_logs_sync(logs, signature, token_mint)
+            return self._parse_swap_logs_sync(logs, signature, token_mint, scan)
         except Exception as e:
             if self.logger and e is not None:
                 self.logger.error(f"Error in sync parse_swap_logs: {e}", exc_info=True)
             return None
     
-    def _parse_swap_logs_sync(self, logs: List[str], signature: str = None, token_mint: str = None) -> Optional[Dict[str, Any]]:
+    def _parse_swap_logs_sync(self, logs: List[str], signature: str = None, token_mint: str = None, scan: Optional[LogScan] = None) -> Optional[Dict[str, Any]]:
         """
         Synchronous version with improved decimal handling and target mint filtering.
+        Reuses ``scan`` when the caller already scanned the logs.
         """
         try:
             if not self.validate_logs(logs):
                 return None
             
+            if scan is None:
+                scan = self.scan_logs(logs)
+                if scan is None:
+                    return None
+            
             # ✅ CRITICAL FIX: Extract all mints from logs first
-            extracted_mints = self._extract_all_mints_from_logs(logs)
+            extracted_mints = scan.mints()
             
             # ✅ CRITICAL FIX: Only process if our target mint is involved in this transaction
             if token_mint and extracted_mints and token_mint not in extracted_mints:
                 if self.logger:
-                    sig_display = signature[:8] + "..." if signature else "unknown"
-                    mint_display = token_mint[:8] + "..." if token_mint else "unknown"
-                    found_display = [m[:8]+'...' for m in extracted_mints[:3]] if extracted_mints else []
-                    self.logger.debug(f"🚫 Skipping transaction {sig_display} - target mint {mint_display} not found in logs (found: {found_display})")
+                    self.logger.debug("🚫 Skipping transaction %.8s... - target mint %.8s... not found in logs (found: %s)",
+                                      signature or "unknown", token_mint, lazy(lambda: [m[:8] + '...' for m in extracted_mints[:3]]))
                 return None
                 
             # Enhanced swap info structure
@@ -366,196 +274,211 @@ class PumpSwapParser(DexParser):
                 "source": "pumpswap_log",
                 "dex_id": self.DEX_ID,
                 "token_mint": token_mint,
-                "extracted_mints": extracted_mints  # Track all mints found
+                "extracted_mints": extracted_mints,  # Track all mints found
+                "program_data": scan.program_data  # base64 Program data payloads
             }
             
             # ✅ ENHANCED: Add comprehensive log pattern debugging for sync version
             if self.logger and signature:
                 self.logger.info(f"🔍 PUMPSWAP SYNC LOG ANALYSIS for {signature[:8]}...")
                 for i, log in enumerate(logs):
-                    if "pAMM" in log or "pump" in log.lower() or "swap" in log.lower():
+                    if self._LOG_ANALYSIS_KEYWORDS.search(log):
                         self.logger.info(f"  📄 Log {i}: {log}")
 
-            for log in logs:
-                log_lower = log.lower()
+            self._apply_log_scan(
+                scan, swap_info,
+                lambda: self._get_token_decimals_sync(token_mint) if token_mint else None,  # cached decimals if available
+                token_mint, ("💾 CACHED", "📊 TESTED")
+            )
+            
+            # Return swap info if we found any relevant events
+            if swap_info["found_swap"]:
+                return swap_info
+            else:
+                return None
                 
-                # ✅ ENHANCED: Look for more PumpSwap patterns (sync version)
-                # Standard instruction patterns
-                if any(pattern in log_lower for pattern in ["instruction: buy", "instruction: sell", "instruction: swap"]):
+        except Exception as e:
+            if self.logger and e is not None:
+                self.logger.error(f"Error parsing PumpSwap log sync: {e}", exc_info=True)
+            return None
+
+    def _apply_log_scan(self, scan: LogScan, swap_info: Dict[str, Any], resolve_decimals: Callable[[], Optional[int]],
+                        token_mint: Optional[str], method_labels: Tuple[str, str]) -> None:
+        """
+        Fold a single-pass log scan into ``swap_info`` (shared by the sync and async paths).
+
+        Args:
+            scan: Result of ``scan_logs``
+            swap_info: Swap dict being built
+            resolve_decimals: Returns token decimals for balance pricing; only called when a
+                "Pump B:/S:" balance line is present
+            token_mint: Mint for decimal lookup/logging
+            method_labels: Log labels for (decimals known, decimals guessed)
+        """
+        logs = scan.logs
+        price_lines = set()
+        token_decimals = None
+        decimals_resolved = False
+        
+        for line, rule, value in scan.events:
+            # Standard instruction patterns
+            if rule == "instruction":
+                instruction = value.lower()
+                if instruction.startswith(("buy", "sell", "swap")):
                     swap_info["found_swap"] = True
-                    if "buy" in log_lower:
+                    if instruction.startswith("buy"):
                         swap_info["instruction_type"] = "buy"
-                    elif "sell" in log_lower:
+                    elif instruction.startswith("sell"):
                         swap_info["instruction_type"] = "sell"
                     else:
                         swap_info["instruction_type"] = "swap"
                     if self.logger:
-                        self.logger.info(f"✅ Found PumpSwap {swap_info['instruction_type']} instruction: {log}")
+                        self.logger.info(f"✅ Found PumpSwap {swap_info['instruction_type']} instruction: {logs[line]}")
+            
+            # Pattern 1: "Pump B: X, S: Y" (balance updates)
+            elif rule == "pump_balance":
+                swap_info["found_swap"] = True
+                swap_info["instruction_type"] = "balance_update"
+                buy_amount_raw = int(value[0])
+                sell_amount_raw = int(value[1])
+                swap_info["buy_amount"] = buy_amount_raw
+                swap_info["sell_amount"] = sell_amount_raw
                 
-                # ✅ ENHANCED: Look for PumpSwap AMM specific patterns
-                # Pattern 1: "Pump B: X, S: Y" (balance updates)
-                pump_balance_match = re.search(r'pump\s+b:\s*(\d+),?\s*s:\s*(\d+)', log_lower)
-                if pump_balance_match:
-                    swap_info["found_swap"] = True
-                    swap_info["instruction_type"] = "balance_update"
-                    buy_amount_raw = int(pump_balance_match.group(1))
-                    sell_amount_raw = int(pump_balance_match.group(2))
-                    swap_info["buy_amount"] = buy_amount_raw
-                    swap_info["sell_amount"] = sell_amount_raw
+                if self.logger:
+                    self.logger.info(f"✅ Found PumpSwap balance update: B={buy_amount_raw}, S={sell_amount_raw}")
+                
+                # Calculate price immediately
+                if buy_amount_raw > 0 and sell_amount_raw > 0:
+                    if not decimals_resolved:
+                        token_decimals = resolve_decimals()
+                        decimals_resolved = True
                     
-                    if self.logger:
-                        self.logger.info(f"✅ Found PumpSwap balance update: B={buy_amount_raw}, S={sell_amount_raw}")
+                    price_sol, token_decimals_used, calc_method = self._calculate_price_with_actual_decimals(
+                        sol_lamports=buy_amount_raw,
+                        token_raw_amount=sell_amount_raw,
+                        actual_token_decimals=token_decimals,
+                        token_mint=token_mint
+                    )
                     
-                    # Calculate price immediately with sync decimals
-                    if buy_amount_raw > 0 and sell_amount_raw > 0:
-                        # Get cached decimals if available
-                        cached_decimals = self._get_token_decimals_sync(token_mint) if token_mint else None
-                        
-                        price_sol, token_decimals_used, calc_method = self._calculate_price_with_actual_decimals(
-                            sol_lamports=buy_amount_raw,
-                            token_raw_amount=sell_amount_raw,
-                            actual_token_decimals=cached_decimals,
-                            token_mint=token_mint
-                        )
-                        
-                        if price_sol is not None:
-                            swap_info["price"] = price_sol
-                            swap_info["price_ratio"] = price_sol
-                            swap_info["calculation_method"] = calc_method
-                            swap_info["token_decimals_used"] = token_decimals_used
-                            if self.logger:
-                                method_desc = "💾 CACHED" if cached_decimals is not None else "📊 TESTED"
-                                self.logger.info(f"{method_desc} PumpSwap price: {price_sol:.8f} SOL (decimals: {token_decimals_used})")
-                
-                # ✅ ENHANCED: Pattern 2: Look for reserve/liquidity updates
-                reserve_match = re.search(r'reserve[s]?\s*[:\-]?\s*(\d+)', log_lower)
-                if reserve_match and not swap_info.get("buy_amount"):
-                    reserve_amount = int(reserve_match.group(1))
+                    if price_sol is not None:
+                        swap_info["price"] = price_sol
+                        swap_info["price_ratio"] = price_sol
+                        swap_info["calculation_method"] = calc_method
+                        swap_info["token_decimals_used"] = token_decimals_used
+                        if self.logger:
+                            method_desc = method_labels[0] if token_decimals is not None else method_labels[1]
+                            self.logger.info(f"{method_desc} PumpSwap price: {price_sol:.8f} SOL (decimals: {token_decimals_used})")
+            
+            # Pattern 2: Look for reserve/liquidity updates
+            elif rule == "reserve":
+                if not swap_info.get("buy_amount"):
+                    reserve_amount = int(value)
                     if reserve_amount > 1000000:  # Likely SOL in lamports
                         swap_info["buy_amount"] = reserve_amount
                         if self.logger:
                             self.logger.info(f"✅ Found reserve amount: {reserve_amount}")
-                
-                # ✅ ENHANCED: Pattern 3: Look for token amounts
-                token_amount_match = re.search(r'token[s]?\s*[:\-]?\s*(\d+)', log_lower)
-                if token_amount_match and not swap_info.get("sell_amount"):
-                    token_amount = int(token_amount_match.group(1))
+            
+            # Pattern 3: Look for token amounts
+            elif rule == "token_amount":
+                if not swap_info.get("sell_amount"):
+                    token_amount = int(value)
                     if token_amount > 1000:  # Reasonable token amount
                         swap_info["sell_amount"] = token_amount
                         if self.logger:
                             self.logger.info(f"✅ Found token amount: {token_amount}")
-                
-                # ✅ ENHANCED: Pattern 4: Look for any numeric patterns that might be amounts
-                if "amount" in log_lower:
-                    amount_matches = re.findall(r'amount[_\w]*[:\s]+(\d+)', log, re.IGNORECASE)
-                    for amount_str in amount_matches:
-                        amount = int(amount_str)
-                        if amount > 1000:  # Filter out small numbers
-                            if swap_info["amount_in"] is None:
-                                swap_info["amount_in"] = amount
-                                if self.logger:
-                                    self.logger.info(f"✅ Found amount_in: {amount}")
-                            elif swap_info["amount_out"] is None:
-                                swap_info["amount_out"] = amount
-                                if self.logger:
-                                    self.logger.info(f"✅ Found amount_out: {amount}")
-                
-                # ✅ ENHANCED: Pattern 5: Look for program invocations
-                if "program" in log_lower and ("invoke" in log_lower or "success" in log_lower):
-                    swap_info["program_interactions"].append(log.strip())
-                    if "pAMM" in log or "pump" in log_lower:
-                        swap_info["found_swap"] = True
+            
+            # Pattern 4: Look for any numeric patterns that might be amounts
+            elif rule == "amount":
+                amount = int(value)
+                if amount > 1000:  # Filter out small numbers
+                    if swap_info["amount_in"] is None:
+                        swap_info["amount_in"] = amount
                         if self.logger:
-                            self.logger.info(f"✅ Found PumpSwap program interaction: {log}")
-                
-                # ✅ ENHANCED: Pattern 6: Look for explicit price mentions
-                price_pattern = r'price[:\s]*(\d+(?:\.\d+)?)'
-                price_match = re.search(price_pattern, log, re.IGNORECASE)
-                if price_match:
+                            self.logger.info(f"✅ Found amount_in: {amount}")
+                    elif swap_info["amount_out"] is None:
+                        swap_info["amount_out"] = amount
+                        if self.logger:
+                            self.logger.info(f"✅ Found amount_out: {amount}")
+            
+            # Pattern 5: Look for program invocations
+            elif rule == "program":
+                if value[1] not in ("invoke", "success"):
+                    continue
+                log = logs[line]
+                swap_info["program_interactions"].append(log.strip())
+                if self._PUMP_KEYWORD.search(value[0]):  # invoked program ID
+                    swap_info["found_swap"] = True
+                    if self.logger:
+                        self.logger.info(f"✅ Found PumpSwap program interaction: {log}")
+            
+            # Pattern 6: Look for explicit price mentions (first per line)
+            elif rule == "price":
+                if line not in price_lines:
+                    price_lines.add(line)
                     try:
-                        explicit_price = float(price_match.group(1))
+                        explicit_price = float(value)
                         swap_info["price"] = explicit_price
                         swap_info["found_swap"] = True
                         if self.logger:
                             self.logger.info(f"✅ Found explicit price: {explicit_price}")
                     except ValueError:
                         pass
-            
-            # Return swap info if we found any relevant events
-            if swap_info["found_swap"]:
-                return swap_info
-            else:
-                return None
-                
-        except Exception as e:
-            if self.logger and e is not None:
-                self.logger.error(f"Error parsing PumpSwap log sync: {e}", exc_info=True)
-            return None
 
     def parse_account_update(self, raw_data: Any, pool_address: str = None) -> Optional[Dict[str, Any]]:
         """
-        Parse PumpSwap account update data using borsh layout
+        Parse PumpSwap account update data using the precompiled pool layout
         Extracts current pool state with price and liquidity
         """
         try:
-            if not raw_data or not self._pumpswap_amm_layout:
+            if not raw_data:
                 return None
-                
-            # Handle both base64 string and bytes
-            if isinstance(raw_data, str):
-                try:
-                    decoded_data = base64.b64decode(raw_data)
-                except Exception as e:
-                    if self.logger and e is not None:
-                        self.logger.error(f"Error decoding base64 data: {e}")
-                    return None
-            elif isinstance(raw_data, (bytes, bytearray)):
-                decoded_data = bytes(raw_data)
-            else:
+
+            buffer = to_buffer(raw_data)
+            if buffer is None:
                 if self.logger:
-                    raw_data_type = type(raw_data).__name__ if raw_data is not None else 'None'
-                    self.logger.warning(f"Unsupported raw_data type: {raw_data_type}")
+                    self.logger.warning(f"Unsupported raw_data type: {type(raw_data).__name__}")
                 return None
-                
-            try:
-                parsed_state = self._pumpswap_amm_layout.parse(decoded_data)
-                
-                token_decimals = parsed_state.decimals
-                sol_decimals = 9
-                token_balance_raw = parsed_state.token_balance
-                sol_balance_raw = parsed_state.sol_balance
 
-                if token_balance_raw > 0 and sol_balance_raw > 0 and token_decimals is not None:
-                    price = (sol_balance_raw / (10**sol_decimals)) / (token_balance_raw / (10**token_decimals))
-                    
-                    return {
-                        "event_type": "account_update",
-                        "pool_address": pool_address,
-                        "price": price,
-                        "liquidity_sol": sol_balance_raw / (10**sol_decimals),
-                        "token_reserve_raw": token_balance_raw,
-                        "sol_reserve_raw": sol_balance_raw,
-                        "token_decimals": token_decimals,
-                        "source": "pumpswap_account",
-                        "dex_id": self.DEX_ID,
-                        "total_trade_volume_sol": parsed_state.total_trade_volume_sol,
-                        "total_trade_volume_token": parsed_state.total_trade_volume_token,
-                        "last_swap_timestamp": parsed_state.last_swap_timestamp
-                    }
-                else:
-                    if self.logger and pool_address:
-                        self.logger.warning(f"Insufficient data in PumpSwap account state for {pool_address} to calculate price")
-                    return None
-                    
-            except Exception as e:
-                if self.logger and e is not None and pool_address:
-                    self.logger.error(f"Error parsing PumpSwap account data for {pool_address}: {e}", exc_info=True)
+            parsed_state = decode_pumpswap_pool(buffer)
+            if parsed_state is None:
+                if self.logger and pool_address:
+                    self.logger.warning(f"PumpSwap pool {pool_address} account data too short")
                 return None
-                
+
+            token_decimals = parsed_state["decimals"]
+            sol_decimals = 9
+            token_balance_raw = parsed_state["token_balance"]
+            sol_balance_raw = parsed_state["sol_balance"]
+
+            if token_balance_raw > 0 and sol_balance_raw > 0 and token_decimals is not None:
+                price = (sol_balance_raw / (10**sol_decimals)) / (token_balance_raw / (10**token_decimals))
+
+                return {
+                    "event_type": "account_update",
+                    "pool_address": pool_address,
+                    "price": price,
+                    "liquidity_sol": sol_balance_raw / (10**sol_decimals),
+                    "token_reserve_raw": token_balance_raw,
+                    "sol_reserve_raw": sol_balance_raw,
+                    "token_decimals": token_decimals,
+                    "token_mint": parsed_state["token_mint"],
+                    "token_vault": parsed_state["token_vault"],
+                    "sol_vault": parsed_state["sol_vault"],
+                    "source": "pumpswap_account",
+                    "dex_id": self.DEX_ID,
+                    "total_trade_volume_sol": parsed_state["total_trade_volume_sol"],
+                    "total_trade_volume_token": parsed_state["total_trade_volume_token"],
+                    "last_swap_timestamp": parsed_state["last_swap_timestamp"]
+                }
+            else:
+                if self.logger and pool_address:
+                    self.logger.warning(f"Insufficient data in PumpSwap account state for {pool_address} to calculate price")
+                return None
+
         except Exception as e:
             if self.logger and e is not None and pool_address:
                 self.logger.error(f"Error parsing PumpSwap account update for {pool_address}: {e}", exc_info=True)
-            return None 
+            return None
 
     def _calculate_price_with_actual_decimals(self, sol_lamports: int, token_raw_amount: int, actual_token_decimals: int = None, token_mint: str = None, expected_price_range=(0.0000001, 100.0)):
         """
@@ -693,6 +616,16 @@ class PumpSwapParser(DexParser):
         Returns:
             int: Token decimals (6 for most meme tokens, 9 for established tokens)
         """
+        # Shared service: cached/persisted, single-flight and batched via getMultipleAccounts
+        service = get_mint_metadata_service()
+        if service is not None:
+            decimals = await service.get_decimals(mint_address)
+            if decimals is not None:
+                return decimals
+            if self.logger:
+                self.logger.debug(f"Mint metadata unavailable for {mint_address[:8]}..., using fallback decimals")
+            return 6  # Not cached, so a later lookup can still resolve the real value
+        
         # Check cache first
         if mint_address in self._decimal_cache:
             return self._decimal_cache[mint_address]
@@ -752,11 +685,19 @@ class PumpSwapParser(DexParser):
             self.logger.debug(f"Using fallback decimals for {mint_address[:8]}...: {fallback_decimals}")
         return fallback_decimals
     
-    def _get_token_decimals_sync(self, mint_address: str) -> int:
+    def _get_token_decimals_sync(self, mint_address: str) -> Optional[int]:
         """
         Synchronous version that returns cached decimals or reasonable fallback.
         Use this when async call is not possible.
+        
+        With the shared mint metadata service this never blocks: a miss schedules a
+        batched background fetch and returns None, so the caller tests candidate
+        decimals for this event only and later events use the real value.
         """
+        service = get_mint_metadata_service()
+        if service is not None:
+            return service.get_decimals_cached(mint_address)
+        
         # Check cache first
         if mint_address in self._decimal_cache:
             return self._decimal_cache[mint_address]
@@ -768,31 +709,29 @@ class PumpSwapParser(DexParser):
             self.logger.debug(f"Sync fallback decimals for {mint_address[:8]}...: {fallback_decimals}")
         return fallback_decimals 
 
-    def _extract_token_mint_from_logs(self, logs: List[str], signature: str = None) -> str:
+    def _extract_token_mint_from_logs(self, logs: List[str], signature: str = None, scan: Optional[LogScan] = None) -> str:
         """
         Try to extract token mint address from logs or use the signature to fetch transaction details.
         
         Args:
             logs: Transaction logs to search for mint addresses
             signature: Transaction signature for Helius lookup
+            scan: Existing scan of ``logs`` to reuse (optional)
             
         Returns:
             str: Token mint address if found, None otherwise
         """
         # Try to extract mint from logs first (faster)
-        for log in logs:
-            # Look for Solana addresses (base58, 32-44 chars, alphanumeric)
-            import re
-            addresses = re.findall(r'\b[1-9A-HJ-NP-Za-km-z]{32,44}\b', log)
-            for addr in addresses:
-                # Skip known program IDs and SOL mint
-                if addr in ['11111111111111111111111111111112', 'So11111111111111111111111111111111112']:
-                    continue
-                # First non-program address is likely the token mint
-                if len(addr) >= 32:
-                    if self.logger:
-                        self.logger.debug(f"Extracted potential mint from logs: {addr[:8]}...")
-                    return addr
+        if scan is None:
+            scan = self.scan_logs(logs, require_activity=False)
+        for addr in scan.addresses:
+            # Skip known program IDs and SOL mint
+            if addr in ('11111111111111111111111111111112', 'So11111111111111111111111111111111112'):
+                continue
+            # First non-program address is likely the token mint
+            if self.logger:
+                self.logger.debug(f"Extracted potential mint from logs: {addr[:8]}...")
+            return addr
         
         # If signature provided, we could fetch transaction details from Helius here
         # For now, return None to use fallback decimals
@@ -809,30 +748,8 @@ class PumpSwapParser(DexParser):
         Returns:
             List[str]: All unique mint addresses found in logs
         """
-        extracted_mints = set()
-        
-        # Known program IDs to skip
-        known_programs = {
-            '11111111111111111111111111111112',  # System Program
-            'So11111111111111111111111111111111112',  # SOL mint
-            '675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8',  # Raydium V4
-            'CAMMCzo5YL8w4VFF8KVHrK22GGUsp5VTaW7grrKgrWqK',  # Raydium CLMM
-            '6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P',   # PumpFun
-            'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA',   # Token Program
-            'ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL'    # Associated Token Program
-        }
-        
         try:
-            import re
-            for log in logs:
-                # Look for Solana addresses (base58, 32-44 chars, alphanumeric)
-                addresses = re.findall(r'\b[1-9A-HJ-NP-Za-km-z]{32,44}\b', log)
-                for addr in addresses:
-                    if addr not in known_programs and len(addr) >= 32:
-                        extracted_mints.add(addr)
-                        
-            return list(extracted_mints)
-            
+            return self.scan_logs(logs, require_activity=False).mints()
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Error extracting mints from logs: {e}")
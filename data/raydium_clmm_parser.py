@@ -6,12 +6,40 @@ Consolidates parsing logic from blockchain_listener.py and market_data.py
 import re
 from typing import List, Dict, Any, Optional
 from .base_parser import DexParser
+from .account_layouts import decode_raydium_clmm_pool
+from utils.logger import lazy
 
 class RaydiumClmmParser(DexParser):
     """Parser for Raydium CLMM (Concentrated Liquidity) pools"""
     
     DEX_ID = 'raydium_clmm'
     
+    LOG_RULES = (
+        ("transfer", r"(?i:transfer)(?:[: \t]+(\d+))?"),
+        ("position", r"(?i:position)"),
+        ("tick_current", r"(?i:tick[_ \t]*current)[: \t]+(-?\d+)"),
+        ("tick", r"(?i:tick)[: \t]+(-?\d+)"),
+        ("sqrt_price_x64", r"(?i:sqrt[_ \t]*price[_ \t]*x64)[: \t]+(\d+)"),
+        ("sqrt_price", r"(?i:sqrt[_ \t]*price)[: \t]+(\d+)"),
+        ("liquidity", r"(?i:liquidity)[_ \t]*[: \t]+(\d+)"),
+        ("amount_a", r"(?i:amount[_ \t]*a)[: \t]+(\d+)"),
+        ("amount_b", r"(?i:amount[_ \t]*b)[: \t]+(\d+)"),
+        ("amount_in", r"(?i:amount[_ \t]*in)[: \t]+(\d+)"),
+        ("amount_out", r"(?i:amount[_ \t]*out)[: \t]+(\d+)"),
+        ("fee_amount", r"(?i:fee[_ \t]*amount)[: \t]+(\d+)"),
+    )
+    SWAP_ACTIVITY_PATTERN = r"swap"
+    
+    # Amount rule -> swap_info field it fills
+    _AMOUNT_FIELDS = {
+        "amount_a": "amount_a",
+        "amount_b": "amount_b",
+        "amount_in": "amount_in",
+        "amount_out": "amount_out",
+        "fee_amount": "fee_amount",
+    }
+    _POSITION_CHANGE = re.compile(r"increase|decrease", re.IGNORECASE)
+    
     def parse_swap_logs(self, logs: List[str], signature: str = None, target_mint: str = None) -> Optional[Dict[str, Any]]:
         """
         Parse Raydium CLMM swap logs to extract price information.
@@ -20,14 +48,20 @@ class RaydiumClmmParser(DexParser):
         try:
             if not self.validate_logs(logs):
                 return None
-            
+
+            # Single pass over all log lines; None when the swap prefilter does not match
+            scan = self.scan_logs(logs)
+            if scan is None:
+                return None
+
             # ✅ CRITICAL FIX: Extract all mints from logs first
-            extracted_mints = self._extract_all_mints_from_logs(logs)
+            extracted_mints = scan.mints()
             
             # ✅ CRITICAL FIX: Only process if our target mint is involved in this transaction
             if target_mint and extracted_mints and target_mint not in extracted_mints:
                 if self.logger:
-                    self.logger.debug(f"🚫 Skipping Raydium CLMM transaction {signature[:8]}... - target mint {target_mint[:8]}... not found in logs (found: {[m[:8]+'...' for m in extracted_mints[:3]]})")
+                    self.logger.debug("🚫 Skipping Raydium CLMM transaction %.8s... - target mint %.8s... not found in logs (found: %s)",
+                                      signature, target_mint, lazy(lambda: [m[:8] + '...' for m in extracted_mints[:3]]))
                 return None
                 
             # Enhanced CLMM-specific swap info
@@ -50,6 +84,7 @@ class RaydiumClmmParser(DexParser):
                 "transfers_detected": [],
                 "parsing_confidence": 0.0,
                 "pool_position_changes": [],
+                "program_data": scan.program_data,  # base64 Program data payloads
                 "signature": signature,
                 "source": "raydium_clmm_log",
                 "dex_id": self.DEX_ID,
@@ -57,143 +92,88 @@ class RaydiumClmmParser(DexParser):
                 "extracted_mints": extracted_mints  # Track all mints found
             }
             
-            transfer_count = 0
+            transfer_lines = set()
+            position_lines = set()
+            liquidity_lines = set()
+            # Per-line tick / sqrt price captures; the specific form wins over the generic one
+            ticks: Dict[int, Dict[str, int]] = {}
+            sqrt_prices: Dict[int, Dict[str, int]] = {}
             
-            for log in logs:
-                log_lower = log.lower()
-                
-                # Enhanced CLMM swap detection
-                if "instruction: swap" in log_lower:
-                    swap_info["found_swap"] = True
-                    swap_info["parsing_confidence"] += 0.4
-                    if self.logger and log:
-                        self.logger.debug(f"Found CLMM swap instruction: {log}")
-                    
-                    # Enhanced swap direction detection
-                    if "exactin" in log_lower or "exact_in" in log_lower:
-                        swap_info["is_exact_in"] = True
-                        swap_info["parsing_confidence"] += 0.1
-                    elif "exactout" in log_lower or "exact_out" in log_lower:
-                        swap_info["is_exact_in"] = False
-                        swap_info["parsing_confidence"] += 0.1
+            for line, rule, value in scan.events:
+                if rule == "instruction":
+                    instruction = value.lower()
+                    # Enhanced CLMM swap detection
+                    if instruction.startswith("swap"):
+                        swap_info["found_swap"] = True
+                        swap_info["parsing_confidence"] += 0.4
+                        if self.logger:
+                            self.logger.debug("Found CLMM swap instruction: %s", logs[line])
+                        
+                        # Enhanced swap direction detection
+                        log_lower = logs[line].lower()
+                        if "exactin" in log_lower or "exact_in" in log_lower:
+                            swap_info["is_exact_in"] = True
+                            swap_info["parsing_confidence"] += 0.1
+                        elif "exactout" in log_lower or "exact_out" in log_lower:
+                            swap_info["is_exact_in"] = False
+                            swap_info["parsing_confidence"] += 0.1
+                    elif instruction.startswith("transfer"):
+                        transfer_lines.add(line)
+                    elif "position" in instruction:
+                        self._track_position_change(swap_info, logs, line, position_lines)
                 
                 # Look for CLMM-specific position changes
-                elif "position" in log_lower and ("increase" in log_lower or "decrease" in log_lower):
-                    swap_info["pool_position_changes"].append(log)
-                    swap_info["parsing_confidence"] += 0.1
+                elif rule == "position":
+                    self._track_position_change(swap_info, logs, line, position_lines)
                     
                 # Enhanced transfer detection
-                elif "transfer" in log_lower:
-                    transfer_count += 1
-                    swap_info["parsing_confidence"] += 0.1
-                    
-                    # Extract transfer amounts
-                    transfer_amounts = re.findall(r'transfer[:\s]+(\d+)', log, re.IGNORECASE)
-                    for amount_str in transfer_amounts:
-                        try:
-                            amount = int(amount_str)
-                            if 100 <= amount <= 1000000000000:  # CLMM realistic amounts (100-1T)
-                                swap_info["transfers_detected"].append(amount)
-                                swap_info["raw_amounts"].append(amount)
-                        except ValueError:
-                            continue
+                elif rule == "transfer":
+                    transfer_lines.add(line)
+                    if value:
+                        amount = int(value)
+                        if 100 <= amount <= 1000000000000:  # CLMM realistic amounts (100-1T)
+                            swap_info["transfers_detected"].append(amount)
+                            swap_info["raw_amounts"].append(amount)
                 
-                # Extract CLMM-specific parameters
                 # Tick information (for price calculation)
-                tick_matches = re.findall(r'tick[_\s]*current[:\s]+(-?\d+)', log_lower)
-                if not tick_matches:
-                    tick_matches = re.findall(r'tick[:\s]+(-?\d+)', log_lower)
-                if tick_matches:
-                    try:
-                        swap_info["tick_current"] = int(tick_matches[0])
-                        swap_info["parsing_confidence"] += 0.15
-                    except ValueError:
-                        pass
+                elif rule == "tick_current" or rule == "tick":
+                    ticks.setdefault(line, {}).setdefault(rule, int(value))
                 
                 # Square root price (concentrated liquidity specific)
-                sqrt_price_matches = re.findall(r'sqrt[_\s]*price[_\s]*x64[:\s]+(\d+)', log_lower)
-                if not sqrt_price_matches:
-                    sqrt_price_matches = re.findall(r'sqrt[_\s]*price[:\s]+(\d+)', log_lower)
-                if sqrt_price_matches:
-                    try:
-                        sqrt_price_raw = int(sqrt_price_matches[0])
-                        swap_info["sqrt_price_raw"] = sqrt_price_raw
-                        
-                        # Analyze sqrt_price values instead of filtering
-                        if sqrt_price_raw == 2**96:
-                            if self.logger:
-                                self.logger.info(f"sqrt_price = 2^96 detected - likely indicates pool initialization or max bounds")
-                            swap_info["sqrt_price_type"] = "max_bound_2_96"
-                        elif sqrt_price_raw >= 2**95:
-                            if self.logger and sqrt_price_raw is not None:
-                                self.logger.info(f"Large sqrt_price detected: {sqrt_price_raw} - near maximum bounds")
-                            swap_info["sqrt_price_type"] = "near_max_bound"
-                        elif sqrt_price_raw <= 1000:
-                            if self.logger and sqrt_price_raw is not None:
-                                self.logger.info(f"Small sqrt_price detected: {sqrt_price_raw} - near minimum bounds")
-                            swap_info["sqrt_price_type"] = "near_min_bound"
-                        else:
-                            # Calculate actual price from sqrt_price
-                            # Price = (sqrt_price / 2^64)^2 for most CLMM implementations
-                            try:
-                                normalized_sqrt_price = sqrt_price_raw / (2**64)
-                                calculated_price = normalized_sqrt_price ** 2
-                                swap_info["sqrt_price"] = calculated_price
-                                swap_info["price"] = calculated_price
-                                swap_info["sqrt_price_type"] = "calculated_price"
-                                swap_info["parsing_confidence"] += 0.25
-                                if self.logger and calculated_price is not None:
-                                    self.logger.debug(f"Calculated CLMM price from sqrt_price: {calculated_price}")
-                            except (OverflowError, ZeroDivisionError) as e:
-                                if self.logger and e is not None and sqrt_price_raw is not None:
-                                    self.logger.warning(f"Error calculating price from sqrt_price {sqrt_price_raw}: {e}")
-                                swap_info["sqrt_price_type"] = "calculation_error"
-                        
-                        swap_info["parsing_confidence"] += 0.15
-                    except ValueError:
-                        pass
+                elif rule == "sqrt_price_x64" or rule == "sqrt_price":
+                    sqrt_prices.setdefault(line, {}).setdefault(rule, int(value))
                 
                 # Liquidity information
-                liquidity_matches = re.findall(r'liquidity[_\s]*[:\s]+(\d+)', log_lower)
-                if liquidity_matches:
-                    try:
-                        swap_info["liquidity"] = int(liquidity_matches[0])
+                elif rule == "liquidity":
+                    if line not in liquidity_lines:
+                        liquidity_lines.add(line)
+                        swap_info["liquidity"] = int(value)
                         swap_info["parsing_confidence"] += 0.1
-                    except ValueError:
-                        pass
-                
-                # Enhanced amount extraction patterns for CLMM
-                amount_patterns = [
-                    r'amount[_\s]*a[:\s]+(\d+)',
-                    r'amount[_\s]*b[:\s]+(\d+)',
-                    r'amount[_\s]*in[:\s]+(\d+)',
-                    r'amount[_\s]*out[:\s]+(\d+)',
-                    r'fee[_\s]*amount[:\s]+(\d+)'
-                ]
                 
-                for pattern in amount_patterns:
-                    amounts = re.findall(pattern, log, re.IGNORECASE)
-                    for amount_str in amounts:
-                        try:
-                            amount = int(amount_str)
-                            if 100 <= amount <= 1000000000000:  # CLMM amounts can be smaller
-                                swap_info["raw_amounts"].append(amount)
-                                
-                                # Try to assign to specific amount fields
-                                if "amount_a" in pattern and swap_info["amount_a"] is None:
-                                    swap_info["amount_a"] = amount
-                                elif "amount_b" in pattern and swap_info["amount_b"] is None:
-                                    swap_info["amount_b"] = amount
-                                elif "amount_in" in pattern and swap_info["amount_in"] is None:
-                                    swap_info["amount_in"] = amount
-                                elif "amount_out" in pattern and swap_info["amount_out"] is None:
-                                    swap_info["amount_out"] = amount
-                                elif "fee" in pattern and swap_info["fee_amount"] is None:
-                                    swap_info["fee_amount"] = amount
-                                    
-                                swap_info["parsing_confidence"] += 0.05
-                        except ValueError:
-                            continue
+                # Enhanced amount extraction for CLMM
+                elif rule in self._AMOUNT_FIELDS:
+                    amount = int(value)
+                    if 100 <= amount <= 1000000000000:  # CLMM amounts can be smaller
+                        swap_info["raw_amounts"].append(amount)
+                        
+                        # Assign to the specific amount field named by the log
+                        field = self._AMOUNT_FIELDS[rule]
+                        if swap_info[field] is None:
+                            swap_info[field] = amount
+                            
+                        swap_info["parsing_confidence"] += 0.05
+            
+            for line in sorted(ticks):
+                captured = ticks[line]
+                swap_info["tick_current"] = captured.get("tick_current", captured.get("tick"))
+                swap_info["parsing_confidence"] += 0.15
+            
+            for line in sorted(sqrt_prices):
+                captured = sqrt_prices[line]
+                self._apply_sqrt_price(swap_info, captured.get("sqrt_price_x64", captured.get("sqrt_price")))
+            
+            transfer_count = len(transfer_lines)
+            swap_info["parsing_confidence"] += 0.1 * transfer_count
             
             # Process amounts intelligently for CLMM
             if len(swap_info["raw_amounts"]) >= 2:
@@ -237,30 +217,89 @@ class RaydiumClmmParser(DexParser):
                 self.logger.error(f"Error parsing Raydium CLMM swap log: {e}", exc_info=True)
             return None
 
+    def _track_position_change(self, swap_info: Dict[str, Any], logs: List[str], line: int, seen: set) -> None:
+        """Record a log line that increases or decreases a CLMM position (once per line)."""
+        if line not in seen and self._POSITION_CHANGE.search(logs[line]):
+            seen.add(line)
+            swap_info["pool_position_changes"].append(logs[line])
+            swap_info["parsing_confidence"] += 0.1
+
+    def _apply_sqrt_price(self, swap_info: Dict[str, Any], sqrt_price_raw: int) -> None:
+        """Classify a logged sqrt_price and derive the pool price from it when in range."""
+        swap_info["sqrt_price_raw"] = sqrt_price_raw
+        
+        # Analyze sqrt_price values instead of filtering
+        if sqrt_price_raw == 2**96:
+            if self.logger:
+                self.logger.info(f"sqrt_price = 2^96 detected - likely indicates pool initialization or max bounds")
+            swap_info["sqrt_price_type"] = "max_bound_2_96"
+        elif sqrt_price_raw >= 2**95:
+            if self.logger and sqrt_price_raw is not None:
+                self.logger.info(f"Large sqrt_price detected: {sqrt_price_raw} - near maximum bounds")
+            swap_info["sqrt_price_type"] = "near_max_bound"
+        elif sqrt_price_raw <= 1000:
+            if self.logger and sqrt_price_raw is not None:
+                self.logger.info(f"Small sqrt_price detected: {sqrt_price_raw} - near minimum bounds")
+            swap_info["sqrt_price_type"] = "near_min_bound"
+        else:
+            # Calculate actual price from sqrt_price
+            # Price = (sqrt_price / 2^64)^2 for most CLMM implementations
+            try:
+                normalized_sqrt_price = sqrt_price_raw / (2**64)
+                calculated_price = normalized_sqrt_price ** 2
+                swap_info["sqrt_price"] = calculated_price
+                swap_info["price"] = calculated_price
+                swap_info["sqrt_price_type"] = "calculated_price"
+                swap_info["parsing_confidence"] += 0.25
+                if self.logger and calculated_price is not None:
+                    self.logger.debug(f"Calculated CLMM price from sqrt_price: {calculated_price}")
+            except (OverflowError, ZeroDivisionError) as e:
+                if self.logger and e is not None and sqrt_price_raw is not None:
+                    self.logger.warning(f"Error calculating price from sqrt_price {sqrt_price_raw}: {e}")
+                swap_info["sqrt_price_type"] = "calculation_error"
+        
+        swap_info["parsing_confidence"] += 0.15
+
     def parse_account_update(self, raw_data: Any, pool_address: str = None) -> Optional[Dict[str, Any]]:
         """
         Parse Raydium CLMM account update data
-        CLMM pools have more complex state than regular AMMs
+        Decodes the PoolState header (mints, vaults, decimals, liquidity, sqrt price)
+        in one pass and derives the spot price from sqrt_price_x64
         """
         try:
             if not raw_data:
                 return None
-                
-            # For now, return basic structure - CLMM account parsing is complex
-            # and would require the full borsh layout definition
+
+            state = decode_raydium_clmm_pool(raw_data)
+            if state is None:
+                if self.logger and pool_address:
+                    self.logger.warning(f"Raydium CLMM pool {pool_address} account data missing or too short")
+                return None
+
             return {
                 "event_type": "account_update",
                 "pool_address": pool_address,
+                "price": state["price"],  # token_mint_0 priced in token_mint_1
+                "token_mint_0": state["token_mint_0"],
+                "token_mint_1": state["token_mint_1"],
+                "token_vault_0": state["token_vault_0"],
+                "token_vault_1": state["token_vault_1"],
+                "mint_decimals_0": state["mint_decimals_0"],
+                "mint_decimals_1": state["mint_decimals_1"],
+                "liquidity": state["liquidity"],
+                "sqrt_price_x64": state["sqrt_price_x64"],
+                "tick_current": state["tick_current"],
+                "tick_spacing": state["tick_spacing"],
+                "status": state["status"],
                 "source": "raydium_clmm_account",
-                "dex_id": self.DEX_ID,
-                "note": "CLMM account parsing requires full layout implementation"
+                "dex_id": self.DEX_ID
             }
-                
+
         except Exception as e:
             if self.logger and e is not None and pool_address:
                 self.logger.error(f"Error parsing Raydium CLMM account update for {pool_address}: {e}", exc_info=True)
             return None
-    
+
     def _extract_all_mints_from_logs(self, logs: List[str]) -> List[str]:
         """
         Extract all possible token mint addresses from logs.
@@ -272,31 +311,9 @@ class RaydiumClmmParser(DexParser):
         Returns:
             List[str]: All unique mint addresses found in logs
         """
-        extracted_mints = set()
-        
-        # Known program IDs to skip
-        known_programs = {
-            '11111111111111111111111111111112',  # System Program
-            'So11111111111111111111111111111111112',  # SOL mint
-            '675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8',  # Raydium V4
-            'CAMMCzo5YL8w4VFF8KVHrK22GGUsp5VTaW7grrKgrWqK',  # Raydium CLMM
-            '6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P',   # PumpFun
-            'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA',   # Token Program
-            'ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL'    # Associated Token Program
-        }
-        
         try:
-            import re
-            for log in logs:
-                # Look for Solana addresses (base58, 32-44 chars, alphanumeric)
-                addresses = re.findall(r'\b[1-9A-HJ-NP-Za-km-z]{32,44}\b', log)
-                for addr in addresses:
-                    if addr not in known_programs and len(addr) >= 32:
-                        extracted_mints.add(addr)
-                        
-            return list(extracted_mints)
-            
+            return self.scan_logs(logs, require_activity=False).mints()
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Error extracting mints from logs: {e}")
-            return [] 
\ No newline at end of file
+            return []
@@ -4,17 +4,34 @@ Consolidates parsing logic from blockchain_listener.py and market_data.py
 """
 
 import re
-import base64
-import struct
 import math
 from typing import List, Dict, Any, Optional
 from .base_parser import DexParser
+from .account_layouts import RAYDIUM_V4_ACCOUNT_SIZE, decode_raydium_v4_pool, to_buffer
+from utils.logger import lazy
 
 class RaydiumV4Parser(DexParser):
     """Parser for Raydium V4 AMM pools"""
     
     DEX_ID = 'raydium_v4'
     
+    LOG_RULES = (
+        ("transfer_amount", r"(?i:transfer[_ \t]*amount)[: \t]+(\d+)"),
+        ("transfer", r"(?i:transfer)(?:[: \t]+(\d+))?"),
+        ("swap_amount", r"(?i:swap[_ \t]*amount)[: \t]+(\d+)"),
+        ("in_amount", r"(?i:in[_ \t]*amount)[: \t]+(\d+)"),
+        ("out_amount", r"(?i:out[_ \t]*amount)[: \t]+(\d+)"),
+        ("fee_amount", r"(?i:fee[_ \t]*amount)[: \t]+(\d+)"),
+        ("fee", r"(?i:fee)[: \t]+(\d+)"),
+        ("commission", r"(?i:commission)[: \t]+(\d+)"),
+        ("liquidity", r"(?i:liquidity)[: \t]+(\d+)"),
+        ("initialize", r"(?i:initialize)"),
+    )
+    SWAP_ACTIVITY_PATTERN = r"swap|initialize"
+    
+    _AMOUNT_RULES = frozenset({"transfer_amount", "swap_amount", "in_amount", "out_amount", "fee_amount"})
+    _POOL_KEYWORD = re.compile(r"pool|amm", re.IGNORECASE)
+    
     def parse_swap_logs(self, logs: List[str], signature: str = None, target_mint: str = None) -> Optional[Dict[str, Any]]:
         """
         Parse Raydium V4 swap logs to extract price information.
@@ -23,14 +40,20 @@ class RaydiumV4Parser(DexParser):
         try:
             if not self.validate_logs(logs):
                 return None
-            
+
+            # Single pass over all log lines; None when the swap prefilter does not match
+            scan = self.scan_logs(logs)
+            if scan is None:
+                return None
+
             # ✅ CRITICAL FIX: Extract all mints from logs first
-            extracted_mints = self._extract_all_mints_from_logs(logs)
+            extracted_mints = scan.mints()
             
             # ✅ CRITICAL FIX: Only process if our target mint is involved in this transaction
             if target_mint and extracted_mints and target_mint not in extracted_mints:
                 if self.logger:
-                    self.logger.debug(f"🚫 Skipping Raydium V4 transaction {signature[:8]}... - target mint {target_mint[:8]}... not found in logs (found: {[m[:8]+'...' for m in extracted_mints[:3]]})")
+                    self.logger.debug("🚫 Skipping Raydium V4 transaction %.8s... - target mint %.8s... not found in logs (found: %s)",
+                                      signature, target_mint, lazy(lambda: [m[:8] + '...' for m in extracted_mints[:3]]))
                 return None
                 
             # Enhanced swap info structure
@@ -52,6 +75,7 @@ class RaydiumV4Parser(DexParser):
                 "parsing_confidence": 0.0,
                 "liquidity_change": None,
                 "slippage_estimate": None,
+                "program_data": scan.program_data,  # base64 ray_log / Program data payloads
                 "signature": signature,
                 "source": "raydium_v4_log",
                 "dex_id": self.DEX_ID,
@@ -59,101 +83,97 @@ class RaydiumV4Parser(DexParser):
                 "extracted_mints": extracted_mints  # Track all mints found
             }
             
-            transfer_count = 0
+            # parsing_confidence is scored per log line as before the single-pass scanner:
+            # a line with any base58 address (program frame lines included) adds 0.1, and
+            # fee and commission each add 0.1 once per line
+            transfer_lines = set()
+            token_lines = set()
+            fee_lines = set()
+            commission_lines = set()
+            initialize_lines = set()
+            liquidity_lines = set()
             
-            for log in logs:
-                log_lower = log.lower()
+            for line, rule, value in scan.events:
+                if rule == "instruction":
+                    instruction = value.lower()
+                    # Enhanced Raydium swap instruction detection
+                    if instruction.startswith("swapbasein"):
+                        swap_info["found_swap"] = True
+                        swap_info["instruction_type"] = "swapbasein"
+                        swap_info["swap_direction"] = "base_to_quote"
+                        swap_info["parsing_confidence"] += 0.4
+                        if self.logger:
+                            self.logger.debug("Found Raydium V4 SwapBaseIn: %s", logs[line])
+                    elif instruction.startswith("swapbaseout"):
+                        swap_info["found_swap"] = True
+                        swap_info["instruction_type"] = "swapbaseout"
+                        swap_info["swap_direction"] = "quote_to_base"
+                        swap_info["parsing_confidence"] += 0.4
+                        if self.logger:
+                            self.logger.debug("Found Raydium V4 SwapBaseOut: %s", logs[line])
+                    elif instruction.startswith("transfer"):
+                        transfer_lines.add(line)
+                    elif instruction.startswith("initialize") and line not in initialize_lines:
+                        initialize_lines.add(line)
+                        self._apply_pool_initialize(swap_info, logs[line])
                 
-                # Enhanced Raydium swap instruction detection
-                if "instruction: swapbasein" in log_lower:
-                    swap_info["found_swap"] = True
-                    swap_info["instruction_type"] = "swapbasein"
-                    swap_info["swap_direction"] = "base_to_quote"
-                    swap_info["parsing_confidence"] += 0.4
-                    if self.logger and log:
-                        self.logger.debug(f"Found Raydium V4 SwapBaseIn: {log}")
-                    
-                elif "instruction: swapbaseout" in log_lower:
-                    swap_info["found_swap"] = True
-                    swap_info["instruction_type"] = "swapbaseout"
-                    swap_info["swap_direction"] = "quote_to_base"
-                    swap_info["parsing_confidence"] += 0.4
-                    if self.logger and log:
-                        self.logger.debug(f"Found Raydium V4 SwapBaseOut: {log}")
-                    
                 # Look for token transfers (indicates actual movement)
-                elif "transfer" in log_lower:
-                    transfer_count += 1
-                    swap_info["parsing_confidence"] += 0.1
-                    
-                    # Extract transfer amounts
-                    transfer_amounts = re.findall(r'transfer[:\s]+(\d+)', log, re.IGNORECASE)
-                    for amount_str in transfer_amounts:
-                        try:
-                            amount = int(amount_str)
-                            if 1000 <= amount <= 1000000000000:  # Filter realistic swap amounts (1K-1T tokens)
-                                swap_info["transfers_detected"].append(amount)
-                                swap_info["raw_amounts"].append(amount)
-                        except ValueError:
-                            continue
-                            
+                elif rule == "transfer":
+                    transfer_lines.add(line)
+                    if value:
+                        amount = int(value)
+                        if 1000 <= amount <= 1000000000000:  # Filter realistic swap amounts (1K-1T tokens)
+                            swap_info["transfers_detected"].append(amount)
+                            swap_info["raw_amounts"].append(amount)
+                
                 # Enhanced amount extraction
-                amount_patterns = [
-                    r'transfer[_\s]*amount[:\s]+(\d+)',
-                    r'swap[_\s]*amount[:\s]+(\d+)',
-                    r'in[_\s]*amount[:\s]+(\d+)', 
-                    r'out[_\s]*amount[:\s]+(\d+)',
-                    r'fee[_\s]*amount[:\s]+(\d+)'
-                ]
+                elif rule in self._AMOUNT_RULES:
+                    if rule == "transfer_amount":
+                        transfer_lines.add(line)
+                    amount = int(value)
+                    if 1000 <= amount <= 1000000000000:  # Filter realistic amounts (1K-1T)
+                        swap_info["raw_amounts"].append(amount)
+                        swap_info["parsing_confidence"] += 0.05
                 
-                for pattern in amount_patterns:
-                    amounts = re.findall(pattern, log, re.IGNORECASE)
-                    for amount_str in amounts:
-                        try:
-                            amount = int(amount_str)
-                            if 1000 <= amount <= 1000000000000:  # Filter realistic amounts (1K-1T)
-                                swap_info["raw_amounts"].append(amount)
-                                swap_info["parsing_confidence"] += 0.05
-                        except ValueError:
-                            continue
+                # Program IDs on frame lines are not token candidates but still score the line
+                elif rule == "program":
+                    token_lines.add(line)
                 
                 # Extract token addresses (Base58 format)
-                token_pattern = r'\b([1-9A-HJ-NP-Za-km-z]{32,44})\b'
-                tokens = re.findall(token_pattern, log)
-                if tokens:
-                    for token in tokens:
-                        if not swap_info["token_in"]:
-                            swap_info["token_in"] = token
-                        elif not swap_info["token_out"] and token != swap_info["token_in"]:
-                            swap_info["token_out"] = token
-                            break
-                    swap_info["parsing_confidence"] += 0.1
+                elif rule == "address":
+                    token_lines.add(line)
+                    if not swap_info["token_in"]:
+                        swap_info["token_in"] = value
+                    elif not swap_info["token_out"] and value != swap_info["token_in"]:
+                        swap_info["token_out"] = value
+                
+                # Look for fee information (first match per line; commission wins over fee)
+                elif rule == "fee":
+                    if line not in fee_lines:
+                        fee_lines.add(line)
+                        if line not in commission_lines:
+                            swap_info["fee_amount"] = int(value)
+                        swap_info["parsing_confidence"] += 0.1
+                elif rule == "commission":
+                    if line not in commission_lines:
+                        commission_lines.add(line)
+                        swap_info["fee_amount"] = int(value)
+                        swap_info["parsing_confidence"] += 0.1
                 
-                # Look for fee information
-                fee_patterns = [r'fee[:\s]+(\d+)', r'commission[:\s]+(\d+)']
-                for pattern in fee_patterns:
-                    fees = re.findall(pattern, log_lower)
-                    if fees:
-                        try:
-                            swap_info["fee_amount"] = int(fees[0])
-                            swap_info["parsing_confidence"] += 0.1
-                        except ValueError:
-                            pass
-                            
                 # Look for pool initialization or liquidity changes
-                if "initialize" in log_lower and ("pool" in log_lower or "amm" in log_lower):
-                    swap_info["event_type"] = "pool_initialize"
-                    swap_info["found_swap"] = True
-                    swap_info["parsing_confidence"] += 0.3
-                    
-                if "liquidity" in log_lower:
-                    liquidity_amounts = re.findall(r'liquidity[:\s]+(\d+)', log_lower)
-                    if liquidity_amounts:
-                        try:
-                            swap_info["liquidity_change"] = int(liquidity_amounts[0])
-                            swap_info["parsing_confidence"] += 0.1
-                        except ValueError:
-                            pass
+                elif rule == "initialize":
+                    if line not in initialize_lines:
+                        initialize_lines.add(line)
+                        self._apply_pool_initialize(swap_info, logs[line])
+                
+                elif rule == "liquidity":
+                    if line not in liquidity_lines:
+                        liquidity_lines.add(line)
+                        swap_info["liquidity_change"] = int(value)
+                        swap_info["parsing_confidence"] += 0.1
+            
+            transfer_count = len(transfer_lines)
+            swap_info["parsing_confidence"] += 0.1 * transfer_count + 0.1 * len(token_lines)
             
             # Process and assign amounts intelligently
             if len(swap_info["raw_amounts"]) >= 2:
@@ -270,72 +290,57 @@ class RaydiumV4Parser(DexParser):
     def parse_account_update(self, raw_data: Any, pool_address: str = None) -> Optional[Dict[str, Any]]:
         """
         Parse Raydium V4 pool account update data
-        Extracts current pool state including prices and liquidity
+        Decodes the full 752-byte AMM state in one pass (see data.account_layouts)
         """
         try:
             if not raw_data:
                 return None
-                
-            # Handle both base64 string and bytes
-            if isinstance(raw_data, str):
-                try:
-                    decoded_data = base64.b64decode(raw_data)
-                except Exception as e:
-                    if self.logger and e is not None:
-                        self.logger.error(f"Error decoding base64 data: {e}")
-                    return None
-            elif isinstance(raw_data, (bytes, bytearray)):
-                decoded_data = bytes(raw_data)
-            else:
+
+            buffer = to_buffer(raw_data)
+            if buffer is None:
                 if self.logger:
-                    raw_data_type = type(raw_data).__name__ if raw_data is not None else 'None'
-                    self.logger.warning(f"Unsupported raw_data type: {raw_data_type}")
+                    self.logger.warning(f"Unsupported raw_data type: {type(raw_data).__name__}")
                 return None
-                
-            if len(decoded_data) < 752:  # Raydium V4 pool state is 752 bytes
+
+            if len(buffer) < RAYDIUM_V4_ACCOUNT_SIZE:  # Raydium V4 pool state is 752 bytes
                 if self.logger and pool_address:
-                    self.logger.warning(f"Raydium V4 pool {pool_address} account data too short: {len(decoded_data)} bytes")
+                    self.logger.warning(f"Raydium V4 pool {pool_address} account data too short: {len(buffer)} bytes")
                 return None
-                
-            try:
-                # Extract decimals from known offsets
-                base_decimal = struct.unpack('<Q', decoded_data[32:40])[0]  # offset 32 for base_decimal
-                quote_decimal = struct.unpack('<Q', decoded_data[40:48])[0]  # offset 40 for quote_decimal
-                
-                # Extract vault addresses from known offsets
-                base_vault_offset = 296  # offset for pool_base_vault in the complete layout
-                quote_vault_offset = 328  # offset for pool_quote_vault in the complete layout
-                
-                if len(decoded_data) >= base_vault_offset + 32 and len(decoded_data) >= quote_vault_offset + 32:
-                    base_vault = decoded_data[base_vault_offset:base_vault_offset + 32]
-                    quote_vault = decoded_data[quote_vault_offset:quote_vault_offset + 32]
-                    
-                    return {
-                        "event_type": "account_update",
-                        "pool_address": pool_address,
-                        "base_decimal": base_decimal,
-                        "quote_decimal": quote_decimal,
-                        "pool_base_vault": base_vault.hex(),
-                        "pool_quote_vault": quote_vault.hex(),
-                        "source": "raydium_v4_account",
-                        "dex_id": self.DEX_ID,
-                        "requires_vault_fetch": True  # Indicates need to fetch vault balances for price
-                    }
-                else:
-                    if self.logger and pool_address:
-                        self.logger.warning(f"Insufficient data to extract vault addresses for Raydium V4 pool {pool_address}")
-                    return None
-                    
-            except struct.error as e:
-                if self.logger and e is not None and pool_address:
-                    self.logger.warning(f"Error parsing Raydium V4 pool structure for {pool_address}: {e}")
+
+            state = decode_raydium_v4_pool(buffer)
+            if state is None:
                 return None
-                
+
+            return {
+                "event_type": "account_update",
+                "pool_address": pool_address,
+                "base_decimal": state["base_decimal"],
+                "quote_decimal": state["quote_decimal"],
+                "pool_base_vault": state["pool_base_vault"],
+                "pool_quote_vault": state["pool_quote_vault"],
+                "base_mint": state["base_mint"],
+                "quote_mint": state["quote_mint"],
+                "lp_mint": state["lp_mint"],
+                "lp_reserve": state["lp_reserve"],
+                "pool_open_time": state["pool_open_time"],
+                "status": state["status"],
+                "source": "raydium_v4_account",
+                "dex_id": self.DEX_ID,
+                "requires_vault_fetch": True  # Indicates need to fetch vault balances for price
+            }
+
         except Exception as e:
             if self.logger and e is not None and pool_address:
                 self.logger.error(f"Error parsing Raydium V4 account update for {pool_address}: {e}", exc_info=True)
             return None
-    
+
+    def _apply_pool_initialize(self, swap_info: Dict[str, Any], log: str) -> None:
+        """Mark a pool initialization when an initialize log line mentions the pool/AMM."""
+        if self._POOL_KEYWORD.search(log):
+            swap_info["event_type"] = "pool_initialize"
+            swap_info["found_swap"] = True
+            swap_info["parsing_confidence"] += 0.3
+
     def _extract_all_mints_from_logs(self, logs: List[str]) -> List[str]:
         """
         Extract all possible token mint addresses from logs.
@@ -347,31 +352,9 @@ class RaydiumV4Parser(DexParser):
         Returns:
             List[str]: All unique mint addresses found in logs
         """
-        extracted_mints = set()
-        
-        # Known program IDs to skip
-        known_programs = {
-            '11111111111111111111111111111112',  # System Program
-            'So11111111111111111111111111111111112',  # SOL mint
-            '675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8',  # Raydium V4
-            'CAMMCzo5YL8w4VFF8KVHrK22GGUsp5VTaW7grrKgrWqK',  # Raydium CLMM
-            '6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P',   # PumpFun
-            'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA',   # Token Program
-            'ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL'    # Associated Token Program
-        }
-        
         try:
-            import re
-            for log in logs:
-                # Look for Solana addresses (base58, 32-44 chars, alphanumeric)
-                addresses = re.findall(r'\b[1-9A-HJ-NP-Za-km-z]{32,44}\b', log)
-                for addr in addresses:
-                    if addr not in known_programs and len(addr) >= 32:
-                        extracted_mints.add(addr)
-                        
-            return list(extracted_mints)
-            
+            return self.scan_logs(logs, require_activity=False).mints()
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Error extracting mints from logs: {e}")
-            return [] 
\ No newline at end of file
+            return []
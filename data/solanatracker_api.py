@@ -8,10 +8,21 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 from config.settings import Settings
 from utils.logger import get_logger
+from utils.rate_governor import RequestPriority, get_rate_governor
+from utils.report_cache import REPORT_NEGATIVE, REPORT_POSITIVE, get_risk_report_cache
 
 # Get logger for this module
 logger = get_logger(__name__)
 
+_NOT_FOUND = {'_not_found': True}
+
+
+def _classify_tracker_result(result: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Cache data and 404s; failures (None) are retried next time."""
+    if not isinstance(result, dict):
+        return None
+    return REPORT_NEGATIVE if result.get('_not_found') else REPORT_POSITIVE
+
 class SolanaTrackerAPI:
     """Client for interacting with the SolanaTracker API."""
     
@@ -33,6 +44,10 @@ class SolanaTrackerAPI:
         self.base_delay = self.settings.BASE_DELAY
         self.max_delay = 30
         self.timeout = aiohttp.ClientTimeout(total=self.settings.HTTP_TIMEOUT)
+        # Shared request-rate budget; replaces the fixed 2s sleep before every request
+        self.rate_governor = get_rate_governor(settings)
+        # Token data and holder counts are reused across scan cycles
+        self.report_cache = get_risk_report_cache(settings)
         
         logger.info(f"SolanaTrackerAPI initialized with URL: {self.api_url}")
     
@@ -82,9 +97,6 @@ class SolanaTrackerAPI:
             List of trending token data dictionaries
         """
         try:
-            # Add initial delay between requests
-            await asyncio.sleep(2)
-            
             headers = {
                 'x-api-key': self.api_key,
                 'Accept': 'application/json'
@@ -104,13 +116,15 @@ class SolanaTrackerAPI:
                         self.logger.info(f"Waiting {wait_time:.1f} seconds before retry {attempt + 1}")
                         await asyncio.sleep(wait_time)
                     
-                    async with aiohttp.ClientSession() as session:
+                    async with self.rate_governor.slot("solanatracker", "default", proxy, RequestPriority.DISCOVERY) as slot, \
+                            aiohttp.ClientSession() as session:
                         async with session.get(
                             f"{self.api_url}/tokens/trending",
                             headers=headers,
                             proxy=proxy['https'] if proxy else None,
                             timeout=self.timeout
                         ) as response:
+                            slot.record(response.status, response.headers.get("Retry-After"))
                             if response.status == 429:  # Rate limit hit
                                 if proxy:
                                     self.proxy_manager.mark_proxy_failure(self.proxy_manager.current_proxy)
@@ -175,6 +189,7 @@ class SolanaTrackerAPI:
     async def get_token_data(self, token_mint: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed token data from SolanaTracker API.
+        Results (and 404s) are served from the shared risk report cache while fresh.
         
         Args:
             token_mint: Token mint address
@@ -182,15 +197,22 @@ class SolanaTrackerAPI:
         Returns:
             Token data dictionary or None if failed
         """
+        result = await self.report_cache.get_or_fetch(
+            "solanatracker", token_mint, lambda: self._fetch_token_data(token_mint),
+            _classify_tracker_result, mint=token_mint,
+        )
+        if not result or result.get('_not_found'):
+            return None
+        return result
+
+    async def _fetch_token_data(self, token_mint: str) -> Optional[Dict[str, Any]]:
+        """Request token data from SolanaTracker (uncached); {'_not_found': True} on 404."""
         try:
             # Check if we have a valid API key
             if not self.api_key or self.api_key == "DEMO_KEY" or self.api_key == "your_solanatracker_api_key":
                 self.logger.warning(f"No valid API key for SolanaTrackerAPI. Dropping token {token_mint}.")
                 return None
                 
-            # Add initial delay between requests
-            await asyncio.sleep(2)
-            
             headers = {
                 'x-api-key': self.api_key,
                 'Accept': 'application/json'
@@ -210,17 +232,23 @@ class SolanaTrackerAPI:
                         self.logger.info(f"Waiting {wait_time:.1f} seconds before retry {attempt + 1} for {token_mint}")
                         await asyncio.sleep(wait_time)
                     
-                    async with aiohttp.ClientSession() as session:
+                    async with self.rate_governor.slot("solanatracker", "default", proxy, RequestPriority.DISCOVERY) as slot, \
+                            aiohttp.ClientSession() as session:
                         async with session.get(
                             f"{self.api_url}/tokens/{token_mint}",
                             headers=headers,
                             proxy=proxy['https'] if proxy else None,
                             timeout=self.timeout
                         ) as response:
+                            slot.record(response.status, response.headers.get("Retry-After"))
                             if response.status == 401:  # Unauthorized
                                 self.logger.error(f"API key unauthorized for SolanaTracker API. Dropping token {token_mint}.")
                                 return None
                                 
+                            elif response.status == 404:  # Unknown token: cached as not found
+                                self.logger.info(f"SolanaTracker has no data for {token_mint} (404). Dropping token.")
+                                return dict(_NOT_FOUND)
+
                             elif response.status == 429:  # Rate limit hit
                                 if proxy:
                                     self.proxy_manager.mark_proxy_failure(self.proxy_manager.current_proxy)
@@ -389,6 +417,8 @@ class SolanaTrackerAPI:
     async def get_token_holders(self, token_mint: str) -> Dict[str, Any]:
         """
         Get token holder data from SolanaTracker API.
+        Counts (and 404s) are served from the shared risk report cache while fresh; every
+        count is also reported to the cache so a large holder move invalidates the mint's reports.
         
         Args:
             token_mint: Token mint address
@@ -396,15 +426,23 @@ class SolanaTrackerAPI:
         Returns:
             Dictionary containing holder data
         """
+        result = await self.report_cache.get_or_fetch(
+            "solanatracker_holders", token_mint, lambda: self._fetch_token_holders(token_mint),
+            _classify_tracker_result, mint=token_mint,
+        )
+        if not result or result.get('_not_found'):
+            return {'holders': 0}
+        self.report_cache.observe_market(token_mint, holders=result.get('holders'))
+        return result
+
+    async def _fetch_token_holders(self, token_mint: str) -> Optional[Dict[str, Any]]:
+        """Request the holder count from SolanaTracker (uncached); None on failure, {'_not_found': True} on 404."""
         try:
             # Check if we have a valid API key
             if not self.api_key or self.api_key == "DEMO_KEY" or self.api_key == "your_solanatracker_api_key":
                 self.logger.warning(f"No valid API key for SolanaTrackerAPI. Dropping token {token_mint}.")
-                return {'holders': 0}
+                return None
                 
-            # Add initial delay between requests
-            await asyncio.sleep(2)
-            
             headers = {
                 'x-api-key': self.api_key,
                 'Accept': 'application/json'
@@ -424,17 +462,23 @@ class SolanaTrackerAPI:
                         logger.info(f"Waiting {wait_time:.1f} seconds before retry {attempt + 1} for {token_mint}")
                         await asyncio.sleep(wait_time)
                     
-                    async with aiohttp.ClientSession() as session:
+                    async with self.rate_governor.slot("solanatracker", "default", proxy, RequestPriority.DISCOVERY) as slot, \
+                            aiohttp.ClientSession() as session:
                         async with session.get(
                             f"{self.api_url}/tokens/{token_mint}/holders",
                             headers=headers,
                             proxy=proxy['https'] if proxy else None,
                             timeout=self.timeout
                         ) as response:
+                            slot.record(response.status, response.headers.get("Retry-After"))
                             if response.status == 401:  # Unauthorized
                                 logger.error(f"API key unauthorized for SolanaTracker API. Dropping token {token_mint}.")
-                                return {'holders': 0}
+                                return None
                                 
+                            elif response.status == 404:  # Unknown token: cached as not found
+                                logger.info(f"SolanaTracker has no holder data for {token_mint} (404).")
+                                return dict(_NOT_FOUND)
+
                             elif response.status == 429:  # Rate limit hit
                                 if proxy and self.proxy_manager:
                                     self.proxy_manager.mark_proxy_failure(self.proxy_manager.current_proxy)
@@ -446,7 +490,7 @@ class SolanaTrackerAPI:
                                     continue
                                 else:
                                     logger.error(f"Max retries reached for SolanaTracker API for {token_mint}. Dropping token.")
-                                    return {'holders': 0}
+                                    return None
                             
                             try:
                                 response.raise_for_status()
@@ -459,7 +503,7 @@ class SolanaTrackerAPI:
                                         continue
                                     else:
                                         logger.error(f"SolanaTracker API returned error after retries. Dropping token {token_mint}.")
-                                        return {'holders': 0}
+                                        return None
                                 
                                 # Extract holder count from response
                                 holder_count = data.get('totalHolders', 0)
@@ -473,7 +517,7 @@ class SolanaTrackerAPI:
                                     continue
                                 else:
                                     logger.error(f"Failed to get holder data for {token_mint} after {self.max_retries} attempts: {e}")
-                                    return {'holders': 0}
+                                    return None
                                     
                 except asyncio.TimeoutError:
                     if proxy and self.proxy_manager:
@@ -483,7 +527,7 @@ class SolanaTrackerAPI:
                         continue
                     else:
                         logger.error(f"Max retries reached due to timeouts for {token_mint}")
-                        return {'holders': 0}
+                        return None
                         
                 except aiohttp.ClientError as e:
                     if proxy and self.proxy_manager:
@@ -493,14 +537,14 @@ class SolanaTrackerAPI:
                         continue
                     else:
                         logger.error(f"Failed to get holder data for {token_mint} after {self.max_retries} attempts: {e}")
-                        return {'holders': 0}
+                        return None
                         
         except Exception as e:
             logger.error(f"Unexpected error getting holder data for {token_mint}: {e}", exc_info=True)
-            return {'holders': 0}
+            return None
             
-        # If we get here, return zero holders as a fallback
-        return {'holders': 0} 
+        # If we get here, the request failed
+        return None 
 
     async def close(self):
         """Closes the aiohttp client session."""
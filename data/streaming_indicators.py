@@ -0,0 +1,615 @@
+"""
+Incremental (streaming) technical indicators.
+
+The batch methods on ``data.indicators.Indicators`` rebuild a pandas Series
+and recompute every indicator over the whole price history on each event, so
+signal latency grows with the history length. The classes here keep per-mint
+state and update in constant (amortised) time per tick instead.
+
+Every indicator reproduces the value the batch method returns for the last row
+of the same price sequence, including its warm-up rules (``None`` while the
+batch method would return an empty Series) and its NaN semantics:
+
+- SMA / Bollinger / ATR / ADX / Stochastic %D use fixed-window rolling means
+  (``rolling(window).mean()``); any NaN inside the window yields NaN.
+- Bollinger uses a sliding Welford variance with ``ddof=1``.
+- EMA / MACD mirror ``ewm(span, adjust=False)``.
+- RSI defaults to the batch definition (simple rolling mean of gains/losses).
+  ``rsi_smoothing='wilder'`` switches to Wilder's smoothing, which is the
+  textbook RSI but intentionally differs from ``Indicators.rsi``.
+
+Rolling sums are resynchronised from their window every ``RESYNC_INTERVAL``
+updates (an O(period) pass amortised to O(1)) so floating-point drift stays
+far below the 1e-9 agreement with the batch implementation.
+"""
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+NAN = float('nan')
+RESYNC_INTERVAL = 1024
+
+
+def _finite(value: float) -> bool:
+    return value == value and value not in (math.inf, -math.inf)
+
+
+def _div(numerator: float, denominator: float) -> float:
+    """Division with NumPy float semantics (x/0 -> +/-inf, 0/0 -> NaN)."""
+    if denominator == 0:
+        if numerator != numerator or numerator == 0:
+            return NAN
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+class RollingMean:
+    """
+    Fixed-window mean with ``Series.rolling(window).mean()`` semantics.
+
+    NaNs are stored in the window; while any NaN is inside it the mean is NaN.
+    A window of identical values returns that value exactly and a window of
+    zeros returns exactly 0.0, which keeps downstream ratios (RSI, DI) from
+    turning 0/0 into a tiny-number artefact.
+    """
+
+    __slots__ = ('period', '_window', '_sum', '_nan_count', '_nonzero_count', '_run', '_updates')
+
+    def __init__(self, period: int):
+        if period < 1:
+            raise ValueError("period must be >= 1")
+        self.period = period
+        self._window: Deque[float] = deque(maxlen=period)
+        self._sum = 0.0
+        self._nan_count = 0
+        self._nonzero_count = 0
+        self._run = 0  # Length of the trailing run of identical values
+        self._updates = 0
+
+    def push(self, value: float) -> float:
+        window = self._window
+        if len(window) == self.period:
+            old = window[0]
+            if old != old:
+                self._nan_count -= 1
+            else:
+                self._sum -= old
+                if old != 0:
+                    self._nonzero_count -= 1
+        if window and window[-1] == value:
+            self._run += 1
+        else:
+            self._run = 1
+        window.append(value)
+        if value != value:
+            self._nan_count += 1
+        else:
+            self._sum += value
+            if value != 0:
+                self._nonzero_count += 1
+
+        self._updates += 1
+        if self._updates % RESYNC_INTERVAL == 0:
+            self._sum = math.fsum(v for v in window if v == v)
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return len(self._window) == self.period
+
+    @property
+    def value(self) -> float:
+        if not self.ready or self._nan_count:
+            return NAN
+        if self._nonzero_count == 0:
+            return 0.0
+        if self._run >= self.period:
+            return self._window[-1]
+        return self._sum / self.period
+
+
+class RollingVariance:
+    """
+    Sliding-window Welford mean/variance with ``rolling(window).std()`` (ddof=1) semantics.
+
+    Inputs are expected to be finite (prices).
+    """
+
+    __slots__ = ('period', '_window', '_mean', '_m2', '_run', '_updates')
+
+    def __init__(self, period: int):
+        if period < 2:
+            raise ValueError("period must be >= 2 for a sample variance")
+        self.period = period
+        self._window: Deque[float] = deque(maxlen=period)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._run = 0
+        self._updates = 0
+
+    def push(self, value: float) -> None:
+        window = self._window
+        if window and window[-1] == value:
+            self._run += 1
+        else:
+            self._run = 1
+
+        if len(window) < self.period:
+            window.append(value)
+            delta = value - self._mean
+            self._mean += delta / len(window)
+            self._m2 += delta * (value - self._mean)
+        else:
+            old = window[0]
+            window.append(value)
+            delta = value - old
+            new_mean = self._mean + delta / self.period
+            self._m2 += delta * ((value - new_mean) + (old - self._mean))
+            self._mean = new_mean
+
+        self._updates += 1
+        if self._updates % RESYNC_INTERVAL == 0:
+            n = len(window)
+            self._mean = math.fsum(window) / n
+            self._m2 = math.fsum((v - self._mean) ** 2 for v in window)
+
+    @property
+    def ready(self) -> bool:
+        return len(self._window) == self.period
+
+    @property
+    def variance(self) -> float:
+        if not self.ready:
+            return NAN
+        if self._run >= self.period:
+            return 0.0
+        return max(self._m2, 0.0) / (self.period - 1)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.ready else NAN
+
+
+class RollingExtremum:
+    """Sliding-window min or max using a monotonic deque (amortised O(1))."""
+
+    __slots__ = ('period', '_is_max', '_candidates', '_index')
+
+    def __init__(self, period: int, is_max: bool):
+        self.period = period
+        self._is_max = is_max
+        self._candidates: Deque[Tuple[int, float]] = deque()
+        self._index = 0
+
+    def push(self, value: float) -> float:
+        candidates = self._candidates
+        if self._is_max:
+            while candidates and candidates[-1][1] <= value:
+                candidates.pop()
+        else:
+            while candidates and candidates[-1][1] >= value:
+                candidates.pop()
+        candidates.append((self._index, value))
+        if candidates[0][0] <= self._index - self.period:
+            candidates.popleft()
+        self._index += 1
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self._index >= self.period
+
+    @property
+    def value(self) -> float:
+        return self._candidates[0][1] if self.ready else NAN
+
+
+class StreamingEMA:
+    """Exponential moving average matching ``ewm(span=period, adjust=False).mean()``."""
+
+    __slots__ = ('period', '_alpha', '_value', 'count')
+
+    def __init__(self, period: int):
+        self.period = period
+        self._alpha = 2.0 / (period + 1.0)
+        self._value: Optional[float] = None
+        self.count = 0
+
+    def push(self, value: float) -> float:
+        if self._value is None:
+            self._value = value
+        else:
+            # Same operation order as pandas' ewm kernel for adjust=False
+            old_wt = 1.0 - self._alpha
+            self._value = (old_wt * self._value + self._alpha * value) / (old_wt + self._alpha)
+        self.count += 1
+        return self._value
+
+    @property
+    def value(self) -> Optional[float]:
+        """Current EMA, or None while fewer than ``period`` values were seen (batch returns empty)."""
+        return self._value if self.count >= self.period else None
+
+
+class StreamingRSI:
+    """
+    Relative Strength Index.
+
+    ``smoothing='sma'`` reproduces ``Indicators.rsi`` (rolling mean of gains and
+    losses, inf -> 100, NaN -> 50). ``smoothing='wilder'`` uses Wilder's
+    recursive average seeded with the first ``period`` deltas.
+    """
+
+    __slots__ = ('period', 'smoothing', '_prev', 'count', '_gain', '_loss', '_avg_gain', '_avg_loss', '_seed')
+
+    def __init__(self, period: int = 14, smoothing: str = 'sma'):
+        if smoothing not in ('sma', 'wilder'):
+            raise ValueError(f"Unknown RSI smoothing '{smoothing}'")
+        self.period = period
+        self.smoothing = smoothing
+        self._prev: Optional[float] = None
+        self.count = 0
+        self._gain = RollingMean(period)
+        self._loss = RollingMean(period)
+        self._avg_gain: Optional[float] = None
+        self._avg_loss: Optional[float] = None
+        self._seed: List[Tuple[float, float]] = []
+
+    def push(self, price: float) -> None:
+        if self._prev is None:
+            # diff() is NaN for the first row; where(delta > 0, 0) turns it into 0
+            gain = loss = 0.0
+        else:
+            delta = price - self._prev
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+        self._prev = price
+        self.count += 1
+
+        if self.smoothing == 'sma':
+            self._gain.push(gain)
+            self._loss.push(loss)
+            return
+
+        if self.count == 1:
+            return
+        if self._avg_gain is None:
+            self._seed.append((gain, loss))
+            if len(self._seed) == self.period:
+                self._avg_gain = math.fsum(g for g, _ in self._seed) / self.period
+                self._avg_loss = math.fsum(l for _, l in self._seed) / self.period
+                self._seed = []
+        else:
+            self._avg_gain = (self._avg_gain * (self.period - 1) + gain) / self.period
+            self._avg_loss = (self._avg_loss * (self.period - 1) + loss) / self.period
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.count <= self.period:
+            return None
+        if self.smoothing == 'sma':
+            avg_gain, avg_loss = self._gain.value, self._loss.value
+        else:
+            avg_gain, avg_loss = self._avg_gain, self._avg_loss
+        rs = _div(avg_gain, avg_loss)
+        if rs != rs:
+            return 50.0
+        if rs == math.inf:
+            return 100.0
+        return 100 - (100 / (1 + rs))
+
+
+class StreamingMACD:
+    """MACD line, signal line and histogram matching ``Indicators.macd``."""
+
+    __slots__ = ('slow_period', '_fast', '_slow', '_signal', 'count', '_macd', '_signal_value')
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        self.slow_period = slow_period
+        self._fast = StreamingEMA(fast_period)
+        self._slow = StreamingEMA(slow_period)
+        self._signal = StreamingEMA(signal_period)
+        self.count = 0
+        self._macd = NAN
+        self._signal_value = NAN
+
+    def push(self, price: float) -> None:
+        self._macd = self._fast.push(price) - self._slow.push(price)
+        self._signal_value = self._signal.push(self._macd)
+        self.count += 1
+
+    @property
+    def value(self) -> Optional[Tuple[float, float, float]]:
+        """(macd, signal, histogram), or None before ``slow_period`` prices."""
+        if self.count < self.slow_period or self.count < self._fast.period or self.count < self._signal.period:
+            return None
+        return self._macd, self._signal_value, self._macd - self._signal_value
+
+
+class StreamingBollinger:
+    """Bollinger Bands (upper, middle, lower) matching ``Indicators.bollinger_bands``."""
+
+    __slots__ = ('std_dev', '_mean', '_var')
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        self.std_dev = std_dev
+        self._mean = RollingMean(period)
+        self._var = RollingVariance(period)
+
+    def push(self, price: float) -> None:
+        self._mean.push(price)
+        self._var.push(price)
+
+    @property
+    def value(self) -> Optional[Tuple[float, float, float]]:
+        if not self._mean.ready:
+            return None
+        middle = self._mean.value
+        width = self._var.std * self.std_dev
+        return middle + width, middle, middle - width
+
+
+class StreamingATR:
+    """Average True Range as a rolling mean of TR, matching ``Indicators.atr``."""
+
+    __slots__ = ('period', '_tr', '_prev_close', 'count')
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._tr = RollingMean(period)
+        self._prev_close: Optional[float] = None
+        self.count = 0
+
+    def push(self, high: float, low: float, close: float) -> float:
+        true_range = high - low
+        if self._prev_close is not None:
+            true_range = max(true_range, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = close
+        self.count += 1
+        return self._tr.push(true_range)
+
+    @property
+    def series_value(self) -> float:
+        """Rolling-mean TR for the latest row regardless of the batch warm-up rule."""
+        return self._tr.value
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.count < self.period + 1:
+            return None
+        return self._tr.value
+
+
+class StreamingADX:
+    """ADX, +DI and -DI matching ``Indicators.adx`` (rolling-mean smoothing)."""
+
+    __slots__ = ('period', '_atr', '_plus_dm', '_minus_dm', '_dx', '_prev_high', '_prev_low',
+                 '_plus_di', '_minus_di', 'count')
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._atr = StreamingATR(period)
+        self._plus_dm = RollingMean(period)
+        self._minus_dm = RollingMean(period)
+        self._dx = RollingMean(period)
+        self._prev_high: Optional[float] = None
+        self._prev_low: Optional[float] = None
+        self._plus_di = NAN
+        self._minus_di = NAN
+        self.count = 0
+
+    def push(self, high: float, low: float, close: float) -> None:
+        plus_dm = minus_dm = 0.0
+        if self._prev_high is not None:
+            high_diff = high - self._prev_high
+            low_diff = low - self._prev_low
+            if high_diff > abs(low_diff):
+                plus_dm = high_diff
+            if high_diff <= 0:
+                plus_dm = 0.0
+            if abs(low_diff) > high_diff:
+                minus_dm = abs(low_diff)
+            if low_diff >= 0:
+                minus_dm = 0.0
+        self._prev_high = high
+        self._prev_low = low
+        self.count += 1
+
+        self._atr.push(high, low, close)
+        atr = self._atr.series_value
+        self._plus_di = 100 * _div(self._plus_dm.push(plus_dm), atr)
+        self._minus_di = 100 * _div(self._minus_dm.push(minus_dm), atr)
+
+        di_sum = self._plus_di + self._minus_di
+        if not (_finite(self._plus_di) and _finite(self._minus_di)) or di_sum == 0:
+            dx = NAN
+        else:
+            dx = 100 * (abs(self._plus_di - self._minus_di) / di_sum)
+        self._dx.push(dx)
+
+    @property
+    def value(self) -> Optional[Tuple[float, float, float]]:
+        """(adx, plus_di, minus_di), or None before ``period + 1`` rows."""
+        if self.count < self.period + 1:
+            return None
+        return self._dx.value, self._plus_di, self._minus_di
+
+
+class StreamingStochastic:
+    """Stochastic oscillator (%K, %D) matching ``Indicators.stochastic``."""
+
+    __slots__ = ('k_period', '_lowest', '_highest', '_d', '_k', 'count')
+
+    def __init__(self, k_period: int = 14, d_period: int = 3):
+        self.k_period = k_period
+        self._lowest = RollingExtremum(k_period, is_max=False)
+        self._highest = RollingExtremum(k_period, is_max=True)
+        self._d = RollingMean(d_period)
+        self._k = NAN
+        self.count = 0
+
+    def push(self, high: float, low: float, close: float) -> None:
+        lowest = self._lowest.push(low)
+        highest = self._highest.push(high)
+        self._k = 100 * _div(close - lowest, highest - lowest)
+        self._d.push(self._k)
+        self.count += 1
+
+    @property
+    def value(self) -> Optional[Tuple[float, float]]:
+        if self.count < self.k_period:
+            return None
+        return self._k, self._d.value
+
+
+@dataclass
+class StreamingIndicatorConfig:
+    """Periods used for every mint tracked by a StreamingIndicatorEngine."""
+    rsi_period: int = 14
+    rsi_smoothing: str = 'sma'
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal: int = 9
+    bb_period: int = 20
+    bb_std_dev: float = 2.0
+    atr_period: int = 14
+    adx_period: int = 14
+    stoch_k_period: int = 14
+    stoch_d_period: int = 3
+    sma_periods: Tuple[int, ...] = (20, 50)
+    ema_periods: Tuple[int, ...] = field(default_factory=tuple)
+
+
+class StreamingIndicatorSet:
+    """All streaming indicators for a single mint."""
+
+    def __init__(self, config: StreamingIndicatorConfig):
+        self.config = config
+        self.count = 0
+        self.last_price: Optional[float] = None
+        self.rsi = StreamingRSI(config.rsi_period, config.rsi_smoothing)
+        self.macd = StreamingMACD(config.macd_fast, config.macd_slow, config.macd_signal)
+        self.bollinger = StreamingBollinger(config.bb_period, config.bb_std_dev)
+        self.atr = StreamingATR(config.atr_period)
+        self.adx = StreamingADX(config.adx_period)
+        self.stochastic = StreamingStochastic(config.stoch_k_period, config.stoch_d_period)
+        self.smas: Dict[int, RollingMean] = {p: RollingMean(p) for p in config.sma_periods}
+        self.emas: Dict[int, StreamingEMA] = {p: StreamingEMA(p) for p in config.ema_periods}
+
+    def update(self, price: float, high: Optional[float] = None, low: Optional[float] = None) -> None:
+        """
+        Feed one price (tick close) into every indicator.
+
+        Args:
+            price: Latest price (close)
+            high: Bar high; defaults to ``price`` for raw ticks
+            low: Bar low; defaults to ``price`` for raw ticks
+        """
+        high = price if high is None else high
+        low = price if low is None else low
+        self.rsi.push(price)
+        self.macd.push(price)
+        self.bollinger.push(price)
+        self.atr.push(high, low, price)
+        self.adx.push(high, low, price)
+        self.stochastic.push(high, low, price)
+        for sma in self.smas.values():
+            sma.push(price)
+        for ema in self.emas.values():
+            ema.push(price)
+        self.count += 1
+        self.last_price = price
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current indicator values.
+
+        Keys whose batch equivalent would return an empty Series are None; values
+        the batch method would report as NaN are NaN.
+        """
+        macd = self.macd.value
+        bands = self.bollinger.value
+        adx = self.adx.value
+        stoch = self.stochastic.value
+        result: Dict[str, Any] = {
+            'count': self.count,
+            'price': self.last_price,
+            'rsi': self.rsi.value,
+            'macd': macd[0] if macd else None,
+            'macd_signal': macd[1] if macd else None,
+            'macd_histogram': macd[2] if macd else None,
+            'bollinger_bands': {
+                'upper': bands[0] if bands else None,
+                'middle': bands[1] if bands else None,
+                'lower': bands[2] if bands else None,
+            },
+            'atr': self.atr.value,
+            'adx': adx[0] if adx else None,
+            'plus_di': adx[1] if adx else None,
+            'minus_di': adx[2] if adx else None,
+            'stoch_k': stoch[0] if stoch else None,
+            'stoch_d': stoch[1] if stoch else None,
+        }
+        for period, sma in self.smas.items():
+            result[f'sma_{period}'] = sma.value if sma.ready else None
+        for period, ema in self.emas.items():
+            result[f'ema_{period}'] = ema.value
+        return result
+
+
+class StreamingIndicatorEngine:
+    """
+    Per-mint registry of StreamingIndicatorSet instances.
+
+    Usage::
+
+        engine = StreamingIndicatorEngine(StreamingIndicatorConfig(rsi_period=14))
+        snapshot = engine.update(mint, price_sol)
+        rsi = snapshot['rsi']
+    """
+
+    def __init__(self, config: Optional[StreamingIndicatorConfig] = None):
+        self.config = config or StreamingIndicatorConfig()
+        self._sets: Dict[str, StreamingIndicatorSet] = {}
+
+    def update(self, mint: str, price: float, high: Optional[float] = None, low: Optional[float] = None) -> Dict[str, Any]:
+        """Feed a price for a mint and return its updated snapshot."""
+        indicator_set = self._sets.get(mint)
+        if indicator_set is None:
+            indicator_set = self._sets[mint] = StreamingIndicatorSet(self.config)
+        indicator_set.update(price, high, low)
+        return indicator_set.snapshot()
+
+    def prime(self, mint: str, prices: Iterable[float]) -> Dict[str, Any]:
+        """Reset a mint and replay a price history into it (e.g. after a restart)."""
+        self.reset(mint)
+        indicator_set = self._sets[mint] = StreamingIndicatorSet(self.config)
+        for price in prices:
+            indicator_set.update(float(price))
+        return indicator_set.snapshot()
+
+    def snapshot(self, mint: str) -> Optional[Dict[str, Any]]:
+        indicator_set = self._sets.get(mint)
+        return indicator_set.snapshot() if indicator_set else None
+
+    def count(self, mint: str) -> int:
+        indicator_set = self._sets.get(mint)
+        return indicator_set.count if indicator_set else 0
+
+    def has(self, mint: str) -> bool:
+        return mint in self._sets
+
+    def reset(self, mint: str) -> None:
+        self._sets.pop(mint, None)
+
+    def clear(self) -> None:
+        self._sets.clear()
+
+    def mints(self) -> List[str]:
+        return list(self._sets)
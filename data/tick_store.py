@@ -0,0 +1,558 @@
+"""
+Append-only tick store for on-chain swaps.
+
+Every swap decoded by the DEX parsers is appended as one row to a per-mint
+columnar segment. A segment is a directory of fixed-capacity ``.npy`` column
+files (timestamp, price_sol, amount_in, amount_out, direction, sig_hash) that
+are opened as NumPy memory maps, so readers get zero-copy views and the
+resident footprint is bounded by the OS page cache instead of Python objects.
+Segments roll over when they hit their row capacity or their time span, and
+segments older than the retention window are pruned.
+
+Layout on disk::
+
+    <root_dir>/<mint>/<segment_start_ms>/timestamp.npy
+                                        /price_sol.npy
+                                        /...
+                                        /meta.json
+
+The writer fills the ``timestamp`` column last, so a reader in another process
+(e.g. the web dashboard) can open the active segment read-only and treat the
+first zero timestamp as the end of the committed rows.
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+import numpy as np
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Column name -> dtype. Order matters: 'timestamp' must stay last because it is
+# the commit marker for a row.
+TICK_COLUMNS: Dict[str, np.dtype] = {
+    "price_sol": np.dtype(np.float64),
+    "amount_in": np.dtype(np.float64),
+    "amount_out": np.dtype(np.float64),
+    "direction": np.dtype(np.int8),
+    "sig_hash": np.dtype(np.uint64),
+    "timestamp": np.dtype(np.float64),
+}
+ROW_BYTES = sum(dtype.itemsize for dtype in TICK_COLUMNS.values())
+
+DIRECTION_UNKNOWN = 0
+DIRECTION_BUY = 1    # SOL/quote in, token out
+DIRECTION_SELL = -1  # token in, SOL/quote out
+
+# Base58 public key; mints become directory names, so nothing else is accepted
+_MINT_PATTERN = re.compile(r"^[1-9A-HJ-NP-Za-km-z]{32,44}$")
+
+_DIRECTION_ALIASES = {
+    "buy": DIRECTION_BUY,
+    "quote_to_base": DIRECTION_BUY,
+    "sell": DIRECTION_SELL,
+    "base_to_quote": DIRECTION_SELL,
+}
+
+
+def is_valid_mint(mint: Any) -> bool:
+    """True if ``mint`` looks like a base58 Solana address (safe to use as a path component)."""
+    return isinstance(mint, str) and _MINT_PATTERN.match(mint) is not None
+
+
+def signature_hash(signature: Optional[str]) -> int:
+    """Stable 64-bit hash of a transaction signature (0 when missing)."""
+    if not signature:
+        return 0
+    return int.from_bytes(hashlib.blake2b(signature.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def direction_from_swap(swap_info: Dict[str, Any]) -> int:
+    """Map the parser-specific direction fields onto DIRECTION_BUY / DIRECTION_SELL."""
+    for key in ("swap_direction", "instruction_type"):
+        value = swap_info.get(key)
+        if isinstance(value, str):
+            direction = _DIRECTION_ALIASES.get(value.lower())
+            if direction is not None:
+                return direction
+    return DIRECTION_UNKNOWN
+
+
+def ticks_to_ohlcv(ticks: Dict[str, np.ndarray], bar_seconds: float, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Resample raw ticks into OHLCV bars.
+
+    Args:
+        ticks: Column dict as returned by TickStore.read()
+        bar_seconds: Bar width in seconds
+        limit: Keep only the most recent ``limit`` bars
+
+    Returns:
+        List of bar dicts with timestamp/open/high/low/close/volume/trades keys,
+        oldest first. Volume is the SOL-side amount of each swap.
+    """
+    ts = ticks.get("timestamp")
+    if ts is None or len(ts) == 0:
+        return []
+
+    price = ticks["price_sol"]
+    direction = ticks["direction"]
+    amount_in = ticks["amount_in"]
+    amount_out = ticks["amount_out"]
+    valid = price > 0
+    if not valid.all():
+        ts, price, direction, amount_in, amount_out = (
+            ts[valid], price[valid], direction[valid], amount_in[valid], amount_out[valid]
+        )
+        if len(ts) == 0:
+            return []
+    # Buys spend SOL (amount_in), sells receive SOL (amount_out)
+    sol_volume = np.where(direction == DIRECTION_SELL, amount_out, amount_in)
+
+    bucket = np.floor(ts / bar_seconds).astype(np.int64)
+    # Ticks are stored in timestamp order, so bucket boundaries are where the id changes
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(bucket)] - 1
+
+    opens = price[starts]
+    closes = price[ends]
+    highs = np.maximum.reduceat(price, starts)
+    lows = np.minimum.reduceat(price, starts)
+    volumes = np.add.reduceat(sol_volume, starts)
+    counts = ends - starts + 1
+
+    if limit is not None and len(starts) > limit:
+        sl = slice(len(starts) - limit, None)
+        starts, opens, highs, lows, closes, volumes, counts = (
+            starts[sl], opens[sl], highs[sl], lows[sl], closes[sl], volumes[sl], counts[sl]
+        )
+
+    return [
+        {
+            "timestamp": float(bucket[s] * bar_seconds),
+            "open": float(o),
+            "high": float(h),
+            "low": float(l),
+            "close": float(c),
+            "volume": float(v),
+            "trades": int(n),
+        }
+        for s, o, h, l, c, v, n in zip(starts, opens, highs, lows, closes, volumes, counts)
+    ]
+
+
+class TickSegment:
+    """One fixed-capacity, memory-mapped columnar segment for a single mint."""
+
+    def __init__(self, path: str, capacity: int, start_ts: float, writable: bool):
+        self.path = path
+        self.capacity = capacity
+        self.start_ts = start_ts
+        self.writable = writable
+        self.sealed = False
+        self.count = 0
+        self.columns: Dict[str, np.memmap] = {}
+
+    @classmethod
+    def create(cls, path: str, capacity: int, start_ts: float) -> "TickSegment":
+        os.makedirs(path, exist_ok=True)
+        segment = cls(path, capacity, start_ts, writable=True)
+        for name, dtype in TICK_COLUMNS.items():
+            segment.columns[name] = np.lib.format.open_memmap(
+                os.path.join(path, f"{name}.npy"), mode="w+", dtype=dtype, shape=(capacity,)
+            )
+        segment.write_meta()
+        return segment
+
+    @classmethod
+    def open(cls, path: str, writable: bool = False) -> "TickSegment":
+        meta = cls.read_meta(path)
+        mode = "r+" if writable and not meta.get("sealed") else "r"
+        columns = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+            for name in TICK_COLUMNS
+        }
+        capacity = len(columns["timestamp"])
+        segment = cls(path, capacity, float(meta.get("start_ts", 0.0)), writable=(mode == "r+"))
+        segment.columns = columns
+        segment.sealed = bool(meta.get("sealed", False))
+        segment.count = segment._recover_count(int(meta.get("count", 0)))
+        return segment
+
+    @staticmethod
+    def read_meta(path: str) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(path, "meta.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _recover_count(self, meta_count: int) -> int:
+        """Rows are committed by their timestamp, so the first zero timestamp ends the segment."""
+        ts = self.columns["timestamp"]
+        if self.sealed or meta_count >= self.capacity:
+            return min(meta_count, self.capacity)
+        empty = np.flatnonzero(ts[meta_count:] == 0)
+        return meta_count + int(empty[0]) if len(empty) else self.capacity
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+    @property
+    def end_ts(self) -> float:
+        return float(self.columns["timestamp"][self.count - 1]) if self.count else self.start_ts
+
+    def append(self, row: Tuple[float, float, float, int, int, float]):
+        i = self.count
+        price_sol, amount_in, amount_out, direction, sig_hash, timestamp = row
+        cols = self.columns
+        cols["price_sol"][i] = price_sol
+        cols["amount_in"][i] = amount_in
+        cols["amount_out"][i] = amount_out
+        cols["direction"][i] = direction
+        cols["sig_hash"][i] = sig_hash
+        cols["timestamp"][i] = timestamp  # Commit marker - written last
+        self.count = i + 1
+
+    def view(self, start_ts: Optional[float] = None, end_ts: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy column views restricted to [start_ts, end_ts]."""
+        ts = self.columns["timestamp"][:self.count]
+        lo = int(np.searchsorted(ts, start_ts, side="left")) if start_ts is not None else 0
+        hi = int(np.searchsorted(ts, end_ts, side="right")) if end_ts is not None else self.count
+        return {name: col[lo:hi] for name, col in self.columns.items()}
+
+    def write_meta(self):
+        meta = {
+            "start_ts": self.start_ts,
+            "end_ts": self.end_ts,
+            "count": self.count,
+            "capacity": self.capacity,
+            "sealed": self.sealed,
+        }
+        tmp_path = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.path, "meta.json"))
+
+    def flush(self):
+        if self.writable:
+            for col in self.columns.values():
+                col.flush()
+            self.write_meta()
+
+    def seal(self):
+        self.sealed = True
+        self.flush()
+        self.close()
+
+    def close(self):
+        # Dropping the memmap references unmaps the files
+        self.columns = {}
+        self.writable = False
+
+
+class TickStore:
+    """
+    Per-mint, append-only, memory-mapped tick store.
+
+    One writer (the MarketData event loop) appends ticks; any number of
+    readers - in-process or in other processes opened with ``read_only=True``
+    - read zero-copy column views. Only the active segment of each mint stays
+    mapped for writing; sealed segments are mapped on demand through a small
+    LRU so that memory stays bounded regardless of how many mints are tracked.
+    """
+
+    def __init__(self,
+                 root_dir: str,
+                 segment_rows: int = 16384,
+                 segment_seconds: float = 3600.0,
+                 retention_seconds: float = 86400.0,
+                 max_open_segments: int = 64,
+                 read_only: bool = False):
+        """
+        Initialize the tick store.
+
+        Args:
+            root_dir: Directory holding one sub-directory per mint
+            segment_rows: Row capacity of a segment before it rolls over
+            segment_seconds: Time span of a segment before it rolls over
+            retention_seconds: Segments ending before now - retention are pruned
+            max_open_segments: Max sealed segments kept mapped for reads
+            read_only: Open for reading only (no appends, no pruning)
+        """
+        self.root_dir = root_dir
+        self.segment_rows = int(segment_rows)
+        self.segment_seconds = float(segment_seconds)
+        self.retention_seconds = float(retention_seconds)
+        self.max_open_segments = int(max_open_segments)
+        self.read_only = read_only
+
+        self._active: Dict[str, TickSegment] = {}
+        self._readers: "OrderedDict[str, TickSegment]" = OrderedDict()
+        self._last_ts: Dict[str, float] = {}
+        self.metrics = {
+            "ticks_appended": 0,
+            "segments_created": 0,
+            "segments_sealed": 0,
+            "segments_pruned": 0,
+        }
+
+        if not read_only:
+            os.makedirs(self.root_dir, exist_ok=True)
+        logger.info(f"TickStore opened at {self.root_dir} (segment_rows={self.segment_rows}, "
+                    f"segment_seconds={self.segment_seconds}, retention={self.retention_seconds}s, read_only={read_only})")
+
+    # --- Writing ---
+
+    def append(self,
+               mint: str,
+               price_sol: float,
+               timestamp: Optional[float] = None,
+               amount_in: float = 0.0,
+               amount_out: float = 0.0,
+               direction: int = DIRECTION_UNKNOWN,
+               signature: Optional[str] = None) -> bool:
+        """
+        Append one tick for a mint.
+
+        Timestamps are clamped to be non-decreasing per mint so that range
+        reads can binary-search the timestamp column.
+
+        Returns:
+            bool: True if the tick was stored
+        """
+        if self.read_only or not is_valid_mint(mint) or price_sol is None:
+            return False
+        now = time.time()
+        ts = float(timestamp) if timestamp else now
+        last_ts = self._last_ts.get(mint)
+        if last_ts is not None and ts < last_ts:
+            ts = last_ts
+
+        segment = self._writable_segment(mint, ts)
+        segment.append((
+            float(price_sol),
+            float(amount_in or 0.0),
+            float(amount_out or 0.0),
+            int(direction),
+            signature_hash(signature),
+            ts,
+        ))
+        self._last_ts[mint] = ts
+        self.metrics["ticks_appended"] += 1
+        return True
+
+    def append_swap(self, mint: str, price_sol: float, swap_info: Dict[str, Any], timestamp: Optional[float] = None) -> bool:
+        """Append a tick from a standardized parser swap dict."""
+        return self.append(
+            mint=mint,
+            price_sol=price_sol,
+            timestamp=timestamp or swap_info.get("timestamp"),
+            amount_in=swap_info.get("amount_in") or 0.0,
+            amount_out=swap_info.get("amount_out") or 0.0,
+            direction=direction_from_swap(swap_info),
+            signature=swap_info.get("signature"),
+        )
+
+    def _writable_segment(self, mint: str, ts: float) -> TickSegment:
+        segment = self._active.get(mint)
+        if segment is None:
+            segment = self._reopen_active(mint)
+        if segment is not None and (segment.is_full or ts - segment.start_ts >= self.segment_seconds):
+            self._seal(mint, segment)
+            segment = None
+        if segment is None:
+            path = os.path.join(self._mint_dir(mint), f"{int(ts * 1000):015d}")
+            segment = TickSegment.create(path, self.segment_rows, ts)
+            self._active[mint] = segment
+            self.metrics["segments_created"] += 1
+        return segment
+
+    def _reopen_active(self, mint: str) -> Optional[TickSegment]:
+        """Resume appending to the newest unsealed segment left by a previous run."""
+        paths = self._segment_paths(mint)
+        if not paths:
+            return None
+        if TickSegment.read_meta(paths[-1]).get("sealed"):
+            return None
+        try:
+            segment = TickSegment.open(paths[-1], writable=True)
+        except Exception as e:
+            logger.warning(f"Could not reopen tick segment {paths[-1]}: {e}")
+            return None
+        self._active[mint] = segment
+        if segment.count:
+            self._last_ts[mint] = segment.end_ts
+        return segment
+
+    def _seal(self, mint: str, segment: TickSegment):
+        segment.seal()
+        self._active.pop(mint, None)
+        self.metrics["segments_sealed"] += 1
+
+    # --- Reading ---
+
+    def _mint_dir(self, mint: str) -> str:
+        if not is_valid_mint(mint):
+            raise ValueError(f"Invalid mint address for tick store: {mint!r}")
+        return os.path.join(self.root_dir, mint)
+
+    def _segment_paths(self, mint: str) -> List[str]:
+        if not is_valid_mint(mint):
+            return []
+        mint_dir = self._mint_dir(mint)
+        try:
+            names = sorted(n for n in os.listdir(mint_dir) if n.isdigit())
+        except FileNotFoundError:
+            return []
+        return [os.path.join(mint_dir, n) for n in names]
+
+    def _segment_for_read(self, path: str) -> Optional[TickSegment]:
+        for segment in self._active.values():
+            if segment.path == path:
+                return segment
+        segment = self._readers.get(path)
+        if segment is not None:
+            # Unsealed segments written by another process keep growing
+            if not segment.sealed:
+                segment.count = segment._recover_count(segment.count)
+            self._readers.move_to_end(path)
+            return segment
+        try:
+            segment = TickSegment.open(path, writable=False)
+        except Exception as e:
+            logger.warning(f"Could not open tick segment {path}: {e}")
+            return None
+        self._readers[path] = segment
+        while len(self._readers) > self.max_open_segments:
+            _, evicted = self._readers.popitem(last=False)
+            evicted.close()
+        return segment
+
+    def iter_segments(self, mint: str, start_ts: Optional[float] = None, end_ts: Optional[float] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield zero-copy column views, one per segment overlapping the range, oldest first."""
+        paths = self._segment_paths(mint)
+        for idx, path in enumerate(paths):
+            # Segment directory names are start timestamps, so the next name bounds this segment
+            if end_ts is not None and int(os.path.basename(path)) / 1000.0 > end_ts:
+                break
+            if start_ts is not None and idx + 1 < len(paths) and int(os.path.basename(paths[idx + 1])) / 1000.0 < start_ts:
+                continue
+            segment = self._segment_for_read(path)
+            if segment is None or segment.count == 0:
+                continue
+            view = segment.view(start_ts, end_ts)
+            if len(view["timestamp"]):
+                yield view
+
+    def read(self, mint: str, start_ts: Optional[float] = None, end_ts: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Read ticks for a mint in [start_ts, end_ts].
+
+        Returns a zero-copy view when the range lives in one segment and a
+        single concatenated copy otherwise.
+        """
+        views = list(self.iter_segments(mint, start_ts, end_ts))
+        if not views:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in TICK_COLUMNS.items()}
+        if len(views) == 1:
+            return views[0]
+        return {name: np.concatenate([v[name] for v in views]) for name in TICK_COLUMNS}
+
+    def read_recent(self, mint: str, seconds: float) -> Dict[str, np.ndarray]:
+        """Read ticks from the last ``seconds`` seconds."""
+        return self.read(mint, start_ts=time.time() - seconds)
+
+    def latest_price(self, mint: str) -> Optional[Tuple[float, float]]:
+        """Return (timestamp, price_sol) of the last tick for a mint, if any."""
+        paths = self._segment_paths(mint)
+        for path in reversed(paths):
+            segment = self._segment_for_read(path)
+            if segment is not None and segment.count:
+                i = segment.count - 1
+                return float(segment.columns["timestamp"][i]), float(segment.columns["price_sol"][i])
+        return None
+
+    def get_ohlcv(self, mint: str, bar_seconds: float, limit: int = 100, min_bars: int = 0) -> List[Dict[str, Any]]:
+        """
+        Build the last ``limit`` OHLCV bars of ``bar_seconds`` width from stored ticks.
+
+        Returns an empty list when ``limit`` is not positive or fewer than
+        ``min_bars`` bars (capped at ``limit``) are available, so callers can
+        fall back to another source instead of using a too-short history.
+        """
+        if limit <= 0 or bar_seconds <= 0:
+            return []
+        ticks = self.read(mint, start_ts=time.time() - bar_seconds * limit)
+        bars = ticks_to_ohlcv(ticks, bar_seconds, limit)
+        if len(bars) < min(min_bars, limit):
+            return []
+        return bars
+
+    def mints(self) -> List[str]:
+        try:
+            return sorted(n for n in os.listdir(self.root_dir)
+                          if is_valid_mint(n) and os.path.isdir(os.path.join(self.root_dir, n)))
+        except FileNotFoundError:
+            return []
+
+    # --- Maintenance ---
+
+    def flush(self):
+        """Flush dirty pages and segment metadata of all active segments."""
+        for segment in self._active.values():
+            try:
+                segment.flush()
+            except Exception as e:
+                logger.warning(f"Error flushing tick segment {segment.path}: {e}")
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Delete segments that ended before the retention window. Returns segments removed."""
+        if self.read_only:
+            return 0
+        cutoff = (now or time.time()) - self.retention_seconds
+        removed = 0
+        for mint in self.mints():
+            for path in self._segment_paths(mint):
+                active = self._active.get(mint)
+                if active is not None and active.path == path:
+                    continue
+                meta = TickSegment.read_meta(path)
+                if float(meta.get("end_ts", meta.get("start_ts", 0.0))) >= cutoff:
+                    break  # Segments are ordered; the rest are newer
+                reader = self._readers.pop(path, None)
+                if reader is not None:
+                    reader.close()
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        self.metrics["segments_pruned"] += removed
+        if removed:
+            logger.info(f"TickStore pruned {removed} segments older than {self.retention_seconds}s")
+        return removed
+
+    def close(self):
+        """Flush active segments and unmap everything. Active segments stay unsealed so a restart resumes them."""
+        self.flush()
+        for segment in self._active.values():
+            segment.close()
+        for segment in self._readers.values():
+            segment.close()
+        self._active.clear()
+        self._readers.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.metrics,
+            "active_segments": len(self._active),
+            "open_read_segments": len(self._readers),
+            "mapped_bytes": (len(self._active) + len(self._readers)) * self.segment_rows * ROW_BYTES,
+        }
@@ -8,10 +8,10 @@ from pathlib import Path
 from typing import Dict, List, Optional, AsyncGenerator, Set, Any, TYPE_CHECKING
 from config.settings import Settings
 from utils.logger import get_logger
-from data.models import Base, Token, Trade, Alert, Position, Order, PaperPosition, PaperWalletSummary
+from data.models import Base, Token, Trade, Alert, Position, Order, PaperPosition, PaperWalletSummary, TokenMintMetadata
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import text, update, delete
+from sqlalchemy import text, update, delete, bindparam, case, event, Float, String, DateTime
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
@@ -80,6 +80,38 @@ class TokenDatabase:
         )
         self.lock = asyncio.Lock()  # Add lock for thread safety
         
+        # Apply WAL / synchronous / cache pragmas to every pooled connection
+        self._sqlite_pragmas = self._build_sqlite_pragmas(settings)
+        event.listen(self.engine.sync_engine, "connect", self._apply_sqlite_pragmas)
+        
+    @staticmethod
+    def _build_sqlite_pragmas(settings: Settings) -> List[str]:
+        """PRAGMA statements run on each new SQLite connection, taken from settings."""
+        pragmas = []
+        if getattr(settings, 'DB_SQLITE_WAL', True):
+            pragmas.append("PRAGMA journal_mode=WAL")
+        synchronous = str(getattr(settings, 'DB_SQLITE_SYNCHRONOUS', 'NORMAL')).upper()
+        if synchronous in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            pragmas.append(f"PRAGMA synchronous={synchronous}")
+        pragmas.append(f"PRAGMA busy_timeout={int(getattr(settings, 'DB_SQLITE_BUSY_TIMEOUT_MS', 5000))}")
+        pragmas.append("PRAGMA temp_store=MEMORY")
+        # Negative cache_size is in KiB
+        pragmas.append(f"PRAGMA cache_size={-int(getattr(settings, 'DB_SQLITE_CACHE_SIZE_KB', 65536))}")
+        pragmas.append(f"PRAGMA mmap_size={int(getattr(settings, 'DB_SQLITE_MMAP_SIZE_MB', 256)) * 1024 * 1024}")
+        return pragmas
+        
+    def _apply_sqlite_pragmas(self, dbapi_connection, connection_record):
+        """Engine 'connect' hook: configure a freshly opened SQLite connection."""
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in self._sqlite_pragmas:
+                try:
+                    cursor.execute(pragma)
+                except Exception as e:
+                    self.logger.warning(f"Failed to apply '{pragma}': {e}")
+        finally:
+            cursor.close()
+        
     async def initialize(self) -> bool:
         """Initialize the database by creating tables and testing connection."""
         try:
@@ -1560,84 +1592,65 @@ class TokenDatabase:
         """
         Updates specific market data fields for a batch of tokens.
         This method is designed to be called by PriceMonitor with data from DexScreener.
-        It updates price_usd, price_native, liquidity, volume_24h, pair_address, dex_id,
-        last_price_update_timestamp, and last_updated.
+        It updates price, liquidity, volume_24h, pair_address, dex_id and last_updated
+        with a single executemany UPDATE; fields missing from a pair keep their stored value.
         It does NOT create new tokens if they don't exist.
         """
         if not token_data_batch:
             self.logger.info("update_token_prices_batch called with empty batch. No action taken.")
             return True
 
+        now = datetime.now(timezone.utc)
+        params = []
+        for token_mint, pair_data in token_data_batch.items():
+            if not isinstance(pair_data, dict):
+                self.logger.warning(f"Skipping invalid pair_data for mint {token_mint} in batch update (not a dict): {pair_data}")
+                continue
+
+            row = {
+                "b_mint": token_mint,
+                "b_price": self._to_float(pair_data.get("priceUsd"), "priceUsd", token_mint),
+                "b_liquidity": None,
+                "b_volume_24h": None,
+                "b_pair_address": str(pair_data["pairAddress"]) if pair_data.get("pairAddress") is not None else None,
+                "b_dex_id": str(pair_data["dexId"]) if pair_data.get("dexId") is not None else None,
+                "b_now": now,
+            }
+            liquidity_data = pair_data.get("liquidity", {})
+            if isinstance(liquidity_data, dict):
+                row["b_liquidity"] = self._to_float(liquidity_data.get("usd"), "liquidity_usd", token_mint)
+            volume_data = pair_data.get("volume", {})
+            if isinstance(volume_data, dict):
+                row["b_volume_24h"] = self._to_float(volume_data.get("h24"), "volume_h24", token_mint)
+
+            # Timestamps are not updated alone
+            if any(row[key] is not None for key in ("b_price", "b_liquidity", "b_volume_24h", "b_pair_address", "b_dex_id")):
+                params.append(row)
+            else:
+                self.logger.debug(f"No updatable price/market fields found for {token_mint} in batch. Timestamps not updated alone.")
+
+        if not params:
+            return True
+
+        tokens = Token.__table__
+        stmt = (
+            update(tokens)
+            .where(tokens.c.mint == bindparam("b_mint", type_=String))
+            .values(
+                price=func.coalesce(bindparam("b_price", type_=Float), tokens.c.price),
+                liquidity=func.coalesce(bindparam("b_liquidity", type_=Float), tokens.c.liquidity),
+                volume_24h=func.coalesce(bindparam("b_volume_24h", type_=Float), tokens.c.volume_24h),
+                pair_address=func.coalesce(bindparam("b_pair_address", type_=String), tokens.c.pair_address),
+                dex_id=func.coalesce(bindparam("b_dex_id", type_=String), tokens.c.dex_id),
+                last_updated=bindparam("b_now", type_=DateTime),
+            )
+        )
         session = await self._get_session()
-        updated_count = 0
         async with session as session:
             async with session.begin():
                 try:
-                    for token_mint, pair_data in token_data_batch.items():
-                        if not isinstance(pair_data, dict):
-                            self.logger.warning(f"Skipping invalid pair_data for mint {token_mint} in batch update (not a dict): {pair_data}")
-                            continue
-
-                        fields_to_update = {
-                            # "last_price_update_timestamp": datetime.now(timezone.utc), # Removed: Model uses 'last_updated'
-                            "last_updated": datetime.now(timezone.utc)
-                        }
-                        
-                        price_usd = pair_data.get("priceUsd")
-                        if price_usd is not None:
-                            try:
-                                fields_to_update["price"] = float(price_usd) # Changed "price_usd" to "price"
-                            except (ValueError, TypeError):
-                                self.logger.warning(f"Could not convert priceUsd '{price_usd}' to float for {token_mint}")
-
-                        # price_native = pair_data.get("priceNative") # Removed: Field does not exist in Token model
-                        # if price_native is not None:
-                        #     try:
-                        #         fields_to_update["price_native"] = float(price_native)
-                        #     except (ValueError, TypeError):
-                        #         self.logger.warning(f"Could not convert priceNative '{price_native}' to float for {token_mint}")
-
-                        liquidity_data = pair_data.get("liquidity", {})
-                        if isinstance(liquidity_data, dict):
-                            liquidity_usd = liquidity_data.get("usd")
-                            if liquidity_usd is not None:
-                                try:
-                                    fields_to_update["liquidity"] = float(liquidity_usd) # Assumes Token model has 'liquidity'
-                                except (ValueError, TypeError):
-                                    self.logger.warning(f"Could not convert liquidity_usd '{liquidity_usd}' to float for {token_mint}")
-                        
-                        volume_data = pair_data.get("volume", {})
-                        if isinstance(volume_data, dict):
-                            volume_h24 = volume_data.get("h24")
-                            if volume_h24 is not None:
-                                try:
-                                    fields_to_update["volume_24h"] = float(volume_h24) # Assumes Token model has 'volume_24h'
-                                except (ValueError, TypeError):
-                                    self.logger.warning(f"Could not convert volume_h24 '{volume_h24}' to float for {token_mint}")
-
-                        if pair_data.get("pairAddress") is not None:
-                            fields_to_update["pair_address"] = str(pair_data["pairAddress"])
-                        
-                        if pair_data.get("dexId") is not None:
-                            fields_to_update["dex_id"] = str(pair_data["dexId"])
-
-                        # Only proceed if there are actual fields to update beyond the 'last_updated' timestamp
-                        # If only 'last_updated' is in fields_to_update, its length will be 1.
-                        # We want to update if any other relevant field is also being updated.
-                        if len(fields_to_update) > 1: # Changed from > 2 to > 1
-                            stmt = (
-                                update(Token)
-                                .where(Token.mint == token_mint)
-                                .values(**fields_to_update)
-                            )
-                            result = await session.execute(stmt)
-                            if result.rowcount > 0:
-                                updated_count += 1
-                            else:
-                                self.logger.debug(f"Token {token_mint} not found or no values changed during batch price update.")
-                        else:
-                            self.logger.debug(f"No updatable price/market fields found for {token_mint} in batch. Timestamps not updated alone.")
-
+                    result = await session.execute(stmt, params)
+                    updated_count = result.rowcount or 0
                     self.logger.info(f"Batch token price update: Attempted to update {len(token_data_batch)} tokens, {updated_count} were actually modified in the DB.")
                     return True
                 except SQLAlchemyError as e:
@@ -1649,6 +1662,168 @@ class TokenDatabase:
                     await session.rollback() # Rollback on error
                     return False
 
+    def _to_float(self, value: Any, field: str, mint: str) -> Optional[float]:
+        """Convert an API value to float, logging (and returning None) when it is not numeric."""
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            self.logger.warning(f"Could not convert {field} '{value}' to float for {mint}")
+            return None
+
+    async def update_token_prices(self, prices: Dict[str, float]) -> int:
+        """
+        Update the price for many tokens in a single transaction.
+        Used by MarketData's event pipeline to persist coalesced blockchain prices.
+        
+        Args:
+            prices: Mapping of mint address -> latest price
+            
+        Returns:
+            int: Number of token rows updated
+        """
+        if not prices:
+            return 0
+        updated = await self.write_market_updates(
+            [{"mint": mint, "price": price} for mint, price in prices.items()]
+        )
+        return max(updated, 0)
+
+    async def write_market_updates(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Apply coalesced per-mint market updates as one executemany UPDATE in one transaction.
+        Used by MarketWriteBehind; ``None`` fields keep their stored value and
+        ``volume_increment`` is added to ``volume_24h``.
+        
+        Args:
+            rows: Dicts with 'mint' and any of 'price', 'liquidity', 'volume_increment'
+            
+        Returns:
+            int: Number of token rows updated, or -1 if the transaction failed
+        """
+        now = datetime.now(timezone.utc)
+        params = [
+            {
+                "b_mint": row["mint"],
+                "b_price": float(row["price"]) if row.get("price") is not None else None,
+                "b_liquidity": float(row["liquidity"]) if row.get("liquidity") is not None else None,
+                "b_volume": float(row["volume_increment"]) if row.get("volume_increment") is not None else None,
+                "b_now": now,
+            }
+            for row in rows
+            if row.get("mint")
+        ]
+        if not params:
+            return 0
+
+        tokens = Token.__table__
+        volume = bindparam("b_volume", type_=Float)
+        stmt = (
+            update(tokens)
+            .where(tokens.c.mint == bindparam("b_mint", type_=String))
+            .values(
+                price=func.coalesce(bindparam("b_price", type_=Float), tokens.c.price),
+                liquidity=func.coalesce(bindparam("b_liquidity", type_=Float), tokens.c.liquidity),
+                volume_24h=case(
+                    (volume.is_(None), tokens.c.volume_24h),
+                    else_=func.coalesce(tokens.c.volume_24h, 0.0) + volume,
+                ),
+                last_updated=bindparam("b_now", type_=DateTime),
+            )
+        )
+        session = await self._get_session()
+        async with session as session:
+            async with session.begin():
+                try:
+                    result = await session.execute(stmt, params)
+                    updated_count = result.rowcount or 0
+                    self.logger.debug(f"Market update batch: {updated_count}/{len(params)} tokens updated")
+                    return updated_count
+                except SQLAlchemyError as e:
+                    self.logger.error(f"SQLAlchemyError during market update batch: {e}", exc_info=True)
+                    await session.rollback()
+                    return -1
+                except Exception as e:
+                    self.logger.error(f"Unexpected error during market update batch: {e}", exc_info=True)
+                    await session.rollback()
+                    return -1
+
+    async def get_all_mint_metadata(self) -> List[Dict[str, Any]]:
+        """
+        Load every persisted mint metadata row (used to warm-start MintMetadataService).
+        
+        Returns:
+            List[Dict]: One dict per mint with decimals, supply, authorities and program owner
+        """
+        session = await self._get_session()
+        async with session as session:
+            try:
+                result = await session.execute(select(TokenMintMetadata))
+                return [
+                    {
+                        "mint": row.mint,
+                        "decimals": row.decimals,
+                        "supply": int(row.supply) if row.supply is not None else None,
+                        "mint_authority": row.mint_authority,
+                        "freeze_authority": row.freeze_authority,
+                        "program_owner": row.program_owner,
+                        "is_initialized": row.is_initialized,
+                        "fetched_at": row.fetched_at,
+                    }
+                    for row in result.scalars().all()
+                ]
+            except SQLAlchemyError as e:
+                self.logger.error(f"SQLAlchemyError loading mint metadata: {e}", exc_info=True)
+                return []
+            except Exception as e:
+                self.logger.error(f"Unexpected error loading mint metadata: {e}", exc_info=True)
+                return []
+
+    async def upsert_mint_metadata(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Insert or update mint metadata rows in a single transaction.
+        
+        Args:
+            records: Dicts with at least 'mint' and 'decimals'
+            
+        Returns:
+            int: Number of rows written
+        """
+        if not records:
+            return 0
+        session = await self._get_session()
+        async with session as session:
+            async with session.begin():
+                try:
+                    mints = [r["mint"] for r in records]
+                    result = await session.execute(select(TokenMintMetadata).where(TokenMintMetadata.mint.in_(mints)))
+                    existing = {row.mint: row for row in result.scalars().all()}
+                    now = datetime.now(timezone.utc)
+                    for record in records:
+                        row = existing.get(record["mint"])
+                        if row is None:
+                            row = TokenMintMetadata(mint=record["mint"])
+                            session.add(row)
+                        row.decimals = int(record["decimals"])
+                        supply = record.get("supply")
+                        row.supply = str(supply) if supply is not None else None
+                        row.mint_authority = record.get("mint_authority")
+                        row.freeze_authority = record.get("freeze_authority")
+                        row.program_owner = record.get("program_owner")
+                        row.is_initialized = bool(record.get("is_initialized", True))
+                        row.fetched_at = record.get("fetched_at") or now
+                    self.logger.debug(f"Upserted mint metadata for {len(records)} mints")
+                    return len(records)
+                except SQLAlchemyError as e:
+                    self.logger.error(f"SQLAlchemyError upserting mint metadata: {e}", exc_info=True)
+                    await session.rollback()
+                    return 0
+                except Exception as e:
+                    self.logger.error(f"Unexpected error upserting mint metadata: {e}", exc_info=True)
+                    await session.rollback()
+                    return 0
+
     async def update_token_price(self, mint: str, price: float) -> bool:
         """
         Update the price for a single token.
@@ -18,9 +18,12 @@ from filters.dump_filter import DumpFilter
 from data.solanatracker_api import SolanaTrackerAPI
 from data.token_database import TokenDatabase
 from data.platform_tracker import PlatformTracker
-from utils.logger import get_logger
+from data.incremental_scan import IncrementalScanState
+from utils.logger import get_logger, lazy_json
 from utils.exception_handler import ExceptionHandler
 from utils.proxy_manager import ProxyManager
+from utils.rate_governor import RequestPriority
+from utils.report_cache import get_risk_report_cache
 import aiohttp
 from data.token_metrics import TokenMetrics
 from config.dexscreener_api import DexScreenerAPI
@@ -101,6 +104,9 @@ class TokenScanner:
         self.force_prequalify_mints: Set[str] = set()
         self._load_forced_prequalify_whitelist()
 
+        # Per-mint snapshot fingerprints and filter results from previous scans
+        self.scan_state = IncrementalScanState(settings)
+
         self.logger.info(f"TokenScanner initialized. Scan interval: {self.scan_interval} seconds.")
 
     def _load_forced_prequalify_whitelist(self):
@@ -210,6 +216,7 @@ class TokenScanner:
             self.logger.info("Starting token scan cycle...")
             start_time = time.time()
             scan_timestamp = datetime.now(timezone.utc) # Use a consistent timestamp for this scan cycle
+            self.scan_state.begin_scan()
 
             # 1. Fetch trending tokens (DexScreener)
             # The method get_trending_tokens returns profiles that include 'icon' and 'links'
@@ -247,11 +254,8 @@ class TokenScanner:
             # --- End Limit --- 
 
             # --- Log Raw API Output Sample (from the list that passed icon/twitter filter) ---
-            try:
-                sample_token = final_trending_list_for_details[0] if final_trending_list_for_details else {}
-                self.logger.debug(f"DexScreener Trending Token Profile (Sample, post icon/twitter filter): {json.dumps(sample_token, indent=2, default=str)}")
-            except Exception as log_e:
-                self.logger.warning(f"Could not log raw API output sample (post icon/twitter): {log_e}")
+            sample_token = final_trending_list_for_details[0] if final_trending_list_for_details else {}
+            self.logger.debug("DexScreener Trending Token Profile (Sample, post icon/twitter filter): %s", lazy_json(sample_token))
             # --- End Log Raw API Output Sample ---
 
             self.logger.info(f"Proceeding to fetch details for {len(final_trending_list_for_details)} tokens that passed icon/twitter filter and quantity limit.")
@@ -301,6 +305,7 @@ class TokenScanner:
 
             # Combine initial, detailed data, and categorize
             combined_data_tokens = []
+            unchanged_count = 0
             # Iterate through the pre_filtered_solana_tokens_for_details which contains the correct mints
             for pre_filtered_item in pre_filtered_solana_tokens_for_details: 
                 mint_from_trending = pre_filtered_item['mint'] # This is the confirmed Solana mint
@@ -325,6 +330,11 @@ class TokenScanner:
                 # Add our confirmed 'mint' (which is actual_mint_in_details) to it for convenience.
                 details_pair_object['mint'] = actual_mint_in_details # Same as mint_from_trending at this point
 
+                # Same snapshot as the last processed scan: nothing to re-filter or re-save
+                if self.scan_state.is_unchanged(details_pair_object):
+                    unchanged_count += 1
+                    continue
+
                 # Consolidate icon: Prefer details_pair_object.info.imageUrl, fallback to original_profile_data.icon
                 # original_profile_data is the PAIR object from the trending list
                 # details_pair_object is the PAIR object from the details endpoint
@@ -412,16 +422,15 @@ class TokenScanner:
                      combined_data_tokens.append(details_pair_object)
 
             current_tokens = combined_data_tokens # List now holds dicts based on 'details_pair_object'
-            self.logger.info(f"{len(current_tokens)} tokens have combined data and category.")
-            if not current_tokens: return
+            self.logger.info(f"{len(current_tokens)} tokens have combined data and category ({unchanged_count} unchanged since last scan skipped).")
+            if not current_tokens:
+                self.scan_state.end_scan()
+                self.last_scan_time = datetime.now(timezone.utc)
+                return
 
             # Log example token after DexScreener details merge
             if current_tokens:
-                try:
-                    example_output = json.dumps(current_tokens[0], indent=2, default=str)
-                    self.logger.debug(f"Example token after DexScreener merge & categorization: {example_output}")
-                except Exception as json_e:
-                     self.logger.warning(f"Could not serialize example token after DexScreener merge: {json_e}")
+                self.logger.debug("Example token after DexScreener merge & categorization: %s", lazy_json(current_tokens[0]))
 
 
             # --- Filter for Solana Tokens (REDUNDANT BLOCK - REMOVED) ---
@@ -449,6 +458,29 @@ class TokenScanner:
             # or refactor the rest of the function to use current_tokens.
             solana_tokens = current_tokens 
 
+            # Liquidity moves past RISK_CACHE_LIQUIDITY_CHANGE_PCT invalidate a mint's cached risk reports
+            report_cache = get_risk_report_cache()
+            for token in solana_tokens:
+                liquidity_usd = token.get('liquidity_usd')
+                if isinstance(liquidity_usd, (int, float)):
+                    report_cache.observe_market(token.get('mint'), liquidity=float(liquidity_usd))
+
+            # Passing results whose inputs did not change since the last scan are carried over
+            for token in solana_tokens:
+                self.scan_state.reuse_filter_results(token)
+
+            # --- Cohort Filters (vectorized threshold checks before any API calls) ---
+            cohort_rejected_count = 0
+            if solana_tokens and getattr(self.settings, 'FILTER_COHORT_ENABLED', True) and self.filter_manager.cohort_filter.enabled:
+                try:
+                    solana_tokens, cohort_rejected = self.filter_manager.apply_cohort_filters(solana_tokens)
+                    cohort_rejected_count = len(cohort_rejected)
+                    for token in cohort_rejected:
+                        self.scan_state.record(token)
+                except Exception as cohort_e:
+                    # Annotations written so far are exact; apply_filters runs whatever is missing per token
+                    self.logger.error(f"Cohort filter pass failed, continuing with per-token filters: {cohort_e}", exc_info=True)
+
             # --- Fetch Additional API Data (Sequential and Batch) ---
             # Note: Data is added directly to the dictionaries within solana_tokens
 
@@ -462,18 +494,8 @@ class TokenScanner:
                         # Call the CONCURRENT method in RugcheckAPI
                         rugcheck_scores_map = await self.rugcheck_api.get_scores_for_mints(mints_to_check)
                         
-                        # --- Debug Log for the entire result map ---
-                        try:
-                             scores_output = json.dumps(rugcheck_scores_map, indent=2, default=str)
-                             # Limit log size if very large
-                             log_limit = 3000
-                             if len(scores_output) > log_limit:
-                                 self.logger.debug(f"API Output Map - RugCheck (Partial): {scores_output[:log_limit]}...")
-                             else:
-                                 self.logger.debug(f"API Output Map - RugCheck (Full): {scores_output}")
-                        except Exception as json_e:
-                             self.logger.warning(f"Could not serialize RugCheck scores map: {json_e}")
-                        # --- End Debug Log ---
+                        # Debug log for the entire result map (serialized only when DEBUG is enabled)
+                        self.logger.debug("API Output Map - RugCheck: %s", lazy_json(rugcheck_scores_map, limit=3000))
 
                     except Exception as rug_e:
                         self.logger.error(f"Error calling RugcheckAPI.get_scores_for_mints: {rug_e}", exc_info=True)
@@ -499,11 +521,7 @@ class TokenScanner:
 
             # Log example token after RugCheck update
             if solana_tokens:
-                 try:
-                    example_output = json.dumps(solana_tokens[0], indent=2, default=str)
-                    self.logger.debug(f"Example token after RugCheck update: {example_output}")
-                 except Exception as json_e:
-                     self.logger.warning(f"Could not serialize example token after RugCheck update: {json_e}")
+                self.logger.debug("Example token after RugCheck update: %s", lazy_json(solana_tokens[0]))
 
 
             # 5. Fetch Solsniffer Data (Batch)
@@ -573,6 +591,7 @@ class TokenScanner:
                         else:
                             # This path is taken if overall_filter_passed is False
                             aborted_early_count +=1 # Count if aborted or failed critical
+                            self.scan_state.record(processed_token_data)
                             self.logger.info(f"Token {mint} did not pass initial critical filters or was aborted. Status: {processed_token_data.get('analysis_status')}")
                             # Do not add to tokens_to_save_batch if it failed critical filters
                             continue # Skip to the next token
@@ -588,7 +607,7 @@ class TokenScanner:
                         # token_data['filter_error'] = str(e)
                         # Still continue to next token
 
-                self.logger.info(f"FilterManager processing complete. Ready for DB: {len(processed_tokens_for_db)}, Aborted Early: {aborted_early_count}, Errors: {filter_application_errors}")
+                self.logger.info(f"FilterManager processing complete. Ready for DB: {len(processed_tokens_for_db)}, Aborted Early: {aborted_early_count}, Rejected by cohort filters: {cohort_rejected_count}, Errors: {filter_application_errors}")
 
             else:
                  self.logger.info("No Solana tokens remaining to apply FilterManager filters.")
@@ -596,16 +615,21 @@ class TokenScanner:
 
             # --- Prepare and Save Final Results to DB ---
             tokens_to_save_prepared = []
+            tokens_saved = []
             for token_data in processed_tokens_for_db: # Iterate over fully processed tokens
                  prepared_data = self._prepare_token_for_db(token_data, scan_timestamp) # Pass scan timestamp
                  if prepared_data:
                      tokens_to_save_prepared.append(prepared_data)
+                     tokens_saved.append(token_data)
 
             if tokens_to_save_prepared:
                 async with self._db_lock:
                     try:
                         await self.db.update_insert_token(tokens_to_save_prepared)
                         self.logger.info(f"Saved/Updated {len(tokens_to_save_prepared)} tokens to the database via update_insert_token.")
+                        # Only remembered once saved, so a failed write is retried next scan
+                        for token_data in tokens_saved:
+                            self.scan_state.record(token_data)
                     except AttributeError as db_e:
                          self.logger.error(f"TokenDatabase missing expected 'update_insert_token' method? {db_e}", exc_info=True)
                     except Exception as e:
@@ -619,6 +643,7 @@ class TokenScanner:
             if tokens_to_save_prepared:
                 await self._update_best_token_selection()
 
+            self.scan_state.end_scan()
             elapsed_time = time.time() - start_time
             self.logger.info(f"Token scan cycle completed in {elapsed_time:.2f} seconds.")
             self.last_scan_time = datetime.now(timezone.utc)
@@ -651,25 +676,10 @@ class TokenScanner:
             
         try:
             # Call the existing get_token_details method which handles list input
-            raw_details = await self.dexscreener_api.get_token_details(mints)
+            raw_details = await self.dexscreener_api.get_token_details(mints, priority=RequestPriority.DISCOVERY)
 
-            # --- ADD DEBUG LOG: Log raw API response BEFORE processing --- #
-            try:
-                # Attempt to log the full raw response (or a sample if too large)
-                raw_details_log = json.dumps(raw_details, indent=2, default=str)
-                # Limit log size if necessary (e.g., first 1000 chars)
-                log_limit = 2000
-                if len(raw_details_log) > log_limit:
-                    # --- FIX: Use triple quotes for multi-line f-string --- #
-                    self.logger.debug(f"""Raw DexScreener Details Multi Response (Sample, {len(mints)} mints):
-                    {raw_details_log[:log_limit]}... (truncated)""")
-                else:
-                    # --- FIX: Use triple quotes for multi-line f-string --- #
-                    self.logger.debug(f"""Raw DexScreener Details Multi Response ({len(mints)} mints):
-                    {raw_details_log}""")
-            except Exception as log_e:
-                self.logger.warning(f"Could not serialize/log raw DexScreener details response: {log_e}. Type: {type(raw_details)}")
-            # --- END DEBUG LOG --- #
+            # Raw API response BEFORE processing; serialized only when DEBUG is enabled (first 2000 chars)
+            self.logger.debug("Raw DexScreener Details Multi Response (%d mints):\n%s", len(mints), lazy_json(raw_details, limit=2000))
 
             # Process the response into a mint -> data map
             if isinstance(raw_details, dict) and 'pairs' in raw_details:
@@ -0,0 +1,103 @@
+"""
+Batched vault-balance reads for pool pricing.
+
+A Raydium V4 account update carries the pool's vault addresses but not their
+balances, so every update used to cost two token-account RPCs. Here every
+vault read from every pool goes through one ``MultipleAccountsBatcher``:
+reads arriving within ``VAULT_FETCH_BATCH_WINDOW`` seconds are de-duplicated
+and sent as ``getMultipleAccounts`` calls of up to 100 keys, so pool-state
+pricing costs about one RPC per window instead of two per event.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+from data.account_batcher import MAX_ACCOUNTS_PER_REQUEST, MultipleAccountsBatcher
+from data.account_layouts import decode_token_account_amount
+from utils.logger import get_logger
+from utils.rate_governor import RequestPriority
+
+logger = get_logger(__name__)
+
+
+class VaultBalanceFetcher:
+    """
+    Raw token balances of pool vaults, fetched in micro-batches.
+
+    Args:
+        settings: Application settings (RPC URL and ``VAULT_FETCH_*`` values)
+        http_client: Shared httpx.AsyncClient; the batcher creates its own if omitted
+        rpc_url: Overrides ``settings.SOLANA_RPC_URL``
+    """
+
+    def __init__(self, settings, http_client=None, rpc_url: Optional[str] = None):
+        self.settings = settings
+        self.batcher = MultipleAccountsBatcher(
+            rpc_url or getattr(settings, 'SOLANA_RPC_URL', 'https://mainnet.helius-rpc.com'),
+            http_client=http_client,
+            batch_window=float(getattr(settings, 'VAULT_FETCH_BATCH_WINDOW', 0.05)),
+            max_batch=int(getattr(settings, 'VAULT_FETCH_MAX_BATCH', MAX_ACCOUNTS_PER_REQUEST)),
+            request_timeout=float(getattr(settings, 'VAULT_FETCH_REQUEST_TIMEOUT', 10.0)),
+            name="vault_fetcher",
+            priority=RequestPriority.POSITION,  # Pool pricing for monitored tokens
+        )
+
+    async def get_balances(self, vaults: Iterable[str]) -> Dict[str, Optional[int]]:
+        """
+        Raw balances for many vaults, batched with every other read in the window.
+
+        Args:
+            vaults: Token account addresses
+
+        Returns:
+            Dict[str, Optional[int]]: vault -> raw amount (None if missing or undecodable)
+        """
+        accounts = await self.batcher.load_many(vaults)
+        return {
+            vault: decode_token_account_amount(account.get('data')) if account else None
+            for vault, account in accounts.items()
+        }
+
+    async def get_pool_reserves(self, base_vault: str, quote_vault: str) -> Optional[Tuple[int, int]]:
+        """
+        Raw (base, quote) reserves of a two-vault pool.
+
+        Returns:
+            Optional[Tuple[int, int]]: Reserves, or None if either vault could not be read
+        """
+        try:
+            balances = await self.get_balances((base_vault, quote_vault))
+        except Exception as e:
+            logger.debug(f"Vault fetch failed for {base_vault[:8]}.../{quote_vault[:8]}...: {e}")
+            return None
+        base, quote = balances.get(base_vault), balances.get(quote_vault)
+        if base is None or quote is None:
+            return None
+        return base, quote
+
+    async def calculate_raydium_v4_price(self, base_vault: str, quote_vault: str,
+                                         base_decimal: int, quote_decimal: int) -> Optional[float]:
+        """
+        Spot price of the base token in quote tokens from the pool's vault balances.
+
+        Args:
+            base_vault: Pool base-token vault
+            quote_vault: Pool quote-token vault
+            base_decimal: Base mint decimals
+            quote_decimal: Quote mint decimals
+
+        Returns:
+            Optional[float]: quote per base, or None if reserves are unavailable or empty
+        """
+        reserves = await self.get_pool_reserves(base_vault, quote_vault)
+        if reserves is None:
+            return None
+        base_raw, quote_raw = reserves
+        if base_raw <= 0 or quote_raw <= 0:
+            return None
+        return (quote_raw / (10 ** quote_decimal)) / (base_raw / (10 ** base_decimal))
+
+    async def close(self):
+        await self.batcher.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        return self.batcher.get_stats()
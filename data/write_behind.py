@@ -0,0 +1,232 @@
+"""
+Write-behind buffer for per-mint market data (price, liquidity, volume).
+
+Hot paths record updates in memory and return immediately; a background task
+flushes the dirty mints to ``TokenDatabase.write_market_updates`` as one
+``executemany`` UPDATE inside a single transaction. Updates are collapsed per
+mint while they wait:
+
+- price / liquidity: latest value wins
+- volume: increments are summed and added to ``volume_24h`` at flush time
+
+A flush is triggered every ``flush_interval`` seconds or as soon as
+``max_dirty`` mints are pending, whichever comes first. Rows of a failed flush
+are merged back into the buffer (newer values still win, volume increments are
+re-added) so nothing is lost, and ``stop()`` performs a final flush so every
+accepted update reaches the database on shutdown.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from performance.metrics_registry import get_metrics_registry
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _PendingRow:
+    """Collapsed state of one dirty mint."""
+    __slots__ = ('price', 'liquidity', 'volume_increment', 'updates')
+
+    def __init__(self):
+        self.price: Optional[float] = None
+        self.liquidity: Optional[float] = None
+        self.volume_increment: Optional[float] = None
+        self.updates = 0
+
+    def merge_older(self, older: '_PendingRow'):
+        """Fold a row that was taken before this one (values on self are newer)."""
+        if self.price is None:
+            self.price = older.price
+        if self.liquidity is None:
+            self.liquidity = older.liquidity
+        if older.volume_increment is not None:
+            self.volume_increment = (self.volume_increment or 0.0) + older.volume_increment
+        self.updates += older.updates
+
+
+class MarketWriteBehind:
+    """
+    Coalescing write-behind buffer in front of a TokenDatabase.
+
+    Args:
+        token_db: TokenDatabase exposing ``write_market_updates(rows)``
+        flush_interval: Max seconds a dirty mint waits before being written
+        max_dirty: Flush as soon as this many distinct mints are pending
+    """
+
+    def __init__(self, token_db, flush_interval: float = 1.0, max_dirty: int = 500):
+        self.token_db = token_db
+        self.flush_interval = max(0.05, float(flush_interval))
+        self.max_dirty = max(1, int(max_dirty))
+
+        self._pending: Dict[str, _PendingRow] = {}
+        self._flush_lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = False
+
+        self.stats = {
+            "updates_accepted": 0,
+            "updates_coalesced": 0,
+            "flushes": 0,
+            "rows_written": 0,
+            "flush_failures": 0,
+            "last_flush_ms": 0.0,
+            "last_flush_time": None,
+        }
+
+        registry = get_metrics_registry()
+        self._accepted_counter = registry.counter("db_write_behind_updates", "Market updates accepted by the write-behind buffer")
+        self._rows_counter = registry.counter("db_write_behind_rows_written", "Coalesced token rows written to the database")
+        self._failure_counter = registry.counter("db_write_behind_flush_failures", "Write-behind flushes that failed and were requeued")
+        self._flush_histogram = registry.histogram("db_write_behind_flush_ms", "Duration of one write-behind flush transaction")
+        self._dirty_gauge = registry.gauge("db_write_behind_dirty", "Mints waiting to be flushed")
+
+    # --- intake ---
+
+    def _row(self, mint: str) -> _PendingRow:
+        if self._stopped:
+            raise RuntimeError("MarketWriteBehind is stopped")
+        row = self._pending.get(mint)
+        if row is None:
+            row = self._pending[mint] = _PendingRow()
+            self._dirty_gauge.set(len(self._pending))
+        else:
+            self.stats["updates_coalesced"] += 1
+        row.updates += 1
+        self.stats["updates_accepted"] += 1
+        self._accepted_counter.inc()
+        return row
+
+    def _after_update(self):
+        self._ensure_started()
+        if len(self._pending) >= self.max_dirty and self._wakeup is not None:
+            self._wakeup.set()
+
+    def update_price(self, mint: str, price: float):
+        """Record the latest price of a mint."""
+        self._row(mint).price = float(price)
+        self._after_update()
+
+    def update_liquidity(self, mint: str, liquidity: float):
+        """Record the latest liquidity (USD) of a mint."""
+        self._row(mint).liquidity = float(liquidity)
+        self._after_update()
+
+    def add_volume(self, mint: str, volume_increment: float):
+        """Add traded volume to a mint; increments are summed until the next flush."""
+        row = self._row(mint)
+        row.volume_increment = (row.volume_increment or 0.0) + float(volume_increment)
+        self._after_update()
+
+    @property
+    def dirty_count(self) -> int:
+        return len(self._pending)
+
+    # --- flushing ---
+
+    def _ensure_started(self):
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop yet: the next update (or stop()) will flush
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        try:
+            while not self._stopped:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                if self._pending and not self._stopped:
+                    await self.flush()
+        except asyncio.CancelledError:
+            logger.debug("Write-behind flush loop cancelled")
+
+    async def flush(self) -> int:
+        """
+        Write every pending mint in one transaction.
+
+        Returns:
+            int: Number of token rows updated (0 on failure; rows are requeued)
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            self._dirty_gauge.set(0)
+            rows = [
+                {
+                    "mint": mint,
+                    "price": row.price,
+                    "liquidity": row.liquidity,
+                    "volume_increment": row.volume_increment,
+                }
+                for mint, row in batch.items()
+            ]
+            start = time.perf_counter()
+            try:
+                updated = await self.token_db.write_market_updates(rows)
+            except asyncio.CancelledError:
+                # The batch is already out of _pending: put it back before unwinding
+                self._requeue(batch)
+                raise
+            except Exception as e:
+                updated = None
+                logger.error(f"Write-behind flush of {len(rows)} mints failed: {e}", exc_info=True)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._flush_histogram.observe(elapsed_ms)
+            self.stats["last_flush_ms"] = elapsed_ms
+
+            if updated is None or updated < 0:
+                self._requeue(batch)
+                self.stats["flush_failures"] += 1
+                self._failure_counter.inc()
+                return 0
+
+            self.stats["flushes"] += 1
+            self.stats["rows_written"] += updated
+            self.stats["last_flush_time"] = time.time()
+            self._rows_counter.inc(updated)
+            logger.debug(f"Write-behind flushed {len(rows)} mints ({updated} rows) in {elapsed_ms:.1f}ms")
+            return updated
+
+    def _requeue(self, batch: Dict[str, _PendingRow]):
+        """Merge a failed batch back under updates that arrived during the flush."""
+        for mint, older in batch.items():
+            newer = self._pending.get(mint)
+            if newer is None:
+                self._pending[mint] = older
+            else:
+                newer.merge_older(older)
+        self._dirty_gauge.set(len(self._pending))
+
+    async def stop(self):
+        """Stop the flush loop and write everything still pending."""
+        self._stopped = True
+        if self._task is not None and not self._task.done():
+            # Let an in-flight flush finish instead of cancelling it mid-write
+            self._wakeup.set()
+            await self._task
+        self._task = None
+        for _ in range(2):
+            if not self._pending:
+                break
+            await self.flush()
+        if self._pending:
+            logger.error(f"Write-behind shutdown flush failed, {len(self._pending)} mints not persisted")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus the current dirty count."""
+        stats = dict(self.stats)
+        stats["dirty"] = len(self._pending)
+        stats["running"] = self._task is not None and not self._task.done()
+        return stats
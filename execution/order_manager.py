@@ -7,6 +7,7 @@ from dotenv import load_dotenv
 # import hashlib # Not needed if WalletManager handles key loading
 import json
 import asyncio
+import time
 from datetime import datetime, timezone
 import base64
 import httpx # Use httpx for async http requests
@@ -24,6 +25,10 @@ from data.token_database import TokenDatabase # Assuming this has update_trade_s
 from config.settings import Settings
 from utils.logger import get_logger
 from utils.circuit_breaker import CircuitBreaker, CircuitBreakerType
+from utils.rpc_pool import get_rpc_pool
+from utils.rate_governor import RequestPriority, get_rate_governor
+from performance.metrics_registry import get_metrics_registry
+from execution.swap_prefetcher import SwapPrefetcher
 
 # Import Wallet components
 from wallet.wallet_manager import WalletManager
@@ -83,6 +88,7 @@ class OrderManager:
         self.solana_client = solana_client # Use the passed client
         self.http_client = http_client # Use the passed client
         self.settings = settings
+        self.rate_governor = get_rate_governor(settings) # Shared request-rate budget across API clients
         self.db = db
         self.wallet_manager = wallet_manager # Store WalletManager
         self.trade_validator = trade_validator # Store TradeValidator
@@ -120,7 +126,7 @@ class OrderManager:
         self.order_history = {}     # Track order history
         
         # Trade execution state
-        self._execution_lock = asyncio.Lock()  # Prevent concurrent executions
+        self._mint_locks: Dict[str, asyncio.Lock] = {}  # One swap at a time per traded mint
         self._pending_trades = set()  # Track trades in progress
 
         # Initialize circuit breaker with settings
@@ -133,6 +139,13 @@ class OrderManager:
             on_reset=self._on_circuit_breaker_reset
         )
 
+        # Pre-built swap transactions for the active mint (live trading only)
+        self.swap_prefetcher: Optional[SwapPrefetcher] = None
+        if self.settings.EXECUTION_PREFETCH_ENABLED and not self.settings.PAPER_TRADING_ENABLED:
+            self.swap_prefetcher = SwapPrefetcher(self, self.settings, get_rpc_pool(self.settings, primary_client=solana_client))
+        self._signal_to_send_histogram = get_metrics_registry().histogram(
+            "order_signal_to_send_ms", "Time from trade signal to transaction send", ("path",))
+
         # Call state initialization (can be awaited later if needed)
         # asyncio.create_task(self.initialize_state()) # Or call explicitly from main
 
@@ -151,15 +164,31 @@ class OrderManager:
         self.transaction_tracker = transaction_tracker
         self.logger.info("TransactionTracker instance set for OrderManager.")
 
+    def prepare_swap(self, mint: str, slippage_bps: Optional[int] = None):
+        """Start pre-building SOL -> mint swap transactions so a buy signal only needs a sign and a send."""
+        if self.swap_prefetcher:
+            self.swap_prefetcher.watch(mint, slippage_bps)
+
+    def release_swap(self, mint: str):
+        """Stop pre-building swap transactions for a mint."""
+        if self.swap_prefetcher:
+            self.swap_prefetcher.unwatch(mint)
+
     # _sign_transaction removed as WalletManager handles keys
 
     async def _fetch_jupiter_quote(self,
                                  input_mint: str,
                                  output_mint: str,
                                  amount_atomic: int,
-                                 slippage_bps: Optional[int] = None
+                                 slippage_bps: Optional[int] = None,
+                                 priority: int = RequestPriority.EXECUTION
                                 ) -> Optional[Dict[str, Any]]:
-        """Fetches a swap quote from the Jupiter API."""
+        """
+        Fetches a swap quote from the Jupiter API.
+
+        Requests below EXECUTION priority (swap prefetching) are made once, logged at
+        DEBUG and do not count towards the circuit breaker.
+        """
         if self.circuit_breaker.check():
             logger.warning("Circuit breaker active. Skipping Jupiter quote fetch.")
             return None
@@ -179,12 +208,16 @@ class OrderManager:
         # TODO: Consider Jupiter v6 'priorityFeeLamports': 'auto' or specific value for priority fees
         # TODO: Consider Jupiter v6 'dynamicComputeUnitLimit': true instead of manual limits/price for dynamic CUs
 
-        self.logger.info(f"Fetching Jupiter quote: {amount_atomic} {input_mint} -> {output_mint} (Slippage: {slippage_val}bps)")
-        retries = 3
+        background = priority > RequestPriority.EXECUTION
+        log_progress = self.logger.debug if background else self.logger.info
+        log_progress(f"Fetching Jupiter quote: {amount_atomic} {input_mint} -> {output_mint} (Slippage: {slippage_val}bps)")
+        retries = 1 if background else 3
         delay = 1
         for attempt in range(retries):
             try:
-                response = await self.http_client.get(url, params=params, timeout=20.0)
+                async with self.rate_governor.slot("jupiter", "default", None, priority) as slot:
+                    response = await self.http_client.get(url, params=params, timeout=20.0)
+                    slot.record(response.status_code, response.headers.get("Retry-After"))
                 response.raise_for_status() # Raise HTTP errors
                 quote_data = response.json()
                 self.logger.debug(f"Jupiter quote response: {json.dumps(quote_data, indent=2)}")
@@ -192,9 +225,13 @@ class OrderManager:
                 if not quote_data or 'outAmount' not in quote_data:
                     self.logger.error("Invalid quote response received from Jupiter.")
                     return None
-                self.logger.info(f"Received Jupiter quote: In {quote_data.get('inAmount')} -> Out {quote_data.get('outAmount')}")
+                log_progress(f"Received Jupiter quote: In {quote_data.get('inAmount')} -> Out {quote_data.get('outAmount')}")
                 return quote_data
             except (httpx.HTTPStatusError, httpx.RequestError, httpx.TimeoutException) as e: # Catch retryable errors
+                if background:
+                    # The governor has already slowed down on a 429; the prefetcher retries on its next round
+                    logger.debug(f"Background Jupiter quote failed: {e}")
+                    return None
                 logger.warning(f"Attempt {attempt + 1}/{retries} failed fetching Jupiter quote: {e}")
                 if attempt == retries - 1:
                     error_body = "Unknown error"
@@ -211,12 +248,18 @@ class OrderManager:
                 await asyncio.sleep(delay * (2 ** attempt))
             except Exception as e:
                 self.logger.error(f"Unexpected error fetching Jupiter quote: {e}", exc_info=True)
-                self.circuit_breaker.increment_failures()
+                if not background:
+                    self.circuit_breaker.increment_failures()
                 return None # Don't retry unexpected errors
         return None # Should not be reached
 
-    async def _get_jupiter_swap_tx(self, quote_response: Dict[str, Any], **kwargs) -> Optional[str]:
-        """Gets the serialized transaction for a given Jupiter quote response."""
+    async def _get_jupiter_swap_tx(self, quote_response: Dict[str, Any],
+                                   priority: int = RequestPriority.EXECUTION, **kwargs) -> Optional[str]:
+        """
+        Gets the serialized transaction for a given Jupiter quote response.
+
+        Background (below EXECUTION priority) requests behave as in _fetch_jupiter_quote.
+        """
         if self.circuit_breaker.check():
             logger.warning("Circuit breaker active. Skipping Jupiter swap transaction fetch.")
             return None
@@ -260,12 +303,15 @@ class OrderManager:
             payload["computeUnitPriceMicroLamports"] = self.compute_unit_price_micro_lamports
         # --- End Override Logic --- 
 
-        self.logger.info(f"Requesting Jupiter swap transaction with payload: {payload}")
-        retries = 3
+        background = priority > RequestPriority.EXECUTION
+        (self.logger.debug if background else self.logger.info)(f"Requesting Jupiter swap transaction with payload: {payload}")
+        retries = 1 if background else 3
         delay = 1
         for attempt in range(retries):
             try:
-                response = await self.http_client.post(url, json=payload, timeout=30.0)
+                async with self.rate_governor.slot("jupiter", "default", None, priority) as slot:
+                    response = await self.http_client.post(url, json=payload, timeout=30.0)
+                    slot.record(response.status_code, response.headers.get("Retry-After"))
                 response.raise_for_status()
                 swap_data = response.json()
                 self.logger.debug(f"Jupiter swap response: {json.dumps(swap_data, indent=2)}")
@@ -277,6 +323,9 @@ class OrderManager:
 
                 return swap_data["swapTransaction"] # This is the base64 encoded Versioned Tx
             except (httpx.HTTPStatusError, httpx.RequestError, httpx.TimeoutException) as e:
+                if background:
+                    logger.debug(f"Background Jupiter swap transaction request failed: {e}")
+                    return None
                 logger.warning(f"Attempt {attempt + 1}/{retries} failed getting Jupiter swap tx: {e}")
                 if attempt == retries - 1:
                     error_body = "Unknown error"
@@ -293,12 +342,26 @@ class OrderManager:
                 await asyncio.sleep(delay * (2 ** attempt))
             except Exception as e:
                 self.logger.error(f"Unexpected error getting Jupiter swap tx: {e}", exc_info=True)
-                self.circuit_breaker.increment_failures()
+                if not background:
+                    self.circuit_breaker.increment_failures()
                 return None # Don't retry unexpected errors
         return None # Should not be reached
 
     async def _sign_and_send_jupiter_tx(self, swap_tx_base64: str) -> Optional[str]:
         """Signs and sends the base64 encoded transaction from Jupiter."""
+        try:
+            # Decode and deserialize the transaction
+            tx_bytes = base64.b64decode(swap_tx_base64)
+            versioned_tx = VersionedTransaction.from_bytes(tx_bytes)
+            self.logger.debug("Successfully deserialized Jupiter transaction.")
+        except ValueError as e:
+             self.logger.error(f"Value error processing Jupiter transaction (decode/deserialize): {e}", exc_info=True)
+             self.circuit_breaker.increment_failures()
+             return None
+        return await self._sign_and_send_versioned_tx(versioned_tx)
+
+    async def _sign_and_send_versioned_tx(self, versioned_tx: VersionedTransaction) -> Optional[str]:
+        """Signs an unsigned Jupiter VersionedTransaction with the wallet keypair and sends it."""
         if self.circuit_breaker.check():
             logger.warning("Circuit breaker active. Skipping transaction signing and sending.")
             return None
@@ -309,23 +372,9 @@ class OrderManager:
             return None
 
         try:
-            # Decode and deserialize the transaction
-            tx_bytes = base64.b64decode(swap_tx_base64)
-            versioned_tx = VersionedTransaction.from_bytes(tx_bytes)
-            self.logger.debug("Successfully deserialized Jupiter transaction.")
-
-            # Sign the transaction message using the keypair
-            message_bytes = versioned_tx.message.serialize()
-            signature = keypair.sign_message(message_bytes)
-
-            # Versioned transactions have a list of signatures. The fee payer's is first.
-            # Jupiter's tx usually has one empty signature placeholder. Replace it.
-            if len(versioned_tx.signatures) == 1:
-                versioned_tx.signatures[0] = signature
-            else:
-                # Fallback if structure is different (shouldn't happen with V6)
-                versioned_tx.signatures = [signature] + versioned_tx.signatures[1:]
-
+            # The wallet is the fee payer and only signer of a Jupiter swap; signing
+            # through the constructor replaces the empty signature placeholder.
+            versioned_tx = VersionedTransaction(versioned_tx.message, [keypair])
             self.logger.debug("Successfully signed Jupiter transaction.")
 
             # Define transaction options
@@ -345,7 +394,7 @@ class OrderManager:
             self.circuit_breaker.increment_failures()
             return None
         except ValueError as e:
-             self.logger.error(f"Value error processing Jupiter transaction (decode/deserialize): {e}", exc_info=True)
+             self.logger.error(f"Value error signing Jupiter transaction: {e}", exc_info=True)
              self.circuit_breaker.increment_failures()
              return None
         except Exception as e:
@@ -353,6 +402,14 @@ class OrderManager:
             self.circuit_breaker.increment_failures()
             return None
             
+    def _mint_lock(self, input_mint: str, output_mint: str) -> asyncio.Lock:
+        """Lock for the non-SOL side of a swap; swaps on different mints run concurrently."""
+        mint = output_mint if input_mint == self.settings.SOL_MINT else input_mint
+        lock = self._mint_locks.get(mint)
+        if lock is None:
+            lock = self._mint_locks[mint] = asyncio.Lock()
+        return lock
+
     async def execute_jupiter_swap(
         self,
         trade_id: int,
@@ -362,16 +419,25 @@ class OrderManager:
         input_decimals: int,
         slippage_bps: Optional[int] = None,
         priority_fee_override: Optional[int] = None,
-        slippage_bps_override: Optional[int] = None
+        slippage_bps_override: Optional[int] = None,
+        signal_time: Optional[float] = None
     ) -> Optional[str]:
-        """Executes a swap via Jupiter API or simulates if paper trading is enabled."""
-            
-        async with self._execution_lock:
-            if trade_id in self._pending_trades:
-                logger.warning(f"Trade {trade_id} is already being processed. Skipping duplicate execution.")
-                return None
-            self._pending_trades.add(trade_id)
+        """Executes a swap via Jupiter API or simulates if paper trading is enabled.
 
+        ``signal_time`` is the ``time.monotonic()`` at which the trade signal fired; it
+        defaults to the call time and feeds the signal-to-send histogram.
+
+        Swaps on the same traded mint run one at a time; swaps on different mints overlap.
+        """
+        if signal_time is None:
+            signal_time = time.monotonic()
+
+        if trade_id in self._pending_trades:
+            logger.warning(f"Trade {trade_id} is already being processed. Skipping duplicate execution.")
+            return None
+        self._pending_trades.add(trade_id)
+
+        async with self._mint_lock(input_mint, output_mint):
             try:
                 # Check if paper trading is enabled
                 if self.paper_trader and self.settings.PAPER_TRADING_ENABLED:
@@ -445,34 +511,48 @@ class OrderManager:
                     )
                     if not can_trade:
                         logger.error(f"Trade {trade_id} failed validation: {validation_msg}")
-                    return None
+                        return None
                 
-                # Get quote with retries
-                quote = await self._fetch_jupiter_quote(
-                    input_mint=input_mint,
-                    output_mint=output_mint,
+                # Use a pre-built transaction when one matches this exact swap
+                template = None
+                if self.swap_prefetcher and not priority_fee_override:
+                    template = self.swap_prefetcher.take(
+                        input_mint, output_mint, input_amount_atomic, slippage_bps or self.slippage_bps)
+
+                if template:
+                    logger.info(f"Trade {trade_id} using pre-built swap transaction "
+                                f"(quote age {time.monotonic() - template.fetched_at:.2f}s)")
+                    signature = await self._sign_and_send_versioned_tx(
+                        self.swap_prefetcher.with_recent_blockhash(template.transaction))
+                else:
+                    # Get quote with retries
+                    quote = await self._fetch_jupiter_quote(
+                        input_mint=input_mint,
+                        output_mint=output_mint,
                         amount_atomic=input_amount_atomic,
-                    slippage_bps=slippage_bps or self.slippage_bps
-                )
-                
-                if not quote:
-                    logger.error(f"Failed to get quote for trade {trade_id}")
-                    return None
-                
-                # Get swap transaction
-                swap_tx = await self._get_jupiter_swap_tx(
-                    quote_response=quote,
-                    priority_fee_override=priority_fee_override
-                )
-                
-                if not swap_tx:
-                    logger.error(f"Failed to get swap transaction for trade {trade_id}")
-                    return None
-                
-                # Sign and send transaction
-                signature = await self._sign_and_send_jupiter_tx(swap_tx)
+                        slippage_bps=slippage_bps or self.slippage_bps
+                    )
+
+                    if not quote:
+                        logger.error(f"Failed to get quote for trade {trade_id}")
+                        return None
+
+                    # Get swap transaction
+                    swap_tx = await self._get_jupiter_swap_tx(
+                        quote_response=quote,
+                        priority_fee_override=priority_fee_override
+                    )
+
+                    if not swap_tx:
+                        logger.error(f"Failed to get swap transaction for trade {trade_id}")
+                        return None
+
+                    # Sign and send transaction
+                    signature = await self._sign_and_send_jupiter_tx(swap_tx)
                 
                 if signature:
+                    self._signal_to_send_histogram.labels(path="template" if template else "fetch").observe(
+                        (time.monotonic() - signal_time) * 1000)
                     # Update trade status and track transaction
                     await self.db.update_trade_status(trade_id, "pending", signature)
                     if self.transaction_tracker:
@@ -524,7 +604,9 @@ class OrderManager:
         """Closes any resources owned by OrderManager."""
         # Since http_client is shared, we don't close it here.
         # If OrderManager created other resources (e.g., specific listeners), close them.
-        logger.info("OrderManager closed (no owned resources).")
+        if self.swap_prefetcher:
+            await self.swap_prefetcher.close()
+        logger.info("OrderManager closed.")
 
     # --- Position and Order Management (DB Interaction) ---
 
@@ -0,0 +1,347 @@
+"""
+Central signature-status poller for transaction confirmation.
+
+Instead of one retry loop per signature, every pending signature is collected
+into batched ``getSignatureStatuses`` calls (up to 256 signatures per request)
+on a short tick. Callers ``await wait_for(signature)`` and get the status once
+the signature reaches the target commitment or fails on-chain, so the RPC call
+count per tick stays flat however many trades are in flight.
+
+With ``ws_url`` set, each watched signature is also sent as a
+``signatureSubscribe`` on one shared WebSocket. Whichever path sees the result
+first resolves the waiters. Polling keeps running alongside, in case a
+notification is missed or the socket drops.
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import websockets
+from solders.signature import Signature
+
+from data.json_codec import JSON_DECODE_ERRORS, loads
+from performance.metrics_registry import get_metrics_registry
+from utils.logger import get_logger
+from utils.rate_governor import RequestPriority
+
+logger = get_logger(__name__)
+
+MAX_SIGNATURES_PER_REQUEST = 256
+COMMITMENT_RANK = {"processed": 0, "confirmed": 1, "finalized": 2}
+
+
+def normalize_commitment(value: Any) -> Optional[str]:
+    """``"processed"``/``"confirmed"``/``"finalized"`` from a string or a solders ``TransactionConfirmationStatus``."""
+    if value is None:
+        return None
+    name = str(value).rsplit(".", 1)[-1].lower()
+    return name if name in COMMITMENT_RANK else None
+
+
+@dataclass
+class SignatureStatus:
+    """Status of one signature, from a ``getSignatureStatuses`` poll (``rpc``) or a ``signatureNotification`` (``ws``)."""
+    signature: str
+    slot: Optional[int]
+    err: Any
+    confirmation_status: Optional[str]
+    source: str = "rpc"
+
+    def reached(self, commitment: str) -> bool:
+        """True once the signature is at ``commitment`` or deeper."""
+        if self.confirmation_status is None:
+            return False
+        return COMMITMENT_RANK[self.confirmation_status] >= COMMITMENT_RANK.get(commitment, 1)
+
+
+class SignatureStatusPoller:
+    """
+    Confirms signatures with batched status polls and an optional WebSocket subscription.
+
+    Args:
+        rpc_pool: RpcPool the ``getSignatureStatuses`` batches are sent through
+        commitment: Target commitment that resolves a waiter
+        interval: Seconds between polls while any signature is watched
+        max_batch: Signatures per ``getSignatureStatuses`` request (RPC max 256)
+        ws_url: WebSocket RPC URL for ``signatureSubscribe``; None disables the WebSocket path
+        priority: RequestPriority of the status polls in the shared rate governor
+    """
+
+    def __init__(self, rpc_pool, commitment: str = "confirmed", interval: float = 0.4,
+                 max_batch: int = MAX_SIGNATURES_PER_REQUEST, ws_url: Optional[str] = None,
+                 priority: int = RequestPriority.EXECUTION):
+        self.rpc_pool = rpc_pool
+        self.commitment = normalize_commitment(commitment) or "confirmed"
+        self.interval = interval
+        self.max_batch = max(1, min(max_batch, MAX_SIGNATURES_PER_REQUEST))
+        self.ws_url = ws_url
+        self.priority = priority
+
+        self._watched: Dict[str, asyncio.Future] = {}
+        self._waiter_counts: Dict[str, int] = {}
+        self._latest: Dict[str, SignatureStatus] = {}
+        self._poll_task: Optional[asyncio.Task] = None
+        self._ws_task: Optional[asyncio.Task] = None
+        self._ws = None
+        self._ws_ids = itertools.count(1)
+        self._ws_requests: Dict[int, str] = {}      # request id -> signature (awaiting subscription id)
+        self._ws_subscriptions: Dict[int, str] = {}  # subscription id -> signature
+        self._counters: Dict[str, int] = {'polls': 0, 'requests': 0, 'resolved_rpc': 0, 'resolved_ws': 0,
+                                          'poll_errors': 0, 'ws_reconnects': 0}
+
+        registry = get_metrics_registry()
+        self._requests_counter = registry.counter(
+            "signature_poller_requests", "getSignatureStatuses requests sent by the central poller")
+        self._resolved_counter = registry.counter(
+            "signature_poller_resolved", "Signatures resolved, by source", ("source",))
+        self._pending_gauge = registry.gauge("signature_poller_pending", "Signatures currently watched")
+        self._batch_histogram = registry.histogram(
+            "signature_poller_batch_size", "Signatures per poll tick",
+            buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512))
+
+    # --- Waiting ---
+
+    async def wait_for(self, signature: str, timeout: Optional[float] = None) -> SignatureStatus:
+        """
+        Wait until ``signature`` reaches the target commitment or fails on-chain.
+
+        Concurrent waiters on the same signature share one watch.
+
+        Raises:
+            asyncio.TimeoutError: if no final status arrives within ``timeout`` seconds
+            ValueError: if ``signature`` is not a valid base58 signature
+        """
+        Signature.from_string(signature)
+        future = self._watched.get(signature)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._watched[signature] = future
+            self._pending_gauge.set(len(self._watched))
+            self._ws_send_subscribe(signature)
+        self._waiter_counts[signature] = self._waiter_counts.get(signature, 0) + 1
+        self._ensure_tasks()
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        finally:
+            self._release(signature)
+
+    def _release(self, signature: str):
+        remaining = self._waiter_counts.get(signature, 1) - 1
+        if remaining > 0:
+            self._waiter_counts[signature] = remaining
+            return
+        self._waiter_counts.pop(signature, None)
+        self._watched.pop(signature, None)
+        self._latest.pop(signature, None)
+        self._pending_gauge.set(len(self._watched))
+        self._ws_send_unsubscribe(signature)
+        if not self._watched and self._ws_task is not None:
+            self._ws_task.cancel()
+            self._ws_task = None
+
+    def latest_status(self, signature: str) -> Optional[SignatureStatus]:
+        """Most recent (possibly not yet final) status seen for a watched signature."""
+        return self._latest.get(signature)
+
+    def _ensure_tasks(self):
+        loop = asyncio.get_running_loop()
+        if self._poll_task is None:
+            self._poll_task = loop.create_task(self._poll_loop())
+        if self.ws_url and self._ws_task is None:
+            self._ws_task = loop.create_task(self._ws_loop())
+
+    def _deliver(self, status: SignatureStatus):
+        future = self._watched.get(status.signature)
+        if future is None or future.done():
+            return
+        self._latest[status.signature] = status
+        if status.err is not None or status.reached(self.commitment):
+            future.set_result(status)
+            self._counters[f"resolved_{status.source}"] += 1
+            self._resolved_counter.labels(status.source).inc()
+
+    # --- Polling ---
+
+    async def fetch_statuses(self, signatures: Iterable[str],
+                             search_transaction_history: bool = False) -> Dict[str, Optional[SignatureStatus]]:
+        """
+        Statuses of ``signatures`` in batched ``getSignatureStatuses`` calls.
+
+        Returns:
+            Dict[str, Optional[SignatureStatus]]: None for signatures the RPC does not know (or that are invalid)
+        """
+        results: Dict[str, Optional[SignatureStatus]] = {}
+        valid: List[str] = []
+        for signature in dict.fromkeys(signatures):
+            try:
+                Signature.from_string(signature)
+                valid.append(signature)
+            except ValueError:
+                logger.warning(f"Skipping invalid signature in status batch: {signature}")
+                results[signature] = None
+
+        batches = [valid[i:i + self.max_batch] for i in range(0, len(valid), self.max_batch)]
+        responses = await asyncio.gather(*(self._fetch_batch(batch, search_transaction_history) for batch in batches))
+        for batch_results in responses:
+            results.update(batch_results)
+        return results
+
+    async def _fetch_batch(self, batch: List[str], search_transaction_history: bool) -> Dict[str, Optional[SignatureStatus]]:
+        self._counters['requests'] += 1
+        self._requests_counter.inc()
+        kwargs = {'search_transaction_history': True} if search_transaction_history else {}
+        response = await self.rpc_pool.call(
+            "get_signature_statuses", [Signature.from_string(sig) for sig in batch],
+            hedge=True, priority=self.priority, **kwargs
+        )
+        values = list(getattr(response, 'value', None) or [])
+        results: Dict[str, Optional[SignatureStatus]] = {}
+        for index, signature in enumerate(batch):
+            value = values[index] if index < len(values) else None
+            results[signature] = None if value is None else SignatureStatus(
+                signature=signature,
+                slot=getattr(value, 'slot', None),
+                err=getattr(value, 'err', None),
+                confirmation_status=normalize_commitment(getattr(value, 'confirmation_status', None)),
+            )
+        return results
+
+    async def _poll_loop(self):
+        try:
+            while self._watched:
+                started = time.monotonic()
+                signatures = [sig for sig, future in self._watched.items() if not future.done()]
+                if signatures:
+                    self._counters['polls'] += 1
+                    self._batch_histogram.observe(len(signatures))
+                    try:
+                        statuses = await self.fetch_statuses(signatures)
+                    except Exception as e:
+                        self._counters['poll_errors'] += 1
+                        logger.warning(f"Signature status poll for {len(signatures)} signature(s) failed: {e}")
+                        statuses = {}
+                    for status in statuses.values():
+                        if status is not None:
+                            self._deliver(status)
+                await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        finally:
+            self._poll_task = None
+
+    # --- WebSocket ---
+
+    async def _ws_loop(self):
+        delay = 1.0
+        ws = None
+        try:
+            while self._watched:
+                try:
+                    async with websockets.connect(self.ws_url, ping_interval=20, ping_timeout=20) as ws:
+                        self._ws = ws
+                        self._ws_requests.clear()
+                        self._ws_subscriptions.clear()
+                        for signature, future in list(self._watched.items()):
+                            if not future.done():
+                                self._ws_send_subscribe(signature)
+                        delay = 1.0
+                        async for raw in ws:
+                            self._handle_ws_message(raw)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self._counters['ws_reconnects'] += 1
+                    logger.warning(f"signatureSubscribe WebSocket error: {e}. Reconnecting in {delay:.0f}s (polling continues)")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30.0)
+                finally:
+                    if self._ws is ws:
+                        self._ws = None
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self._ws_task is asyncio.current_task():
+                self._ws_task = None
+
+    def _ws_send(self, payload: Dict[str, Any]):
+        if self._ws is None:
+            return
+        asyncio.ensure_future(self._ws.send(json.dumps(payload))).add_done_callback(
+            lambda task: task.cancelled() or task.exception())  # Send failures surface as a reconnect
+
+    def _ws_send_subscribe(self, signature: str):
+        if self._ws is None:
+            return
+        request_id = next(self._ws_ids)
+        self._ws_requests[request_id] = signature
+        self._ws_send({"jsonrpc": "2.0", "id": request_id, "method": "signatureSubscribe",
+                       "params": [signature, {"commitment": self.commitment}]})
+
+    def _ws_send_unsubscribe(self, signature: str):
+        for subscription_id, subscribed in list(self._ws_subscriptions.items()):
+            if subscribed == signature:
+                del self._ws_subscriptions[subscription_id]
+                self._ws_send({"jsonrpc": "2.0", "id": next(self._ws_ids), "method": "signatureUnsubscribe",
+                               "params": [subscription_id]})
+
+    def _handle_ws_message(self, raw: Any):
+        try:
+            message = loads(raw)
+        except JSON_DECODE_ERRORS:
+            logger.debug(f"Ignoring non-JSON signatureSubscribe frame: {str(raw)[:200]}")
+            return
+        if not isinstance(message, dict):
+            return
+
+        request_id = message.get("id")
+        if request_id in self._ws_requests:
+            signature = self._ws_requests.pop(request_id)
+            if "result" in message and signature in self._watched:
+                self._ws_subscriptions[message["result"]] = signature
+            elif "error" in message:
+                logger.debug(f"signatureSubscribe rejected for {signature}: {message['error']}")
+            return
+
+        if message.get("method") != "signatureNotification":
+            return
+        params = message.get("params") or {}
+        # Signature subscriptions are cancelled by the node after the first notification
+        signature = self._ws_subscriptions.pop(params.get("subscription"), None)
+        result = params.get("result") or {}
+        value = result.get("value")
+        if signature is None or not isinstance(value, dict):
+            return
+        self._deliver(SignatureStatus(
+            signature=signature,
+            slot=(result.get("context") or {}).get("slot"),
+            err=value.get("err"),
+            confirmation_status=self.commitment,
+            source="ws",
+        ))
+
+    # --- Lifecycle ---
+
+    async def close(self):
+        """Stop polling and the WebSocket; pending waiters are cancelled."""
+        for future in self._watched.values():
+            if not future.done():
+                future.cancel()
+        for task in (self._poll_task, self._ws_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._poll_task = None
+        self._ws_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'watched': len(self._watched),
+            'ws_connected': self._ws is not None,
+            'ws_subscriptions': len(self._ws_subscriptions),
+            **self._counters,
+        }
@@ -0,0 +1,291 @@
+"""
+Pre-built Jupiter swap transactions for the active mint.
+
+While a mint is watched, quotes and swap transactions for SOL -> mint are
+fetched ahead of time at the configured SOL size buckets and kept for a short
+validity window. A background task keeps a recent blockhash from the RPC pool,
+which is swapped into a template's message just before signing, so a trade
+that matches a bucket only needs a sign and a send when the signal fires.
+Jupiter's swap transaction creates the output token account when it is
+missing, using the mint's own token program, so no ATA is prepared here.
+Jupiter requests go through the rate governor at DISCOVERY priority, so live
+trades are served first; a round with failed refreshes doubles the wait before
+the next one.
+"""
+
+import asyncio
+import base64
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from solders.hash import Hash
+from solders.message import MessageV0
+from solders.transaction import VersionedTransaction
+
+from performance.metrics_registry import get_metrics_registry
+from utils.logger import get_logger
+from utils.rate_governor import RequestPriority
+from utils.rpc_pool import get_rpc_pool
+
+logger = get_logger(__name__)
+
+TemplateKey = Tuple[str, str, int, int]
+
+# Upper bound on the refresh wait after repeated failed rounds (seconds)
+MAX_REFRESH_BACKOFF = 60.0
+
+
+def parse_size_buckets(value: Any) -> List[float]:
+    """Positive SOL sizes from a comma-separated setting, sorted and de-duplicated."""
+    sizes = set()
+    for part in str(value or "").split(","):
+        try:
+            size = float(part.strip())
+        except ValueError:
+            continue
+        if size > 0:
+            sizes.add(size)
+    return sorted(sizes)
+
+
+@dataclass
+class SwapTemplate:
+    """An unsigned Jupiter swap transaction with the quote it was built from."""
+    input_mint: str
+    output_mint: str
+    amount_atomic: int
+    slippage_bps: int
+    quote: Dict[str, Any]
+    transaction: VersionedTransaction
+    fetched_at: float
+    expires_at: float
+
+    @property
+    def key(self) -> TemplateKey:
+        return (self.input_mint, self.output_mint, self.amount_atomic, self.slippage_bps)
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.monotonic()) >= self.expires_at
+
+
+class SwapPrefetcher:
+    """
+    Keeps swap templates and a rolling recent blockhash for OrderManager.
+
+    Args:
+        order_manager: OrderManager whose Jupiter quote/swap calls build the templates
+        settings: Application settings (EXECUTION_PREFETCH_* and EXECUTION_BLOCKHASH_*)
+        rpc_pool: RpcPool used for ``getLatestBlockhash``; defaults to the global pool
+    """
+
+    def __init__(self, order_manager, settings, rpc_pool=None):
+        self.order_manager = order_manager
+        self.settings = settings
+        self.rpc_pool = rpc_pool or get_rpc_pool()
+        self.sol_mint = str(settings.SOL_MINT)
+        self.size_buckets_sol = parse_size_buckets(getattr(settings, 'EXECUTION_PREFETCH_SIZES_SOL', ''))
+        self.quote_ttl = max(0.5, float(getattr(settings, 'EXECUTION_PREFETCH_QUOTE_TTL', 5.0)))
+        self.blockhash_interval = max(0.2, float(getattr(settings, 'EXECUTION_BLOCKHASH_REFRESH_INTERVAL', 2.0)))
+        self.blockhash_max_age = float(getattr(settings, 'EXECUTION_BLOCKHASH_MAX_AGE', 30.0))
+
+        self._templates: Dict[TemplateKey, SwapTemplate] = {}
+        self._watched: Dict[str, int] = {}  # mint -> slippage_bps
+        self._blockhash: Optional[Hash] = None
+        self._blockhash_at = 0.0
+        self._blockhash_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+        registry = get_metrics_registry()
+        self._lookups = registry.counter(
+            "swap_prefetch_lookups", "Swap template lookups at execution time", ("result",))
+        self._refresh_histogram = registry.histogram(
+            "swap_prefetch_refresh_ms", "Time to fetch one quote and swap transaction template")
+        self._blockhash_age_gauge = registry.gauge(
+            "swap_prefetch_blockhash_age_s", "Age of the cached recent blockhash when last used")
+
+    # --- Blockhash ---
+
+    def start(self) -> None:
+        """Start the blockhash refresher (idempotent)."""
+        if self._blockhash_task is None or self._blockhash_task.done():
+            self._blockhash_task = asyncio.create_task(self._blockhash_loop())
+
+    async def _blockhash_loop(self) -> None:
+        while True:
+            try:
+                response = await self.rpc_pool.call("get_latest_blockhash", priority=RequestPriority.EXECUTION)
+                self._blockhash = response.value.blockhash
+                self._blockhash_at = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"SwapPrefetcher: blockhash refresh failed: {e}")
+            await asyncio.sleep(self.blockhash_interval)
+
+    def current_blockhash(self) -> Optional[Hash]:
+        """The cached blockhash, or None when missing or older than EXECUTION_BLOCKHASH_MAX_AGE."""
+        if self._blockhash is None:
+            return None
+        age = time.monotonic() - self._blockhash_at
+        if age > self.blockhash_max_age:
+            return None
+        self._blockhash_age_gauge.set(age)
+        return self._blockhash
+
+    def with_recent_blockhash(self, transaction: VersionedTransaction) -> VersionedTransaction:
+        """
+        Rebuild an unsigned v0 transaction around the cached blockhash.
+
+        Returns the transaction unchanged when no fresh blockhash is cached or the
+        message is not v0. Only valid while the wallet is the sole signer, which is
+        the case for Jupiter swap transactions.
+        """
+        blockhash = self.current_blockhash()
+        message = transaction.message
+        if blockhash is None or not isinstance(message, MessageV0):
+            return transaction
+        if message.recent_blockhash == blockhash:
+            return transaction
+        rebuilt = MessageV0(
+            message.header,
+            message.account_keys,
+            blockhash,
+            message.instructions,
+            message.address_table_lookups,
+        )
+        return VersionedTransaction.populate(rebuilt, transaction.signatures)
+
+    # --- Templates ---
+
+    def watch(self, mint: str, slippage_bps: Optional[int] = None) -> None:
+        """Start keeping templates for SOL -> ``mint`` at every size bucket. Must be called from the event loop."""
+        if not self.size_buckets_sol or mint == self.sol_mint:
+            return
+        self._watched[mint] = slippage_bps if slippage_bps is not None else self.order_manager.slippage_bps
+        self.start()
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+        self._wakeup.set()
+        logger.info(f"SwapPrefetcher: watching {mint} at {self.size_buckets_sol} SOL")
+
+    def unwatch(self, mint: str) -> None:
+        """Stop refreshing ``mint`` and drop its templates."""
+        if self._watched.pop(mint, None) is None:
+            return
+        for key in [k for k in self._templates if mint in (k[0], k[1])]:
+            del self._templates[key]
+        logger.info(f"SwapPrefetcher: stopped watching {mint}")
+
+    def take(self, input_mint: str, output_mint: str, amount_atomic: int,
+             slippage_bps: int) -> Optional[SwapTemplate]:
+        """
+        Remove and return the unexpired template for exactly this swap, if any.
+
+        A template is handed out once; the refresh loop builds its replacement.
+        """
+        template = self._templates.pop((input_mint, output_mint, amount_atomic, slippage_bps), None)
+        if template is None or template.expired():
+            self._lookups.labels(result="miss").inc()
+            if template is not None:
+                self._wakeup.set()
+            return None
+        self._lookups.labels(result="hit").inc()
+        self._wakeup.set()
+        return template
+
+    def _amount_atomic(self, size_sol: float) -> int:
+        return int(size_sol * 10**9)
+
+    async def _refresh_template(self, mint: str, size_sol: float, slippage_bps: int) -> bool:
+        """Rebuild one template; False when Jupiter did not return a usable quote or transaction."""
+        started = time.monotonic()
+        amount_atomic = self._amount_atomic(size_sol)
+        quote = await self.order_manager._fetch_jupiter_quote(
+            input_mint=self.sol_mint,
+            output_mint=mint,
+            amount_atomic=amount_atomic,
+            slippage_bps=slippage_bps,
+            priority=RequestPriority.DISCOVERY,
+        )
+        if not quote:
+            return False
+        swap_tx = await self.order_manager._get_jupiter_swap_tx(
+            quote_response=quote, priority=RequestPriority.DISCOVERY)
+        if not swap_tx:
+            return False
+        if self._watched.get(mint) != slippage_bps:
+            return True  # Unwatched or re-watched meanwhile; not a Jupiter failure
+        try:
+            transaction = VersionedTransaction.from_bytes(base64.b64decode(swap_tx))
+        except ValueError as e:
+            logger.warning(f"SwapPrefetcher: could not decode swap transaction for {mint}: {e}")
+            return False
+        fetched_at = time.monotonic()
+        template = SwapTemplate(
+            input_mint=self.sol_mint,
+            output_mint=mint,
+            amount_atomic=amount_atomic,
+            slippage_bps=slippage_bps,
+            quote=quote,
+            transaction=transaction,
+            fetched_at=fetched_at,
+            expires_at=fetched_at + self.quote_ttl,
+        )
+        self._templates[template.key] = template
+        self._refresh_histogram.observe((fetched_at - started) * 1000)
+        return True
+
+    async def _refresh_loop(self) -> None:
+        """Rebuild templates before they expire while any mint is watched."""
+        failed_rounds = 0
+        while self._watched:
+            self._wakeup.clear()
+            now = time.monotonic()
+            # Refresh anything missing or past half its validity window
+            stale = []
+            for mint, slippage in list(self._watched.items()):
+                for size in self.size_buckets_sol:
+                    template = self._templates.get((self.sol_mint, mint, self._amount_atomic(size), slippage))
+                    if template is None or now - template.fetched_at >= self.quote_ttl / 2:
+                        stale.append((mint, size, slippage))
+            if stale:
+                results = await asyncio.gather(
+                    *(self._refresh_template(*args) for args in stale), return_exceptions=True)
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.warning(f"SwapPrefetcher: template refresh failed: {result}")
+                if all(result is True for result in results):
+                    failed_rounds = 0
+                else:
+                    # Jupiter is throttling or failing; back off instead of hammering it
+                    failed_rounds += 1
+                    logger.debug(f"SwapPrefetcher: {sum(r is not True for r in results)}/{len(results)} "
+                                 f"refreshes failed, backing off (round {failed_rounds})")
+            wait = min(self.quote_ttl / 2 * 2 ** failed_rounds, max(MAX_REFRESH_BACKOFF, self.quote_ttl / 2))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def close(self) -> None:
+        """Stop background tasks and drop all templates."""
+        self._watched.clear()
+        self._templates.clear()
+        tasks = [t for t in (self._blockhash_task, self._refresh_task) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._blockhash_task = self._refresh_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "watched_mints": list(self._watched),
+            "size_buckets_sol": self.size_buckets_sol,
+            "templates": len(self._templates),
+            "valid_templates": sum(1 for t in self._templates.values() if not t.expired(now)),
+            "blockhash": str(self._blockhash) if self._blockhash else None,
+            "blockhash_age_s": round(now - self._blockhash_at, 3) if self._blockhash else None,
+        }
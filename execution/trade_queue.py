@@ -1,10 +1,16 @@
 import asyncio
+import heapq
+import itertools
 import logging
-from typing import Dict, List, Optional, Any, Callable, TYPE_CHECKING
-from datetime import datetime
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Any, Callable, Set, Tuple, TYPE_CHECKING
+from datetime import datetime, timezone
 from dataclasses import dataclass
 from enum import Enum
 
+from data.mint_metadata import get_mint_metadata_service
+from performance.metrics_registry import get_metrics_registry
 from utils.logger import get_logger
 from utils.circuit_breaker import CircuitBreaker, CircuitBreakerType
 
@@ -26,20 +32,46 @@ class TradeRequest:
     metadata: Dict[str, Any]
     callback: Optional[Callable] = None
 
+@dataclass
+class _QueuedTrade:
+    """A trade request waiting in its mint's FIFO, with its enqueue time for wait metrics."""
+    request: TradeRequest
+    enqueued_at: float
+
+
 class TradeQueue:
     """
     Manages a prioritized queue of trade requests with proper execution handling.
+    
+    Trades for different mints run concurrently on up to ``max_concurrency`` workers;
+    trades for the same mint run one at a time in arrival order. Mints with queued
+    work wait in a heap keyed by (highest queued ``TradePriority``, request timestamp),
+    so a HIGH trade jumps the line across mints without overtaking earlier trades
+    for its own mint. Circuit breakers are checked when a trade is dispatched.
+
+    ``TradeRequest.amount`` is a token quantity. Trades execute through
+    ``OrderManager.execute_jupiter_swap``: a buy spends ``amount`` times the mint's
+    SOL price (or ``metadata['amount_sol']``), a sell sells ``amount`` tokens.
     """
     
-    def __init__(self, order_manager: 'OrderManager'):
+    def __init__(self, order_manager: 'OrderManager', max_concurrency: int = 4):
         """
         Initialize the trade queue.
         
         Args:
             order_manager: OrderManager instance for executing trades
+            max_concurrency: Maximum number of trades (on distinct mints) executing at once
         """
         self.order_manager = order_manager
-        self.queue: List[TradeRequest] = []
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.queue: Dict[str, Deque[_QueuedTrade]] = {}  # Per-mint FIFO of pending trades
+        self._ready: List[Tuple[int, float, int, str, int]] = []  # (-priority, timestamp, seq, mint, version)
+        self._ready_version: Dict[str, int] = {}  # Latest heap entry per mint; older entries are stale
+        self._running: Set[str] = set()  # Mints with a trade executing
+        self._tasks: Set[asyncio.Task] = set()
+        self._sequence = itertools.count()
+        self._trade_ids = itertools.count(int(time.time() * 1000))  # Used when metadata carries no trade_id
+        self._wakeup: Optional[asyncio.Event] = None
         self.processing = False
         self.circuit_breaker = CircuitBreaker(
             breaker_type=CircuitBreakerType.COMPONENT,
@@ -64,7 +96,15 @@ class TradeQueue:
         # Token-specific circuit breakers
         self.token_circuit_breakers: Dict[str, CircuitBreaker] = {}
         
-        logger.info("TradeQueue initialized")
+        registry = get_metrics_registry()
+        self._wait_histogram = registry.histogram(
+            "trade_queue_wait_ms", "Time from enqueue to dispatch", ("priority",))
+        self._execution_histogram = registry.histogram(
+            "trade_queue_execution_ms", "Trade execution time", ("side",))
+        self._depth_gauge = registry.gauge("trade_queue_depth", "Trades waiting to be dispatched")
+        self._running_gauge = registry.gauge("trade_queue_running", "Trades currently executing")
+        
+        logger.info(f"TradeQueue initialized (max concurrency: {self.max_concurrency})")
     
     def _on_circuit_breaker_activate(self) -> None:
         """Callback when main circuit breaker activates."""
@@ -149,16 +189,20 @@ class TradeQueue:
                 logger.warning(f"Token circuit breaker active for {trade_request.token_address}, rejecting trade")
                 return False
             
-            # Add to queue
-            self.queue.append(trade_request)
-            self.queue.sort(key=lambda x: (x.priority.value, -x.timestamp.timestamp()), reverse=True)
-            self.metrics["queue_size"] = len(self.queue)
+            # Add to the mint's FIFO and (re)rank the mint
+            mint = trade_request.token_address
+            self.queue.setdefault(mint, deque()).append(_QueuedTrade(trade_request, time.monotonic()))
+            self._schedule_mint(mint)
+            self._update_queue_size()
             
             logger.info(f"Added trade request to queue: {trade_request}")
             
             # Start processing if not already running
             if not self.processing:
+                self.processing = True
                 asyncio.create_task(self._process_queue())
+            elif self._wakeup is not None:
+                self._wakeup.set()
             
             return True
             
@@ -166,62 +210,72 @@ class TradeQueue:
             logger.error(f"Error adding trade to queue: {e}", exc_info=True)
             return False
     
-    async def _process_queue(self):
-        """Process the trade queue."""
-        if self.processing:
+    def _queued_count(self) -> int:
+        return sum(len(trades) for trades in self.queue.values())
+    
+    def _update_queue_size(self) -> None:
+        self.metrics["queue_size"] = self._queued_count()
+        self._depth_gauge.set(self.metrics["queue_size"])
+    
+    def _schedule_mint(self, mint: str) -> None:
+        """Push ``mint`` onto the ready heap, ranked by its most urgent queued trade."""
+        trades = self.queue.get(mint)
+        if not trades or mint in self._running:
             return
-        
+        priority = max(queued.request.priority.value for queued in trades)
+        version = self._ready_version.get(mint, 0) + 1
+        self._ready_version[mint] = version
+        heapq.heappush(self._ready, (-priority, trades[0].request.timestamp.timestamp(), next(self._sequence), mint, version))
+    
+    def _pop_ready_mint(self) -> Optional[str]:
+        """Next mint to dispatch, skipping stale heap entries."""
+        while self._ready:
+            _, _, _, mint, version = heapq.heappop(self._ready)
+            if version == self._ready_version.get(mint) and mint not in self._running and self.queue.get(mint):
+                return mint
+        return None
+    
+    async def _process_queue(self):
+        """Dispatch queued trades to concurrent workers until the queue is drained."""
         self.processing = True
+        self._wakeup = asyncio.Event()
         logger.info("Starting trade queue processing")
         
         try:
-            while self.queue:
-                # Check main circuit breaker
+            while self._ready or self._tasks:
+                self._wakeup.clear()
+                
+                # Check main circuit breaker; queued trades stay queued until the next add_trade
                 if self.circuit_breaker.check():
                     logger.warning("Main circuit breaker active, pausing queue processing")
                     break
                 
-                trade_request = self.queue[0]
-                
-                # Check strategy and token circuit breakers
-                strategy_cb = self._get_strategy_circuit_breaker(trade_request.strategy_id)
-                token_cb = self._get_token_circuit_breaker(trade_request.token_address)
-                
-                if strategy_cb.check() or token_cb.check():
-                    logger.warning(f"Skipping trade due to circuit breaker: {trade_request}")
-                    self.queue.pop(0)
-                    continue
-                
-                # Process trade
-                start_time = datetime.now()
-                success = await self._execute_trade(trade_request)
-                
-                # Update metrics
-                processing_time = (datetime.now() - start_time).total_seconds()
-                self.metrics["total_processing_time"] += processing_time
-                self.metrics["total_trades"] += 1
-                if success:
-                    self.metrics["successful_trades"] += 1
-                else:
-                    self.metrics["failed_trades"] += 1
-                
-                self.metrics["avg_processing_time"] = (
-                    self.metrics["total_processing_time"] / self.metrics["total_trades"]
-                )
-                
-                # Remove processed trade
-                self.queue.pop(0)
-                self.metrics["queue_size"] = len(self.queue)
-                
-                # Notify callback if provided
-                if trade_request.callback:
-                    try:
-                        await trade_request.callback(success)
-                    except Exception as e:
-                        logger.error(f"Error in trade callback: {e}", exc_info=True)
+                while len(self._tasks) < self.max_concurrency:
+                    mint = self._pop_ready_mint()
+                    if mint is None:
+                        break
+                    queued = self.queue[mint].popleft()
+                    trade_request = queued.request
+                    
+                    # Check strategy and token circuit breakers at dispatch time
+                    strategy_cb = self._get_strategy_circuit_breaker(trade_request.strategy_id)
+                    token_cb = self._get_token_circuit_breaker(trade_request.token_address)
+                    if strategy_cb.check() or token_cb.check():
+                        logger.warning(f"Skipping trade due to circuit breaker: {trade_request}")
+                        self._finish_mint(mint)
+                        await self._notify_callback(trade_request, False)
+                        continue
+                    
+                    self._wait_histogram.labels(trade_request.priority.name).observe(
+                        (time.monotonic() - queued.enqueued_at) * 1000)
+                    self._running.add(mint)
+                    task = asyncio.create_task(self._run_trade(trade_request))
+                    self._tasks.add(task)
+                    self._running_gauge.set(len(self._tasks))
+                self._update_queue_size()
                 
-                # Small delay between trades
-                await asyncio.sleep(1)
+                if self._tasks or self._ready:
+                    await self._wakeup.wait()
         
         except Exception as e:
             logger.error(f"Error processing trade queue: {e}", exc_info=True)
@@ -229,8 +283,56 @@ class TradeQueue:
         
         finally:
             self.processing = False
+            self._wakeup = None
             logger.info("Trade queue processing completed")
     
+    def _finish_mint(self, mint: str) -> None:
+        """Release ``mint`` after a trade and requeue it if more trades are waiting."""
+        self._running.discard(mint)
+        if self.queue.get(mint):
+            self._schedule_mint(mint)
+        else:
+            self.queue.pop(mint, None)
+            self._ready_version.pop(mint, None)
+    
+    async def _run_trade(self, trade_request: TradeRequest) -> None:
+        """Execute one trade on a worker slot, record metrics and wake the dispatcher."""
+        start_time = time.monotonic()
+        success = False
+        try:
+            success = await self._execute_trade(trade_request)
+        finally:
+            # Update metrics
+            processing_time = time.monotonic() - start_time
+            self._execution_histogram.labels("buy" if trade_request.is_buy else "sell").observe(processing_time * 1000)
+            self.metrics["total_processing_time"] += processing_time
+            self.metrics["total_trades"] += 1
+            if success:
+                self.metrics["successful_trades"] += 1
+            else:
+                self.metrics["failed_trades"] += 1
+            
+            self.metrics["avg_processing_time"] = (
+                self.metrics["total_processing_time"] / self.metrics["total_trades"]
+            )
+            
+            # Free the worker slot before waking the dispatcher (done callbacks run too late for it)
+            self._tasks.discard(asyncio.current_task())
+            self._finish_mint(trade_request.token_address)
+            self._running_gauge.set(len(self._tasks))
+            if self._wakeup is not None:
+                self._wakeup.set()
+        
+        await self._notify_callback(trade_request, success)
+    
+    async def _notify_callback(self, trade_request: TradeRequest, success: bool) -> None:
+        """Notify callback if provided."""
+        if trade_request.callback:
+            try:
+                await trade_request.callback(success)
+            except Exception as e:
+                logger.error(f"Error in trade callback: {e}", exc_info=True)
+    
     async def _execute_trade(self, trade_request: TradeRequest) -> bool:
         """
         Execute a single trade request.
@@ -249,18 +351,8 @@ class TradeQueue:
                 return False
             
             # Execute trade
-            if trade_request.is_buy:
-                result = await self.order_manager.execute_buy(
-                    token_address=trade_request.token_address,
-                    amount_usd=trade_request.amount,
-                    metadata=trade_request.metadata
-                )
-            else:
-                result = await self.order_manager.execute_sell(
-                    token_address=trade_request.token_address,
-                    amount_usd=trade_request.amount,
-                    metadata=trade_request.metadata
-                )
+            swap = await self._swap_arguments(trade_request)
+            result = await self.order_manager.execute_jupiter_swap(**swap) if swap else None
             
             if result:
                 logger.info(f"Trade executed successfully: {trade_request}")
@@ -277,6 +369,54 @@ class TradeQueue:
             self._get_token_circuit_breaker(trade_request.token_address).increment_failures()
             return False
     
+    async def _swap_arguments(self, trade_request: TradeRequest) -> Optional[Dict[str, Any]]:
+        """
+        Translate a trade request into ``OrderManager.execute_jupiter_swap`` arguments.
+        
+        Returns:
+            Keyword arguments, or None if the SOL amount or token decimals cannot be determined
+        """
+        settings = self.order_manager.settings
+        mint = trade_request.token_address
+        metadata = trade_request.metadata or {}
+        
+        if trade_request.is_buy:
+            amount_sol = metadata.get('amount_sol')
+            if amount_sol is None:
+                price_sol = await self.order_manager.price_monitor.get_current_price_sol(mint)
+                if not price_sol or price_sol <= 0:
+                    logger.error(f"No SOL price for {mint}; cannot size buy {trade_request}")
+                    return None
+                amount_sol = trade_request.amount * price_sol
+            input_mint, output_mint, input_amount, input_decimals = settings.SOL_MINT, mint, amount_sol, 9
+        else:
+            input_decimals = metadata.get('decimals')
+            if input_decimals is None:
+                service = get_mint_metadata_service()
+                if service is not None:
+                    input_decimals = await service.get_decimals(mint)
+            if input_decimals is None:
+                if not settings.PAPER_TRADING_ENABLED:
+                    logger.error(f"Unknown decimals for {mint}; cannot size sell {trade_request}")
+                    return None
+                input_decimals = 9  # Paper trades work in token units and ignore decimals
+            input_mint, output_mint, input_amount = mint, settings.SOL_MINT, trade_request.amount
+        
+        # TradeRequest timestamps are wall-clock; execute_jupiter_swap measures on the monotonic clock
+        timestamp = trade_request.timestamp
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        signal_age = (datetime.now(timezone.utc) - timestamp).total_seconds()
+        return {
+            "trade_id": metadata.get('trade_id') or next(self._trade_ids),
+            "input_mint": input_mint,
+            "output_mint": output_mint,
+            "input_amount": input_amount,
+            "input_decimals": input_decimals,
+            "slippage_bps": metadata.get('slippage_bps'),
+            "signal_time": time.monotonic() - max(signal_age, 0.0),
+        }
+    
     def get_queue_status(self) -> Dict[str, Any]:
         """
         Get current status of the trade queue.
@@ -285,9 +425,17 @@ class TradeQueue:
             Dictionary with queue status information
         """
         return {
-            "queue_size": len(self.queue),
+            "queue_size": self._queued_count(),
+            "running": len(self._tasks),
+            "max_concurrency": self.max_concurrency,
             "processing": self.processing,
             "metrics": self.metrics,
+            "wait_ms": {
+                priority.name: self._wait_histogram.labels(priority.name).snapshot() for priority in TradePriority
+            },
+            "execution_ms": {
+                side: self._execution_histogram.labels(side).snapshot() for side in ("buy", "sell")
+            },
             "circuit_breaker_status": {
                 "main": self.circuit_breaker.is_active(),
                 "strategies": {
@@ -302,9 +450,11 @@ class TradeQueue:
         }
     
     def clear_queue(self) -> None:
-        """Clear all pending trades from the queue."""
+        """Clear all pending trades from the queue (trades already executing run to completion)."""
         self.queue.clear()
-        self.metrics["queue_size"] = 0
+        self._ready.clear()
+        self._ready_version.clear()
+        self._update_queue_size()
         logger.info("Trade queue cleared")
     
     async def close(self) -> None:
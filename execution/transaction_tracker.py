@@ -10,15 +10,15 @@ from datetime import datetime, timezone
 from solana.rpc.async_api import AsyncClient
 from solders.signature import Signature
 from solana.rpc.types import TxOpts  # Changed from solders
-from solana.rpc.commitment import Commitment, Confirmed, Processed # Changed from solders
-from solana.rpc.core import RPCException # Changed import location again
-from solders.transaction_status import TransactionConfirmationStatus
 
 # Import settings and database
 from config.settings import Settings
 from utils.circuit_breaker import CircuitBreaker, CircuitBreakerType
 from data.token_database import TokenDatabase # Explicitly import for type hint
 from utils.logger import get_logger
+from utils.rate_governor import RequestPriority
+from utils.rpc_pool import get_rpc_pool
+from execution.signature_poller import SignatureStatus, SignatureStatusPoller
 from sqlalchemy import text # Added import
 from data.models import Trade as TradeModel # Import the specific model if needed for type hinting
 
@@ -38,6 +38,17 @@ class TransactionTracker:
         self.base_retry_delay = getattr(self.settings, 'TX_CONFIRM_DELAY_SECONDS', 1.0)
         self.confirmation_commitment = "confirmed"
         self.solana_client = solana_client
+        self.rpc_pool = get_rpc_pool(self.settings, primary_client=solana_client)  # Hedged status/transaction reads
+        # One batched getSignatureStatuses poll (plus optional signatureSubscribe) for every pending signature.
+        # The confirmation deadline matches the old per-signature retry schedule.
+        self.confirm_timeout = sum(min(self.base_retry_delay * (1.5 ** attempt), 30) for attempt in range(self.max_retries))
+        self.signature_poller = SignatureStatusPoller(
+            self.rpc_pool,
+            commitment=self.confirmation_commitment,
+            interval=getattr(self.settings, 'SIGNATURE_POLLER_INTERVAL', 0.4),
+            max_batch=getattr(self.settings, 'SIGNATURE_POLLER_MAX_BATCH', 256),
+            ws_url=getattr(self.settings, 'SOLANA_WSS_URL', None) if getattr(self.settings, 'SIGNATURE_POLLER_WS_ENABLED', False) else None,
+        )
         self.db = db
         
         # Initialize circuit breaker with more lenient settings
@@ -103,7 +114,9 @@ class TransactionTracker:
                     
                 self._pending_transactions[tx_hash] = {
                     'trade_id': trade_id,
-                    'status': 'pending'
+                    'status': 'pending',
+                    'start_time': datetime.now().isoformat(),
+                    'attempts': 0
                 }
                 
                 # Update trade status in database
@@ -129,9 +142,16 @@ class TransactionTracker:
 
             self.logger.info(f"Checking status for {len(pending_trades)} pending trade(s)...")
             
+            # One batched getSignatureStatuses lookup for every pending signature
+            signatures = [
+                trade.transaction_hash for trade in pending_trades
+                if trade.transaction_hash and not trade.transaction_hash.startswith("PAPER_TRADE_SUCCESS_")
+            ]
+            statuses = await self.signature_poller.fetch_statuses(signatures, search_transaction_history=True) if signatures else {}
+            
             # Prepare tasks for checking each transaction
             tasks = [
-                self._check_single_transaction(trade)
+                self._check_single_transaction(trade, statuses.get(trade.transaction_hash))
                 for trade in pending_trades
             ]
             
@@ -151,8 +171,8 @@ class TransactionTracker:
             self.logger.error(f"Error fetching or processing pending trades: {e}", exc_info=True)
             self.circuit_breaker.increment_failures()
 
-    async def _check_single_transaction(self, trade: TradeModel) -> bool:
-        """Check status of a single transaction signature."""
+    async def _check_single_transaction(self, trade: TradeModel, status: Optional[SignatureStatus] = None) -> bool:
+        """Apply the status of a single transaction signature (from the batched lookup) to its trade."""
         tx_hash = trade.transaction_hash
         trade_id = trade.id
 
@@ -170,18 +190,14 @@ class TransactionTracker:
             return True
 
         try:
-            # Use Solana client to get transaction status
             self.logger.debug(f"Checking signature: {tx_hash} for trade {trade_id}")
-            response = await self.solana_client.get_signature_statuses([tx_hash], search_transaction_history=True)
-            
-            if not response or not response['result'] or not response['result']['value'] or response['result']['value'][0] is None:
+            if status is None:
                 self.logger.warning(f"Could not get status for signature {tx_hash} (trade {trade_id}). Still pending or TX not found?")
                 # Decide if we should retry later or mark as potentially failed after N attempts
                 return False
                 
-            status = response['result']['value'][0]
-            confirmation_status = status.get('confirmationStatus')
-            err = status.get('err')
+            confirmation_status = status.confirmation_status
+            err = status.err
             
             self.logger.debug(f"Signature {tx_hash} status: Confirmation='{confirmation_status}', Error='{err}'")
 
@@ -226,10 +242,13 @@ class TransactionTracker:
         try:
             # Fetch the full transaction details
             # Adjust encoding and commitment level as needed
-            tx_response = await self.solana_client.get_transaction(
+            tx_response = await self.rpc_pool.call(
+                "get_transaction",
                 tx_hash, 
                 encoding='jsonParsed', 
-                max_supported_transaction_version=0 # Specify version if needed
+                max_supported_transaction_version=0, # Specify version if needed
+                hedge=True,
+                priority=RequestPriority.EXECUTION
             )
             
             if not tx_response or not tx_response['result']:
@@ -357,7 +376,14 @@ class TransactionTracker:
             logger.error(f"Error during _log_confirmed_trade for trade_id {trade_id}: {e}", exc_info=True)
 
     async def _confirm_tx_with_retries(self, trade_id: int, tx_hash: str):
-        """Attempts to confirm a transaction signature with retries and exponential backoff."""
+        """
+        Waits for a transaction signature to reach the confirmation commitment.
+
+        The signature is handed to the shared SignatureStatusPoller, which checks all
+        pending signatures in batched getSignatureStatuses calls on a short tick
+        instead of running one backoff loop per signature. The deadline equals the
+        old retry schedule (TX_CONFIRM_MAX_RETRIES / TX_CONFIRM_DELAY_SECONDS).
+        """
         if tx_hash not in self._pending_transactions:
             logger.warning(f"Transaction {tx_hash} not found in pending transactions. Starting new tracking.")
             await self.track_transaction(tx_hash, trade_id)
@@ -374,96 +400,67 @@ class TransactionTracker:
             return
 
         start_time = time.monotonic()
-        for attempt in range(self.max_retries):
-            delay = self.base_retry_delay * (1.5 ** attempt)
-            max_delay = 30
-            actual_delay = min(delay, max_delay)
-
-            if attempt > 0:
-                logger.debug(f"Retrying confirmation for {tx_hash} (Attempt {attempt + 1}/{self.max_retries}), waiting {actual_delay:.2f}s...")
-                await asyncio.sleep(actual_delay)
-
-            try:
-                status_response = await self.solana_client.get_signature_statuses([signature])
-
-                if not status_response or not status_response.value or status_response.value[0] is None:
-                    logger.debug(f"Transaction {tx_hash} not yet found (Attempt {attempt + 1}).")
-                    continue
-
-                tx_status = status_response.value[0]
+        try:
+            # Resolved by the shared poller's batched status calls (or signatureSubscribe)
+            tx_status = await self.signature_poller.wait_for(tx_hash, timeout=self.confirm_timeout)
+        except asyncio.TimeoutError:
+            elapsed = time.monotonic() - start_time
+            timeout_message = f"Confirmation timed out after {elapsed:.2f}s."
+            logger.critical(f"{timeout_message} (Trade ID: {trade_id}, Tx: {tx_hash}).")
+            await self._update_trade_status(trade_id, 'failed', timeout_message)
+            self._record_transaction_history(tx_hash, 'failed', timeout_message)
+            return
+        except Exception as e:
+            logger.error(f"Unexpected error confirming tx {tx_hash}: {e}", exc_info=True)
+            await self._update_trade_status(trade_id, 'failed', f"Unexpected confirmation error: {str(e)[:100]}")
+            self._record_transaction_history(tx_hash, 'failed', str(e))
+            return
 
-                if tx_status.err:
-                    error_message = f"Transaction failed on-chain: {tx_status.err}"
-                    logger.warning(f"{error_message} (Trade ID: {trade_id}, Tx: {tx_hash})")
-                    await self._update_trade_status(trade_id, 'failed', error_message)
-                    self._record_transaction_history(tx_hash, 'failed', error_message)
-                    return
+        if tx_status.err is not None:
+            error_message = f"Transaction failed on-chain: {tx_status.err}"
+            logger.warning(f"{error_message} (Trade ID: {trade_id}, Tx: {tx_hash})")
+            await self._update_trade_status(trade_id, 'failed', error_message)
+            self._record_transaction_history(tx_hash, 'failed', error_message)
+            return
 
-                current_commitment = tx_status.confirmation_status
-                target_reached = False
-                
-                if self.confirmation_commitment == Commitment.Processed:
-                    target_reached = True
-                elif self.confirmation_commitment == Commitment.Confirmed:
-                    target_reached = current_commitment in [TransactionConfirmationStatus.Confirmed, TransactionConfirmationStatus.Finalized]
-                elif self.confirmation_commitment == Commitment.Finalized:
-                    target_reached = current_commitment == TransactionConfirmationStatus.Finalized
-
-                if current_commitment:
-                    logger.debug(f"Tx {tx_hash} status: {current_commitment} (Target: {self.confirmation_commitment})")
-                    
-                    if target_reached and self.confirmation_commitment != Commitment.Processed:
-                        elapsed = time.monotonic() - start_time
-                        logger.info(f"Transaction {tx_hash} confirmed successfully at {current_commitment} level for trade ID {trade_id} after {elapsed:.2f}s.")
-                        
-                        # Get actual output amount if possible
-                        actual_output_amount = await self._get_transaction_output_amount(signature, trade_id)
-                        
-                        # Update trade status
-                        update_ok = await self._update_trade_status(trade_id, 'confirmed', actual_output_amount=actual_output_amount)
-                        
-                        if update_ok:
-                            logger.info(f"Triggering position update for confirmed trade {trade_id}...")
-                            # Log the trade (BUY or SELL) before updating position
-                            await self._log_confirmed_trade(trade_id, tx_hash, actual_output_amount)
-                            
-                            pos_update_ok = await self.db.update_position_from_trade(trade_id)
-                            if not pos_update_ok:
-                                logger.critical(f"CRITICAL: Trade {trade_id} status set to 'confirmed', but position update failed!")
-                            else:
-                                logger.error(f"Failed to update trade {trade_id} status to 'confirmed' in DB.")
-                            
-                        self._record_transaction_history(tx_hash, 'confirmed', None, actual_output_amount)
-                        return
-                        
-                    elif target_reached:
-                        logger.info(f"Transaction {tx_hash} reached Processed state for trade {trade_id}.")
-                        self._record_transaction_history(tx_hash, 'processed')
-                        return
-
-            except RPCException as e: # Catch RPCException from core
-                logger.warning(f"RPC error checking status for {tx_hash} (Attempt {attempt + 1}): {e}")
-            except asyncio.TimeoutError:
-                logger.warning(f"Timeout checking status for {tx_hash} (Attempt {attempt + 1}). Retrying...")
-            except Exception as e:
-                logger.error(f"Unexpected error confirming tx {tx_hash}: {e}", exc_info=True)
-                await self._update_trade_status(trade_id, 'failed', f"Unexpected confirmation error: {str(e)[:100]}")
-                self._record_transaction_history(tx_hash, 'failed', str(e))
-                return
+        if self.confirmation_commitment == "processed":
+            logger.info(f"Transaction {tx_hash} reached Processed state for trade {trade_id}.")
+            self._record_transaction_history(tx_hash, 'processed')
+            return
 
         elapsed = time.monotonic() - start_time
-        timeout_message = f"Confirmation timed out after {self.max_retries} retries ({elapsed:.2f}s)."
-        logger.critical(f"{timeout_message} (Trade ID: {trade_id}, Tx: {tx_hash}).")
-        await self._update_trade_status(trade_id, 'failed', timeout_message)
-        self._record_transaction_history(tx_hash, 'failed', timeout_message)
+        logger.info(f"Transaction {tx_hash} confirmed successfully at {tx_status.confirmation_status} level for trade ID {trade_id} after {elapsed:.2f}s (via {tx_status.source}).")
+        
+        # Get actual output amount if possible
+        actual_output_amount = await self._get_transaction_output_amount(signature, trade_id)
+        
+        # Update trade status
+        update_ok = await self._update_trade_status(trade_id, 'confirmed', actual_output_amount=actual_output_amount)
+        
+        if update_ok:
+            logger.info(f"Triggering position update for confirmed trade {trade_id}...")
+            # Log the trade (BUY or SELL) before updating position
+            await self._log_confirmed_trade(trade_id, tx_hash, actual_output_amount)
+            
+            pos_update_ok = await self.db.update_position_from_trade(trade_id)
+            if not pos_update_ok:
+                logger.critical(f"CRITICAL: Trade {trade_id} status set to 'confirmed', but position update failed!")
+        else:
+            logger.error(f"Failed to update trade {trade_id} status to 'confirmed' in DB.")
+            
+        self._record_transaction_history(tx_hash, 'confirmed', None, actual_output_amount)
 
     async def _get_transaction_output_amount(self, signature: Signature, trade_id: int) -> Optional[float]:
         """Attempts to get the actual output amount from a confirmed transaction."""
         try:
-            tx_details_response = await self.solana_client.get_transaction(
+            tx_details_response = await self.rpc_pool.call(
+                "get_transaction",
                 signature,
                 max_supported_transaction_version=0,
-                commitment=self.confirmation_commitment
+                commitment=self.confirmation_commitment,
+                hedge=True,
+                accept=lambda response: response is not None and response.value is not None,
+                priority=RequestPriority.EXECUTION
             )
             
             if tx_details_response and tx_details_response.value:
@@ -609,4 +606,5 @@ class TransactionTracker:
 
     async def close(self):
         """Clean up resources."""
-        self.logger.info("Closing TransactionTracker")
\ No newline at end of file
+        self.logger.info("Closing TransactionTracker")
+        await self.signature_poller.close()
\ No newline at end of file
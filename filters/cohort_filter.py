@@ -0,0 +1,251 @@
+"""
+Cohort (batch) evaluation of the threshold filters over a whole scan.
+
+``LiquidityFilter``, ``VolumeFilter``, ``DumpFilter``, ``WhaleFilter`` and
+``MoonshotFilter`` are pure comparisons of numeric token fields against
+settings thresholds. Instead of awaiting each filter once per token,
+``CohortFilter`` extracts the fields of every scanned token into columns once,
+evaluates each filter as a numpy mask and annotates the tokens with exactly the
+dicts the per-token ``analyze_token`` would have produced (same keys, reasons and
+early-exit order). Tokens flagged here can never pass ``FilterManager`` (any
+flagged filter fails the token), so they are dropped before the network filters
+and the API prefetches; survivors keep their ``<name>_analysis`` annotations,
+which ``FilterEngine`` treats as already done.
+
+Rows whose fields the per-token code would not compare as plain numbers (None,
+strings, ...) are left undecided for that filter and go through the normal
+per-token path, so error handling stays identical.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from performance.metrics_registry import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# Evaluated in FilterManager order
+COHORT_FILTERS = ('liquidity', 'volume', 'dump', 'whale', 'moonshot')
+
+# (decided mask, flagged mask, row -> analysis dict)
+Evaluation = Tuple[np.ndarray, np.ndarray, Callable[[int], Dict[str, Any]]]
+
+
+def _column(values: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Float column plus a mask of rows that hold plain numbers (int/float/bool)."""
+    ok = [isinstance(v, (int, float)) for v in values]
+    column = np.array([v if o else np.nan for v, o in zip(values, ok)], dtype=float)
+    return column, np.array(ok, dtype=bool)
+
+
+def _liquidity_values(token: Dict[str, Any]) -> Tuple[Any, Any]:
+    """Liquidity and market cap exactly as LiquidityFilter.analyze_token reads them."""
+    liquidity_data = token.get("liquidity", {})
+    liquidity = liquidity_data.get("usd", 0.0) if isinstance(liquidity_data, dict) else 0.0
+    market_cap_data = token.get("marketCap", {})
+    market_cap = market_cap_data.get("usd", 0.0) if isinstance(market_cap_data, dict) else 0.0
+    if market_cap == 0.0:
+        market_cap = token.get("market_cap", 0.0)
+        if isinstance(market_cap, dict):
+            market_cap = market_cap.get("usd", 0.0)
+        elif not isinstance(market_cap, (float, int)):
+            market_cap = 0.0
+    return liquidity, market_cap
+
+
+class CohortFilter:
+    """
+    Vectorized threshold filters for a list of scanned tokens.
+
+    Args:
+        filters: Enabled filter instances by name (FilterManager.filters); only the
+            names in COHORT_FILTERS are evaluated, with the thresholds the instances use
+    """
+
+    def __init__(self, filters: Dict[str, Any]):
+        evaluators = {
+            'liquidity': self._liquidity,
+            'volume': self._volume,
+            'dump': self._dump,
+            'whale': self._whale,
+            'moonshot': self._moonshot,
+        }
+        self.filters = {name: filters[name] for name in COHORT_FILTERS if filters.get(name) is not None}
+        self._evaluators = {name: evaluators[name] for name in self.filters}
+
+        registry = get_metrics_registry()
+        self._evaluated_counter = registry.counter("cohort_filter_tokens", "Tokens evaluated by the vectorized cohort filters")
+        self._rejected_counter = registry.counter("cohort_filter_rejected", "Tokens rejected by a cohort filter before network filters", ("filter",))
+        self._undecided_counter = registry.counter("cohort_filter_undecided", "Token/filter pairs left to the per-token path", ("filter",))
+        self._duration = registry.histogram("cohort_filter_ms", "Duration of one cohort filter pass")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._evaluators)
+
+    def apply(self, tokens: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Annotate a cohort and split it into survivors and rejected tokens.
+
+        Rejected tokens get 'overall_filter_passed' False and 'analysis_status'
+        'rejected_by_cohort'; their 'filter_results' hold the analyses computed
+        before the rejecting filter.
+
+        Returns:
+            (survivors, rejected), both in input order
+        """
+        if not tokens or not self._evaluators:
+            return list(tokens), []
+
+        start = time.perf_counter()
+        rejected = np.zeros(len(tokens), dtype=bool)
+        for name, evaluate in self._evaluators.items():
+            decided, flagged, build = evaluate(self.filters[name], tokens)
+            key = f"{name}_analysis"
+            for i in np.flatnonzero(decided & ~rejected):
+                token = tokens[i]
+                result = build(i)
+                token[key] = result
+                token.setdefault('filter_results', {})[name] = result
+            newly_rejected = decided & flagged & ~rejected
+            self._rejected_counter.labels(name).inc(int(newly_rejected.sum()))
+            self._undecided_counter.labels(name).inc(int((~decided & ~rejected).sum()))
+            rejected |= newly_rejected
+
+        survivors, dropped = [], []
+        for token, is_rejected in zip(tokens, rejected):
+            if is_rejected:
+                token['overall_filter_passed'] = False
+                token['analysis_status'] = 'rejected_by_cohort'
+                dropped.append(token)
+            else:
+                survivors.append(token)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._duration.observe(elapsed_ms)
+        self._evaluated_counter.inc(len(tokens))
+        logger.info("Cohort filters (%s) rejected %d of %d tokens in %.1fms",
+                    ", ".join(self._evaluators), len(dropped), len(tokens), elapsed_ms)
+        return survivors, dropped
+
+    # --- evaluators (mirror each filter's analyze_token) ---
+
+    @staticmethod
+    def _liquidity(filter_instance, tokens: List[Dict[str, Any]]) -> Evaluation:
+        raw = [_liquidity_values(t) for t in tokens]
+        liquidity_raw = [r[0] for r in raw]
+        market_cap_raw = [r[1] for r in raw]
+        liquidity, liquidity_ok = _column(liquidity_raw)
+        market_cap, market_cap_ok = _column(market_cap_raw)
+
+        low_liquidity = liquidity < filter_instance.min_liquidity_threshold
+        has_market_cap = market_cap > 0
+        ratio = np.divide(liquidity, market_cap, out=np.full(len(tokens), np.inf), where=has_market_cap)
+        low_ratio = has_market_cap & (ratio < filter_instance.min_liquidity_ratio)
+
+        def build(i: int) -> Dict[str, Any]:
+            risks = []
+            if low_liquidity[i]:
+                risks.append("low_liquidity")
+            if low_ratio[i]:
+                risks.append("low_liquidity_ratio")
+            return {
+                "symbol": tokens[i].get("symbol", "Unknown"),
+                "liquidity": liquidity_raw[i],
+                "market_cap": market_cap_raw[i],
+                "flagged": bool(risks),
+                "detected_risks": risks,
+            }
+        return liquidity_ok & market_cap_ok, low_liquidity | low_ratio, build
+
+    @staticmethod
+    def _volume(filter_instance, tokens: List[Dict[str, Any]]) -> Evaluation:
+        settings = filter_instance.settings
+        min_vol_24h, min_vol_5m = settings.MIN_VOLUME_24H, settings.MIN_VOLUME_5M
+        v24_raw = [t.get("volume_24h", 0) for t in tokens]
+        v5_raw = [t.get("volume_5m", 0) for t in tokens]
+        v24, v24_ok = _column(v24_raw)
+        v5, v5_ok = _column(v5_raw)
+        low_24h = v24 < min_vol_24h
+        low_5m = ~low_24h & (v5 < min_vol_5m)
+
+        def build(i: int) -> Dict[str, Any]:
+            result = {'flagged': False, 'reason': 'passed', 'volume_24h': v24_raw[i], 'volume_5m': v5_raw[i]}
+            if low_24h[i]:
+                result.update(flagged=True, reason=f'volume_24h_too_low ({v24_raw[i]} < {min_vol_24h})')
+            elif low_5m[i]:
+                result.update(flagged=True, reason=f'volume_5m_too_low ({v5_raw[i]} < {min_vol_5m})')
+            return result
+        # A failing 24h check returns before the 5m value is compared
+        return v24_ok & (v5_ok | low_24h), low_24h | low_5m, build
+
+    @staticmethod
+    def _dump(filter_instance, tokens: List[Dict[str, Any]]) -> Evaluation:
+        score_raw = [t.get("dump_score", 0.0) for t in tokens]
+        dev_raw = [t.get("dev_wallet_activity", 0.0) for t in tokens]
+        score, score_ok = _column(score_raw)
+        dev, dev_ok = _column(dev_raw)
+        no_lock = np.fromiter((not t.get("liquidity_lock", False) for t in tokens), dtype=bool, count=len(tokens))
+        not_renounced = np.fromiter((not t.get("ownership_renounced", False) for t in tokens), dtype=bool, count=len(tokens))
+        low_score = score < filter_instance.dump_score_threshold
+        high_dev = dev > filter_instance.dev_wallet_activity_threshold
+
+        def build(i: int) -> Dict[str, Any]:
+            risks = [risk for risk, hit in (
+                ("low_dump_score", low_score[i]),
+                ("no_liquidity_lock", no_lock[i]),
+                ("non_renounced_ownership", not_renounced[i]),
+                ("high_dev_wallet_activity", high_dev[i]),
+            ) if hit]
+            return {"mint": tokens[i].get("mint", "UNKNOWN_MINT"), "flagged": bool(risks), "detected_risks": risks}
+        return score_ok & dev_ok, low_score | no_lock | not_renounced | high_dev, build
+
+    @staticmethod
+    def _whale(filter_instance, tokens: List[Dict[str, Any]]) -> Evaluation:
+        settings = filter_instance.settings
+        max_top_holder, max_whale = settings.MAX_TOP_HOLDER_PERCENTAGE, settings.MAX_WHALE_HOLDINGS
+        top_raw = [t.get("top_holder_percentage", 0) for t in tokens]
+        whale_raw = [t.get("whale_holdings", 0) for t in tokens]
+        top, top_ok = _column(top_raw)
+        whale, whale_ok = _column(whale_raw)
+        high_top = top > max_top_holder
+        high_whale = ~high_top & (whale > max_whale)
+
+        def build(i: int) -> Dict[str, Any]:
+            result = {'flagged': False, 'reason': 'passed', 'top_holder_percentage': top_raw[i], 'whale_holdings': whale_raw[i]}
+            if high_top[i]:
+                result.update(flagged=True, reason=f'top_holder_percentage_too_high ({top_raw[i]} > {max_top_holder})')
+            elif high_whale[i]:
+                result.update(flagged=True, reason=f'whale_holdings_too_high ({whale_raw[i]} > {max_whale})')
+            return result
+        return top_ok & (whale_ok | high_top), high_top | high_whale, build
+
+    @staticmethod
+    def _moonshot(filter_instance, tokens: List[Dict[str, Any]]) -> Evaluation:
+        settings = filter_instance.settings
+        min_price_chg, min_vol_chg, max_mc = settings.MIN_PRICE_CHANGE_24H, settings.MIN_VOLUME_CHANGE_24H, settings.MAX_MARKET_CAP
+        price_raw = [t.get("price_change_24h", 0) for t in tokens]
+        volume_raw = [t.get("volume_change_24h", 0) for t in tokens]
+        mc_raw = [t.get("market_cap", 0) for t in tokens]
+        price, price_ok = _column(price_raw)
+        volume, volume_ok = _column(volume_raw)
+        mc, mc_ok = _column(mc_raw)
+        low_price = price < min_price_chg
+        low_volume = ~low_price & (volume < min_vol_chg)
+        high_mc = ~low_price & ~low_volume & (mc > max_mc)
+
+        def build(i: int) -> Dict[str, Any]:
+            result = {'flagged': False, 'reason': 'passed', 'price_change_24h': price_raw[i],
+                      'volume_change_24h': volume_raw[i], 'market_cap': mc_raw[i]}
+            if low_price[i]:
+                result.update(flagged=True, reason=f'price_change_too_low ({price_raw[i]} < {min_price_chg})')
+            elif low_volume[i]:
+                result.update(flagged=True, reason=f'volume_change_too_low ({volume_raw[i]} < {min_vol_chg})')
+            elif high_mc[i]:
+                result.update(flagged=True, reason=f'market_cap_too_high ({mc_raw[i]} > {max_mc})')
+            return result
+        decided = price_ok & (low_price | (volume_ok & (low_volume | mc_ok)))
+        return decided, low_price | low_volume | high_mc, build
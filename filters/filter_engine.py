@@ -0,0 +1,348 @@
+"""
+Concurrent execution engine for FilterManager.
+
+Every filter is described by a ``FilterSpec``: its dependencies, cost class and
+(for network filters) the provider it calls. ``FilterEngine`` resolves how to
+call each filter instance once at construction (instead of probing methods with
+``hasattr`` on every token) and then, per token:
+
+- runs cheap filters (``cpu``/``db``) inline, in ``FILTER_ORDER``;
+- starts network filters as soon as their dependencies have finished, so
+  independent RugCheck / Twitter / RPC calls overlap and token latency
+  approaches the slowest filter rather than the sum (SolSniffer waits for
+  RugCheck to save its paid quota);
+- bounds each provider with a semaphore shared by every token in flight;
+- on ``initial_scan``, holds network filters until the cheap critical filters
+  (blacklist) have passed, and cancels whatever is still running as soon as a
+  critical filter fails or errors (``analysis_status='aborted_early'``);
+- records per-filter latency in the metrics registry and on the token.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from performance.metrics_registry import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# Cost classes
+COST_CPU = "cpu"
+COST_DB = "db"
+COST_NETWORK = "network"
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """Scheduling metadata for one filter."""
+    name: str
+    cost: str = COST_CPU
+    provider: Optional[str] = None  # Concurrency-limited backend for network filters
+    depends_on: Tuple[str, ...] = ()  # Filters whose results must exist before this one runs
+    critical: bool = False  # Failure aborts the token during initial_scan
+
+
+# Declared in the sequential order FilterManager used to run them (critical checks first)
+FILTER_SPECS: Dict[str, FilterSpec] = {spec.name: spec for spec in (
+    FilterSpec("blacklist", cost=COST_DB, critical=True),
+    FilterSpec("whitelist", cost=COST_CPU),
+    FilterSpec("rugcheck", cost=COST_NETWORK, provider="rugcheck", critical=True),
+    # Paid quota: only spent once RugCheck has not already rejected the token
+    FilterSpec("solsniffer", cost=COST_NETWORK, provider="solsniffer", critical=True, depends_on=("rugcheck",)),
+    FilterSpec("scam", cost=COST_CPU),
+    FilterSpec("liquidity", cost=COST_CPU),
+    FilterSpec("volume", cost=COST_CPU),
+    FilterSpec("dump", cost=COST_CPU),
+    FilterSpec("whale", cost=COST_CPU),
+    FilterSpec("bonding_curve", cost=COST_NETWORK, provider="solana_rpc"),
+    FilterSpec("social", cost=COST_NETWORK, provider="twitter"),
+    FilterSpec("moonshot", cost=COST_CPU),
+)}
+FILTER_ORDER: List[str] = list(FILTER_SPECS)
+
+# Per-provider concurrency defaults (overridden from settings)
+DEFAULT_PROVIDER_LIMITS: Dict[str, int] = {
+    "rugcheck": 4,
+    "solsniffer": 2,
+    "twitter": 2,
+    "solana_rpc": 8,
+}
+
+FilterAdapter = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Any]]
+
+
+def result_key(name: str) -> str:
+    """Key a filter's annotation is stored under on the token."""
+    return 'bonding_curve' if name == 'bonding_curve' else f"{name}_analysis"
+
+
+def is_flagged(name: str, result: Any) -> bool:
+    """True when a filter result fails the token."""
+    if name == 'blacklist' and result is True:
+        return True
+    return isinstance(result, dict) and bool(result.get('flagged', False))
+
+
+def is_critical_failure(name: str, result: Any) -> bool:
+    """Failure test applied to critical filters for the initial-scan early exit."""
+    if name == 'blacklist' and result is True:
+        return True
+    if isinstance(result, dict):
+        return bool(result.get('flagged', False) or result.get('status') == 'error' or result.get('failed', False))
+    return False
+
+
+def _compare_bonding_market_cap(mint: str, token_data: Dict[str, Any], result: Dict[str, Any]):
+    """Flag a >25% gap between the DexScreener and bonding-curve market caps."""
+    dex_mcap = token_data.get('marketCap', 0.0)
+    if not isinstance(dex_mcap, (float, int)):
+        dex_mcap = 0.0
+    bonding_mcap = result.get('market_cap', 0.0)
+    if not isinstance(bonding_mcap, (float, int)):
+        bonding_mcap = 0.0
+
+    mismatch = False
+    if dex_mcap > 0 and bonding_mcap > 0:
+        diff_percent = abs(dex_mcap - bonding_mcap) / dex_mcap
+        if diff_percent > 0.25:
+            mismatch = True
+            logger.warning(f"MCAP Mismatch for {mint}: DexScreener (${dex_mcap:,.2f}) vs BondingCurve (${bonding_mcap:,.2f}) > 25%")
+    result['mcap_dex_bonding_mismatch'] = mismatch
+
+
+def resolve_adapter(name: str, filter_instance: Any) -> Optional[FilterAdapter]:
+    """
+    Build the call adapter for a filter instance, once.
+
+    The method is chosen with the same priority FilterManager has always used:
+    get_bonding_curve_metrics, analyze_and_annotate, apply, analyze_token,
+    check, analyze, evaluate, calculate_risk_score.
+
+    Returns:
+        ``async adapter(token_data, context) -> result``, or None if the filter
+        exposes none of the known methods
+    """
+    if hasattr(filter_instance, 'get_bonding_curve_metrics'):
+        method = filter_instance.get_bonding_curve_metrics
+
+        async def bonding_curve_adapter(token_data, context):
+            mint = token_data['mint']
+            # Only run bonding curve analysis on PumpFun/PumpSwap tokens
+            token_dex_id = token_data.get('dex_id', '').lower()
+            if token_dex_id not in ('pumpfun', 'pumpswap'):
+                logger.debug(f"Skipping bonding curve analysis for {mint} - not a PumpFun/PumpSwap token (dex_id: {token_dex_id})")
+                return {"status": "skipped", "message": f"Bonding curve analysis only applies to PumpFun/PumpSwap tokens, not {token_dex_id}"}
+            sol_price_usd = context.get('sol_price_usd', 0.0)
+            if not sol_price_usd > 0:
+                return {"status": "error", "message": "Skipped due to missing SOL price"}
+            result = await method(mint, sol_price_usd)
+            if result and result.get('status') == 'success':
+                _compare_bonding_market_cap(mint, token_data, result)
+            return result
+        return bonding_curve_adapter
+
+    for attr in ('analyze_and_annotate', 'apply'):
+        if hasattr(filter_instance, attr):
+            method = getattr(filter_instance, attr)
+            keys = (f"{name}_analysis", name)
+
+            async def annotate_adapter(token_data, context, _method=method, _keys=keys):
+                # Annotates the token in place; the specific analysis part is the result
+                await _method([token_data])
+                for key in _keys:
+                    if key in token_data:
+                        return token_data[key]
+                return {"status": "annotated_in_place"}
+            return annotate_adapter
+
+    for attr in ('analyze_token', 'check', 'analyze', 'evaluate'):
+        if hasattr(filter_instance, attr):
+            method = getattr(filter_instance, attr)
+
+            async def single_token_adapter(token_data, context, _method=method):
+                return await _method(token_data)
+            return single_token_adapter
+
+    if hasattr(filter_instance, 'calculate_risk_score'):
+        method = filter_instance.calculate_risk_score
+
+        async def address_adapter(token_data, context):
+            return await method(token_data['mint'])
+        return address_adapter
+
+    return None
+
+
+class FilterEngine:
+    """
+    Dependency-aware, concurrency-limited runner for a set of filter instances.
+
+    Args:
+        filters: Enabled filter instances by name
+        specs: Scheduling metadata by filter name (defaults to FILTER_SPECS)
+        provider_limits: Max concurrent calls per provider, shared across tokens
+        concurrent: If False, every filter runs inline in FILTER_ORDER (previous behaviour)
+    """
+
+    def __init__(self, filters: Dict[str, Any], specs: Optional[Dict[str, FilterSpec]] = None,
+                 provider_limits: Optional[Dict[str, int]] = None, concurrent: bool = True):
+        self.specs = dict(specs or FILTER_SPECS)
+        self.concurrent = concurrent
+        limits = {**DEFAULT_PROVIDER_LIMITS, **(provider_limits or {})}
+        self._provider_semaphores = {provider: asyncio.Semaphore(max(1, int(limit))) for provider, limit in limits.items()}
+
+        # Resolve call adapters once; unknown filters run last as cheap filters
+        order = [name for name in FILTER_ORDER if name in filters] + [name for name in filters if name not in FILTER_ORDER]
+        self.adapters: Dict[str, FilterAdapter] = {}
+        for name in order:
+            instance = filters[name]
+            if instance is None:
+                continue
+            adapter = resolve_adapter(name, instance)
+            if adapter is None:
+                logger.warning(f"No suitable analysis method found for filter '{name}'. Skipping.")
+                continue
+            self.adapters[name] = adapter
+            self.specs.setdefault(name, FilterSpec(name))
+        self.order: List[str] = list(self.adapters)
+        for name in self.order:
+            missing = [dep for dep in self.specs[name].depends_on if dep not in self.adapters]
+            if missing:
+                logger.warning(f"Filter '{name}' depends on disabled filters {missing}; ignoring those dependencies.")
+
+        registry = get_metrics_registry()
+        self._latency = registry.histogram("filter_latency_ms", "Time spent in one filter for one token", ("filter",))
+        self._errors = registry.counter("filter_errors", "Filters that raised while analysing a token", ("filter",))
+        self._aborts = registry.counter("filter_early_aborts", "Tokens aborted by a failing critical filter", ("filter",))
+
+    def _deps(self, name: str) -> Tuple[str, ...]:
+        return tuple(dep for dep in self.specs[name].depends_on if dep in self.adapters)
+
+    def _is_network(self, name: str) -> bool:
+        return self.concurrent and self.specs[name].cost == COST_NETWORK
+
+    async def _call(self, name: str, token_data: Dict[str, Any], context: Dict[str, Any]) -> Tuple[Any, Optional[BaseException], float]:
+        """Run one adapter under its provider limit; never raises (except cancellation)."""
+        semaphore = self._provider_semaphores.get(self.specs[name].provider) if self._is_network(name) else None
+        start = time.perf_counter()
+        try:
+            if semaphore is not None:
+                async with semaphore:
+                    start = time.perf_counter()  # Exclude time queued behind the provider limit
+                    result = await self.adapters[name](token_data, context)
+            else:
+                result = await self.adapters[name](token_data, context)
+            return result, None, (time.perf_counter() - start) * 1000
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return None, e, (time.perf_counter() - start) * 1000
+
+    async def run(self, token_data: Dict[str, Any], context: Optional[Dict[str, Any]] = None,
+                  initial_scan: bool = False) -> Dict[str, Any]:
+        """
+        Apply every enabled filter to one token.
+
+        Filters whose annotation key is already on the token are skipped.
+
+        Returns:
+            Dict with 'filter_results' (by filter, in FILTER_ORDER), 'overall_filter_passed',
+            'analysis_status' ('complete' or 'aborted_early') and 'latency_ms' per filter
+        """
+        context = context or {}
+        mint = token_data.get('mint')
+        results: Dict[str, Any] = {}
+        latency_ms: Dict[str, float] = {}
+        state = {'passed': True, 'aborted': False}
+
+        pending = []
+        for name in self.order:
+            key = result_key(name)
+            if key in token_data:
+                logger.debug("Skipping filter '%s' for %s as results key '%s' already exists.", name, mint, key)
+                continue
+            pending.append(name)
+        done = set(self.order) - set(pending)
+
+        def record(name: str, result: Any, error: Optional[BaseException], elapsed_ms: float) -> bool:
+            """Store one outcome; returns True if the token must be aborted."""
+            latency_ms[name] = elapsed_ms
+            self._latency.labels(name).observe(elapsed_ms)
+            done.add(name)
+            critical = self.specs[name].critical
+            if error is not None:
+                logger.error(f"Error applying filter '{name}' to {mint}: {error}", exc_info=error)
+                self._errors.labels(name).inc()
+                results[name] = {"status": "error", "message": str(error)}
+                if critical:
+                    state['passed'] = False
+                    if initial_scan:
+                        logger.warning(f"Critical filter '{name}' errored for {mint} during initial scan. Aborting further analysis.")
+                        return True
+                return False
+
+            results[name] = result
+            logger.debug("Filter '%s' applied to %s. Result: %s", name, mint, result)
+            if initial_scan and critical and is_critical_failure(name, result):
+                logger.warning(f"Critical filter '{name}' failed for {mint} during initial scan. Aborting further analysis.")
+                state['passed'] = False
+                return True
+            if is_flagged(name, result):
+                state['passed'] = False
+            return False
+
+        # Network filters wait for their dependencies and, on initial scans, for the cheap critical gate
+        gate = {name for name in pending if initial_scan and self.specs[name].critical and not self._is_network(name)}
+        running: Dict[asyncio.Task, str] = {}
+
+        def ready(name: str) -> bool:
+            if not all(dep in done for dep in self._deps(name)):
+                return False
+            return not (self._is_network(name) and not gate <= done)
+
+        try:
+            while True:
+                # Launch every ready network filter, then run the next ready cheap filter inline
+                for name in [n for n in pending if self._is_network(n) and ready(n)]:
+                    pending.remove(name)
+                    running[asyncio.ensure_future(self._call(name, token_data, context))] = name
+                name = next((n for n in pending if not self._is_network(n) and ready(n)), None)
+                if name is not None:
+                    pending.remove(name)
+                    if record(name, *(await self._call(name, token_data, context))):
+                        state['aborted'] = True
+                        self._aborts.labels(name).inc()
+                        return self._finish(results, latency_ms, state)
+                    continue  # A finished cheap filter may unblock network filters
+                if not running:
+                    if pending:
+                        logger.warning(f"Unresolvable filter dependencies for {mint}: {pending}")
+                    return self._finish(results, latency_ms, state)
+
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    name = running.pop(task)
+                    if record(name, *task.result()):
+                        state['aborted'] = True
+                        self._aborts.labels(name).inc()
+                        return self._finish(results, latency_ms, state)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    def _finish(self, results: Dict[str, Any], latency_ms: Dict[str, float], state: Dict[str, bool]) -> Dict[str, Any]:
+        ordered = {name: results[name] for name in self.order if name in results}
+        return {
+            'filter_results': ordered,
+            'overall_filter_passed': state['passed'],
+            'analysis_status': 'aborted_early' if state['aborted'] else 'complete',
+            'latency_ms': {name: round(latency_ms[name], 3) for name in self.order if name in latency_ms},
+        }
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-filter latency snapshot (count, mean, p50/p90/p95/p99 in ms)."""
+        return {name: self._latency.labels(name).snapshot() for name in self.order}
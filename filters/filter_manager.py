@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import httpx
 from solana.rpc.async_api import AsyncClient # Import AsyncClient
 from datetime import datetime, timezone # Ensure datetime is imported
@@ -30,6 +30,8 @@ from .volume_filter import VolumeFilter
 from .whale_filter import WhaleFilter
 from .whitelist import WhitelistFilter
 from .blacklist import BlacklistFilter
+from .filter_engine import FilterEngine
+from .cohort_filter import CohortFilter
 # TODO: Add imports for any other filters like DevWalletActivityFilter if needed
 
 logger = logging.getLogger(__name__)
@@ -67,6 +69,18 @@ class FilterManager:
         
         self.filters: Dict[str, Optional[Any]] = {}
         self._initialize_filters()
+        # Call adapters are resolved once here; providers are throttled across all tokens in flight
+        self.engine = FilterEngine(
+            {name: inst for name, inst in self.filters.items() if inst},
+            provider_limits={
+                'rugcheck': getattr(settings, 'FILTER_RUGCHECK_CONCURRENCY', 4),
+                'solsniffer': getattr(settings, 'FILTER_SOLSNIFFER_CONCURRENCY', 2),
+                'twitter': getattr(settings, 'FILTER_TWITTER_CONCURRENCY', 2),
+                'solana_rpc': getattr(settings, 'FILTER_RPC_CONCURRENCY', 8),
+            },
+            concurrent=getattr(settings, 'FILTER_ENGINE_CONCURRENT', True),
+        )
+        self.cohort_filter = CohortFilter(self.filters)
         logger.info(f"FilterManager initialized with filters: {list(f for f in self.filters if self.filters[f] is not None)}")
 
     def _initialize_filters(self):
@@ -193,6 +207,41 @@ class FilterManager:
                     logger.error(f"Error closing filter {filter_instance.__class__.__name__}: {e}", exc_info=True)
         logger.info("FilterManager closed.")
 
+    def _prepare_token_fields(self, token_data: Dict[str, Any]):
+        """Ensure essential data from DexScreener (or earlier stages) is present for filters."""
+        # These might already be populated by TokenScanner._prepare_token_for_db
+        if 'symbol' not in token_data:
+             token_data['symbol'] = token_data.get('baseToken', {}).get('symbol') or token_data.get('name', 'Unknown')
+        if 'liquidity' not in token_data: # Ensure top-level liquidity (expecting USD value)
+            liquidity_data = token_data.get('liquidity', {})
+            token_data['liquidity'] = liquidity_data.get('usd', 0.0) if isinstance(liquidity_data, dict) else 0.0
+        if 'marketCap' not in token_data: # Ensure top-level marketCap (expecting USD value)
+             token_data['marketCap'] = token_data.get('marketCap', 0.0) # Check top level first
+             if isinstance(token_data['marketCap'], dict): # If it's a dict, try getting 'usd'
+                 token_data['marketCap'] = token_data['marketCap'].get('usd', 0.0)
+             elif not isinstance(token_data['marketCap'], (float, int)):
+                 token_data['marketCap'] = 0.0 # Default to 0 if not a number
+
+    def apply_cohort_filters(self, tokens: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Runs the threshold filters (liquidity, volume, dump, whale, moonshot) over a whole
+        scan cohort at once, before any per-token or network work.
+
+        Args:
+            tokens: Scanned token dicts (mutated with '<filter>_analysis' annotations).
+
+        Returns:
+            (survivors, rejected). Survivors still go through apply_filters, which skips
+            the filters already annotated here; rejected tokens are marked as failed.
+        """
+        for token_data in tokens:
+            self._prepare_token_fields(token_data)
+        survivors, rejected = self.cohort_filter.apply(tokens)
+        now = datetime.now(timezone.utc)
+        for token_data in rejected:
+            token_data['last_filter_update'] = now
+        return survivors, rejected
+
     async def apply_filters(self, token_data: Dict[str, Any], current_time: Optional[datetime] = None, initial_scan: bool = False) -> Tuple[bool, Optional[str]]:
         """
         Applies enabled filters to the token data, annotates it, and saves results.
@@ -207,16 +256,16 @@ class FilterManager:
             The input token_data dictionary annotated with a 'filter_results' key. 
             Also includes 'analysis_status' ('complete' or 'aborted_early').
         """
-        # Fetch current SOL price before the loop
+        # Fetch current SOL price before running filters (only the bonding curve filter needs it)
         sol_price_usd = 0.0
-        try:
-            sol_price_usd = await self.price_monitor.get_sol_price()
-            if sol_price_usd is None:
-                 sol_price_usd = 0.0
-                 logger.warning("Could not retrieve current SOL price for bonding curve calculation.")
-        except Exception as e:
-            logger.error(f"Error fetching SOL price from PriceMonitor: {e}", exc_info=True)
-            # Handle error appropriately, maybe skip bonding curve filter or use default
+        if 'bonding_curve' in self.engine.adapters:
+            try:
+                sol_price_usd = await self.price_monitor.get_sol_price()
+                if sol_price_usd is None:
+                    sol_price_usd = 0.0
+                    logger.warning("Could not retrieve current SOL price for bonding curve calculation.")
+            except Exception as e:
+                logger.error(f"Error fetching SOL price from PriceMonitor: {e}", exc_info=True)
 
         mint = token_data.get("mint") # Get mint from token_data
         if not mint:
@@ -229,186 +278,17 @@ class FilterManager:
 
         logger.debug(f"Applying filters to token {mint} (SOL Price: ${sol_price_usd:.2f}, Initial Scan: {initial_scan})")
         filter_results = token_data.get('filter_results', {}) # Preserve previous results if any
-        analysis_status = 'complete'
-        overall_filter_passed = True # Assume passing unless a filter fails
 
-        # --- Verification Needed --- 
-        # 3. Which filters are 'critical' for early exit during initial scan?
-        #    Using rugcheck, solsniffer, blacklist as examples.
-        critical_filters_for_early_exit = ['rugcheck', 'blacklist', 'solsniffer']
+        self._prepare_token_fields(token_data)
 
-        # Ensure essential data from DexScreener (or earlier stages) is present for filters
-        # These might already be populated by TokenScanner._prepare_token_for_db
-        if 'symbol' not in token_data:
-             token_data['symbol'] = token_data.get('baseToken', {}).get('symbol') or token_data.get('name', 'Unknown')
-        if 'liquidity' not in token_data: # Ensure top-level liquidity (expecting USD value)
-            liquidity_data = token_data.get('liquidity', {})
-            token_data['liquidity'] = liquidity_data.get('usd', 0.0) if isinstance(liquidity_data, dict) else 0.0
-        if 'marketCap' not in token_data: # Ensure top-level marketCap (expecting USD value)
-             token_data['marketCap'] = token_data.get('marketCap', 0.0) # Check top level first
-             if isinstance(token_data['marketCap'], dict): # If it's a dict, try getting 'usd'
-                 token_data['marketCap'] = token_data['marketCap'].get('usd', 0.0)
-             elif not isinstance(token_data['marketCap'], (float, int)):
-                 token_data['marketCap'] = 0.0 # Default to 0 if not a number
-        
         logger.debug(f"Pre-filter token_data prep for {mint}: Symbol='{token_data.get('symbol')}', Liq='{token_data.get('liquidity')}', MCAP='{token_data.get('marketCap')}'")
 
-        # Iterate through instantiated filters
-        # --- Define the order filters should run (example) ---
-        # Critical checks first, then informational/scoring
-        filter_order = [
-            'blacklist',
-            'whitelist',
-            'rugcheck',
-            'solsniffer',
-            'scam', # Assuming scam filter is critical
-            'liquidity',
-            'volume',
-            'dump',
-            'whale',
-            'bonding_curve', 
-            'social', 
-            'moonshot',
-            # Add others in desired order
-        ]
-        
-        # Create a map for quick lookup
-        enabled_filters_map = {name: inst for name, inst in self.filters.items() if inst}
-        
-        for name in filter_order:
-            filter_instance = enabled_filters_map.get(name)
-            if filter_instance:
-                # Skip if already processed in a previous partial run
-                # Check if analysis result key exists, not just filter name
-                analysis_key = f"{name}_analysis" if name not in ['bonding_curve'] else 'bonding_curve' # Special case for bonding curve key?
-                # TODO: Standardize result key naming across all filters
-                if analysis_key in token_data:
-                    logger.debug(f"Skipping filter '{name}' for {mint} as results key '{analysis_key}' already exists.")
-                    continue
-                    
-                logger.debug(f"Applying filter '{name}' to {mint}...")
-                try:
-                    # Determine the method to call (Prioritize analyze_token)
-                    method_to_call = None
-                    method_type = None # To track how to call it
-                    
-                    # --- Determine Filter Method and Type ---
-                    if hasattr(filter_instance, 'get_bonding_curve_metrics'):
-                        method_to_call = filter_instance.get_bonding_curve_metrics
-                        method_type = 'bonding_curve' # Specific handling: Needs mint, sol_price
-                    elif hasattr(filter_instance, 'analyze_and_annotate'):
-                        method_to_call = filter_instance.analyze_and_annotate
-                        method_type = 'annotate_list' # Expects list, modifies in place
-                    elif hasattr(filter_instance, 'apply'):
-                         # WhitelistFilter uses 'apply' but expects a list
-                         method_to_call = filter_instance.apply
-                         method_type = 'apply_list' # Expects list, modifies in place
-                    elif hasattr(filter_instance, 'analyze_token'): 
-                        method_to_call = filter_instance.analyze_token
-                        method_type = 'single_token' # Expects dict, returns result
-                    elif hasattr(filter_instance, 'check'): 
-                        method_to_call = filter_instance.check
-                        method_type = 'single_token' # Assume expects dict, returns result
-                    elif hasattr(filter_instance, 'analyze'): 
-                        method_to_call = filter_instance.analyze
-                        method_type = 'single_token' # Assume expects dict, returns result
-                    elif hasattr(filter_instance, 'evaluate'): 
-                        method_to_call = filter_instance.evaluate
-                        method_type = 'single_token' # Assume expects dict, returns result
-                    elif hasattr(filter_instance, 'calculate_risk_score'): 
-                        method_to_call = filter_instance.calculate_risk_score
-                        method_type = 'single_token_addr' # Needs address string
-
-                    result = None # Initialize result
-                    if method_to_call:
-                        # Determine arguments and call method based on type
-                        if method_type == 'bonding_curve':
-                            # Only run bonding curve analysis on PumpFun/PumpSwap tokens
-                            token_dex_id = token_data.get('dex_id', '').lower()
-                            if token_dex_id in ['pumpfun', 'pumpswap']:
-                                if sol_price_usd > 0: 
-                                    result = await method_to_call(mint, sol_price_usd) # Pass mint string, price
-                                else:
-                                    result = {"status": "error", "message": "Skipped due to missing SOL price"}
-                            else:
-                                result = {"status": "skipped", "message": f"Bonding curve analysis only applies to PumpFun/PumpSwap tokens, not {token_dex_id}"}
-                                logger.debug(f"Skipping bonding curve analysis for {mint} - not a PumpFun/PumpSwap token (dex_id: {token_dex_id})")
-                        elif method_type == 'single_token_addr':
-                            result = await method_to_call(mint) # Pass mint string
-                        elif method_type in ('annotate_list', 'apply_list'):
-                            # Ensure it's called with the current token_data
-                            await method_to_call([token_data])
-                            # Result is now IN token_data, extract the specific analysis part
-                            # Standardize the key name later!
-                            result_key = f"{name}_analysis" if name not in ['bonding_curve', 'blacklist', 'whitelist'] else name
-                            result = token_data.get(result_key, {"status":"annotated_in_place"}) 
-                        elif method_type == 'single_token':
-                            # Pass the potentially updated token_data
-                            result = await method_to_call(token_data)
-                            
-                        # Store the result in filter_results (standardized key)
-                        filter_results[name] = result
-                        logger.debug(f"Filter '{name}' applied to {mint}. Result: {result}")
-                        
-                        # --- Market Cap Comparison Logic (After bonding_curve filter) ---
-                        if name == 'bonding_curve' and result and result.get('status') == 'success':
-                            dex_mcap = token_data.get('marketCap', 0.0) # Get DexScreener MCAP 
-                            # Ensure dex_mcap is float/int
-                            if not isinstance(dex_mcap, (float, int)):
-                                 dex_mcap = 0.0
-                                 
-                            bonding_mcap = result.get('market_cap', 0.0)
-                            # Ensure bonding_mcap is float/int
-                            if not isinstance(bonding_mcap, (float, int)):
-                                 bonding_mcap = 0.0
-
-                            # Add mismatch flag if difference > 25% and both > 0
-                            mismatch = False
-                            if dex_mcap > 0 and bonding_mcap > 0:
-                                 diff_percent = abs(dex_mcap - bonding_mcap) / dex_mcap
-                                 if diff_percent > 0.25:
-                                     mismatch = True
-                                     logger.warning(f"MCAP Mismatch for {mint}: DexScreener (${dex_mcap:,.2f}) vs BondingCurve (${bonding_mcap:,.2f}) > 25%")
-                            # Store the flag within the bonding_curve results
-                            result['mcap_dex_bonding_mismatch'] = mismatch
-                        # --- End Market Cap Comparison Logic ---
-
-                        # Check for early exit if a critical filter failed
-                        if initial_scan and name in critical_filters_for_early_exit:
-                            # How to check failure? Assume a 'flagged' or 'failed' key in result dict
-                            is_failed = False
-                            if isinstance(result, dict):
-                                is_failed = result.get('flagged', False) or result.get('status') == 'error' or result.get('failed', False)
-                                # Specific check for blacklist filter if its result is just a boolean True
-                                if name == 'blacklist' and result is True:
-                                     is_failed = True
-                                     
-                            if is_failed:
-                                logger.warning(f"Critical filter '{name}' failed for {mint} during initial scan. Aborting further analysis.")
-                                analysis_status = 'aborted_early'
-                                overall_filter_passed = False # Mark as failed overall
-                                break # Exit the filter loop for this token
-                        
-                        # Check if *any* filter flagged the token
-                        if isinstance(result, dict) and result.get('flagged', False):
-                            overall_filter_passed = False
-                        elif name == 'blacklist' and result is True: # Specific blacklist check
-                            overall_filter_passed = False
-
-                    else:
-                        logger.warning(f"No suitable analysis method found for filter '{name}'. Skipping.")
-
-                except Exception as e:
-                    logger.error(f"Error applying filter '{name}' to {mint}: {e}", exc_info=True)
-                    # Store error information in results
-                    filter_results[name] = {"status": "error", "message": str(e)}
-                    # Decide if this error constitutes overall failure
-                    if name in critical_filters_for_early_exit: 
-                        overall_filter_passed = False
-                        if initial_scan: 
-                            analysis_status = 'aborted_early'
-                            logger.warning(f"Critical filter '{name}' errored for {mint} during initial scan. Aborting further analysis.")
-                            break # Exit loop on critical error during initial scan
+        # Dependency order, cost classes and critical (early-exit) filters are declared in filter_engine.FILTER_SPECS
+        outcome = await self.engine.run(token_data, context={'sol_price_usd': sol_price_usd}, initial_scan=initial_scan)
+        filter_results.update(outcome['filter_results'])
+        analysis_status = outcome['analysis_status']
+        overall_filter_passed = outcome['overall_filter_passed']
+        token_data['filter_latency_ms'] = outcome['latency_ms']
 
         # Add final results and status back to the main token_data dictionary
         token_data['filter_results'] = filter_results
@@ -422,6 +302,10 @@ class FilterManager:
         logger.debug(f"Finished applying filters for {mint}. Overall passed: {overall_filter_passed}, Status: {analysis_status}")
         return token_data
 
+    def get_filter_latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-filter latency percentiles (ms) gathered by the filter engine."""
+        return self.engine.get_stats()
+
     async def _save_filter_results(self, mint: str, results: Dict[str, Any]):
         """Saves the filter results for a token to the database."""
         # This should likely be handled by TokenScanner after all processing is done
@@ -10,6 +10,7 @@ from typing import Optional, Dict, Any, List, Union
 from datetime import datetime, timezone
 from config.settings import Settings
 from utils.logger import get_logger
+from utils.report_cache import REPORT_NEGATIVE, REPORT_POSITIVE, get_risk_report_cache
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import json
@@ -45,6 +46,7 @@ class SolsnifferAPI:
         self.base_delay = settings.ERROR_RETRY_INTERVAL
         self._session = None
         self._logged_first_passed_token = False # Add flag
+        self.report_cache = get_risk_report_cache(settings) # Scores are reused across scan cycles
         
     async def initialize(self) -> bool:
         """Initialize the Solsniffer API client.
@@ -259,7 +261,29 @@ class SolsnifferAPI:
         """Get Solsniffer score and risk details for a single token.
         Handles API errors and returns a standardized dictionary.
         Includes 'solsniffer_score' and 'solsniffer_passed' keys.
+        Scores and 404s are served from the shared risk report cache while fresh.
         """
+        if not token_mint:
+            return await self._fetch_token_score(token_mint)
+        return await self.report_cache.get_or_fetch(
+            "solsniffer", token_mint, lambda: self._fetch_token_score(token_mint),
+            self._classify_score, mint=token_mint,
+        )
+
+    @staticmethod
+    def _classify_score(result: Dict[str, Any]) -> Optional[str]:
+        """Cache processed scores (passing or not) and not-found results, never API/transport errors."""
+        if not isinstance(result, dict):
+            return None
+        if result.get('not_found'):
+            return REPORT_NEGATIVE
+        details = result.get('details')
+        if isinstance(details, dict) and 'error' in details:
+            return None  # Built by _get_minimal_data(error_message=...)
+        return REPORT_POSITIVE
+
+    async def _fetch_token_score(self, token_mint: str) -> Dict[str, Any]:
+        """Request the Solsniffer score for a single token (uncached)."""
         # Use the updated error structure
         default_error_result = self._get_minimal_data(failing=False, error_message="API unavailable")
         
@@ -334,7 +358,9 @@ class SolsnifferAPI:
                              elif response.status == 404:
                                   self.logger.warning(f"Solsniffer token {token_mint} not found (404). Returning default error.")
                                   # Return error state
-                                  return self._get_minimal_data(failing=False, error_message="Token not found by API (404)") 
+                                  not_found = self._get_minimal_data(failing=False, error_message="Token not found by API (404)")
+                                  not_found['not_found'] = True
+                                  return not_found
                              else:
                                  error_text = await response.text()
                                  self.logger.error(f"Solsniffer API error {response.status} for {token_mint}. Response: {error_text[:100]}. Retrying (Attempt {attempt}/{self.max_retries})...")
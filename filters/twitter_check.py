@@ -10,6 +10,7 @@ from datetime import datetime, timedelta, timezone
 from config.settings import Settings
 from config.thresholds import Thresholds
 from utils.logger import get_logger
+from utils.report_cache import REPORT_NEGATIVE, REPORT_POSITIVE, get_risk_report_cache
 from random import randint
 import pandas as pd
 from dotenv import load_dotenv
@@ -50,6 +51,7 @@ class TwitterCheck:
             self.logged_in = False
             self.last_login_attempt = None
             self.login_lock = asyncio.Lock()
+            self.report_cache = get_risk_report_cache(settings) # Account checks are reused across scan cycles
             
             self.follower_thresholds = {
                 'FRESH': self.thresholds.get('FRESH_TWITTER_MIN_FOLLOWERS'),
@@ -230,7 +232,31 @@ class TwitterCheck:
                 'description': str | None,
                 'mint_announced': bool | None # True if mint found, False if not found, None if mint_address not provided
             }
+        Results for existing and not-found accounts are served from the shared risk
+        report cache while fresh (keyed by handle and mint); errors are not cached.
         """
+        handle = self.extract_twitter_handle(twitter_url) if twitter_url else None
+        if not handle:
+            return await self._verify_twitter_account(twitter_url, mint_address)
+        return await self.report_cache.get_or_fetch(
+            "twitter", f"{handle.lower()}|{mint_address or ''}",
+            lambda: self._verify_twitter_account(twitter_url, mint_address),
+            self._classify_verification,
+        )
+
+    @staticmethod
+    def _classify_verification(result: Dict[str, Any]) -> Optional[str]:
+        """Cache existing accounts and confirmed not-found accounts, never session/rate-limit errors."""
+        if not isinstance(result, dict):
+            return None
+        if result.get('exists'):
+            return REPORT_POSITIVE
+        if str(result.get('error') or '').startswith("Account not found"):
+            return REPORT_NEGATIVE
+        return None
+
+    async def _verify_twitter_account(self, twitter_url: str, mint_address: Optional[str] = None) -> Dict[str, Any]:
+        """Fetches Twitter account data (uncached); see verify_twitter_account."""
         handle = None
         default_result = {
             'handle': None, 'exists': False, 'error': 'Unknown error', 
@@ -336,7 +362,7 @@ class TwitterCheck:
                     self.logger.warning(f"Twitter rate limit hit for @{handle}. Waiting {wait_time} seconds. (Reset timestamp: {reset_time})")
                     await asyncio.sleep(wait_time)
                     # Retry the call (could implement max retries here)
-                    return await self.verify_twitter_account(twitter_url, mint_address) 
+                    return await self._verify_twitter_account(twitter_url, mint_address) 
                 except Exception as rate_limit_e:
                      self.logger.error(f"Error handling rate limit: {rate_limit_e}")
                      default_result['error'] = f"Rate limit hit, error handling failed: {rate_limit_e}"
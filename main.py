@@ -41,6 +41,9 @@ from config.filters_config import FiltersConfig
 from utils.encryption import decrypt_env_file, test_encryption, get_encryption_password
 from utils.circuit_breaker import CircuitBreaker
 from utils.proxy_manager import ProxyManager
+from utils.rate_governor import get_rate_governor
+from utils.rpc_pool import get_rpc_pool
+from utils.report_cache import get_risk_report_cache
 from utils.helpers import ensure_directory_exists, setup_output_dirs
 from utils import get_logger, get_git_commit_hash
 from utils.logger import get_logger
@@ -1127,6 +1130,18 @@ async def close_all_components(components_dict: dict):
         except Exception as e:
             logger.error(f"Error closing Solana Client: {e}", exc_info=True)
             
+    # Close RPC pool clients (the shared solana_client above is not owned by the pool)
+    try:
+        await get_rpc_pool().close()
+    except Exception as e:
+        logger.error(f"Error closing RPC pool: {e}", exc_info=True)
+            
+    # Flush the risk report cache shared by the API clients
+    try:
+        await get_risk_report_cache().close()
+    except Exception as e:
+        logger.error(f"Error closing risk report cache: {e}", exc_info=True)
+
     # Close SolanaTrackerAPI
     solana_tracker_api = components_dict.get("solana_tracker_api")
     if solana_tracker_api and hasattr(solana_tracker_api, 'close') and callable(getattr(solana_tracker_api, 'close')):
@@ -1178,6 +1193,10 @@ async def initialize_components(settings: Settings) -> dict:
     start_time = time.time()
     
     # Initialize basic utilities
+    rate_governor = get_rate_governor(settings)  # Configure before any API client sends a request
+    logger.info(f"Rate governor {'enabled' if rate_governor.enabled else 'disabled'} (limits: {settings.RATE_GOVERNOR_LIMITS})")
+    report_cache = get_risk_report_cache(settings)  # Opens and warms the risk report store before API clients use it
+    logger.info(f"Risk report cache {'enabled' if report_cache.enabled else 'disabled'}: {report_cache.get_stats()['entries']} reports loaded")
     proxy_manager = ProxyManager(settings.PROXY_FILE_PATH) if settings.USE_PROXIES else None
     if proxy_manager:
         logger.info(f"ProxyManager initialized. {len(proxy_manager.get_all_proxies())} proxies loaded.")
@@ -1202,6 +1221,8 @@ async def initialize_components(settings: Settings) -> dict:
     # Initialize Solana client
     solana_client = AsyncClient(settings.SOLANA_RPC_URL)
     logger.info(f"Solana AsyncClient initialized for endpoint: {settings.SOLANA_RPC_URL}")
+    rpc_pool = get_rpc_pool(settings, primary_client=solana_client)  # Shares the client above for SOLANA_RPC_URL
+    logger.info(f"RPC pool initialized with {len(rpc_pool.endpoints)} endpoints (hedging {'enabled' if rpc_pool.hedging_enabled else 'disabled'})")
 
     # --- Database Initialization ---
     db = await TokenDatabase.create(settings.DATABASE_FILE_PATH, settings)
@@ -1335,7 +1356,7 @@ async def initialize_components(settings: Settings) -> dict:
         trade_validator=trade_validator,
         price_monitor=market_data.price_monitor # price_monitor comes from market_data
     )
-    trade_queue = TradeQueue(order_manager=order_manager)
+    trade_queue = TradeQueue(order_manager=order_manager, max_concurrency=settings.TRADE_QUEUE_MAX_CONCURRENCY)
     # Initialize TransactionTracker here as it can be needed by other strategy components initialized shortly
     transaction_tracker = TransactionTracker(settings=settings, solana_client=solana_client, db=db)
     logger.info("Core execution components (BalanceChecker, TradeValidator, OrderManager, TradeQueue, TransactionTracker) initialized.")
@@ -1372,7 +1393,7 @@ async def initialize_components(settings: Settings) -> dict:
     
     # Initialize missing components needed by StrategySelector
     # Initialize Indicators
-    indicators = Indicators(settings=settings, thresholds=thresholds)
+    indicators = Indicators(settings=settings, thresholds=thresholds, tick_store=market_data.tick_store)
     logger.info("Indicators initialized.")
     
     # Initialize Whitelist
@@ -1890,6 +1911,14 @@ async def main():
         else:
             logger.warning("API module not found in sys.modules. FastAPI endpoints will not be available.")
 
+        # Prometheus scrape endpoint for this process's metrics registry (same route as web/app.py)
+        from fastapi.responses import PlainTextResponse
+        from performance.metrics_registry import PROMETHEUS_CONTENT_TYPE, get_metrics_registry
+
+        @app_instance.get("/metrics", response_class=PlainTextResponse)
+        async def prometheus_metrics():
+            return PlainTextResponse(get_metrics_registry().render_text(), media_type=PROMETHEUS_CONTENT_TYPE)
+
         # --- Start Background Tasks ---
         background_tasks = []
         
@@ -2,21 +2,27 @@
 Synthron Crypto Trader - Performance Package
 
 This package includes tools for analyzing and optimizing trading performance:
-1. Backtesting: Simulate and evaluate trading strategies using historical data.
+1. Backtesting: Simulate and evaluate trading strategies using historical data
+   (vectorized and event-driven modes in backtest_engine, parallel parameter
+   sweeps and walk-forward optimization in parameter_sweep).
 2. Reporting: Generate performance reports, visualizations, and logs.
 3. Metrics: Calculate key performance indicators (KPIs) like ROI, Sharpe Ratio, and drawdown.
 4. DrawdownTracker: Monitor and manage account drawdowns in real-time.
 5. SystemMonitor: Real-time system performance monitoring and health tracking.
+   Samples feed a Prometheus-style MetricsRegistry exported at /metrics.
 6. Decorators: Performance monitoring decorators for trading operations.
 
 """
 
 # Import all classes from the performance package
 from .backtesting import Backtesting
+from .backtest_engine import BacktestConfig, BacktestResult, run_vectorized, run_event_driven
+from .parameter_sweep import ParameterSweep, grid_samples, random_samples, walk_forward_windows
 from .reporting import Reporting
 from .metrics import Metrics
 from .drawdown_tracker import DrawdownTracker
 from .system_monitor import SystemMonitor, get_system_monitor, initialize_system_monitor
+from .metrics_registry import MetricsRegistry, get_metrics_registry
 from .decorators import (
     SystemMonitoringMixin, performance_timer, async_performance_timer,
     monitor_trade_execution, monitor_strategy_evaluation, monitor_price_operation,
@@ -29,12 +35,22 @@ import logging
 # Public API for the performance package
 __all__ = [
     "Backtesting",
+    "BacktestConfig",
+    "BacktestResult",
+    "run_vectorized",
+    "run_event_driven",
+    "ParameterSweep",
+    "grid_samples",
+    "random_samples",
+    "walk_forward_windows",
     "Reporting", 
     "Metrics",
     "DrawdownTracker",
     "SystemMonitor",
     "get_system_monitor",
     "initialize_system_monitor",
+    "MetricsRegistry",
+    "get_metrics_registry",
     "SystemMonitoringMixin",
     "performance_timer",
     "async_performance_timer",
@@ -0,0 +1,492 @@
+"""
+Backtest engine with a vectorized mode and an event-driven mode.
+
+Vectorized mode turns entry/exit signal arrays into positions, fills, fees,
+slippage and an equity curve with NumPy only (no per-bar Python loop). Signals
+come from the ``Indicators`` functions in ``data/indicators.py`` (or from any
+caller-supplied boolean arrays). With stop-loss / take-profit enabled, trades
+are resolved one per Python step, scanning each trade's bars with NumPy.
+
+Event-driven mode replays ticks through the real
+``EntryExitStrategy.get_signal_on_price_event`` code, with a simulated order
+book standing in for OrderManager and the replayed prices standing in for
+MarketData, and fills its signals with the same fee/slippage model.
+
+Both modes return a ``BacktestResult`` whose ``metrics()`` come from
+``performance/metrics.calculate_metrics``.
+
+Fill model (both modes):
+- A signal on bar ``t`` fills at the price of bar ``t + 1`` (no look-ahead).
+- Buys fill at ``price * (1 + slippage)``, sells at ``price * (1 - slippage)``.
+- ``fee_pct`` is charged on the notional of each side.
+- Stop-loss / take-profit levels are relative to the entry fill and fill on the
+  bar that crosses them.
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from performance.metrics import calculate_metrics
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Exit reasons recorded on trades
+EXIT_SIGNAL = "signal"
+EXIT_STOP_LOSS = "stop_loss"
+EXIT_TAKE_PROFIT = "take_profit"
+EXIT_END_OF_DATA = "end_of_data"
+
+
+@dataclass
+class BacktestConfig:
+    """
+    Capital, sizing and cost model for a backtest.
+
+    Args:
+        initial_capital: Starting equity (quote units, e.g. SOL)
+        position_fraction: Fraction of equity committed to each trade (compounding)
+        fee_pct: Fee per side, in percent of notional
+        slippage_pct: Adverse fill slippage per side, in percent of price
+        stop_loss_pct: Stop-loss distance below the entry fill as a fraction (0.12 = 12%); None disables
+        take_profit_pct: Take-profit distance above the entry fill as a fraction; None disables
+        bar_seconds: Bar width used to synthesize timestamps when none are given
+    """
+    initial_capital: float = 10000.0
+    position_fraction: float = 1.0
+    fee_pct: float = 0.25
+    slippage_pct: float = 0.5
+    stop_loss_pct: Optional[float] = None
+    take_profit_pct: Optional[float] = None
+    bar_seconds: float = 60.0
+
+    @classmethod
+    def from_settings(cls, settings, **overrides) -> 'BacktestConfig':
+        """Build a config from SLIPPAGE_TOLERANCE, BACKTEST_FEE_PCT, STOP_LOSS_PCT and TAKE_PROFIT_PCT."""
+        values = dict(
+            initial_capital=float(os.getenv("STARTING_CAPITAL", 10000)),
+            fee_pct=float(getattr(settings, 'BACKTEST_FEE_PCT', cls.fee_pct)),
+            slippage_pct=float(getattr(settings, 'SLIPPAGE_TOLERANCE', cls.slippage_pct)),
+            stop_loss_pct=getattr(settings, 'STOP_LOSS_PCT', None),
+            take_profit_pct=getattr(settings, 'TAKE_PROFIT_PCT', None),
+        )
+        values.update(overrides)
+        return cls(**values)
+
+    @property
+    def slippage(self) -> float:
+        return self.slippage_pct / 100.0
+
+    @property
+    def fee(self) -> float:
+        return self.fee_pct / 100.0
+
+
+@dataclass
+class BacktestResult:
+    """Trades, per-bar equity and position of one backtest run."""
+    trades: pd.DataFrame
+    equity_curve: pd.Series
+    position: np.ndarray
+    mode: str
+    config: BacktestConfig = field(repr=False, default=None)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Performance metrics from ``performance.metrics.calculate_metrics``."""
+        if self.trades.empty or len(self.equity_curve) < 2:
+            total_return = 0.0
+            if len(self.equity_curve):
+                total_return = (self.equity_curve.iloc[-1] / self.equity_curve.iloc[0] - 1) * 100
+            return {'total_return': round(total_return, 2), 'total_trades': 0}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return calculate_metrics({'trades': self.trades, 'equity_curve': self.equity_curve})
+
+    def trade_log(self) -> List[Dict[str, Any]]:
+        """Buy/sell rows in the shape ``Backtesting.results`` and the ``Metrics`` class use."""
+        log = []
+        for trade in self.trades.itertuples(index=False):
+            log.append({"action": "buy", "price": trade.entry_price, "quantity": trade.quantity,
+                        "profit": 0.0, "timestamp": trade.entry_time})
+            log.append({"action": "sell", "price": trade.exit_price, "quantity": trade.quantity,
+                        "profit": trade.profit, "timestamp": trade.exit_time, "reason": trade.reason})
+        return log
+
+
+def to_timestamps(timestamps: Optional[Iterable[Any]], n: int, bar_seconds: float = 60.0) -> pd.DatetimeIndex:
+    """DatetimeIndex from epoch seconds / datetimes, or synthetic bars from the epoch when None."""
+    if timestamps is None:
+        return pd.to_datetime(np.arange(n) * bar_seconds, unit='s')
+    values = np.asarray(timestamps)
+    if np.issubdtype(values.dtype, np.number):
+        return pd.to_datetime(values, unit='s')
+    return pd.DatetimeIndex(pd.to_datetime(values))
+
+
+def indicator_signals(prices: Iterable[float],
+                      rsi_period: int = 14,
+                      rsi_oversold: Optional[float] = None,
+                      rsi_overbought: Optional[float] = None,
+                      bb_period: Optional[int] = None,
+                      bb_std_dev: float = 2.0,
+                      macd_exit: bool = False,
+                      macd_fast: int = 12,
+                      macd_slow: int = 26,
+                      macd_signal: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mean-reversion entry/exit arrays from the ``Indicators`` functions.
+
+    Entry mirrors ``EntryExitStrategy._generate_reversion_signals`` (RSI oversold
+    and price below the lower band). Exit is RSI overbought or price above the
+    upper band, plus a negative MACD histogram when ``macd_exit`` is set.
+    Defaults come from ``config/thresholds.py``.
+
+    Returns:
+        (entries, exits) boolean arrays aligned with ``prices``
+    """
+    from config import thresholds as threshold_defaults
+    from data.indicators import Indicators
+
+    close = pd.Series(np.asarray(prices, dtype=np.float64))
+    rsi_oversold = threshold_defaults.RSI_OVERSOLD if rsi_oversold is None else rsi_oversold
+    rsi_overbought = threshold_defaults.RSI_OVERBOUGHT if rsi_overbought is None else rsi_overbought
+    bb_period = threshold_defaults.BOLLINGER_PERIOD if bb_period is None else bb_period
+    macd_signal = threshold_defaults.MACD_SIGNAL_PERIOD if macd_signal is None else macd_signal
+
+    n = len(close)
+    rsi = Indicators.rsi(close, int(rsi_period))
+    upper, _, lower = Indicators.bollinger_bands(close, int(bb_period), bb_std_dev)
+    if rsi.empty or upper.empty:
+        return np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+
+    price = close.to_numpy()
+    rsi = rsi.to_numpy()
+    with np.errstate(invalid='ignore'):
+        entries = (rsi < rsi_oversold) & (price < lower.to_numpy())
+        exits = (rsi > rsi_overbought) | (price > upper.to_numpy())
+        if macd_exit:
+            _, _, histogram = Indicators.macd(close, int(macd_fast), int(macd_slow), int(macd_signal))
+            if not histogram.empty:
+                exits |= histogram.to_numpy() < 0
+    return entries, exits
+
+
+def _forward_fill_state(entries: np.ndarray, exits: np.ndarray) -> np.ndarray:
+    """Desired holding state after each bar: 1 after an entry, 0 after an exit (exit wins ties)."""
+    n = len(entries)
+    state = np.where(exits, 0.0, np.where(entries, 1.0, np.nan))
+    marked = ~np.isnan(state)
+    last = np.where(marked, np.arange(n), -1)
+    np.maximum.accumulate(last, out=last)
+    held = np.where(last >= 0, state[np.maximum(last, 0)], 0.0)
+    return held > 0
+
+
+def run_vectorized(prices: Iterable[float],
+                   entries: Iterable[bool],
+                   exits: Iterable[bool],
+                   config: Optional[BacktestConfig] = None,
+                   timestamps: Optional[Iterable[Any]] = None) -> BacktestResult:
+    """
+    Vectorized backtest of one price series.
+
+    Args:
+        prices: Bar close prices
+        entries: True where the strategy wants to be long after this bar
+        exits: True where the strategy wants to be flat after this bar
+        config: Cost and sizing model (defaults to ``BacktestConfig()``)
+        timestamps: Epoch seconds or datetimes per bar; synthetic ``bar_seconds`` bars if None
+    """
+    config = config or BacktestConfig()
+    price = np.asarray(prices, dtype=np.float64)
+    entries = np.asarray(entries, dtype=bool)
+    exits = np.asarray(exits, dtype=bool)
+    n = len(price)
+    if len(entries) != n or len(exits) != n:
+        raise ValueError("prices, entries and exits must have the same length")
+    index = to_timestamps(timestamps, n, config.bar_seconds)
+    if n == 0:
+        return _empty_result(index, config, "vectorized")
+
+    if config.stop_loss_pct or config.take_profit_pct:
+        entry_idx, exit_idx, reasons = _trades_with_stops(price, entries, exits, config)
+    else:
+        entry_idx, exit_idx, reasons = _signal_trades(entries, exits)
+    return _build_result(price, index, entry_idx, exit_idx, reasons, config, "vectorized")
+
+
+def _signal_trades(entries: np.ndarray, exits: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(entry bars, exit bars, reasons) from signals alone; orders decided on bar t fill on bar t + 1."""
+    n = len(entries)
+    held = _forward_fill_state(entries, exits)
+    position = np.zeros(n, dtype=bool)
+    position[1:] = held[:-1]
+    change = np.diff(position.astype(np.int8), prepend=np.int8(0))
+    entry_idx = np.flatnonzero(change == 1)
+    exit_idx = np.flatnonzero(change == -1)
+    reasons = np.full(len(entry_idx), EXIT_SIGNAL, dtype=object)
+    if len(exit_idx) < len(entry_idx):
+        exit_idx = np.append(exit_idx, n - 1)
+        reasons[-1] = EXIT_END_OF_DATA
+    return entry_idx, exit_idx, reasons
+
+
+def _trades_with_stops(price: np.ndarray, entries: np.ndarray, exits: np.ndarray,
+                       config: BacktestConfig) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Trades with stop-loss / take-profit exits.
+
+    A stop ends a trade early and the next trade needs a fresh entry signal, so
+    trades are resolved one after another: one Python step per trade, with the
+    next signal found by ``searchsorted`` and the first crossing bar by a NumPy
+    scan over that trade's bars only.
+    """
+    n = len(price)
+    entry_bars = np.flatnonzero(entries & ~exits)
+    exit_bars = np.flatnonzero(exits)
+    sl = config.stop_loss_pct
+    tp = config.take_profit_pct
+    entry_idx: List[int] = []
+    exit_idx: List[int] = []
+    reasons: List[str] = []
+    start = 0
+    while True:
+        i = np.searchsorted(entry_bars, start)
+        if i == len(entry_bars) or entry_bars[i] >= n - 1:
+            break
+        signal_bar = int(entry_bars[i])
+        entry = signal_bar + 1
+        j = np.searchsorted(exit_bars, signal_bar, side='right')
+        if j < len(exit_bars) and exit_bars[j] + 1 < n:
+            exit_bar, reason = int(exit_bars[j]) + 1, EXIT_SIGNAL
+        else:
+            exit_bar, reason = n - 1, EXIT_END_OF_DATA
+
+        entry_fill = price[entry] * (1 + config.slippage)
+        # The last bar can still stop out a trade that runs to the end of the data
+        window = price[entry + 1:exit_bar + (reason == EXIT_END_OF_DATA)]
+        hit = np.zeros(len(window), dtype=bool)
+        if sl:
+            hit |= window <= entry_fill * (1 - sl)
+        if tp:
+            hit |= window >= entry_fill * (1 + tp)
+        if hit.any():
+            exit_bar = entry + 1 + int(np.argmax(hit))
+            reason = EXIT_STOP_LOSS if sl and price[exit_bar] <= entry_fill * (1 - sl) else EXIT_TAKE_PROFIT
+
+        entry_idx.append(entry)
+        exit_idx.append(exit_bar)
+        reasons.append(reason)
+        if reason == EXIT_END_OF_DATA:
+            break
+        start = exit_bar
+    return (np.asarray(entry_idx, dtype=np.int64), np.asarray(exit_idx, dtype=np.int64),
+            np.asarray(reasons, dtype=object))
+
+
+def _empty_result(index: pd.DatetimeIndex, config: BacktestConfig, mode: str) -> BacktestResult:
+    trades = pd.DataFrame(columns=["entry_time", "exit_time", "entry_price", "exit_price", "quantity",
+                                   "profit", "return_pct", "duration", "reason"])
+    equity = pd.Series(np.full(len(index), config.initial_capital), index=index, name="equity")
+    return BacktestResult(trades, equity, np.zeros(len(index), dtype=bool), mode, config)
+
+
+def _build_result(price: np.ndarray, index: pd.DatetimeIndex, entry_idx: np.ndarray, exit_idx: np.ndarray,
+                  reasons: np.ndarray, config: BacktestConfig, mode: str) -> BacktestResult:
+    """Fills, per-trade P&L and the marked-to-market equity curve for non-overlapping trades."""
+    n = len(price)
+    if len(entry_idx) == 0:
+        return _empty_result(index, config, mode)
+
+    fraction = config.position_fraction
+    entry_fill = price[entry_idx] * (1 + config.slippage)
+    exit_fill = price[exit_idx] * (1 - config.slippage)
+    cost = entry_fill * (1 + config.fee)           # per unit bought
+    proceeds = exit_fill * (1 - config.fee)        # per unit sold
+    trade_return = proceeds / cost - 1
+
+    growth = np.cumprod(1 + fraction * trade_return)
+    equity_before = config.initial_capital * np.concatenate(([1.0], growth[:-1]))
+    quantity = fraction * equity_before / cost
+    profit = fraction * equity_before * trade_return
+
+    # Realized equity after the trades closed so far; open trades are marked at the exit fill price
+    bars = np.arange(n)
+    closed = np.searchsorted(exit_idx, bars, side='right')
+    realized = config.initial_capital * np.concatenate(([1.0], growth))[closed]
+    delta = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(delta, entry_idx, 1)
+    np.add.at(delta, exit_idx, -1)
+    position = np.cumsum(delta[:n]) > 0
+    open_trade = np.minimum(closed, len(entry_idx) - 1)
+    marked = (equity_before[open_trade] * (1 - fraction)
+              + quantity[open_trade] * price * (1 - config.slippage) * (1 - config.fee))
+    equity = np.where(position, marked, realized)
+
+    entry_time = index[entry_idx]
+    exit_time = index[exit_idx]
+    trades = pd.DataFrame({
+        "entry_time": entry_time,
+        "exit_time": exit_time,
+        "entry_price": entry_fill,
+        "exit_price": exit_fill,
+        "quantity": quantity,
+        "profit": profit,
+        "return_pct": trade_return * 100,
+        "duration": (exit_time - entry_time).total_seconds() / 3600,  # hours
+        "reason": reasons,
+    })
+    return BacktestResult(trades, pd.Series(equity, index=index, name="equity"), position, mode, config)
+
+
+# --- Event-driven mode ---
+
+class _ReplayTokenStore:
+    """Stands in for TokenDatabase.get_token during a replay."""
+
+    def __init__(self, token: Any):
+        self.token = token
+
+    async def get_token(self, mint: str):
+        return self.token
+
+
+class _ReplayMarketData:
+    """Stands in for MarketData: the replayed price is already the SOL price."""
+
+    def __init__(self):
+        self.price: Optional[float] = None
+
+    async def get_token_price_sol(self, mint: str) -> Optional[float]:
+        return self.price
+
+    async def _get_sol_price_usd(self) -> Optional[float]:
+        return None
+
+
+class _SimulatedBook:
+    """Stands in for OrderManager position lookups and records fills for one mint."""
+
+    def __init__(self, mint: str):
+        self.mint = mint
+        self.position: Optional[Dict[str, Any]] = None
+
+    def get_position(self, mint: str) -> Optional[Dict[str, Any]]:
+        return self.position if mint == self.mint else None
+
+    def has_position(self, mint: str) -> bool:
+        return self.get_position(mint) is not None
+
+
+async def run_event_driven_async(strategy, mint: str, prices: Iterable[float],
+                                 config: Optional[BacktestConfig] = None,
+                                 timestamps: Optional[Iterable[Any]] = None,
+                                 token: Any = None) -> BacktestResult:
+    """
+    Replay ticks through ``strategy.get_signal_on_price_event``.
+
+    ``strategy`` is an ``EntryExitStrategy``; its db, market_data and
+    order_manager are replaced by replay stand-ins for the duration of the run.
+    Time-based exits use wall-clock position age in the strategy, so they do not
+    fire during a replay.
+
+    Args:
+        strategy: EntryExitStrategy instance
+        mint: Mint the ticks belong to
+        prices: Tick/bar prices in SOL
+        config: Cost model; stop-loss/take-profit come from the strategy, not the config
+        timestamps: Epoch seconds or datetimes per tick
+        token: Token row returned to the entry checks; defaults to one that passes them
+    """
+    config = config or BacktestConfig()
+    price = np.asarray(prices, dtype=np.float64)
+    n = len(price)
+    index = to_timestamps(timestamps, n, config.bar_seconds)
+    if token is None:
+        token = _passing_token()
+
+    book = _SimulatedBook(mint)
+    market = _ReplayMarketData()
+    saved = (strategy.db, strategy.market_data, strategy.order_manager, strategy.active_mint)
+    strategy.db, strategy.market_data, strategy.order_manager = _ReplayTokenStore(token), market, None
+    strategy.set_active_mint(mint)
+    strategy.order_manager = book
+
+    entry_idx: List[int] = []
+    exit_idx: List[int] = []
+    reasons: List[str] = []
+    pending: Optional[Dict[str, Any]] = None
+    try:
+        for i in range(n):
+            # Fill the previous tick's signal at this tick's price
+            if pending is not None:
+                if pending["action"] == "BUY" and book.position is None:
+                    entry_idx.append(i)
+                    book.position = {
+                        "mint": mint,
+                        "quantity": 1.0,
+                        "entry_price": price[i] * (1 + config.slippage),
+                        "strategy": pending.get("strategy_name", "default"),
+                        "entry_timestamp": datetime.now(timezone.utc),
+                    }
+                elif pending["action"] == "SELL" and book.position is not None:
+                    exit_idx.append(i)
+                    reasons.append(pending.get("reason") or EXIT_SIGNAL)
+                    book.position = None
+                pending = None
+
+            market.price = float(price[i])
+            signal = await strategy.get_signal_on_price_event({"mint": mint, "price": market.price, "timestamp": index[i]})
+            if signal and signal.get("action") in ("BUY", "SELL"):
+                pending = signal
+    finally:
+        strategy.db, strategy.market_data, strategy.order_manager, active = saved
+        strategy.active_mint = active
+
+    if len(exit_idx) < len(entry_idx):
+        exit_idx.append(n - 1)
+        reasons.append(EXIT_END_OF_DATA)
+    return _build_result(price, index, np.asarray(entry_idx, dtype=np.int64), np.asarray(exit_idx, dtype=np.int64),
+                         np.asarray(reasons, dtype=object), config, "event")
+
+
+def run_event_driven(strategy, mint: str, prices: Iterable[float],
+                     config: Optional[BacktestConfig] = None,
+                     timestamps: Optional[Iterable[Any]] = None,
+                     token: Any = None) -> BacktestResult:
+    """Synchronous wrapper around ``run_event_driven_async``."""
+    return asyncio.run(run_event_driven_async(strategy, mint, prices, config, timestamps, token))
+
+
+def _passing_token() -> Any:
+    """A token row that clears the entry checks in ``get_signal_on_price_event``."""
+    return SimpleNamespace(
+        overall_filter_passed=True,
+        volume_24h=float('inf'),
+        liquidity=float('inf'),
+        category='FRESH',
+    )
+
+
+def signals_for(strategy: Any, data: pd.DataFrame, **signal_params) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Entry/exit arrays for ``data``.
+
+    Uses ``strategy.generate_signals(data)`` when the strategy provides it, maps a
+    plain row callable returning ``'buy'``/``'sell'`` over the frame once, and
+    falls back to ``indicator_signals`` on the price column otherwise.
+    """
+    generate: Optional[Callable] = getattr(strategy, 'generate_signals', None)
+    if callable(generate):
+        entries, exits = generate(data)
+        return np.asarray(entries, dtype=bool), np.asarray(exits, dtype=bool)
+    if callable(strategy) and not hasattr(strategy, 'get_signal_on_price_event'):
+        actions = data.apply(strategy, axis=1).to_numpy()
+        return actions == 'buy', actions == 'sell'
+    return indicator_signals(data['price'].to_numpy(), **signal_params)
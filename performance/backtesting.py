@@ -5,6 +5,7 @@ import logging
 import os
 from dotenv import load_dotenv
 from config.settings import Settings
+from performance.backtest_engine import BacktestConfig, run_vectorized, run_event_driven, signals_for
 
 # Load environment variables
 load_dotenv()
@@ -34,21 +35,27 @@ class Backtesting:
         self.strategy = strategy
         self.results = []
         self.data = None
+        self.result = None  # BacktestResult of the last run_backtest()
 
         self.settings = Settings()
         self.trade_size = self.settings.TRADE_SIZE
         self.slippage_tolerance = self.settings.SLIPPAGE_TOLERANCE
         self.risk_per_trade = self.settings.RISK_PER_TRADE
 
-    def load_data(self, source=None, live=False, symbol=None):
+    def load_data(self, source=None, live=False, symbol=None, mint=None, bar_seconds=None):
         """
-        Load historical data from CSV or fetch live data from DexScreener.
+        Load historical data from CSV, the on-chain tick store, or fetch live data from DexScreener.
         :param source: Path to CSV or None for API fetching.
         :param live: Boolean, fetch live data if True.
         :param symbol: Trading pair symbol for live data (e.g., "SOL/USDT").
+        :param mint: Token mint to replay from the tick store.
+        :param bar_seconds: Resample ticks into bars of this width; raw ticks if None.
         """
         try:
-            if live and symbol:
+            if mint:
+                self.data = self._load_tick_data(mint, bar_seconds)
+                logging.info(f"Loaded {len(self.data)} rows for {mint} from tick store.")
+            elif live and symbol:
                 logging.info(f"Fetching live data for {symbol}...")
                 api_url = f"{self.api_base_url}/{symbol}"
                 response = requests.get(api_url)
@@ -67,6 +74,32 @@ class Backtesting:
             logging.error(f"Failed to load data: {e}")
             raise
 
+    def _load_tick_data(self, mint, bar_seconds=None):
+        """
+        Read recorded swap ticks for a mint (read-only, zero-copy) into a DataFrame with price/volume columns.
+        :param mint: Token mint address.
+        :param bar_seconds: Optional bar width for OHLCV resampling.
+        """
+        from data.tick_store import TickStore, ticks_to_ohlcv, DIRECTION_SELL
+        import numpy as np
+
+        store = TickStore(self.settings.TICK_STORE_PATH, read_only=True)
+        try:
+            ticks = store.read(mint)
+            if bar_seconds:
+                bars = pd.DataFrame(ticks_to_ohlcv(ticks, bar_seconds))
+                if not bars.empty:
+                    bars["price"] = bars["close"]
+                return bars
+            return pd.DataFrame({
+                "timestamp": np.array(ticks["timestamp"]),
+                "price": np.array(ticks["price_sol"]),
+                "volume": np.where(ticks["direction"] == DIRECTION_SELL, ticks["amount_out"], ticks["amount_in"]),
+                "direction": np.array(ticks["direction"]),
+            })
+        finally:
+            store.close()
+
     def simulate_trade(self, action, price, quantity):
         """
         Simulate a trade (buy/sell).
@@ -110,8 +143,19 @@ class Backtesting:
     def evaluate_metrics(self):
         """
         Evaluate performance metrics based on trade results.
+        After run_backtest(), adds the performance.metrics set for the engine result.
         """
         try:
+            if self.result is not None:
+                metrics = self.result.metrics()
+                equity = self.result.equity_curve
+                metrics.update({
+                    "total_profit": float(self.result.trades['profit'].sum()) if not self.result.trades.empty else 0.0,
+                    "ROI": metrics.get('total_return', 0.0),
+                    "max_drawdown": float((equity - equity.cummax()).min()) if len(equity) else 0.0,
+                })
+                logging.info(f"Performance metrics: {metrics}")
+                return metrics
             df = pd.DataFrame(self.results)
             total_profit = df['profit'].sum()
             roi = (total_profit / self.capital) * 100
@@ -123,22 +167,32 @@ class Backtesting:
             logging.error(f"Error evaluating metrics: {e}")
             raise
 
-    def run_backtest(self):
+    def run_backtest(self, mode="vectorized", mint=None, config=None, **signal_params):
         """
-        Run backtesting on historical data.
+        Run backtesting on historical data with the backtest engine.
+        :param mode: 'vectorized' (signal arrays, NumPy fills/equity) or 'event' (ticks through EntryExitStrategy).
+        :param mint: Mint the data belongs to (event mode).
+        :param config: BacktestConfig; built from settings if None.
+        :param signal_params: Passed to indicator_signals when the strategy has no generate_signals().
         """
-        logging.info("Starting backtesting...")
+        logging.info(f"Starting backtesting ({mode})...")
         try:
             if self.data is None:
                 raise ValueError("No data loaded. Call load_data() first.")
-                
-            for _, row in self.data.iterrows():
-                signal = self.strategy(row)
-                if signal == 'buy':
-                    self.simulate_trade('buy', row['price'], row['volume'])
-                elif signal == 'sell':
-                    self.simulate_trade('sell', row['price'], row['volume'])
-            logging.info("Backtesting completed successfully.")
+
+            config = config or BacktestConfig.from_settings(self.settings, initial_capital=self.capital)
+            timestamps = self.data['timestamp'].to_numpy() if 'timestamp' in self.data.columns else None
+            prices = self.data['price'].to_numpy()
+            if mode == "event":
+                self.result = run_event_driven(self.strategy, mint or "backtest", prices, config, timestamps)
+            elif mode == "vectorized":
+                entries, exits = signals_for(self.strategy, self.data, **signal_params)
+                self.result = run_vectorized(prices, entries, exits, config, timestamps)
+            else:
+                raise ValueError(f"Unknown backtest mode: {mode}")
+            self.results = self.result.trade_log()
+            logging.info(f"Backtesting completed successfully: {len(self.result.trades)} trades.")
+            return self.result
         except Exception as e:
             logging.error(f"Backtesting error: {e}")
             raise
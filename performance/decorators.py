@@ -378,13 +378,13 @@ def monitor_websocket_operation(operation_name: str):
     )
 
 def monitor_message_processing(message_type: str = ""):
-    """Decorator for message processing operations"""
+    """Decorator for message processing operations (runs per WebSocket frame, so it records but never prints)"""
     labels = {"message_type": message_type} if message_type else None
     return measure_async_performance(
         "message_processing_time",
         labels=labels,
         component="message_dispatcher",
-        log_result=True
+        log_result=False
     )
 
 def monitor_event_handling(event_type: str = ""):
@@ -0,0 +1,434 @@
+"""
+Prometheus-style metrics registry for hot-path instrumentation.
+
+Counters, gauges and histograms are grouped in families. Each family keeps one
+preallocated child per label set; children are keyed by the ``(name, value)``
+label tuple and label strings are interned when a child is created. Recording
+is a plain attribute or list-slot update:
+
+- ``Counter.inc`` / ``Gauge.set`` add to or overwrite one number.
+- ``Histogram.observe`` bisects a fixed bucket boundary list and bumps one
+  slot of a preallocated count list. No per-sample object is retained, so
+  memory is constant no matter how many samples are recorded.
+
+There are no locks. Samples are written from the event loop thread; a
+concurrent read from another thread may see a slightly stale value, which is
+acceptable for metrics. Percentiles are interpolated from bucket counts.
+With the default log-spaced buckets the error is at most one bucket width,
+about 19% of the value.
+
+``render_text`` produces the Prometheus text exposition format (0.0.4) served
+at ``/metrics``.
+"""
+
+import math
+import re
+import sys
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def exponential_buckets(start: float, factor: float, count: int) -> Tuple[float, ...]:
+    """
+    Log-spaced bucket upper bounds: ``start, start*factor, ..., start*factor**(count-1)``
+
+    Args:
+        start: First upper bound (> 0)
+        factor: Ratio between consecutive bounds (> 1)
+        count: Number of bounds
+
+    Returns:
+        Tuple[float, ...]: Increasing bucket upper bounds (``+Inf`` is implicit)
+    """
+    if start <= 0 or factor <= 1 or count < 1:
+        raise ValueError("exponential_buckets needs start > 0, factor > 1 and count >= 1")
+    return tuple(start * factor ** i for i in range(count))
+
+
+def log_linear_buckets(low: float, high: float, factor: float = 2 ** 0.25) -> Tuple[float, ...]:
+    """
+    HDR-style bucket bounds covering ``[low, high]`` with a constant relative width.
+
+    Args:
+        low: Smallest value that needs resolving
+        high: Largest value that needs resolving
+        factor: Ratio between consecutive bounds (2**0.25 gives 4 buckets per doubling)
+
+    Returns:
+        Tuple[float, ...]: Increasing bucket upper bounds ending at or above ``high``
+    """
+    count = int(math.ceil(math.log(high / low, factor))) + 1
+    return exponential_buckets(low, factor, count)
+
+
+# Durations in milliseconds: 10 microseconds .. ~2 minutes
+DEFAULT_DURATION_MS_BUCKETS = log_linear_buckets(0.01, 120_000.0)
+
+
+def sanitize_metric_name(name: str) -> str:
+    """Replace characters Prometheus does not allow in metric names with ``_``."""
+    cleaned = _INVALID_NAME_CHARS.sub("_", name)
+    if cleaned and cleaned[0].isdigit():
+        cleaned = f"_{cleaned}"
+    return cleaned
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# --- Children (one per label set) ---
+
+class CounterChild:
+    """Monotonic counter for one label set."""
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class GaugeChild:
+    """Last-value gauge for one label set."""
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+
+class HistogramChild:
+    """
+    Fixed-bucket histogram for one label set.
+
+    ``counts[i]`` counts samples ``<= bounds[i]``. The last slot, ``counts[len(bounds)]``,
+    is the ``+Inf`` bucket.
+    """
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts: List[int] = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: 'HistogramChild'):
+        """Add another histogram with the same bounds into this one."""
+        counts = self.counts
+        for i, c in enumerate(other.counts):
+            counts[i] += c
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Approximate ``q``-quantile (0..1) from the bucket counts.
+
+        The value is linearly interpolated inside the bucket that holds the target
+        rank and clamped to the observed min/max.
+
+        Returns:
+            Optional[float]: None when nothing has been observed
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        bounds = self.bounds
+        for i, c in enumerate(self.counts):
+            if not c:
+                continue
+            if cumulative + c >= rank:
+                lower = bounds[i - 1] if i > 0 else self.min
+                upper = bounds[i] if i < len(bounds) else self.max
+                lower = max(lower, self.min)
+                upper = min(upper, self.max)
+                if upper <= lower:
+                    return lower
+                return lower + (upper - lower) * ((rank - cumulative) / c)
+            cumulative += c
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Count, sum, min/max, mean and p50/p90/p95/p99."""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "p50": self.percentile(0.50),
+            "p90": self.percentile(0.90),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+# --- Families ---
+
+class MetricFamily:
+    """
+    Named metric with one child per label set.
+
+    Args:
+        name: Metric name (sanitized for Prometheus)
+        documentation: HELP text
+        labelnames: Fixed label names for ``labels(*values)``; ``child(dict)`` accepts any names
+    """
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str = "", labelnames: Sequence[str] = ()):
+        self.name = sanitize_metric_name(name)
+        self.documentation = documentation or name
+        self.labelnames = tuple(sys.intern(n) for n in labelnames)
+        # Canonical (interned, stringified) label tuple -> child
+        self._children: Dict[Tuple, Any] = {}
+        # Every key a child has been looked up by (e.g. with non-str values) -> child
+        self._lookup: Dict[Tuple, Any] = {}
+        # Unlabelled child, preallocated so the common case is a single attribute read
+        self.default = self._new_child()
+        self._children[()] = self._lookup[()] = self.default
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwvalues):
+        """
+        Child for the given label values (created on first use).
+
+        Callers on hot paths should keep the returned child instead of calling this per sample.
+        """
+        if kwvalues:
+            values = tuple(kwvalues[n] for n in self.labelnames)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        return self._child_for_key(tuple(zip(self.labelnames, values)))
+
+    def child(self, labels: Optional[Dict[str, Any]] = None):
+        """
+        Child for a label dict (the ``SystemMonitor`` calling convention).
+
+        Args:
+            labels: Label name -> value; None or empty selects the unlabelled child
+        """
+        if not labels:
+            return self.default
+        key = tuple(labels.items())
+        child = self._lookup.get(key)
+        return child if child is not None else self._child_for_key(key)
+
+    def _child_for_key(self, key: Tuple):
+        child = self._lookup.get(key)
+        if child is None:
+            canonical = tuple((sys.intern(str(k)), sys.intern(str(v))) for k, v in key)
+            child = self._children.get(canonical)
+            if child is None:
+                child = self._new_child()
+                self._children[canonical] = child
+            self._lookup[key] = child
+        return child
+
+    def children(self) -> Iterable[Tuple[Tuple, Any]]:
+        """``(label pairs, child)`` for every label set, including the unlabelled one."""
+        return list(self._children.items())
+
+    @staticmethod
+    def _format_labels(key: Tuple, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [f'{k}="{_escape_label_value(str(v))}"' for k, v in key]
+        if extra is not None:
+            pairs.append(f'{extra[0]}="{extra[1]}"')
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(MetricFamily):
+    """Monotonic counter family; exposed as ``<name>_total``."""
+
+    metric_type = "counter"
+
+    def _new_child(self):
+        return CounterChild()
+
+    def inc(self, amount: float = 1):
+        self.default.inc(amount)
+
+    def render(self) -> List[str]:
+        name = self.name if self.name.endswith("_total") else f"{self.name}_total"
+        lines = [f"# HELP {name} {self.documentation}", f"# TYPE {name} counter"]
+        for key, child in self.children():
+            if key or child.value:
+                lines.append(f"{name}{self._format_labels(key)} {_format_value(child.value)}")
+        return lines
+
+
+class Gauge(MetricFamily):
+    """Last-value gauge family."""
+
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return GaugeChild()
+
+    def set(self, value: float):
+        self.default.set(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for key, child in self.children():
+            if key or child.value:
+                lines.append(f"{self.name}{self._format_labels(key)} {_format_value(child.value)}")
+        return lines
+
+
+class Histogram(MetricFamily):
+    """
+    Fixed-bucket histogram family.
+
+    Args:
+        buckets: Increasing bucket upper bounds shared by all children
+            (default: ``DEFAULT_DURATION_MS_BUCKETS``)
+    """
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str = "", labelnames: Sequence[str] = (),
+                 buckets: Optional[Sequence[float]] = None):
+        bounds = tuple(float(b) for b in (buckets or DEFAULT_DURATION_MS_BUCKETS))
+        if any(b >= c for b, c in zip(bounds, bounds[1:])):
+            raise ValueError(f"Histogram {name} buckets must be strictly increasing")
+        self.bounds = bounds
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        self.default.observe(value)
+
+    def merged(self) -> HistogramChild:
+        """All label sets combined into one histogram (allocated on each call; for reporting)."""
+        total = HistogramChild(self.bounds)
+        for _, child in self.children():
+            if child.count:
+                total.merge(child)
+        return total
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, child in self.children():
+            if not child.count:
+                continue
+            cumulative = 0
+            for bound, c in zip(self.bounds, child.counts):
+                cumulative += c
+                # Buckets below the first sample are omitted to keep the exposition short
+                if cumulative:
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', '+Inf'))} {child.count}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {child.count}")
+        return lines
+
+
+# --- Registry ---
+
+class MetricsRegistry:
+    """
+    Process-wide collection of metric families.
+
+    ``counter``/``gauge``/``histogram`` return the existing family of that name or
+    create it; asking for an existing name with a different type raises ValueError.
+    """
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        family = self._families.get(name)
+        if family is None:
+            family = cls(name, documentation, labelnames, **kwargs)
+            self._families[name] = family
+        elif type(family) is not cls:
+            raise ValueError(f"Metric {name} is already registered as a {family.metric_type}")
+        return family
+
+    def counter(self, name: str, documentation: str = "", labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str = "", labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str = "", labelnames: Sequence[str] = (),
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[MetricFamily]:
+        return self._families.get(name)
+
+    def families(self) -> List[MetricFamily]:
+        return list(self._families.values())
+
+    def render_text(self) -> str:
+        """All families in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for family in sorted(self.families(), key=lambda f: f.name):
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry instance
+_metrics_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get or create the global metrics registry"""
+    global _metrics_registry
+    if _metrics_registry is None:
+        _metrics_registry = MetricsRegistry()
+    return _metrics_registry
@@ -0,0 +1,454 @@
+"""
+Parallel parameter sweep and walk-forward optimizer for the backtest engine.
+
+Candidates come from a grid, random samples or a Bayesian sampler (Gaussian
+process + expected improvement, scikit-learn). Every candidate is one
+``run_vectorized`` backtest on a ``ProcessPoolExecutor`` worker.
+
+The price (and timestamp) arrays are copied once into
+``multiprocessing.shared_memory`` and every worker maps them read-only in its
+initializer, so a task only pickles its parameter dict and a bar range. The
+work per task is pure NumPy/pandas with no shared state, so throughput scales
+with the worker count until the machine runs out of cores.
+
+Parameters named like ``BacktestConfig`` fields (``stop_loss_pct``,
+``take_profit_pct``, ``fee_pct``, ...) go to the cost model; all others go to
+``indicator_signals`` (``rsi_oversold``, ``rsi_overbought``, ``bb_period``,
+``macd_signal``, ...).
+
+Usage:
+    python -m performance.parameter_sweep --data outputs/historical_data.csv --mode grid \\
+        --train-bars 43200 --test-bars 10080 --output outputs/sweep_results.csv
+"""
+
+import itertools
+import math
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from performance.backtest_engine import BacktestConfig, indicator_signals, run_vectorized
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CONFIG_PARAMS = frozenset(f.name for f in fields(BacktestConfig))
+
+# Parameter space: a list is a set of discrete choices, a (low, high) tuple a uniform range
+# (integers when both bounds are ints).
+ParameterSpace = Dict[str, Any]
+
+DEFAULT_SPACE: ParameterSpace = {
+    'rsi_oversold': [25, 30, 35, 40, 45],
+    'rsi_overbought': [55, 60, 65, 70, 75],
+    'stop_loss_pct': [0.05, 0.08, 0.12, 0.2],
+    'take_profit_pct': [0.1, 0.24, 0.4],
+}
+
+
+# --- Candidate generation ---
+
+def _is_range(spec: Any) -> bool:
+    return isinstance(spec, tuple) and len(spec) == 2 and all(isinstance(v, (int, float)) for v in spec)
+
+
+def _range_values(spec: Tuple[float, float], points: int) -> List[Any]:
+    low, high = spec
+    if isinstance(low, int) and isinstance(high, int):
+        return sorted(set(int(round(v)) for v in np.linspace(low, high, points)))
+    return [float(v) for v in np.linspace(low, high, points)]
+
+
+def grid_samples(space: ParameterSpace, grid_points: int = 5) -> List[Dict[str, Any]]:
+    """Every combination of the space; ranges are split into ``grid_points`` values."""
+    names = list(space)
+    axes = [_range_values(space[n], grid_points) if _is_range(space[n]) else list(space[n]) for n in names]
+    return [dict(zip(names, combo)) for combo in itertools.product(*axes)]
+
+
+def _sample_value(spec: Any, rng: np.random.Generator) -> Any:
+    if _is_range(spec):
+        low, high = spec
+        if isinstance(low, int) and isinstance(high, int):
+            return int(rng.integers(low, high + 1))
+        return float(rng.uniform(low, high))
+    choices = list(spec)
+    return choices[int(rng.integers(len(choices)))]
+
+
+def random_samples(space: ParameterSpace, count: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """``count`` independent uniform draws from the space."""
+    rng = np.random.default_rng(seed)
+    return [{name: _sample_value(spec, rng) for name, spec in space.items()} for _ in range(count)]
+
+
+class BayesianSampler:
+    """
+    Batch Bayesian optimization over a parameter space.
+
+    Starts with random draws, then fits a Gaussian process to the observed
+    scores (higher is better) and proposes the candidates with the highest
+    expected improvement out of ``n_candidates`` random points.
+    """
+
+    def __init__(self, space: ParameterSpace, seed: Optional[int] = None,
+                 n_initial: int = 10, n_candidates: int = 2000):
+        self.space = space
+        self.names = list(space)
+        self.rng = np.random.default_rng(seed)
+        self.n_initial = n_initial
+        self.n_candidates = n_candidates
+        self.observed: List[Tuple[np.ndarray, float]] = []
+
+    def _encode(self, params: Dict[str, Any]) -> np.ndarray:
+        point = []
+        for name in self.names:
+            spec, value = self.space[name], params[name]
+            if _is_range(spec):
+                low, high = spec
+                point.append((value - low) / (high - low) if high != low else 0.0)
+            else:
+                choices = list(spec)
+                point.append(choices.index(value) / max(len(choices) - 1, 1))
+        return np.asarray(point, dtype=np.float64)
+
+    def _decode(self, point: np.ndarray) -> Dict[str, Any]:
+        params = {}
+        for name, u in zip(self.names, point):
+            spec = self.space[name]
+            if _is_range(spec):
+                low, high = spec
+                value = low + u * (high - low)
+                params[name] = int(round(value)) if isinstance(low, int) and isinstance(high, int) else float(value)
+            else:
+                choices = list(spec)
+                params[name] = choices[int(round(u * (len(choices) - 1)))]
+        return params
+
+    def observe(self, params: Dict[str, Any], score: float) -> None:
+        if score is not None and math.isfinite(score):
+            self.observed.append((self._encode(params), float(score)))
+
+    def propose(self, count: int) -> List[Dict[str, Any]]:
+        if len(self.observed) < self.n_initial:
+            return random_samples(self.space, count, int(self.rng.integers(2**31)))
+
+        from scipy.stats import norm
+        from sklearn.exceptions import ConvergenceWarning
+        from sklearn.gaussian_process import GaussianProcessRegressor
+        from sklearn.gaussian_process.kernels import ConstantKernel, Matern, WhiteKernel
+
+        X = np.stack([x for x, _ in self.observed])
+        y = np.asarray([s for _, s in self.observed])
+        y_mean, y_std = y.mean(), y.std() or 1.0
+        gp = GaussianProcessRegressor(
+            kernel=ConstantKernel() * Matern(nu=2.5) + WhiteKernel(),
+            normalize_y=False, random_state=int(self.rng.integers(2**31)))
+        with warnings.catch_warnings():
+            # Flat objective surfaces push the noise level to its bound; that is expected here
+            warnings.simplefilter('ignore', ConvergenceWarning)
+            gp.fit(X, (y - y_mean) / y_std)
+
+        candidates = self.rng.random((self.n_candidates, len(self.names)))
+        mu, sigma = gp.predict(candidates, return_std=True)
+        best = (y.max() - y_mean) / y_std
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (mu - best) / sigma
+            ei = np.where(sigma > 0, (mu - best) * norm.cdf(z) + sigma * norm.pdf(z), 0.0)
+
+        proposals, seen = [], set()
+        for idx in np.argsort(-ei):
+            params = self._decode(candidates[idx])
+            key = tuple(params.values())
+            if key in seen:
+                continue
+            seen.add(key)
+            proposals.append(params)
+            if len(proposals) == count:
+                break
+        return proposals
+
+
+def walk_forward_windows(n: int, train_bars: int, test_bars: int,
+                         step_bars: Optional[int] = None) -> List[Tuple[int, int, int, int]]:
+    """(train_start, train_end, test_start, test_end) windows rolling forward by ``step_bars`` (default ``test_bars``)."""
+    step = step_bars or test_bars
+    windows = []
+    start = 0
+    while start + train_bars + test_bars <= n:
+        windows.append((start, start + train_bars, start + train_bars, start + train_bars + test_bars))
+        start += step
+    return windows
+
+
+def rank_results(rows: Iterable[Dict[str, Any]], objective: str) -> pd.DataFrame:
+    """Results table sorted by ``objective`` (best first, missing scores last) with a 1-based ``rank`` column."""
+    table = pd.DataFrame(list(rows))
+    if table.empty:
+        return table
+    table = table.sort_values(objective, ascending=False, na_position='last', kind='stable').reset_index(drop=True)
+    table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    return table
+
+
+# --- Shared memory ---
+
+class SharedArray:
+    """A NumPy array copied into a named shared-memory block (owned and unlinked by the creator)."""
+
+    def __init__(self, array: np.ndarray):
+        array = np.ascontiguousarray(array)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.spec = (self.shm.name, array.shape, array.dtype.str)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf)[...] = array
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+# Per-worker state, set by _init_worker
+_worker_blocks: List[shared_memory.SharedMemory] = []
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_config: Dict[str, Any] = {}
+_worker_options: Dict[str, Any] = {}
+
+
+def _init_worker(specs: Dict[str, Tuple[str, tuple, str]], config: Dict[str, Any], options: Dict[str, Any]) -> None:
+    for key, (name, shape, dtype) in specs.items():
+        # Pool workers share the parent's resource tracker, so attaching does not
+        # hand ownership of the block to the worker
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_blocks.append(shm)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        array.flags.writeable = False
+        _worker_arrays[key] = array
+    _worker_config.update(config)
+    _worker_options.update(options)
+
+
+def _evaluate(params: Dict[str, Any], start: int, end: int) -> Dict[str, Any]:
+    """Backtest one parameter set on bars [start, end) of the shared arrays."""
+    price = _worker_arrays['price']
+    timestamps = _worker_arrays.get('timestamp')
+    objective = _worker_options['objective']
+    # Indicators warm up on the bars before the window, trades happen inside it
+    lo = max(0, start - _worker_options['warmup_bars'])
+    signal_params = {k: v for k, v in params.items() if k not in CONFIG_PARAMS}
+    config = BacktestConfig(**{**_worker_config, **{k: v for k, v in params.items() if k in CONFIG_PARAMS}})
+    try:
+        entries, exits = indicator_signals(price[lo:end], **signal_params)
+        result = run_vectorized(price[start:end], entries[start - lo:], exits[start - lo:], config,
+                                timestamps[start:end] if timestamps is not None else None)
+        metrics = result.metrics()
+    except Exception as e:
+        return {**params, objective: float('nan'), 'error': str(e)}
+    score = metrics.get(objective)
+    metrics[objective] = float(score) if score is not None and np.isfinite(score) else float('nan')
+    return {**params, **metrics}
+
+
+class ParameterSweep:
+    """
+    Fans backtests of many parameter sets out over a process pool.
+
+    Use as a context manager (or call ``close()``) so the pool is shut down and
+    the shared-memory blocks are unlinked.
+
+    Args:
+        prices: Bar prices for one mint
+        timestamps: Epoch seconds per bar (optional)
+        config: Base cost model; swept config parameters override it per candidate
+        objective: ``calculate_metrics`` key to maximize
+        workers: Process count (default ``os.cpu_count()``)
+        warmup_bars: Bars before each window used only to warm up indicators
+    """
+
+    def __init__(self, prices: Sequence[float], timestamps: Optional[Sequence[float]] = None,
+                 config: Optional[BacktestConfig] = None, objective: str = 'sharpe_ratio',
+                 workers: Optional[int] = None, warmup_bars: int = 200):
+        self.n = len(prices)
+        self.objective = objective
+        self.workers = workers or os.cpu_count() or 1
+        self._arrays = {'price': SharedArray(np.asarray(prices, dtype=np.float64))}
+        if timestamps is not None:
+            self._arrays['timestamp'] = SharedArray(np.asarray(timestamps, dtype=np.float64))
+        specs = {key: shared.spec for key, shared in self._arrays.items()}
+        options = {'objective': objective, 'warmup_bars': warmup_bars}
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker,
+            initargs=(specs, asdict(config or BacktestConfig()), options))
+        logger.info(f"ParameterSweep ready: {self.n} bars, {self.workers} workers, objective {objective}")
+
+    def __enter__(self) -> 'ParameterSweep':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        for shared in self._arrays.values():
+            shared.close()
+        self._arrays = {}
+
+    def _map(self, tasks: List[Tuple[Dict[str, Any], int, int]]) -> List[Dict[str, Any]]:
+        futures = [self._pool.submit(_evaluate, params, start, end) for params, start, end in tasks]
+        return [future.result() for future in futures]
+
+    def evaluate(self, samples: Iterable[Dict[str, Any]], start: int = 0, end: Optional[int] = None) -> pd.DataFrame:
+        """Backtest every sample on bars [start, end) and return the ranked table."""
+        end = self.n if end is None else end
+        return rank_results(self._map([(params, start, end) for params in samples]), self.objective)
+
+    def bayesian(self, space: ParameterSpace, n_iter: int, batch_size: Optional[int] = None,
+                 seed: Optional[int] = None, start: int = 0, end: Optional[int] = None) -> pd.DataFrame:
+        """Bayesian search: ``n_iter`` evaluations proposed ``batch_size`` (default: workers) at a time."""
+        end = self.n if end is None else end
+        batch_size = batch_size or self.workers
+        sampler = BayesianSampler(space, seed=seed, n_initial=max(batch_size, 10))
+        rows: List[Dict[str, Any]] = []
+        while len(rows) < n_iter:
+            batch = sampler.propose(min(batch_size, n_iter - len(rows)))
+            for row in self._map([(params, start, end) for params in batch]):
+                sampler.observe({name: row[name] for name in space}, row.get(self.objective))
+                rows.append(row)
+        return rank_results(rows, self.objective)
+
+    def _best(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Highest-scoring row (first on ties); rows without a finite score lose."""
+        def score(row):
+            value = row.get(self.objective)
+            return value if value is not None and math.isfinite(value) else -math.inf
+        return max(rows, key=score)
+
+    def _windows(self, train_bars: int, test_bars: int,
+                 step_bars: Optional[int]) -> List[Tuple[int, int, int, int]]:
+        windows = walk_forward_windows(self.n, train_bars, test_bars, step_bars)
+        if not windows:
+            raise ValueError(f"{self.n} bars is too short for a {train_bars}+{test_bars} bar walk-forward window")
+        return windows
+
+    def _out_of_sample(self, windows: List[Tuple[int, int, int, int]], chosen: List[Dict[str, Any]],
+                       names: Sequence[str]) -> pd.DataFrame:
+        """Backtest each window's chosen parameters on its test window; one row per window."""
+        test_rows = self._map([
+            ({name: best[name] for name in names}, window[2], window[3])
+            for best, window in zip(chosen, windows)
+        ])
+        rows = []
+        for window, best, test in zip(windows, chosen, test_rows):
+            rows.append({
+                'train_start': window[0], 'train_end': window[1],
+                'test_start': window[2], 'test_end': window[3],
+                f'train_{self.objective}': best[self.objective],
+                **test,
+            })
+        return pd.DataFrame(rows)
+
+    def walk_forward(self, samples: Sequence[Dict[str, Any]], train_bars: int, test_bars: int,
+                     step_bars: Optional[int] = None) -> pd.DataFrame:
+        """
+        Pick the best sample on each train window and backtest it on the following test window.
+
+        All train windows are evaluated in one batch, then all test windows, so the
+        pool stays busy across windows. Returns one row per window with the chosen
+        parameters, ``train_<objective>`` and the out-of-sample metrics.
+        """
+        windows = self._windows(train_bars, test_bars, step_bars)
+        samples = list(samples)
+        train_rows = self._map([(params, w[0], w[1]) for w in windows for params in samples])
+
+        chosen = [
+            self._best(train_rows[i * len(samples):(i + 1) * len(samples)])
+            for i in range(len(windows))
+        ]
+        return self._out_of_sample(windows, chosen, list(samples[0]))
+
+    def bayesian_walk_forward(self, space: ParameterSpace, n_iter: int, train_bars: int, test_bars: int,
+                              step_bars: Optional[int] = None, batch_size: Optional[int] = None,
+                              seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        Walk-forward with a fresh ``bayesian`` search of ``n_iter`` evaluations on each train window.
+
+        Each search only sees its own train window, so the choice stays out of sample.
+        Windows run one after another because every round depends on the last; each
+        round still fills the pool. Returns the same table as ``walk_forward``.
+        """
+        windows = self._windows(train_bars, test_bars, step_bars)
+        rng = np.random.default_rng(seed)
+        chosen = []
+        for train_start, train_end, _, _ in windows:
+            table = self.bayesian(space, n_iter, batch_size, seed=int(rng.integers(2**31)),
+                                  start=train_start, end=train_end)
+            chosen.append(table.iloc[0].to_dict())
+        return self._out_of_sample(windows, chosen, list(space))
+
+
+def _load_prices(args) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    if args.mint:
+        from performance.backtesting import Backtesting
+        backtester = Backtesting(strategy=None)
+        backtester.load_data(mint=args.mint, bar_seconds=args.bar_seconds)
+        data = backtester.data
+    else:
+        data = pd.read_csv(args.data)
+    timestamps = None
+    if 'timestamp' in data.columns and pd.api.types.is_numeric_dtype(data['timestamp']):
+        timestamps = data['timestamp'].to_numpy(dtype=np.float64)
+    return data['price'].to_numpy(dtype=np.float64), timestamps
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep / walk-forward optimizer")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--data", help="CSV with price (and optional epoch-second timestamp) columns")
+    source.add_argument("--mint", help="Mint to load from the tick store")
+    parser.add_argument("--bar-seconds", type=int, default=60, help="Bar width when loading from the tick store")
+    parser.add_argument("--mode", choices=["grid", "random", "bayes"], default="grid")
+    parser.add_argument("--samples", type=int, default=200, help="Candidates for random, or evaluations per bayes search")
+    parser.add_argument("--objective", default="sharpe_ratio")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--train-bars", type=int, default=0, help="Walk-forward train window (0 = single in-sample sweep)")
+    parser.add_argument("--test-bars", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=os.path.join("outputs", "sweep_results.csv"))
+    args = parser.parse_args()
+    if bool(args.train_bars) != bool(args.test_bars):
+        parser.error("--train-bars and --test-bars go together")
+
+    from config.settings import Settings
+    prices, timestamps = _load_prices(args)
+    config = BacktestConfig.from_settings(Settings())
+
+    with ParameterSweep(prices, timestamps, config, objective=args.objective, workers=args.workers) as sweep:
+        if args.mode == "bayes":
+            if args.train_bars:
+                table = sweep.bayesian_walk_forward(DEFAULT_SPACE, args.samples, args.train_bars,
+                                                    args.test_bars, seed=args.seed)
+            else:
+                table = sweep.bayesian(DEFAULT_SPACE, args.samples, seed=args.seed)
+        else:
+            samples = grid_samples(DEFAULT_SPACE) if args.mode == "grid" \
+                else random_samples(DEFAULT_SPACE, args.samples, args.seed)
+            if args.train_bars:
+                table = sweep.walk_forward(samples, args.train_bars, args.test_bars)
+            else:
+                table = sweep.evaluate(samples)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    table.to_csv(args.output, index=False)
+    logger.info(f"Wrote {len(table)} rows to {args.output}")
+    print(table.head(20).to_string())
+
+
+if __name__ == "__main__":
+    main()
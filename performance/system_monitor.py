@@ -4,9 +4,10 @@ Real-time system performance tracking for blockchain trading operations
 """
 
 import time
+import math
 import asyncio
-import threading
 import statistics
+from array import array
 from typing import Dict, List, Any, Optional, Union, Callable
 from dataclasses import dataclass, field
 from collections import defaultdict, deque
@@ -16,6 +17,7 @@ from datetime import datetime, timezone
 import logging
 
 from utils.logger import get_logger
+from performance.metrics_registry import Histogram, MetricsRegistry, get_metrics_registry
 
 class MetricType(str, Enum):
     """Types of metrics supported by the system monitor"""
@@ -50,81 +52,125 @@ class MetricValue:
     component: Optional[str] = None
     
 class MetricSeries:
-    """Time series data for a metric"""
+    """
+    Time series data for a metric
+    
+    Recent samples live in a preallocated ring of ``max_size`` (timestamp, value)
+    slots, so recording never allocates or locks. Duration and histogram series
+    also feed a bucketed ``Histogram`` family (one child per label set), which
+    gives lifetime percentiles without keeping or sorting samples.
+    """
     
-    def __init__(self, metric_type: MetricType, max_size: int = 1000):
+    def __init__(self, metric_type: MetricType, max_size: int = 1000,
+                 histogram: Optional[Histogram] = None):
         self.metric_type = metric_type
-        self.values: deque = deque(maxlen=max_size)
+        self.max_size = max(1, int(max_size))
+        self._timestamps = array('d', bytes(8 * self.max_size))
+        self._values = array('d', bytes(8 * self.max_size))
+        self._next = 0
         self.total_samples = 0
-        self._lock = threading.Lock()
+        if histogram is None and metric_type in (MetricType.HISTOGRAM, MetricType.DURATION):
+            histogram = Histogram("series")
+        self.histogram = histogram
     
     def add_value(self, value: Union[int, float], timestamp: Optional[float] = None, 
                  labels: Optional[Dict[str, str]] = None, component: Optional[str] = None):
-        """Add a new metric value"""
-        if timestamp is None:
-            timestamp = time.time()
-        
-        metric_value = MetricValue(
-            timestamp=timestamp,
-            value=value,
-            labels=labels or {},
-            component=component
-        )
-        
-        with self._lock:
-            self.values.append(metric_value)
-            self.total_samples += 1
+        """Add a new metric value (labels only select the histogram child; the ring keeps values)"""
+        i = self._next
+        self._timestamps[i] = timestamp or time.time()
+        self._values[i] = value
+        i += 1
+        self._next = i if i < self.max_size else 0
+        self.total_samples += 1
+        histogram = self.histogram
+        if histogram is not None:
+            histogram.child(labels).observe(value)
+    
+    def _indices(self):
+        """Ring slot indexes, oldest first"""
+        size = min(self.total_samples, self.max_size)
+        start = (self._next - size) % self.max_size
+        return [(start + k) % self.max_size for k in range(size)]
     
     def get_latest(self, count: int = 1) -> List[MetricValue]:
         """Get the latest N values"""
-        with self._lock:
-            return list(self.values)[-count:]
+        indices = self._indices()[-count:] if count > 0 else []
+        return [MetricValue(timestamp=self._timestamps[i], value=self._values[i]) for i in indices]
     
     def get_range(self, start_time: float, end_time: Optional[float] = None) -> List[MetricValue]:
         """Get values within a time range"""
         if end_time is None:
             end_time = time.time()
         
-        with self._lock:
-            return [v for v in self.values if start_time <= v.timestamp <= end_time]
+        timestamps, values = self._timestamps, self._values
+        return [
+            MetricValue(timestamp=timestamps[i], value=values[i])
+            for i in self._indices() if start_time <= timestamps[i] <= end_time
+        ]
     
     def get_statistics(self, window_seconds: Optional[int] = None) -> Dict[str, Any]:
-        """Get statistical summary of the metric"""
-        if window_seconds:
-            cutoff_time = time.time() - window_seconds
-            values = [v.value for v in self.values if v.timestamp >= cutoff_time]
-        else:
-            values = [v.value for v in self.values]
-        
-        if not values:
+        """
+        Get statistical summary of the metric
+        
+        count/latest/min/max/mean/stdev come from the ring (optionally limited to the
+        last ``window_seconds``); percentiles come from the histogram buckets and cover
+        the whole lifetime of the series.
+        """
+        cutoff_time = time.time() - window_seconds if window_seconds else None
+        timestamps, values = self._timestamps, self._values
+        
+        count = 0
+        total = 0.0
+        total_sq = 0.0
+        low = math.inf
+        high = -math.inf
+        first_ts = last_ts = None
+        latest = None
+        for i in self._indices():
+            ts = timestamps[i]
+            if cutoff_time is not None and ts < cutoff_time:
+                continue
+            value = values[i]
+            count += 1
+            total += value
+            total_sq += value * value
+            if value < low:
+                low = value
+            if value > high:
+                high = value
+            if first_ts is None:
+                first_ts = ts
+            last_ts = ts
+            latest = value
+        
+        if not count:
             return {"count": 0}
         
+        mean = total / count
         stats = {
-            "count": len(values),
+            "count": count,
             "total_samples": self.total_samples,
-            "latest": values[-1] if values else None,
-            "min": min(values),
-            "max": max(values),
-            "mean": statistics.mean(values)
+            "latest": latest,
+            "min": low,
+            "max": high,
+            "mean": mean
         }
         
-        if len(values) > 1:
-            stats["median"] = statistics.median(values)
-            stats["stdev"] = statistics.stdev(values)
+        if count > 1:
+            stats["stdev"] = math.sqrt(max(total_sq - count * mean * mean, 0.0) / (count - 1))
         
         # Type-specific statistics
-        if self.metric_type == MetricType.RATE and len(values) >= 2:
+        if self.metric_type == MetricType.RATE and count >= 2:
             # Calculate rate over time window
-            time_span = self.values[-1].timestamp - self.values[0].timestamp
+            time_span = last_ts - first_ts
             if time_span > 0:
-                stats["rate_per_second"] = len(values) / time_span
+                stats["rate_per_second"] = count / time_span
         
-        if self.metric_type == MetricType.HISTOGRAM:
-            values_sorted = sorted(values)
-            stats["p50"] = statistics.median(values_sorted)
-            if len(values_sorted) >= 4:
-                stats["p95"] = values_sorted[int(0.95 * len(values_sorted))]
-                stats["p99"] = values_sorted[int(0.99 * len(values_sorted))]
+        if self.histogram is not None:
+            distribution = self.histogram.merged()
+            stats["median"] = stats["p50"] = distribution.percentile(0.50)
+            stats["p95"] = distribution.percentile(0.95)
+            stats["p99"] = distribution.percentile(0.99)
         
         return stats
 
@@ -147,6 +193,11 @@ class SystemMonitor:
         self.counters: Dict[str, int] = defaultdict(int)
         self.gauges: Dict[str, float] = {}
         
+        # Prometheus-style families exported at /metrics (None marks a name clash)
+        self.registry: MetricsRegistry = get_metrics_registry()
+        self._counters: Dict[str, Any] = {}
+        self._gauges: Dict[str, Any] = {}
+        
         # Component health tracking
         self.component_health: Dict[str, Dict[str, Any]] = defaultdict(dict)
         self.health_checks: Dict[str, Callable] = {}
@@ -181,9 +232,20 @@ class SystemMonitor:
     def register_metric(self, name: str, metric_type: MetricType, max_size: int = 1000):
         """Register a new metric for tracking"""
         if name not in self.metrics:
-            self.metrics[name] = MetricSeries(metric_type, max_size)
+            histogram = None
+            if metric_type in (MetricType.HISTOGRAM, MetricType.DURATION):
+                histogram = self._family(self.registry.histogram, name)
+            self.metrics[name] = MetricSeries(metric_type, max_size, histogram)
             self.logger.debug(f"Registered system metric: {name} ({metric_type.value})")
     
+    def _family(self, factory: Callable, name: str):
+        """Registry family for a metric name, or None if the name is taken by another metric type"""
+        try:
+            return factory(name, f"{name} (recorded by SystemMonitor)")
+        except ValueError as e:
+            self.logger.debug(f"Metric {name} not exported: {e}")
+            return None
+    
     def register_health_check(self, component: str, check_function: Callable):
         """Register a health check function for a component"""
         self.health_checks[component] = check_function
@@ -193,35 +255,58 @@ class SystemMonitor:
                      labels: Optional[Dict[str, str]] = None,
                      component: Optional[str] = None):
         """Record a metric value"""
-        if name not in self.metrics:
+        series = self.metrics.get(name)
+        if series is None:
             # Auto-register as counter if not explicitly registered
             self.register_metric(name, MetricType.COUNTER)
-        
-        self.metrics[name].add_value(value, labels=labels, component=component)
+            series = self.metrics[name]
+        
+        series.add_value(value, labels=labels, component=component)
+        if series.histogram is None:
+            # Values without a distribution are exported as their latest reading
+            gauge = self._gauges.get(name)
+            if gauge is None:
+                gauge = self._gauges[name] = self._family(self.registry.gauge, name)
+            if gauge is not None:
+                gauge.child(labels).set(value)
     
     def increment_counter(self, name: str, amount: int = 1, 
                          labels: Optional[Dict[str, str]] = None,
                          component: Optional[str] = None):
         """Increment a counter metric"""
         self.counters[name] += amount
-        self.record_metric(f"{name}_total", self.counters[name], labels, component)
+        counter = self._counters.get(name)
+        if counter is None:
+            counter = self._counters[name] = self._family(self.registry.counter, name)
+        if counter is not None:
+            counter.child(labels).inc(amount)
+        
+        series_name = f"{name}_total"
+        series = self.metrics.get(series_name)
+        if series is None:
+            self.register_metric(series_name, MetricType.COUNTER)
+            series = self.metrics[series_name]
+        series.add_value(self.counters[name], labels=labels, component=component)
     
     def set_gauge(self, name: str, value: Union[int, float],
                  labels: Optional[Dict[str, str]] = None,
                  component: Optional[str] = None):
         """Set a gauge metric value"""
         self.gauges[name] = value
+        if name not in self.metrics:
+            self.register_metric(name, MetricType.GAUGE)
         self.record_metric(name, value, labels, component)
     
     def record_duration(self, name: str, duration_seconds: float,
                        labels: Optional[Dict[str, str]] = None,
                        component: Optional[str] = None):
         """Record a duration metric"""
-        if name not in self.metrics:
+        series = self.metrics.get(name)
+        if series is None:
             self.register_metric(name, MetricType.DURATION)
+            series = self.metrics[name]
         
-        duration_ms = duration_seconds * 1000
-        self.record_metric(name, duration_ms, labels, component)
+        series.add_value(duration_seconds * 1000, None, labels, component)
     
     def record_trade_operation(self, operation_type: str, duration_seconds: float, 
                               success: bool, labels: Optional[Dict[str, str]] = None):
@@ -470,7 +555,10 @@ class SystemMonitor:
             self.logger.error(f"Error generating system report: {e}", exc_info=True)
     
     def export_metrics(self, format_type: str = "json") -> str:
-        """Export all system metrics in specified format"""
+        """Export all system metrics in specified format ("json" or "prometheus")"""
+        if format_type.lower() == "prometheus":
+            return self.registry.render_text()
+        
         export_data = {
             "timestamp": time.time(),
             "system_type": "blockchain_trading",
@@ -8,7 +8,7 @@ from datetime import datetime, timezone, timedelta
 import collections
 import pandas as pd
 
-from data.indicators import Indicators as IndicatorCalculator
+from data.streaming_indicators import StreamingIndicatorEngine, StreamingIndicatorConfig
 from filters.whitelist import Whitelist
 from filters.blacklist import Blacklist
 from config.thresholds import Thresholds
@@ -60,6 +60,9 @@ class EntryExitStrategy:
         self.max_history_len = getattr(settings, 'MAX_PRICE_HISTORY_LEN', 200)
         self.logger.info(f"Initialized price history deque with max length {self.max_history_len}")
 
+        # --- Streaming indicators (O(1) per price event, kept alongside price_history) ---
+        self.streaming_indicators = StreamingIndicatorEngine(self._build_streaming_indicator_config())
+
         # --- Internal State for TSL High Water Mark --- #
         self.position_hwm: Dict[str, float] = {}
         self.logger.info("Initialized TSL High-Water Mark tracking dictionary.")
@@ -414,9 +417,7 @@ class EntryExitStrategy:
                 self.logger.debug(f"EES.handle_realtime_price_update: Ignoring non-positive price {price} for {mint}")
                 return
 
-            if mint not in self.price_history:
-                self.price_history[mint] = collections.deque(maxlen=self.max_history_len)
-            self.price_history[mint].append(current_price)
+            self._record_price(mint, current_price)
             
             # If EES is in direct trading mode and this specific mint is its active_mint (e.g. for single token focus)
             # it could trigger its own signal evaluation here.
@@ -474,13 +475,10 @@ class EntryExitStrategy:
             self.logger.warning(f"EES.get_signal_on_price_event: Invalid price ({price_event}) for active mint {self.active_mint}: {e}")
             return None
 
-        # Update internal price history for the active_mint with SOL price
-        if self.active_mint not in self.price_history: # Should have been set by set_active_mint
-            self.price_history[self.active_mint] = collections.deque(maxlen=self.max_history_len)
-        
+        # Update internal price history (and streaming indicators) for the active_mint with SOL price
         # Convert current_price to SOL if it's in USD (for SOL-based trading)
         current_price_sol = await self._convert_price_to_sol(current_price, self.active_mint)
-        self.price_history[self.active_mint].append(current_price_sol)
+        self._record_price(self.active_mint, current_price_sol)
         history = self.price_history[self.active_mint]
         
         # self.logger.debug(f"EES.get_signal_on_price_event: Updated price history for {self.active_mint}. Price: {current_price}, History len: {len(history)}")
@@ -503,30 +501,9 @@ class EntryExitStrategy:
 
 
         # --- Calculate Indicators ---
-        # This part is from evaluate_entry_signals_periodically
-        prices_series = pd.Series(list(history))
-        calculated_indicators = {}
+        # Read from the streaming engine; state was advanced by _record_price above
         try:
-            rsi_series = IndicatorCalculator.rsi(prices_series, period=MIN_RSI_PERIOD)
-            calculated_indicators['rsi'] = rsi_series.iloc[-1] if not rsi_series.empty else None
-            
-            macd_fast = self.thresholds.get('MACD_FAST_PERIOD', 12) if self.thresholds else 12
-            macd_slow = self.thresholds.get('MACD_SLOW_PERIOD', 26)
-            macd_signal_p = self.thresholds.get('MACD_SIGNAL_PERIOD', 9)
-            macd_line, signal_line, hist_macd = IndicatorCalculator.macd(prices_series,
-                                                                   fast_period=macd_fast,
-                                                                   slow_period=macd_slow,
-                                                                   signal_period=macd_signal_p)
-            calculated_indicators['macd_histogram'] = hist_macd.iloc[-1] if not hist_macd.empty else None
-            
-            bb_period = self.thresholds.get('BB_PERIOD', 20)
-            bb_std = self.thresholds.get('BB_STD_DEV', 2.0)
-            upper, middle, lower = IndicatorCalculator.bollinger_bands(prices_series, period=bb_period, std_dev=bb_std)
-            calculated_indicators['bollinger_bands'] = {
-                'upper': upper.iloc[-1] if not upper.empty else None,
-                'middle': middle.iloc[-1] if not middle.empty else None,
-                'lower': lower.iloc[-1] if not lower.empty else None
-            }
+            calculated_indicators = self._get_streaming_indicators(self.active_mint)
             # self.logger.debug(f"EES.get_signal_on_price_event: Indicators for {self.active_mint}: {calculated_indicators}")
         except Exception as indi_calc_e:
             self.logger.error(f"EES.get_signal_on_price_event: Error calculating indicators for {self.active_mint}: {indi_calc_e}", exc_info=True)
@@ -755,30 +732,8 @@ class EntryExitStrategy:
                     continue
 
                 # --- Calculate Indicators --- #
-                prices_series = pd.Series(list(history))
-                calculated_indicators = {}
                 try:
-            # Calculate RSI
-                    rsi_series = IndicatorCalculator.rsi(prices_series, period=MIN_RSI_PERIOD)
-                    calculated_indicators['rsi'] = rsi_series.iloc[-1] if not rsi_series.empty else None
-            # Calculate MACD
-                    macd_fast = self.thresholds.get('MACD_FAST_PERIOD', 12)
-                    macd_slow = self.thresholds.get('MACD_SLOW_PERIOD', 26)
-                    macd_signal_p = self.thresholds.get('MACD_SIGNAL_PERIOD', 9)
-                    macd_line, signal_line, hist = IndicatorCalculator.macd(prices_series,
-                                                                           fast_period=macd_fast,
-                                                                           slow_period=macd_slow,
-                                                                           signal_period=macd_signal_p)
-                    calculated_indicators['macd_histogram'] = hist.iloc[-1] if not hist.empty else None
-                    # Calculate Bollinger Bands
-                    bb_period = self.thresholds.get('BB_PERIOD', 20)
-                    bb_std = self.thresholds.get('BB_STD_DEV', 2.0)
-                    upper, middle, lower = IndicatorCalculator.bollinger_bands(prices_series, period=bb_period, std_dev=bb_std)
-                    calculated_indicators['bollinger_bands'] = {
-                        'upper': upper.iloc[-1] if not upper.empty else None,
-                        'middle': middle.iloc[-1] if not middle.empty else None,
-                        'lower': lower.iloc[-1] if not lower.empty else None
-                    }
+                    calculated_indicators = self._get_streaming_indicators(mint)
                     # Add other indicator calcs here if needed
                     # self.logger.debug(f"Calculated indicators for entry eval {mint}: {calculated_indicators}")
                 except Exception as indi_calc_e:
@@ -1193,10 +1148,52 @@ class EntryExitStrategy:
             # if self.market_data:
             #      self.market_data.unsubscribe("realtime_price_update", self.handle_realtime_price_update)
             self.price_history.clear()
+            self.streaming_indicators.clear()
             self.position_hwm.clear() # Clear HWM tracking
         except Exception as e:
             self.logger.error(f"Error closing EntryExitStrategy: {str(e)}")
     
+    def _build_streaming_indicator_config(self) -> StreamingIndicatorConfig:
+        """Build the streaming indicator periods from thresholds (same keys the batch path used)."""
+        def threshold(key, default):
+            if self.thresholds and hasattr(self.thresholds, 'get'):
+                value = self.thresholds.get(key, default)
+                return default if value is None else value
+            return default
+
+        return StreamingIndicatorConfig(
+            rsi_period=MIN_RSI_PERIOD,
+            rsi_smoothing=getattr(self.settings, 'RSI_SMOOTHING', 'sma'),
+            macd_fast=int(threshold('MACD_FAST_PERIOD', 12)),
+            macd_slow=int(threshold('MACD_SLOW_PERIOD', 26)),
+            macd_signal=int(threshold('MACD_SIGNAL_PERIOD', 9)),
+            bb_period=int(threshold('BB_PERIOD', 20)),
+            bb_std_dev=float(threshold('BB_STD_DEV', 2.0)),
+        )
+
+    def _record_price(self, mint: str, price: float) -> None:
+        """Append a price to the mint's history and advance its streaming indicators."""
+        if mint not in self.price_history:
+            self.price_history[mint] = collections.deque(maxlen=self.max_history_len)
+        self.price_history[mint].append(price)
+        self.streaming_indicators.update(mint, price)
+
+    def _get_streaming_indicators(self, mint: str) -> Dict:
+        """
+        Current RSI / MACD histogram / Bollinger values for a mint in the shape
+        _generate_default_signals expects. Values are None until warmed up.
+        """
+        snapshot = self.streaming_indicators.snapshot(mint)
+        if snapshot is None:
+            # History was filled before the engine existed; replay it once
+            history = self.price_history.get(mint) or []
+            snapshot = self.streaming_indicators.prime(mint, history)
+        return {
+            'rsi': snapshot['rsi'],
+            'macd_histogram': snapshot['macd_histogram'],
+            'bollinger_bands': snapshot['bollinger_bands'],
+        }
+
     async def _convert_price_to_sol(self, price: float, mint: str) -> float:
         """Convert a price to SOL if needed. Assumes price might be in USD and converts to SOL."""
         try:
@@ -1222,6 +1219,10 @@ class EntryExitStrategy:
 
     def set_active_mint(self, mint: str):
         self.logger.info(f"EES: Setting active mint to: {mint}")
+        if self.order_manager:
+            if self.active_mint and self.active_mint != mint:
+                self.order_manager.release_swap(self.active_mint)
+            self.order_manager.prepare_swap(mint)
         self.active_mint = mint
         # Ensure price history deque exists for this mint
         if mint not in self.price_history:
@@ -1236,6 +1237,8 @@ class EntryExitStrategy:
         cleared_mint = self.active_mint
         if mint_to_clear is None or self.active_mint == mint_to_clear:
             self.logger.info(f"EES: Clearing active mint (was: {self.active_mint}, requested for: {mint_to_clear if mint_to_clear else 'any'}).")
+            if self.order_manager and cleared_mint:
+                self.order_manager.release_swap(cleared_mint)
             self.active_mint = None
             # Optionally, clean up state for `cleared_mint` if it's no longer active.
             # For example, if price_history for non-active mints should be pruned:
@@ -1,4 +1,5 @@
 import logging
+import time
 from typing import List, Dict, Optional, TYPE_CHECKING
 from datetime import datetime
 
@@ -103,9 +104,11 @@ class PositionManagement:
                       current_price: float, 
                       target_price: float, 
                       max_position_size: float,
-                      strategy: str):
+                      strategy: str,
+                      signal_time: Optional[float] = None):
         """
         Dynamically scale into a position based on price proximity to the target.
+        ``signal_time`` is the ``time.monotonic()`` at which the position was evaluated.
         """
         try:
             # Check circuit breaker
@@ -127,7 +130,8 @@ class PositionManagement:
                 output_mint=symbol,
                 input_amount=additional_size,
                 input_decimals=9,  # SOL decimals
-                slippage_bps=self.settings.SLIPPAGE_BPS
+                slippage_bps=self.settings.SLIPPAGE_BPS,
+                signal_time=signal_time
             )
             
             if trade_id:
@@ -152,9 +156,11 @@ class PositionManagement:
                        current_price: float, 
                        position_size: float, 
                        scale_out_ratio: float,
-                       strategy: str):
+                       strategy: str,
+                       signal_time: Optional[float] = None):
         """
         Dynamically scale out of a position by reducing position size proportionally.
+        ``signal_time`` is the ``time.monotonic()`` at which the position was evaluated.
         """
         try:
             # Check circuit breaker
@@ -174,7 +180,8 @@ class PositionManagement:
                 output_mint=str(self.order_manager.SOL_MINT),
                 input_amount=size_to_scale_out,
                 input_decimals=9,  # Assuming token decimals
-                slippage_bps=self.settings.SLIPPAGE_BPS
+                slippage_bps=self.settings.SLIPPAGE_BPS,
+                signal_time=signal_time
             )
             
             if trade_id:
@@ -205,9 +212,11 @@ class PositionManagement:
                                  current_price: float, 
                                  position_size: float, 
                                  profit_target: float,
-                                 strategy: str):
+                                 strategy: str,
+                                 signal_time: Optional[float] = None):
         """
         Take partial profits if the current price meets or exceeds the profit target.
+        ``signal_time`` is the ``time.monotonic()`` at which the position was evaluated.
         """
         try:
             # Check circuit breaker
@@ -228,7 +237,8 @@ class PositionManagement:
                 output_mint=str(self.order_manager.SOL_MINT),
                 input_amount=partial_size,
                 input_decimals=9,
-                slippage_bps=self.settings.SLIPPAGE_BPS
+                slippage_bps=self.settings.SLIPPAGE_BPS,
+                signal_time=signal_time
             )
             
             if trade_id:
@@ -265,6 +275,7 @@ class PositionManagement:
                 return
                 
             for position in positions:
+                signal_time = time.monotonic()  # Execution latency is measured from this decision
                 symbol = position["symbol"]
                 strategy = position.get("strategy", "default")
                 current_size = position["size"]
@@ -282,10 +293,10 @@ class PositionManagement:
 
                 if current_size < target_size:
                     logger.info(f"{symbol}: Current size {current_size} below target {target_size}. Scaling in.")
-                    await self.scale_in(symbol, current_price, entry_price, target_size, strategy)
+                    await self.scale_in(symbol, current_price, entry_price, target_size, strategy, signal_time)
                 elif current_size > target_size:
                     logger.info(f"{symbol}: Current size {current_size} exceeds target {target_size}. Scaling out.")
-                    await self.scale_out(symbol, current_price, current_size, 0.5, strategy)
+                    await self.scale_out(symbol, current_price, current_size, 0.5, strategy, signal_time)
                     
         except Exception as e:
             logger.error(f"Error during position rebalancing: {e}")
@@ -302,6 +313,7 @@ class PositionManagement:
                 return
                 
             for position in positions:
+                signal_time = time.monotonic()  # Execution latency is measured from this decision
                 symbol = position["symbol"]
                 strategy = position.get("strategy", "default")
                 current_price = position["current_price"]
@@ -309,7 +321,7 @@ class PositionManagement:
                 profit_target = position.get("profit_target", current_price * (1 + self.thresholds.GAIN_TARGET_RATIO))
 
                 # Take partial profits
-                await self.take_partial_profits(symbol, current_price, position_size, profit_target, strategy)
+                await self.take_partial_profits(symbol, current_price, position_size, profit_target, strategy, signal_time)
 
             # Rebalance positions after taking partial profits
             await self.rebalance_positions(positions, account_balance)
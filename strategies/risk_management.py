@@ -250,7 +250,7 @@ class TokenRiskMonitor:
             if price_drop_pct >= self.price_drop_threshold_pct:
                 reason = f"Price drop >= {self.price_drop_threshold_pct*100}% detected in {self.price_drop_window_seconds}s ({start_price:.6f} -> {current_price:.6f})"
                 self.logger.warning(f"RISK DETECTED ({mint}): {reason}")
-                await self._trigger_urgent_exit(mint, reason)
+                await self._trigger_urgent_exit(mint, reason, signal_timestamp=current_timestamp)
 
 
     async def run_periodic_checks(self):
@@ -301,8 +301,8 @@ class TokenRiskMonitor:
         self.logger.info("Finished periodic risk checks.")
 
 
-    async def _trigger_urgent_exit(self, mint: str, reason: str):
-        """Enqueues an urgent SELL trade for the given mint."""
+    async def _trigger_urgent_exit(self, mint: str, reason: str, signal_timestamp: Optional[datetime] = None):
+        """Enqueues an urgent SELL trade for the given mint, stamped with the triggering price event's time."""
         if self._exit_triggered.get(mint):
             self.logger.info(f"Urgent exit already triggered for {mint}. Ignoring duplicate request.")
             return
@@ -331,7 +331,7 @@ class TokenRiskMonitor:
             is_buy=False,
             priority=TradePriority.CRITICAL_SELL, # Highest priority
             strategy_id="risk_monitor",
-            timestamp=datetime.now(timezone.utc),
+            timestamp=signal_timestamp or datetime.now(timezone.utc),
             metadata={
                 'exit_reason': 'risk_monitor_trigger',
                 'risk_details': reason,
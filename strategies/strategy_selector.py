@@ -9,6 +9,8 @@ from utils import get_logger
 from filters.whitelist import Whitelist
 from data.token_database import TokenDatabase
 from data.indicators import Indicators
+from data.streaming_indicators import StreamingIndicatorEngine, StreamingIndicatorConfig
+from data.indicator_kernel import compute_indicator_batch_from_frames
 from data.price_monitor import PriceMonitor
 from filters.blacklist import Blacklist
 from datetime import datetime, timezone
@@ -32,6 +34,19 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+
+def _signal_timestamp(signal: Dict) -> datetime:
+    """When a signal fired, so queued trades measure latency from the signal rather than the enqueue."""
+    timestamp = signal.get("timestamp")
+    if isinstance(timestamp, str):
+        try:
+            timestamp = datetime.fromisoformat(timestamp)
+        except ValueError:
+            timestamp = None
+    if not isinstance(timestamp, datetime):
+        return datetime.now(timezone.utc)
+    return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+
 class StrategyEvaluator:
     """
     Evaluates market data for a specific token and generates trading signals.
@@ -67,6 +82,10 @@ class StrategyEvaluator:
         self._market_data_cache = {}  # Stores latest market data by mint
         self._trade_signals_cache = {}  # Stores latest signals by mint
         self._indicator_values = {}  # Stores calculated indicators by mint
+        rsi_smoothing = getattr(settings, 'RSI_SMOOTHING', 'sma') if settings else 'sma'
+        self.streaming_indicators = StreamingIndicatorEngine(
+            StreamingIndicatorConfig(rsi_smoothing=rsi_smoothing, sma_periods=(20, 50))
+        )  # O(1) per-update indicator state by mint
         
         # Configuration for signal generation
         self._entry_conditions = {
@@ -121,33 +140,27 @@ class StrategyEvaluator:
             if mint not in self._indicator_values:
                 self._indicator_values[mint] = {}
             
-            # Calculate basic indicators if we have enough data
-            if len(historical_data) >= 14:  # Minimum data points for RSI
-                # Convert historical data to a format usable for indicators
-                prices = [entry.get("price", 0) for entry in historical_data]
-                
-                # Calculate RSI if indicators service is available
-                if self.indicators:
-                    rsi = await self.indicators.calculate_rsi(prices)
-                    self._indicator_values[mint]["rsi"] = rsi
-                    
-                    # Calculate MACD
-                    macd, signal, histogram = await self.indicators.calculate_macd(prices)
-                    self._indicator_values[mint]["macd"] = macd
-                    self._indicator_values[mint]["signal"] = signal
-                    self._indicator_values[mint]["histogram"] = histogram
-                    
-                    # Calculate moving averages
-                    sma_20 = await self.indicators.calculate_sma(prices, 20)
-                    sma_50 = await self.indicators.calculate_sma(prices, 50)
-                    self._indicator_values[mint]["sma_20"] = sma_20
-                    self._indicator_values[mint]["sma_50"] = sma_50
-                    
-                    self.logger.debug(f"Updated indicators for {mint}: RSI={rsi:.2f}, MACD={macd:.6f}")
-                else:
-                    self.logger.warning(f"Indicators service not available for {mint}")
+            # Advance the streaming indicators: replay history once, then one price per update
+            if not self.streaming_indicators.has(mint) and historical_data:
+                prices = [entry.get("price", 0) for entry in historical_data if entry.get("price")]
+                snapshot = self.streaming_indicators.prime(mint, prices)
+            elif current_price and current_price > 0:
+                snapshot = self.streaming_indicators.update(mint, float(current_price))
+            else:
+                snapshot = self.streaming_indicators.snapshot(mint)
+            
+            # Publish indicators once RSI is warmed up
+            if snapshot and snapshot["rsi"] is not None:
+                values = self._indicator_values[mint]
+                values["rsi"] = snapshot["rsi"]
+                values["macd"] = snapshot["macd"]
+                values["signal"] = snapshot["macd_signal"]
+                values["histogram"] = snapshot["macd_histogram"]
+                values["sma_20"] = snapshot["sma_20"]
+                values["sma_50"] = snapshot["sma_50"]
+                self.logger.debug(f"Updated indicators for {mint}: RSI={snapshot['rsi']:.2f}, MACD={snapshot['macd']}")
             else:
-                self.logger.debug(f"Not enough historical data for {mint} to calculate indicators")
+                self.logger.debug(f"Not enough price data for {mint} to calculate indicators")
         
         except Exception as e:
             self.logger.error(f"Error updating indicators for {mint}: {str(e)}")
@@ -449,7 +462,7 @@ class StrategyEvaluator:
                 is_buy=(action == "BUY"),
                 priority=priority,
                 strategy_id="StrategyEvaluator",
-                timestamp=datetime.now(timezone.utc),
+                timestamp=_signal_timestamp(trade_signal),
                 metadata={
                     "signal_details": trade_signal,
                     "token_price_at_signal": price
@@ -582,6 +595,7 @@ class StrategySelector:
         
         # Ensure tokens are dictionaries before processing
         valid_tokens = [token for token in tokens if isinstance(token, dict)]
+        self._annotate_with_indicators(valid_tokens)
 
         for token in valid_tokens:
             # Add strategy indicators calculated elsewhere (e.g., TokenScanner or DataProcessing)
@@ -612,6 +626,36 @@ class StrategySelector:
 
         return strategy_candidates
 
+    def _annotate_with_indicators(self, tokens: List[Dict]) -> None:
+        """
+        Compute indicators for every token that carries price data in one batched pass.
+
+        Tokens may provide 'ohlcv' (DataFrame or list of bar dicts) or 'price_history'
+        (list of closes). Each token's latest values go to token['technical_indicators'];
+        duplicate mints are computed per token.
+        """
+        frames: Dict[str, pd.DataFrame] = {}
+        for i, token in enumerate(tokens):
+            ohlcv = token.get('ohlcv')
+            if isinstance(ohlcv, pd.DataFrame) and not ohlcv.empty:
+                frames[str(i)] = ohlcv
+            elif isinstance(ohlcv, list) and ohlcv:
+                frames[str(i)] = pd.DataFrame(ohlcv)
+            elif token.get('price_history'):
+                frames[str(i)] = pd.DataFrame({'close': token['price_history']})
+        if not frames:
+            return
+
+        try:
+            batch = compute_indicator_batch_from_frames(frames)
+        except Exception as e:
+            self.logger.error(f"Batched indicator calculation failed for {len(frames)} tokens: {e}", exc_info=True)
+            return
+
+        for key in batch.mints:
+            tokens[int(key)]['technical_indicators'] = batch.latest(key)
+        self.logger.debug(f"Batched indicators computed for {len(batch)} tokens.")
+
     async def select_and_execute(self, tokens: List[Dict]):
         """
         Analyzes tokens, generates trading signals using EntryExitStrategy,
@@ -687,7 +731,7 @@ class StrategySelector:
                             is_buy=True, # Only creating BUY requests here
                             priority=priority,
                             strategy_id=strategy_name,
-                            timestamp=datetime.now(timezone.utc),
+                            timestamp=_signal_timestamp(signal),
                             metadata={
                                 'signal_details': signal,
                                 'token_price_at_signal': token_price
@@ -1082,7 +1126,7 @@ class StrategySelector:
                         is_buy=(action == 'BUY'),
                         priority=priority,
                         strategy_id=strategy_name,
-                        timestamp=datetime.now(timezone.utc),
+                        timestamp=_signal_timestamp(signal),
                         metadata={
                             'signal_details': signal,
                             'token_price_at_signal': current_price,
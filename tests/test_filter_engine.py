@@ -0,0 +1,36 @@
+import asyncio
+
+from filters.filter_engine import FilterEngine
+
+
+class RecordingFilter:
+    def __init__(self, name, calls, result):
+        self.name = name
+        self.calls = calls
+        self.result = result
+
+    async def analyze_token(self, token_data):
+        self.calls.append(self.name)
+        return self.result
+
+
+def _engine(calls, rugcheck_result):
+    return FilterEngine({
+        "blacklist": RecordingFilter("blacklist", calls, False),
+        "rugcheck": RecordingFilter("rugcheck", calls, rugcheck_result),
+        "solsniffer": RecordingFilter("solsniffer", calls, {"flagged": False}),
+    })
+
+
+def test_solsniffer_not_called_when_rugcheck_rejects_initial_scan():
+    calls = []
+    outcome = asyncio.run(_engine(calls, {"flagged": True}).run({"mint": "m"}, initial_scan=True))
+    assert outcome["analysis_status"] == "aborted_early"
+    assert "solsniffer" not in calls
+
+
+def test_solsniffer_runs_after_rugcheck_passes():
+    calls = []
+    outcome = asyncio.run(_engine(calls, {"flagged": False}).run({"mint": "m"}, initial_scan=True))
+    assert outcome["overall_filter_passed"] is True
+    assert calls == ["blacklist", "rugcheck", "solsniffer"]
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+from data.incremental_scan import IncrementalScanState
+
+SETTINGS = SimpleNamespace(SCAN_INCREMENTAL_ENABLED=True, SCAN_FINGERPRINT_PRECISION=4,
+                           SCAN_INCREMENTAL_MAX_AGE=1800, SCAN_FILTER_REUSE_MAX_AGE=600, SCAN_STATE_TTL=7200)
+
+
+def _token(price="0.0012341", volume_24h=5000.0, price_change_24h=10.0):
+    return {
+        'mint': 'mintA', 'priceUsd': price, 'liquidity': {'usd': 20000.0},
+        'volume_24h': volume_24h, 'volume_5m': 100.0,
+        'price_change_24h': price_change_24h, 'volume_change_24h': 1.0, 'market_cap': 1e6,
+    }
+
+
+def _process(state, token):
+    """Scan-side bookkeeping for one token whose filters all passed."""
+    token.setdefault('filter_results', {})
+    for name in ('blacklist', 'volume', 'moonshot', 'rugcheck'):
+        token['filter_results'].setdefault(name, False if name == 'blacklist' else {'flagged': False, 'ran': name})
+    state.record(token)
+
+
+def test_unchanged_mint_is_skipped_until_it_changes():
+    state = IncrementalScanState(SETTINGS)
+    state.begin_scan()
+    token = _token()
+    assert not state.is_unchanged(token)
+    _process(state, token)
+    state.end_scan()
+
+    state.begin_scan()
+    # Below the fingerprint precision: still the same snapshot
+    assert state.is_unchanged(_token(price="0.0012344"))
+    assert not state.is_unchanged(_token(price="0.0013"))
+    assert state.end_scan()['unchanged'] == 1
+
+
+def test_changed_mint_reuses_only_filters_with_unchanged_inputs():
+    state = IncrementalScanState(SETTINGS)
+    state.begin_scan()
+    token = _token()
+    state.is_unchanged(token)
+    _process(state, token)
+    state.end_scan()
+
+    state.begin_scan()
+    moved = _token(price="0.002", price_change_24h=60.0)
+    assert not state.is_unchanged(moved)
+    reused = state.reuse_filter_results(moved)
+    # Volume inputs are identical; moonshot's are not; network results are young enough; blacklist always reruns
+    assert sorted(reused) == ['rugcheck', 'volume']
+    assert moved['volume_analysis'] == {'flagged': False, 'ran': 'volume'}
+    assert 'moonshot_analysis' not in moved and 'blacklist_analysis' not in moved
+
+
+def test_filter_error_forgets_the_mint():
+    state = IncrementalScanState(SETTINGS)
+    state.begin_scan()
+    token = _token()
+    state.is_unchanged(token)
+    token['filter_results'] = {'rugcheck': {'status': 'error', 'message': 'timeout'}}
+    state.record(token)
+    state.end_scan()
+
+    state.begin_scan()
+    assert not state.is_unchanged(_token())
+    assert state.end_scan()['new'] == 1
@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+from data.market_replay import Recording, ReplaySession, _regressions
+
+
+class SignallingEvaluator:
+    """Stands in for StrategyEvaluator; the session wraps process_trade_signal."""
+
+    def __init__(self):
+        self.signals = []
+
+    async def process_trade_signal(self, signal):
+        self.signals.append(signal)
+
+
+class SignallingDispatcher:
+    """Turns every frame into a trade signal after a short delay."""
+
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+
+    async def dispatch_message(self, frame, stream):
+        await asyncio.sleep(0.01)
+        await self.evaluator.process_trade_signal({'mint': frame})
+
+
+def _gate_args(**overrides):
+    args = dict(stage='callback', max_p99_ms=None, max_signal_p99_ms=None, min_fps=None)
+    args.update(overrides)
+    return SimpleNamespace(**args)
+
+
+def test_signal_stage_is_measured_and_gated():
+    evaluator = SignallingEvaluator()
+    listener = SimpleNamespace(message_dispatcher=SignallingDispatcher(evaluator), _active_subscriptions={})
+    recording = Recording(frames=[(0.0, 'raydium_v4', 'a'), (0.1, 'raydium_v4', 'b')])
+    session = ReplaySession(listener, recording, strategy_evaluator=evaluator, via_dispatcher=True, drain_seconds=0)
+
+    report = asyncio.run(session.run())
+
+    assert [s['mint'] for s in evaluator.signals] == ['a', 'b']
+    assert report.stages['signal']['count'] == 2
+    assert report.stages['signal']['p99_ms'] >= 10
+    assert _regressions(report, _gate_args(max_signal_p99_ms=1000)) == []
+    assert _regressions(report, _gate_args(max_signal_p99_ms=1))[0].startswith("signal p99")
+    # The probe is removed after the run
+    assert 'process_trade_signal' not in vars(evaluator)
+
+
+def test_gated_stage_without_samples_fails():
+    recording = Recording(frames=[(0.0, 'raydium_v4', 'a')])
+    listener = SimpleNamespace(message_dispatcher=SimpleNamespace(dispatch_message=lambda *a: asyncio.sleep(0)),
+                               _active_subscriptions={})
+    report = asyncio.run(ReplaySession(listener, recording, via_dispatcher=True, drain_seconds=0).run())
+    assert _regressions(report, _gate_args(max_signal_p99_ms=50)) == ["no signal samples"]
@@ -0,0 +1,31 @@
+from data.blockchain_models import validate_websocket_message
+from data.message_dispatcher import MessageDispatcher
+
+LOGS_FRAME = {
+    "jsonrpc": "2.0",
+    "method": "logsNotification",
+    "params": {
+        "result": {"context": {"slot": 1}, "value": {"signature": "sig", "err": None, "logs": ["Program log: x"]}},
+        "subscription": 5,
+    },
+}
+
+
+def _bare_dispatcher(sample_rate: float = 0.0) -> MessageDispatcher:
+    dispatcher = MessageDispatcher.__new__(MessageDispatcher)
+    dispatcher._validation_sample_rate = sample_rate
+    return dispatcher
+
+
+def test_validated_frame_routes_like_raw_frame():
+    dispatcher = _bare_dispatcher()
+    validated = validate_websocket_message(LOGS_FRAME).model_dump(exclude_none=True)
+    assert dispatcher._determine_message_type(LOGS_FRAME) == 'logs_notification'
+    assert dispatcher._determine_message_type(validated) == 'logs_notification'
+
+
+def test_validation_sampling_matches_configured_rate():
+    for rate in (0.0, 0.01, 0.25, 0.6, 1.0):
+        dispatcher = _bare_dispatcher(rate)
+        sampled = sum(dispatcher._is_sampled(n) for n in range(1, 10001))
+        assert sampled == int(10000 * rate)
@@ -0,0 +1,28 @@
+import numpy as np
+
+from performance.parameter_sweep import ParameterSweep
+
+SPACE = {'rsi_oversold': [25, 35, 45], 'rsi_overbought': [55, 65, 75]}
+
+
+def _prices(n=1200, seed=7):
+    rng = np.random.default_rng(seed)
+    return 1.0 + 0.2 * np.sin(np.arange(n) / 25.0) + rng.normal(0, 0.01, n).cumsum() * 0.1
+
+
+def test_bayesian_walk_forward_searches_each_train_window():
+    with ParameterSweep(_prices(), workers=2, warmup_bars=50) as sweep:
+        searched = []
+        bayesian = sweep.bayesian
+
+        def recording_bayesian(space, n_iter, batch_size=None, seed=None, start=0, end=None):
+            searched.append((start, end))
+            return bayesian(space, n_iter, batch_size, seed=seed, start=start, end=end)
+
+        sweep.bayesian = recording_bayesian
+        table = sweep.bayesian_walk_forward(SPACE, 4, train_bars=400, test_bars=200, seed=1)
+
+    assert searched == [(0, 400), (200, 600), (400, 800), (600, 1000)]
+    assert list(table['test_start']) == [400, 600, 800, 1000]
+    assert set(table['rsi_oversold']) <= {25, 35, 45}
+    assert 'train_sharpe_ratio' in table.columns
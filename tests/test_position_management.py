@@ -0,0 +1,44 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from strategies.position_management import PositionManagement
+
+
+class RecordingOrderManager:
+    SOL_MINT = "So11111111111111111111111111111111111111112"
+
+    def __init__(self):
+        self.swaps = []
+
+    async def execute_jupiter_swap(self, **kwargs):
+        self.swaps.append(kwargs)
+        return len(self.swaps)
+
+
+def test_position_swaps_carry_the_evaluation_time():
+    order_manager = RecordingOrderManager()
+    manager = PositionManagement(
+        order_manager=order_manager,
+        settings=SimpleNamespace(SLIPPAGE_BPS=50, RISK_PER_TRADE=0.01),
+        thresholds=SimpleNamespace(PARTIAL_PROFIT_RATIO=0.5, GAIN_TARGET_RATIO=0.2),
+        balance_checker=None, trade_validator=None,
+    )
+    positions = [{"symbol": "mintA", "current_price": 2.0, "size": 10.0, "profit_target": 1.5,
+                  "entry_price": 1.0, "stop_loss": 0.9}]
+
+    async def scenario():
+        async def fixed_size(**kwargs):
+            await asyncio.sleep(0.05)  # Sizing runs after the decision clock has started
+            return 4.0
+
+        manager.calculate_position_size = fixed_size
+        before = time.monotonic()
+        await manager.manage_positions(positions, account_balance=100.0)
+        return before
+
+    before = asyncio.run(scenario())
+    partial, scale_out = order_manager.swaps
+    assert partial["input_amount"] == 5.0 and scale_out["input_amount"] == 5.0
+    assert before <= partial["signal_time"] <= scale_out["signal_time"]
+    assert scale_out["signal_time"] < before + 0.05
@@ -0,0 +1,30 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from data import raydium_v4_parser
+from data.raydium_v4_parser import RaydiumV4Parser
+
+FIXTURES = Path(raydium_v4_parser.__file__).parent / "fixtures" / "swap_logs.json"
+
+
+def _v4_fixtures():
+    return json.loads(FIXTURES.read_text())["raydium_v4"]
+
+
+def test_swap_confidence_matches_per_line_scoring():
+    # Scores from the per-line parser that preceded the single-pass scanner
+    parser = RaydiumV4Parser(None)
+    swaps = [parser.parse_swap_logs(logs, "sig") for logs in _v4_fixtures()]
+    assert [s and round(s["parsing_confidence"], 4) for s in swaps] == [3.75, 3.75, 3.75, None, None, None]
+
+
+def test_fee_and_commission_each_score_once_per_line():
+    parser = RaydiumV4Parser(None)
+    swap = parser.parse_swap_logs([
+        "Program log: Instruction: SwapBaseIn",
+        "Program log: fee: 10 commission: 20 fee: 30",
+    ], "sig")
+    assert swap["fee_amount"] == 20
+    assert swap["parsing_confidence"] == pytest.approx(0.6)
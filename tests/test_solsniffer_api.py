@@ -0,0 +1,28 @@
+import logging
+
+from filters.solsniffer_api import SolsnifferAPI
+from utils.report_cache import REPORT_NEGATIVE, REPORT_POSITIVE
+
+
+def _api():
+    api = SolsnifferAPI.__new__(SolsnifferAPI)
+    api.logger = logging.getLogger("test_solsniffer_api")
+    return api
+
+
+def test_every_processed_score_is_cached():
+    api = _api()
+    good = api.process_token_data({'score': 85, 'risk': 1, 'details': {}})
+    invalid = api.process_token_data({'score': 'n/a', 'risk': 3, 'details': {'mint': 'ok'}})
+    assert not invalid['solsniffer_passed']
+    assert SolsnifferAPI._classify_score(good) == REPORT_POSITIVE
+    assert SolsnifferAPI._classify_score(invalid) == REPORT_POSITIVE
+
+
+def test_errors_are_not_cached_and_not_found_is():
+    api = _api()
+    assert SolsnifferAPI._classify_score(api._get_minimal_data(error_message="API Error: busy")) is None
+    assert SolsnifferAPI._classify_score(api._get_minimal_data(failing=True, error_message="Data processing error")) is None
+    not_found = api._get_minimal_data(error_message="Token not found by API (404)")
+    not_found['not_found'] = True
+    assert SolsnifferAPI._classify_score(not_found) == REPORT_NEGATIVE
@@ -0,0 +1,37 @@
+import logging
+from datetime import datetime, timezone
+
+from strategies.strategy_selector import StrategySelector, _signal_timestamp
+
+
+def _selector():
+    selector = StrategySelector.__new__(StrategySelector)
+    selector.logger = logging.getLogger("test_strategy_selector")
+    return selector
+
+
+def test_indicators_attached_without_changing_strategy_routing():
+    rising = [1.0 + 0.05 * i for i in range(60)]
+    falling = [4.0 - 0.05 * i for i in range(60)]
+    tokens = [
+        {'mint': 'mintA', 'price_history': rising},
+        {'mint': 'mintA', 'price_history': falling},  # Duplicate mint with its own history
+        {'mint': 'mintB'},
+    ]
+
+    candidates = _selector().analyze_market_conditions(tokens)
+
+    first, second, bare = tokens
+    assert first['technical_indicators']['RSI_14'] > 70
+    assert second['technical_indicators']['RSI_14'] < 30
+    assert 'technical_indicators' not in bare
+    # Indicators alone do not make a token a breakout/trend/reversion candidate
+    assert not any(key.startswith('is_') for token in tokens for key in token)
+    assert candidates['default'] == tokens
+
+
+def test_signal_timestamp_prefers_the_signal_time():
+    fired = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    assert _signal_timestamp({'timestamp': fired.isoformat()}) == fired
+    assert _signal_timestamp({'timestamp': fired.replace(tzinfo=None)}) == fired
+    assert _signal_timestamp({}) > fired
@@ -0,0 +1,40 @@
+import time
+
+from data.tick_store import TickStore
+
+MINT = "So11111111111111111111111111111111111111112"
+
+
+def _store(tmp_path):
+    return TickStore(str(tmp_path / "ticks"), segment_rows=1024)
+
+
+def test_ohlcv_requires_min_bars(tmp_path):
+    store = _store(tmp_path)
+    now = time.time()
+    store.append(MINT, 1.0, timestamp=now - 5)
+
+    assert len(store.get_ohlcv(MINT, 60, limit=100)) == 1
+    assert store.get_ohlcv(MINT, 60, limit=100, min_bars=100) == []
+
+    # Enough history: min_bars is capped at the requested bar count
+    other = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+    for i in range(10):
+        store.append(other, 1.0 + i, timestamp=now - 590 + i * 60)
+    assert len(store.get_ohlcv(other, 60, limit=10, min_bars=100)) == 10
+
+
+def test_ohlcv_non_positive_limit_returns_nothing(tmp_path):
+    store = _store(tmp_path)
+    store.append(MINT, 1.0, timestamp=time.time() - 5)
+    assert store.get_ohlcv(MINT, 60, limit=0) == []
+    assert store.get_ohlcv(MINT, 60, limit=-1) == []
+
+
+def test_invalid_mint_never_touches_the_filesystem(tmp_path):
+    store = _store(tmp_path)
+    assert store.append("../escape", 1.0) is False
+    assert store.append("", 1.0) is False
+    assert store.get_ohlcv("../../etc", 60, limit=10) == []
+    assert not (tmp_path / "escape").exists()
+    assert store.mints() == []
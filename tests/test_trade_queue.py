@@ -0,0 +1,117 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from execution.order_manager import OrderManager
+from execution.trade_queue import TradePriority, TradeQueue, TradeRequest
+
+SOL = "So11111111111111111111111111111111111111112"
+MINT_A = "4k3Dyjzvzp8eMZWUXbBCjEvwSkkk59S5iCNLY3QrkX6R"
+MINT_B = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+
+class FakePriceMonitor:
+    async def get_current_price_sol(self, mint, max_age_seconds=None):
+        return 0.001
+
+
+class FakeWalletManager:
+    def get_public_key(self):
+        return None
+
+
+class SlowPaperTrader:
+    """Stands in for PaperTrading; records when each trade ran."""
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.trades = []
+
+    async def execute_trade(self, trade_id, action, mint, price_sol, amount):
+        started = time.monotonic()
+        await asyncio.sleep(self.delay)
+        self.trades.append({"action": action, "mint": mint, "amount": amount,
+                            "started": started, "finished": time.monotonic()})
+        return True
+
+
+def _order_manager(paper_trader):
+    settings = SimpleNamespace(
+        PAPER_TRADING_ENABLED=True, SOL_MINT=SOL, MAX_SLIPPAGE_PCT=1.0,
+        COMPUTE_UNIT_PRICE_MICRO_LAMPORTS=0, COMPUTE_UNIT_LIMIT=0,
+        JUPITER_ULTRA_API="", JUPITER_PRICE_API="",
+        COMPONENT_CB_MAX_FAILURES=5, CIRCUIT_BREAKER_RESET_MINUTES=1,
+        EXECUTION_PREFETCH_ENABLED=False,
+    )
+    order_manager = OrderManager(
+        solana_client=None, http_client=None, settings=settings, db=None,
+        wallet_manager=FakeWalletManager(), trade_validator=None, price_monitor=FakePriceMonitor(),
+    )
+    order_manager.paper_trader = paper_trader
+    return order_manager
+
+
+def _request(mint, is_buy, amount, outcomes):
+    async def callback(success):
+        outcomes.append((mint, is_buy, success))
+
+    return TradeRequest(
+        token_address=mint, amount=amount, is_buy=is_buy, priority=TradePriority.MEDIUM,
+        strategy_id="test", timestamp=datetime.now(timezone.utc), metadata={}, callback=callback,
+    )
+
+
+async def _run(queue, requests, outcomes):
+    for request in requests:
+        assert await queue.add_trade(request)
+    while len(outcomes) < len(requests):
+        await asyncio.sleep(0.01)
+
+
+def test_queue_executes_through_order_manager_swap():
+    async def scenario():
+        paper = SlowPaperTrader(delay=0.0)
+        queue = TradeQueue(_order_manager(paper), max_concurrency=2)
+        outcomes = []
+        await _run(queue, [_request(MINT_A, True, 1000.0, outcomes), _request(MINT_B, False, 50.0, outcomes)], outcomes)
+        return paper, queue, outcomes
+
+    paper, queue, outcomes = asyncio.run(scenario())
+    assert sorted(outcomes) == sorted([(MINT_A, True, True), (MINT_B, False, True)])
+    by_mint = {trade["mint"]: trade for trade in paper.trades}
+    # A buy of 1000 tokens at 0.001 SOL spends 1 SOL, which buys back 1000 tokens
+    assert by_mint[MINT_A]["action"] == "BUY" and abs(by_mint[MINT_A]["amount"] - 1000.0) < 1e-6
+    assert by_mint[MINT_B]["action"] == "SELL" and by_mint[MINT_B]["amount"] == 50.0
+    assert queue.metrics["failed_trades"] == 0
+
+
+def test_swaps_on_different_mints_overlap():
+    async def scenario():
+        paper = SlowPaperTrader(delay=0.2)
+        queue = TradeQueue(_order_manager(paper), max_concurrency=2)
+        outcomes = []
+        await _run(queue, [_request(MINT_A, True, 10.0, outcomes), _request(MINT_B, True, 10.0, outcomes),
+                           _request(MINT_A, False, 5.0, outcomes)], outcomes)
+        return paper
+
+    paper = asyncio.run(scenario())
+    a_buy, a_sell = [t for t in paper.trades if t["mint"] == MINT_A]
+    (b_buy,) = [t for t in paper.trades if t["mint"] == MINT_B]
+    # Different mints run at the same time; the same mint stays in order
+    assert b_buy["started"] < a_buy["finished"] and a_buy["started"] < b_buy["finished"]
+    assert a_sell["started"] >= a_buy["finished"]
+
+
+def test_swaps_on_one_mint_run_one_at_a_time():
+    async def scenario():
+        paper = SlowPaperTrader(delay=0.1)
+        order_manager = _order_manager(paper)
+        await asyncio.gather(
+            order_manager.execute_jupiter_swap(1, SOL, MINT_A, 0.5, 9),
+            order_manager.execute_jupiter_swap(2, MINT_A, SOL, 100.0, 6),
+        )
+        return paper
+
+    first, second = sorted(asyncio.run(scenario()).trades, key=lambda t: t["started"])
+    assert second["started"] >= first["finished"]
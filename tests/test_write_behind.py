@@ -0,0 +1,63 @@
+import asyncio
+
+from data.write_behind import MarketWriteBehind
+
+
+class SlowTokenDatabase:
+    """Records written rows; each write takes ``delay`` seconds."""
+
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+        self.rows = {}
+        self.write_started = asyncio.Event()
+
+    async def write_market_updates(self, rows):
+        self.write_started.set()
+        await asyncio.sleep(self.delay)
+        for row in rows:
+            self.rows[row["mint"]] = row
+        return len(rows)
+
+
+def test_stop_during_inflight_flush_writes_everything():
+    async def scenario():
+        db = SlowTokenDatabase()
+        buffer = MarketWriteBehind(db, flush_interval=0.05, max_dirty=1000)
+        for i in range(10):
+            buffer.update_price(f"mint{i}", 1.0 + i)
+        await asyncio.wait_for(db.write_started.wait(), timeout=2.0)
+        # The flush loop is now inside write_market_updates with the batch swapped out
+        buffer_stats_before = buffer.get_stats()
+        await buffer.stop()
+        return db, buffer, buffer_stats_before
+
+    db, buffer, before = asyncio.run(scenario())
+    assert before["dirty"] == 0
+    assert sorted(db.rows) == sorted(f"mint{i}" for i in range(10))
+    assert db.rows["mint3"]["price"] == 4.0
+    assert buffer.get_stats()["dirty"] == 0
+
+
+def test_cancelled_flush_requeues_batch():
+    async def scenario():
+        db = SlowTokenDatabase(delay=10.0)
+        buffer = MarketWriteBehind(db, flush_interval=60.0)
+        buffer.update_price("mintA", 2.0)
+        buffer.add_volume("mintA", 5.0)
+        flush = asyncio.create_task(buffer.flush())
+        await asyncio.wait_for(db.write_started.wait(), timeout=2.0)
+        buffer.add_volume("mintA", 1.0)  # Arrives while the batch is being written
+        flush.cancel()
+        try:
+            await flush
+        except asyncio.CancelledError:
+            pass
+        pending = buffer._pending["mintA"]
+        db.delay = 0.0
+        await buffer.stop()
+        return db, pending
+
+    db, pending = asyncio.run(scenario())
+    assert pending.price == 2.0
+    assert pending.volume_increment == 6.0
+    assert db.rows["mintA"]["volume_increment"] == 6.0
@@ -1,7 +1,11 @@
+import atexit
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler, SMTPHandler
-from typing import Optional
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, SMTPHandler
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 from pathlib import Path
 
 # Create outputs directory if it doesn't exist
@@ -15,6 +19,8 @@ MAX_LOG_FILE_SIZE = int(os.getenv("MAX_LOG_FILE_SIZE", 10 * 1024 * 1024))  # 10
 BACKUP_COUNT = int(os.getenv("BACKUP_COUNT", 5))  # Keep 5 backup log files
 ENABLE_CONSOLE_LOGGING = os.getenv("ENABLE_CONSOLE_LOGGING", "True").lower() == "true"
 ENABLE_EMAIL_LOGGING = os.getenv("ENABLE_EMAIL_LOGGING", "False").lower() == "true"
+# Handlers run on a background thread behind a QueueHandler (see QueueLoggingBackend)
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE_ENABLED", "True").lower() == "true"
 
 # Email configuration for critical error reporting
 EMAIL_HOST = os.getenv("EMAIL_HOST", "")
@@ -24,6 +30,193 @@ EMAIL_USERNAME = os.getenv("EMAIL_USERNAME", "")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD", "")
 EMAIL_RECIPIENTS = os.getenv("EMAIL_RECIPIENTS", "").split(",")
 
+class _LazyMessage:
+    """Log argument whose string form is only computed if a handler formats the record."""
+    __slots__ = ('func', 'args', 'kwargs')
+
+    def __init__(self, func: Callable[..., Any], args: Tuple, kwargs: Dict[str, Any]):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        return str(self.func(*self.args, **self.kwargs))
+
+    __repr__ = __str__
+
+
+def lazy(func: Callable[..., Any], *args, **kwargs) -> _LazyMessage:
+    """
+    Defer building an expensive log message until the record is actually emitted.
+
+    Pass the result as a %-style argument so disabled levels never call ``func``::
+
+        logger.debug("Pool state: %s", lazy(describe_pool, pool))
+
+    Args:
+        func: Callable producing the message text (or any object to ``str()``)
+        *args, **kwargs: Arguments for ``func``
+
+    Returns:
+        An object whose ``str()`` calls ``func(*args, **kwargs)``
+    """
+    return _LazyMessage(func, args, kwargs)
+
+
+def _dumps_truncated(obj: Any, limit: Optional[int]) -> str:
+    text = json.dumps(obj, indent=2, default=str)
+    if limit is not None and len(text) > limit:
+        return f"{text[:limit]}... (truncated)"
+    return text
+
+
+def lazy_json(obj: Any, limit: Optional[int] = None) -> _LazyMessage:
+    """``lazy`` pretty-printed JSON of ``obj``, truncated to ``limit`` characters."""
+    return _LazyMessage(_dumps_truncated, (obj, limit), {})
+
+
+class RoutedQueueHandler(QueueHandler):
+    """QueueHandler that tags each record with the destination it was logged for."""
+
+    def __init__(self, log_queue, route: str):
+        super().__init__(log_queue)
+        self.route = route
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        record.log_route = self.route
+        return record
+
+
+class RoutingQueueListener(QueueListener):
+    """QueueListener that hands each record only to the handlers of its route."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue, respect_handler_level=True)
+        self.routes: Dict[str, Tuple[logging.Handler, ...]] = {}
+
+    def handle(self, record: logging.LogRecord):
+        record = self.prepare(record)
+        for handler in self.routes.get(getattr(record, 'log_route', None), ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class QueueLoggingBackend:
+    """
+    Process-wide non-blocking logging backend.
+
+    Loggers get a ``RoutedQueueHandler`` whose ``emit`` only enqueues the record;
+    a single ``RoutingQueueListener`` thread formats and writes it with the real
+    handlers (files, console, email) registered for that route. Records are
+    rendered to a plain message in the caller (``QueueHandler.prepare``) so
+    mutable arguments are captured at log time.
+    """
+
+    def __init__(self):
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.listener = RoutingQueueListener(self.queue)
+        self._queue_handlers: Dict[str, RoutedQueueHandler] = {}
+        self._lock = threading.Lock()
+        self._started = False
+
+    def set_route(self, route: str, handlers: Iterable[logging.Handler]) -> RoutedQueueHandler:
+        """
+        Register (or replace) the handlers behind ``route`` and return its queue handler.
+        Replaced handlers are closed once the listener no longer references them.
+        """
+        with self._lock:
+            previous = self.listener.routes.get(route, ())
+            self.listener.routes = {**self.listener.routes, route: tuple(handlers)}
+            queue_handler = self._queue_handlers.get(route)
+            if queue_handler is None:
+                queue_handler = self._queue_handlers[route] = RoutedQueueHandler(self.queue, route)
+            if not self._started:
+                self.listener.start()
+                self._started = True
+        for handler in previous:
+            if handler not in self.listener.routes[route]:
+                handler.close()
+        return queue_handler
+
+    def queue_handler(self, route: str) -> Optional[RoutedQueueHandler]:
+        """Queue handler of an already registered route, or None."""
+        return self._queue_handlers.get(route)
+
+    def stop(self):
+        """Drain the queue, stop the listener thread and close every handler."""
+        with self._lock:
+            if not self._started:
+                return
+            self.listener.stop()
+            self._started = False
+            for handlers in self.listener.routes.values():
+                for handler in handlers:
+                    handler.close()
+
+
+_log_backend: Optional[QueueLoggingBackend] = None
+_log_backend_lock = threading.Lock()
+
+
+def get_log_backend() -> QueueLoggingBackend:
+    """Process-wide QueueLoggingBackend, started on first use and stopped at exit."""
+    global _log_backend
+    if _log_backend is None:
+        with _log_backend_lock:
+            if _log_backend is None:
+                _log_backend = QueueLoggingBackend()
+                atexit.register(_log_backend.stop)
+    return _log_backend
+
+
+def attach_handlers(logger: logging.Logger, route: str, handlers: Iterable[logging.Handler], use_queue: Optional[bool] = None):
+    """
+    Attach ``handlers`` to ``logger``, behind the shared queue unless queueing is disabled.
+
+    Args:
+        logger: Logger to attach to
+        route: Backend route name; registering the same route again replaces its handlers
+        handlers: Fully configured handlers (level, formatter, filters)
+        use_queue: Override LOG_QUEUE_ENABLED
+    """
+    if LOG_QUEUE_ENABLED if use_queue is None else use_queue:
+        logger.addHandler(get_log_backend().set_route(route, handlers))
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
+
+
+def _module_handlers(log_file: str, formatter: logging.Formatter) -> list:
+    """File, optional console and optional email handlers shared by get_logger loggers."""
+    handlers = []
+
+    # File handler with rotation
+    file_handler = RotatingFileHandler(log_file, maxBytes=MAX_LOG_FILE_SIZE, backupCount=BACKUP_COUNT)
+    file_handler.setFormatter(formatter)
+    handlers.append(file_handler)
+
+    # Console handler (optional)
+    if ENABLE_CONSOLE_LOGGING:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    # Email handler for critical errors (optional)
+    if ENABLE_EMAIL_LOGGING and EMAIL_HOST and EMAIL_USERNAME and EMAIL_PASSWORD and EMAIL_RECIPIENTS:
+        email_handler = SMTPHandler(
+            mailhost=(EMAIL_HOST, EMAIL_PORT),
+            fromaddr=EMAIL_USERNAME,
+            toaddrs=EMAIL_RECIPIENTS,
+            subject="Synthron Critical Alert",
+            credentials=(EMAIL_USERNAME, EMAIL_PASSWORD),
+            secure=() if EMAIL_USE_TLS else None,
+        )
+        email_handler.setFormatter(formatter)
+        email_handler.setLevel(logging.CRITICAL) # Email handler always CRITICAL
+        handlers.append(email_handler)
+    return handlers
+
 def get_logger(module_name: str, log_level: int = logging.INFO, log_file: Optional[str] = None) -> logging.Logger:
     """
     Configure and return a logger for the specified module.
@@ -44,6 +237,9 @@ def get_logger(module_name: str, log_level: int = logging.INFO, log_file: Option
              logger.setLevel(log_level)
              # Also update existing handlers
              for handler in logger.handlers:
+                  # Shared queue handlers stay at NOTSET; the logger level gates them
+                  if isinstance(handler, QueueHandler):
+                       continue
                   # Be careful not to lower email handler level below CRITICAL
                   if not isinstance(handler, SMTPHandler) or log_level >= logging.CRITICAL:
                        handler.setLevel(log_level)
@@ -57,34 +253,19 @@ def get_logger(module_name: str, log_level: int = logging.INFO, log_file: Option
         "%(asctime)s - %(levelname)s - [%(name)s] - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
     )
 
-    # File handler with rotation
-    file_handler = RotatingFileHandler(log_file, maxBytes=MAX_LOG_FILE_SIZE, backupCount=BACKUP_COUNT)
-    file_handler.setFormatter(formatter)
-    # File handler should respect the passed-in level
-    file_handler.setLevel(log_level) 
-    logger.addHandler(file_handler)
-
-    # Console handler (optional)
-    if ENABLE_CONSOLE_LOGGING:
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        # Console handler should also respect the passed-in level
-        console_handler.setLevel(log_level)
-        logger.addHandler(console_handler)
-
-    # Email handler for critical errors (optional)
-    if ENABLE_EMAIL_LOGGING and EMAIL_HOST and EMAIL_USERNAME and EMAIL_PASSWORD and EMAIL_RECIPIENTS:
-        email_handler = SMTPHandler(
-            mailhost=(EMAIL_HOST, EMAIL_PORT),
-            fromaddr=EMAIL_USERNAME,
-            toaddrs=EMAIL_RECIPIENTS,
-            subject="Synthron Critical Alert",
-            credentials=(EMAIL_USERNAME, EMAIL_PASSWORD),
-            secure=() if EMAIL_USE_TLS else None,
-        )
-        email_handler.setFormatter(formatter)
-        email_handler.setLevel(logging.CRITICAL) # Email handler always CRITICAL
-        logger.addHandler(email_handler)
+    if LOG_QUEUE_ENABLED:
+        # One shared set of handlers per log file, written from the listener thread;
+        # the logger's own level does the filtering
+        backend = get_log_backend()
+        route = f"module:{log_file}"
+        queue_handler = backend.queue_handler(route) or backend.set_route(route, _module_handlers(log_file, formatter))
+        logger.addHandler(queue_handler)
+    else:
+        for handler in _module_handlers(log_file, formatter):
+            # Direct handlers respect the passed-in level (email stays CRITICAL)
+            if not isinstance(handler, SMTPHandler):
+                handler.setLevel(log_level)
+            logger.addHandler(handler)
 
     logger.info(f"Logger initialized for {module_name} with level {logging.getLevelName(log_level)}") # Use getLevelName for clarity
     return logger
@@ -0,0 +1,391 @@
+"""
+Shared adaptive rate-limit governor for outbound API calls.
+
+Every HTTP client that talks to a rate-limited provider asks the governor for a
+send slot before each attempt and reports the response status afterwards.
+Slots come from a token bucket keyed by ``(provider, endpoint class, proxy)``,
+so all call sites that share a quota also share one view of it. A 429 storm
+seen by the scanner slows the price monitor's calls to the same provider and
+proxy too.
+
+- Refill rate is tuned AIMD style. Each success adds ``increase_rps / rate``,
+  about ``increase_rps`` per second at full load, up to the configured
+  provider ceiling. A 429 multiplies the rate by ``decrease_factor``, at most
+  once per ``cooldown`` so a burst of in-flight 429s counts as one signal.
+- ``Retry-After`` (seconds or HTTP date) pauses the whole bucket until it
+  expires.
+- Waiting callers are served by ``RequestPriority`` first, then in arrival
+  order. Trade execution and open-position pricing run before scanner
+  discovery.
+- Rates, queue depth, utilization, grants, 429s and slot wait times are
+  published to the metrics registry (``/metrics``) and ``get_stats``.
+
+Limits come from ``RATE_GOVERNOR_LIMITS``, e.g.
+``"dexscreener=5,dexscreener:latest=1,helius=10"``: the ceiling in requests per
+second for a provider, optionally narrowed to one endpoint class.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from performance.metrics_registry import get_metrics_registry
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_PROVIDER_LIMITS = "dexscreener=5,dexscreener:latest=1,rugcheck=3,solanatracker=1,jupiter=1,helius=10"
+
+
+class RequestPriority(IntEnum):
+    """Slot priority; lower values are served first."""
+    EXECUTION = 0   # Quotes/transactions for a trade being placed
+    POSITION = 1    # Pricing of open positions and monitored tokens
+    NORMAL = 2
+    DISCOVERY = 3   # Scanner discovery and filter enrichment
+
+
+def parse_limits(spec: str) -> Dict[Tuple[str, Optional[str]], float]:
+    """
+    Parse ``"provider[:endpoint_class]=rps,..."`` into ceilings.
+
+    Returns:
+        Dict[Tuple[str, Optional[str]], float]: (provider, endpoint class or None) -> requests/second
+    """
+    limits: Dict[Tuple[str, Optional[str]], float] = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            key, value = item.split("=", 1)
+            provider, _, endpoint_class = key.strip().lower().partition(":")
+            rate = float(value)
+        except ValueError:
+            logger.warning(f"Ignoring malformed rate limit entry: {item!r}")
+            continue
+        if rate > 0:
+            limits[(provider, endpoint_class or None)] = rate
+    return limits
+
+
+def proxy_label(proxy: Any) -> str:
+    """
+    Stable, credential-free identifier for a proxy.
+
+    Accepts a ProxyManager proxy dict (``host``/``url``), a requests-style
+    ``{'http': url, 'https': url}`` dict, a URL string or None (direct).
+    """
+    if not proxy:
+        return "direct"
+    if isinstance(proxy, dict):
+        if proxy.get("host"):
+            return str(proxy["host"])
+        proxy = proxy.get("url") or proxy.get("https") or proxy.get("http") or ""
+    parts = urlsplit(str(proxy) if "://" in str(proxy) else f"//{proxy}")
+    host = parts.hostname or "direct"
+    return f"{host}:{parts.port}" if parts.port else host
+
+
+def provider_for_url(url: str) -> str:
+    """Provider name for an RPC/API URL (``helius`` for Helius hosts, else the host name)."""
+    host = urlsplit(url if "://" in url else f"//{url}").hostname or url
+    return "helius" if "helius" in host else host
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+# Tie-breaker so waiters of equal priority are served in arrival order
+_sequence = itertools.count()
+
+
+class RateBucket:
+    """
+    Token bucket with an AIMD-tuned refill rate and a priority wait queue.
+
+    Args:
+        key: ``(provider, endpoint class, proxy label)``
+        ceiling: Provider ceiling in requests/second (the rate never exceeds it)
+        min_rate: Floor the rate is never cut below
+        burst: Bucket capacity (requests that may be sent back to back)
+        increase_rps: Additive increase per second of successful traffic
+        decrease_factor: Multiplier applied on a 429
+        cooldown: Minimum seconds between two multiplicative decreases
+        max_retry_after: Cap on honoured ``Retry-After`` pauses
+    """
+
+    def __init__(self, key: Tuple[str, str, str], ceiling: float, min_rate: float, burst: float,
+                 increase_rps: float, decrease_factor: float, cooldown: float, max_retry_after: float):
+        self.key = key
+        self.ceiling = ceiling
+        self.min_rate = min(min_rate, ceiling)
+        self.burst = max(1.0, burst)
+        self.increase_rps = increase_rps
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.max_retry_after = max_retry_after
+
+        self.rate = ceiling
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.in_flight = 0
+
+        self._counters: Dict[str, int] = {'granted': 0, 'queued': 0, 'throttled': 0, 'errors': 0}
+        self._window_start = self.updated
+        self._window_grants = 0
+        self.utilization = 0.0
+
+        registry = get_metrics_registry()
+        labels = {'provider': key[0], 'endpoint': key[1], 'proxy': key[2]}
+        self._rate_gauge = registry.gauge("rate_governor_rate", "Current refill rate (requests/s)").child(labels)
+        self._queue_gauge = registry.gauge("rate_governor_queue_depth", "Callers waiting for a send slot").child(labels)
+        self._utilization_gauge = registry.gauge(
+            "rate_governor_utilization", "Granted slots / refill rate over the last second").child(labels)
+        self._granted_counter = registry.counter("rate_governor_granted", "Send slots granted").child(labels)
+        self._throttled_counter = registry.counter("rate_governor_throttled", "429 responses reported").child(labels)
+        self._wait_histogram = registry.histogram("rate_governor_wait_ms", "Time spent waiting for a send slot").child(labels)
+        self._rate_gauge.set(self.rate)
+
+    # --- Slots ---
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def _grant(self, now: float):
+        self.tokens -= 1
+        self._counters['granted'] += 1
+        self._granted_counter.inc()
+        self._window_grants += 1
+        window = now - self._window_start
+        if window >= 1.0:
+            self.utilization = self._window_grants / (window * self.rate)
+            self._utilization_gauge.set(self.utilization)
+            self._window_start = now
+            self._window_grants = 0
+
+    async def acquire(self, priority: int = RequestPriority.NORMAL):
+        """Wait for a send slot; callers with a lower ``priority`` value are served first."""
+        now = time.monotonic()
+        if not self._waiters and now >= self.blocked_until:
+            self._refill(now)
+            if self.tokens >= 1:
+                self._grant(now)
+                self._wait_histogram.observe(0.0)
+                return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (int(priority), next(_sequence), future))
+        self._counters['queued'] += 1
+        self._queue_gauge.set(len(self._waiters))
+        if self._dispatcher is None:
+            self._dispatcher = loop.create_task(self._dispatch())
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as the caller was cancelled: hand the token back
+                self.tokens += 1
+            else:
+                future.cancel()
+            raise
+        self._wait_histogram.observe((time.monotonic() - now) * 1000)
+
+    async def _dispatch(self):
+        try:
+            while self._waiters:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens < 1:
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+                    continue
+                _, _, future = heapq.heappop(self._waiters)
+                self._queue_gauge.set(len(self._waiters))
+                if future.done():
+                    continue  # Waiter was cancelled
+                self._grant(now)
+                future.set_result(None)
+        finally:
+            self._dispatcher = None
+
+    # --- Feedback ---
+
+    def record(self, status: Optional[int], retry_after: Any = None):
+        """
+        Feed a response back into the rate.
+
+        Args:
+            status: HTTP status code, or None for a transport error (does not change the rate)
+            retry_after: ``Retry-After`` header value, if any
+        """
+        now = time.monotonic()
+        if status == 429:
+            self._counters['throttled'] += 1
+            self._throttled_counter.inc()
+            if now - self._last_decrease >= self.cooldown:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self._last_decrease = now
+                self._rate_gauge.set(self.rate)
+                logger.info(f"Rate governor {'/'.join(self.key)}: 429 received, rate cut to {self.rate:.2f}/s")
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            delay = parse_retry_after(retry_after)
+            if delay:
+                self.blocked_until = max(self.blocked_until, now + min(delay, self.max_retry_after))
+        elif status is not None and 200 <= status < 400:
+            if self.rate < self.ceiling and now - self._last_decrease >= self.cooldown:
+                self.rate = min(self.ceiling, self.rate + self.increase_rps / self.rate)
+                self._rate_gauge.set(self.rate)
+        else:
+            self._counters['errors'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            'rate': self.rate,
+            'ceiling': self.ceiling,
+            'tokens': self.tokens,
+            'queue_depth': len(self._waiters),
+            'in_flight': self.in_flight,
+            'utilization': self.utilization,
+            'blocked_for': max(0.0, self.blocked_until - now),
+            **self._counters,
+        }
+
+
+class RateSlot:
+    """Handle for one granted send; report the response through ``record``."""
+
+    __slots__ = ("bucket", "recorded")
+
+    def __init__(self, bucket: Optional[RateBucket]):
+        self.bucket = bucket
+        self.recorded = False
+
+    def record(self, status: Optional[int], retry_after: Any = None):
+        """Report the HTTP status (and ``Retry-After`` header) of the request sent with this slot."""
+        if self.bucket is not None and not self.recorded:
+            self.bucket.record(status, retry_after)
+        self.recorded = True
+
+
+class RateLimitGovernor:
+    """
+    Registry of rate buckets shared by every API client in the process.
+
+    Args:
+        settings: Application settings (``RATE_GOVERNOR_*`` values); defaults apply when omitted
+    """
+
+    def __init__(self, settings=None):
+        self._buckets: Dict[Tuple[str, str, str], RateBucket] = {}
+        self.configure(settings)
+
+    def configure(self, settings=None):
+        """Load ``RATE_GOVERNOR_*`` values; buckets that already exist keep their ceilings."""
+        self.settings = settings
+        self.enabled = bool(getattr(settings, 'RATE_GOVERNOR_ENABLED', True))
+        self.limits = parse_limits(getattr(settings, 'RATE_GOVERNOR_LIMITS', DEFAULT_PROVIDER_LIMITS))
+        self.default_rps = float(getattr(settings, 'RATE_GOVERNOR_DEFAULT_RPS', 5.0))
+        self.burst_seconds = float(getattr(settings, 'RATE_GOVERNOR_BURST_SECONDS', 1.0))
+        self.min_rate_fraction = float(getattr(settings, 'RATE_GOVERNOR_MIN_RATE_FRACTION', 0.05))
+        self.increase_rps = float(getattr(settings, 'RATE_GOVERNOR_INCREASE_RPS', 0.5))
+        self.decrease_factor = float(getattr(settings, 'RATE_GOVERNOR_DECREASE_FACTOR', 0.5))
+        self.cooldown = float(getattr(settings, 'RATE_GOVERNOR_COOLDOWN', 1.0))
+        self.max_retry_after = float(getattr(settings, 'RATE_GOVERNOR_MAX_RETRY_AFTER', 120.0))
+
+    def ceiling_for(self, provider: str, endpoint_class: Optional[str] = None) -> float:
+        """Configured requests/second for a provider endpoint class (falls back to provider, then default)."""
+        return self.limits.get((provider, endpoint_class)) or self.limits.get((provider, None)) or self.default_rps
+
+    def bucket(self, provider: str, endpoint_class: str = "default", proxy: Any = None) -> RateBucket:
+        """Bucket for ``(provider, endpoint class, proxy)``, created on first use."""
+        key = (provider.lower(), endpoint_class or "default", proxy_label(proxy))
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            ceiling = self.ceiling_for(key[0], endpoint_class)
+            bucket = RateBucket(
+                key,
+                ceiling=ceiling,
+                min_rate=ceiling * self.min_rate_fraction,
+                burst=ceiling * self.burst_seconds,
+                increase_rps=self.increase_rps,
+                decrease_factor=self.decrease_factor,
+                cooldown=self.cooldown,
+                max_retry_after=self.max_retry_after,
+            )
+            self._buckets[key] = bucket
+        return bucket
+
+    @asynccontextmanager
+    async def slot(self, provider: str, endpoint_class: str = "default", proxy: Any = None,
+                   priority: int = RequestPriority.NORMAL):
+        """
+        Wait for a send slot and yield a ``RateSlot`` to report the response on.
+
+        Usage:
+            async with governor.slot("dexscreener", "tokens", proxy, RequestPriority.POSITION) as slot:
+                response = await session.get(url)
+                slot.record(response.status, response.headers.get("Retry-After"))
+
+        A slot left without a ``record`` call counts as a transport error.
+        """
+        if not self.enabled:
+            yield RateSlot(None)
+            return
+        bucket = self.bucket(provider, endpoint_class, proxy)
+        await bucket.acquire(priority)
+        slot = RateSlot(bucket)
+        bucket.in_flight += 1
+        try:
+            yield slot
+        finally:
+            bucket.in_flight -= 1
+            if not slot.recorded:
+                slot.record(None)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-bucket rate, queue depth, utilization and counters, keyed ``provider/endpoint/proxy``."""
+        return {"/".join(key): bucket.get_stats() for key, bucket in self._buckets.items()}
+
+
+# Global governor instance shared by all API clients
+_rate_governor: Optional[RateLimitGovernor] = None
+
+
+def get_rate_governor(settings=None) -> RateLimitGovernor:
+    """Get or create the global rate governor (the first caller that passes settings configures it)"""
+    global _rate_governor
+    if _rate_governor is None:
+        _rate_governor = RateLimitGovernor(settings)
+    elif settings is not None and _rate_governor.settings is None:
+        _rate_governor.configure(settings)
+    return _rate_governor
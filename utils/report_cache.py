@@ -0,0 +1,458 @@
+"""
+Shared persistent cache for third-party risk reports.
+
+RugCheck, SolSniffer, SolanaTracker and Twitter reports barely change between
+scan cycles, but fetching them again for every trending mint is where most of
+the scan latency and API quota goes. ``RiskReportCache`` keeps one entry per
+``(provider, key)`` in memory, backed by a SQLite table so the cache survives
+restarts:
+
+- Each provider has its own TTL (``RISK_CACHE_TTL_<PROVIDER>``). Not-found
+  results are cached too (negative caching) with ``RISK_CACHE_NEGATIVE_TTL``.
+  Transient failures (timeouts, 429s, 5xx) are never cached.
+- Entries tied to a mint carry that mint's version. ``observe_market()`` bumps
+  the version when liquidity or holder count moves by more than
+  ``RISK_CACHE_LIQUIDITY_CHANGE_PCT`` / ``RISK_CACHE_HOLDER_CHANGE_PCT``
+  since the last bump, which invalidates every report cached for the mint.
+- Concurrent lookups of the same key share one fetch.
+- Writes are buffered and flushed to SQLite from a worker thread every
+  ``RISK_CACHE_FLUSH_INTERVAL`` seconds. On startup the unexpired rows and
+  mint versions are loaded back into memory.
+
+Clients call ``get_or_fetch(provider, key, fetch, classify, mint=...)``, where
+``classify(result)`` returns ``REPORT_POSITIVE``, ``REPORT_NEGATIVE`` or None
+(don't cache).
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from performance.metrics_registry import get_metrics_registry
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+REPORT_POSITIVE = "positive"
+REPORT_NEGATIVE = "negative"
+
+_FETCH_CANCELLED = object()
+
+# Bump when the stored payload format changes; rows written by other versions are dropped on load
+CACHE_FORMAT_VERSION = 1
+
+# Seconds a report stays fresh, by provider
+DEFAULT_PROVIDER_TTLS: Dict[str, float] = {
+    "rugcheck": 900.0,
+    "solsniffer": 1800.0,
+    "solanatracker": 300.0,
+    "solanatracker_holders": 300.0,
+    "twitter": 3600.0,
+}
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS risk_reports (
+        provider TEXT NOT NULL,
+        cache_key TEXT NOT NULL,
+        mint TEXT,
+        mint_version INTEGER NOT NULL DEFAULT 0,
+        negative INTEGER NOT NULL DEFAULT 0,
+        payload TEXT,
+        fetched_at REAL NOT NULL,
+        expires_at REAL NOT NULL,
+        format_version INTEGER NOT NULL,
+        PRIMARY KEY (provider, cache_key)
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_risk_reports_expires ON risk_reports (expires_at)",
+    """CREATE TABLE IF NOT EXISTS risk_report_mint_versions (
+        mint TEXT PRIMARY KEY,
+        version INTEGER NOT NULL,
+        liquidity REAL,
+        holders REAL,
+        updated_at REAL NOT NULL
+    )""",
+)
+
+
+def _encode(value: Any) -> Any:
+    """JSON default hook: keep datetimes round-trippable."""
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    return str(value)
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def _copy(payload: Any) -> Any:
+    """Shallow copy so callers annotating a report don't mutate the cached one."""
+    return dict(payload) if isinstance(payload, dict) else payload
+
+
+class _Entry:
+    __slots__ = ("payload", "negative", "mint", "mint_version", "fetched_at", "expires_at")
+
+    def __init__(self, payload: Any, negative: bool, mint: Optional[str], mint_version: int, fetched_at: float, expires_at: float):
+        self.payload = payload
+        self.negative = negative
+        self.mint = mint
+        self.mint_version = mint_version
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+
+
+class _MintVersion:
+    __slots__ = ("version", "liquidity", "holders")
+
+    def __init__(self, version: int = 0, liquidity: Optional[float] = None, holders: Optional[float] = None):
+        self.version = version
+        self.liquidity = liquidity
+        self.holders = holders
+
+
+def _moved(old: Optional[float], new: Optional[float], threshold: float) -> bool:
+    """True when ``new`` differs from the baseline by more than ``threshold`` (relative)."""
+    if new is None or old is None:
+        return False
+    if old <= 0:
+        return new > 0
+    return abs(new - old) / old > threshold
+
+
+class RiskReportCache:
+    """
+    TTL cache of provider reports with SQLite persistence.
+
+    Args:
+        settings: Settings with the ``RISK_CACHE_*`` values; without settings the
+            cache is memory-only until ``configure`` is called
+    """
+
+    def __init__(self, settings=None):
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._versions: Dict[str, _MintVersion] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._dirty_entries: Dict[Tuple[str, str], Optional[_Entry]] = {}  # None = delete
+        self._dirty_versions: Dict[str, _MintVersion] = {}
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self.path: Optional[str] = None
+
+        registry = get_metrics_registry()
+        self._lookups = registry.counter("risk_cache_lookups", "Risk report cache lookups by result", ("provider", "result"))
+        self._invalidations = registry.counter("risk_cache_invalidations", "Mint version bumps that invalidated cached reports")
+        self._entries_gauge = registry.gauge("risk_cache_entries", "Risk reports held in memory")
+        self._flush_ms = registry.histogram("risk_cache_flush_ms", "Duration of one risk cache flush to SQLite")
+        self.configure(settings)
+
+    def configure(self, settings=None):
+        """Load ``RISK_CACHE_*`` values and, on first use of a path, open and warm the SQLite store."""
+        self.settings = settings
+        self.enabled = bool(getattr(settings, 'RISK_CACHE_ENABLED', True))
+        self.ttls = dict(DEFAULT_PROVIDER_TTLS)
+        for provider in DEFAULT_PROVIDER_TTLS:
+            ttl = getattr(settings, f'RISK_CACHE_TTL_{provider.upper()}', None)
+            if ttl is not None:
+                self.ttls[provider] = float(ttl)
+        self.negative_ttl = float(getattr(settings, 'RISK_CACHE_NEGATIVE_TTL', 600.0))
+        self.liquidity_change = float(getattr(settings, 'RISK_CACHE_LIQUIDITY_CHANGE_PCT', 0.3))
+        self.holder_change = float(getattr(settings, 'RISK_CACHE_HOLDER_CHANGE_PCT', 0.25))
+        self.flush_interval = max(0.1, float(getattr(settings, 'RISK_CACHE_FLUSH_INTERVAL', 2.0)))
+
+        path = getattr(settings, 'RISK_CACHE_FILE_PATH', None)
+        if self.enabled and path and self._conn is None:
+            try:
+                self._open(path)
+                self._warm()
+            except Exception as e:
+                logger.error(f"Risk report cache store {path} unavailable, caching in memory only: {e}", exc_info=True)
+                self._conn = None
+
+    # --- lookups ---
+
+    def _ttl(self, provider: str, negative: bool) -> float:
+        return self.negative_ttl if negative else self.ttls.get(provider, 600.0)
+
+    def get(self, provider: str, key: str) -> Optional[_Entry]:
+        """Fresh entry for ``(provider, key)`` or None (expired and invalidated entries are dropped)."""
+        entry = self._entries.get((provider, key))
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time() or (entry.mint and entry.mint_version != self.mint_version(entry.mint)):
+            self._drop((provider, key))
+            return None
+        return entry
+
+    async def get_or_fetch(self, provider: str, key: str, fetch: Callable[[], Awaitable[Any]],
+                           classify: Callable[[Any], Optional[str]], mint: Optional[str] = None) -> Any:
+        """
+        Return the cached report or run ``fetch`` (once per key, however many callers wait on it).
+
+        Args:
+            provider: Provider name (selects the TTL)
+            key: Cache key within the provider (usually the mint)
+            fetch: Coroutine factory performing the real API call
+            classify: Maps a fetch result to REPORT_POSITIVE / REPORT_NEGATIVE / None (don't cache)
+            mint: Mint whose version guards this entry (None = not invalidated by market moves)
+        """
+        if not self.enabled or not key:
+            return await fetch()
+
+        entry = self.get(provider, key)
+        if entry is not None:
+            self._lookups.labels(provider, "negative_hit" if entry.negative else "hit").inc()
+            return _copy(entry.payload)
+
+        cache_key = (provider, key)
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            self._lookups.labels(provider, "coalesced").inc()
+            result = await asyncio.shield(inflight)
+            if result is _FETCH_CANCELLED:
+                return await self.get_or_fetch(provider, key, fetch, classify, mint)
+            return _copy(result)
+
+        self._lookups.labels(provider, "miss").inc()
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            future.set_result(_FETCH_CANCELLED)  # Waiters fetch for themselves
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Waiters re-raise; mark retrieved for the owner
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+        future.set_result(result)
+
+        try:
+            kind = classify(result)
+        except Exception as e:
+            logger.warning(f"Could not classify {provider} report for {key}: {e}")
+            kind = None
+        if kind in (REPORT_POSITIVE, REPORT_NEGATIVE):
+            self.put(provider, key, result, negative=kind == REPORT_NEGATIVE, mint=mint)
+        return result
+
+    def put(self, provider: str, key: str, payload: Any, negative: bool = False, mint: Optional[str] = None):
+        """Store a report under the provider's (or the negative) TTL."""
+        if not self.enabled:
+            return
+        now = time.time()
+        entry = _Entry(_copy(payload), negative, mint, self.mint_version(mint) if mint else 0, now, now + self._ttl(provider, negative))
+        self._entries[(provider, key)] = entry
+        self._dirty_entries[(provider, key)] = entry
+        self._entries_gauge.set(len(self._entries))
+        self._schedule_flush()
+
+    def _drop(self, cache_key: Tuple[str, str]):
+        if self._entries.pop(cache_key, None) is not None:
+            self._dirty_entries[cache_key] = None
+            self._entries_gauge.set(len(self._entries))
+
+    # --- versioned invalidation ---
+
+    def mint_version(self, mint: str) -> int:
+        version = self._versions.get(mint)
+        return version.version if version else 0
+
+    def observe_market(self, mint: str, liquidity: Optional[float] = None, holders: Optional[float] = None) -> bool:
+        """
+        Record a token's current liquidity / holder count.
+
+        Returns:
+            True if the change since the last version crossed a threshold and the
+            mint's cached reports were invalidated
+        """
+        if not self.enabled or not mint:
+            return False
+        state = self._versions.get(mint)
+        if state is None:
+            self._versions[mint] = self._dirty_versions[mint] = _MintVersion(0, liquidity, holders)
+            return False
+
+        bumped = _moved(state.liquidity, liquidity, self.liquidity_change) or _moved(state.holders, holders, self.holder_change)
+        if bumped:
+            state.version += 1
+            state.liquidity = liquidity if liquidity is not None else state.liquidity
+            state.holders = holders if holders is not None else state.holders
+            self._invalidations.inc()
+            logger.debug("Invalidated cached risk reports for %s (version %d)", mint, state.version)
+        else:
+            # Fill in a baseline the first observation did not have
+            if state.liquidity is None and liquidity is not None:
+                state.liquidity = liquidity
+            elif state.holders is None and holders is not None:
+                state.holders = holders
+            else:
+                return False
+        self._dirty_versions[mint] = state
+        self._schedule_flush()
+        return bumped
+
+    def invalidate(self, mint: str):
+        """Drop every cached report guarded by ``mint``."""
+        state = self._versions.setdefault(mint, _MintVersion())
+        state.version += 1
+        self._dirty_versions[mint] = state
+        self._invalidations.inc()
+        self._schedule_flush()
+
+    # --- persistence ---
+
+    def _open(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        self._conn = conn
+        self.path = path
+
+    def _warm(self):
+        """Load unexpired reports and mint versions from SQLite."""
+        now = time.time()
+        with self._db_lock:
+            self._conn.execute("DELETE FROM risk_reports WHERE expires_at <= ? OR format_version != ?", (now, CACHE_FORMAT_VERSION))
+            versions = self._conn.execute("SELECT mint, version, liquidity, holders FROM risk_report_mint_versions").fetchall()
+            rows = self._conn.execute(
+                "SELECT provider, cache_key, mint, mint_version, negative, payload, fetched_at, expires_at FROM risk_reports"
+            ).fetchall()
+        for mint, version, liquidity, holders in versions:
+            self._versions[mint] = _MintVersion(version, liquidity, holders)
+        loaded = 0
+        for provider, key, mint, mint_version, negative, payload, fetched_at, expires_at in rows:
+            if mint and mint_version != self.mint_version(mint):
+                continue
+            try:
+                value = json.loads(payload, object_hook=_decode) if payload is not None else None
+            except ValueError:
+                continue
+            self._entries[(provider, key)] = _Entry(value, bool(negative), mint, mint_version, fetched_at, expires_at)
+            loaded += 1
+        self._entries_gauge.set(len(self._entries))
+        logger.info(f"Risk report cache warmed from {self.path}: {loaded} reports, {len(versions)} mint versions")
+
+    def _schedule_flush(self):
+        if self._conn is None or (self._flush_task is not None and not self._flush_task.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop: close() / atexit flushes synchronously
+        self._flush_task = loop.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        try:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+        except asyncio.CancelledError:
+            pass
+
+    def _take_dirty(self):
+        entries, self._dirty_entries = self._dirty_entries, {}
+        versions, self._dirty_versions = self._dirty_versions, {}
+        upserts, deletes = [], []
+        for (provider, key), entry in entries.items():
+            if entry is None:
+                deletes.append((provider, key))
+                continue
+            try:
+                payload = json.dumps(entry.payload, default=_encode) if entry.payload is not None else None
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Skipping unserializable {provider} report for {key}: {e}")
+                continue
+            upserts.append((provider, key, entry.mint, entry.mint_version, int(entry.negative), payload,
+                            entry.fetched_at, entry.expires_at, CACHE_FORMAT_VERSION))
+        version_rows = [(mint, v.version, v.liquidity, v.holders, time.time()) for mint, v in versions.items()]
+        return upserts, deletes, version_rows
+
+    def _write(self, upserts, deletes, version_rows):
+        with self._db_lock:
+            conn = self._conn
+            if conn is None:
+                return
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT OR REPLACE INTO risk_reports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", upserts)
+                conn.executemany("DELETE FROM risk_reports WHERE provider = ? AND cache_key = ?", deletes)
+                conn.executemany("INSERT OR REPLACE INTO risk_report_mint_versions VALUES (?, ?, ?, ?, ?)", version_rows)
+                conn.execute("DELETE FROM risk_reports WHERE expires_at <= ?", (time.time(),))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    async def flush(self):
+        """Write buffered reports and versions to SQLite off the event loop."""
+        if self._conn is None or not (self._dirty_entries or self._dirty_versions):
+            return
+        upserts, deletes, version_rows = self._take_dirty()
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._write, upserts, deletes, version_rows)
+        except Exception as e:
+            logger.error(f"Risk report cache flush failed: {e}", exc_info=True)
+            return
+        self._flush_ms.observe((time.perf_counter() - start) * 1000)
+
+    def flush_sync(self):
+        """Blocking flush (used at interpreter exit)."""
+        if self._conn is None or not (self._dirty_entries or self._dirty_versions):
+            return
+        try:
+            self._write(*self._take_dirty())
+        except Exception as e:
+            logger.error(f"Risk report cache flush failed: {e}", exc_info=True)
+
+    async def close(self):
+        """Flush pending writes and close the SQLite store."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry counts by provider plus pending writes."""
+        by_provider: Dict[str, int] = {}
+        for provider, _ in self._entries:
+            by_provider[provider] = by_provider.get(provider, 0) + 1
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "entries": len(self._entries),
+            "by_provider": by_provider,
+            "tracked_mints": len(self._versions),
+            "pending_writes": len(self._dirty_entries) + len(self._dirty_versions),
+        }
+
+
+_report_cache: Optional[RiskReportCache] = None
+
+
+def get_risk_report_cache(settings=None) -> RiskReportCache:
+    """Get or create the global risk report cache (the first caller that passes settings configures it)"""
+    global _report_cache
+    if _report_cache is None:
+        _report_cache = RiskReportCache(settings)
+        atexit.register(_report_cache.flush_sync)
+    elif settings is not None and _report_cache.settings is None:
+        _report_cache.configure(settings)
+    return _report_cache
@@ -0,0 +1,361 @@
+"""
+Multi-endpoint Solana RPC pool with latency-aware routing and hedged requests.
+
+The pool holds one ``AsyncClient`` per configured HTTP endpoint (the Helius /
+primary ``SOLANA_RPC_URL``, ``SOLANA_MAINNET_RPC`` and any ``RPC_POOL_EXTRA_URLS``)
+and routes each call to the endpoint with the best score.
+
+- Every endpoint keeps an EWMA of its call latency and of its error rate
+  (1 per failed call, 0 per success). The score is the latency EWMA inflated
+  by the error EWMA, so a fast but flaky endpoint drops behind a slower
+  reliable one. After ``RPC_POOL_MAX_CONSECUTIVE_ERRORS`` failures in a row an
+  endpoint is benched for ``RPC_POOL_ERROR_COOLDOWN`` seconds.
+- ``call(..., hedge=True)`` sends the request to the best endpoint and, if no
+  answer has arrived by that endpoint's p90 latency, sends a duplicate to the
+  next endpoint. Whichever answers first wins and the other is cancelled.
+- Without hedging, a failed call still falls through to the next endpoint
+  right away, which is the old primary-then-fallback behaviour.
+- Each attempt takes a send slot from the shared rate governor (provider
+  derived from the endpoint host, endpoint class ``rpc``), so pool traffic and
+  the batched ``getMultipleAccounts`` reads share one Helius budget.
+- Latency, errors, hedges and hedge wins are published to the metrics
+  registry (``/metrics``) and ``get_stats``.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from solana.rpc.async_api import AsyncClient
+
+from performance.metrics_registry import get_metrics_registry
+from utils.logger import get_logger
+from utils.rate_governor import RequestPriority, get_rate_governor, provider_for_url
+
+logger = get_logger(__name__)
+
+
+def status_from_exception(exc: BaseException) -> Optional[int]:
+    """HTTP status code behind an RPC exception (walks ``__cause__``/``__context__``), if any."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        response = getattr(exc, 'response', None)
+        status = getattr(response, 'status_code', None)
+        if isinstance(status, int):
+            return status
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+class RpcEndpoint:
+    """
+    One RPC endpoint and its health statistics.
+
+    Args:
+        url: HTTP RPC URL (may carry an API key; never logged or used as a label)
+        name: Credential-free label used in logs and metrics
+        client: Existing ``AsyncClient`` to reuse; the pool does not close it
+        alpha: EWMA smoothing factor for latency and error rate
+        window: Number of recent latencies kept for the p90 estimate
+        initial_latency: Latency estimate (seconds) before the first sample
+    """
+
+    def __init__(self, url: str, name: str, client: Optional[AsyncClient] = None,
+                 alpha: float = 0.2, window: int = 128, initial_latency: float = 0.3):
+        self.url = url
+        self.name = name
+        self.client = client
+        self.owns_client = client is None
+        self.alpha = alpha
+        self.ewma_latency = initial_latency
+        self.error_rate = 0.0
+        self.consecutive_errors = 0
+        self.benched_until = 0.0
+        self.in_flight = 0
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._counters: Dict[str, int] = {'calls': 0, 'errors': 0, 'hedges': 0, 'hedge_wins': 0, 'cancelled': 0}
+
+        registry = get_metrics_registry()
+        labels = {'endpoint': name}
+        self._latency_histogram = registry.histogram("rpc_pool_latency_ms", "RPC call latency per endpoint").child(labels)
+        self._calls_counter = registry.counter("rpc_pool_calls", "RPC calls sent per endpoint").child(labels)
+        self._errors_counter = registry.counter("rpc_pool_errors", "Failed RPC calls per endpoint").child(labels)
+        self._hedges_counter = registry.counter("rpc_pool_hedges", "Hedged duplicates sent to this endpoint").child(labels)
+        self._hedge_wins_counter = registry.counter(
+            "rpc_pool_hedge_wins", "Hedged duplicates that answered before the original").child(labels)
+        self._score_gauge = registry.gauge("rpc_pool_score", "Routing score (lower is preferred)").child(labels)
+
+    def get_client(self) -> AsyncClient:
+        if self.client is None:
+            self.client = AsyncClient(self.url)
+        return self.client
+
+    def score(self, error_weight: float) -> float:
+        """Routing score: latency EWMA scaled up by the error EWMA and by calls already in flight."""
+        return self.ewma_latency * (1.0 + error_weight * self.error_rate) * (1.0 + 0.1 * self.in_flight)
+
+    def available(self, now: float) -> bool:
+        return now >= self.benched_until
+
+    def latency_quantile(self, q: float, min_samples: int) -> Optional[float]:
+        """Latency quantile (seconds) over the recent window, or None with too few samples."""
+        if len(self._latencies) < min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def record_success(self, latency: float):
+        self._latencies.append(latency)
+        self.ewma_latency += self.alpha * (latency - self.ewma_latency)
+        self.error_rate -= self.alpha * self.error_rate
+        self.consecutive_errors = 0
+        self._latency_histogram.observe(latency * 1000)
+
+    def record_censored(self, elapsed: float):
+        """Fold in a call cancelled after ``elapsed`` seconds, if that is slower than the current estimate."""
+        if elapsed > self.ewma_latency:
+            self.ewma_latency += self.alpha * (elapsed - self.ewma_latency)
+            self._latencies.append(elapsed)
+
+    def record_error(self, latency: float, max_consecutive: int, cooldown: float):
+        self._counters['errors'] += 1
+        self._errors_counter.inc()
+        self.error_rate += self.alpha * (1.0 - self.error_rate)
+        # A failure that took longer than usual still says something about latency
+        if latency > self.ewma_latency:
+            self.ewma_latency += self.alpha * (latency - self.ewma_latency)
+        self.consecutive_errors += 1
+        if self.consecutive_errors >= max_consecutive:
+            self.benched_until = time.monotonic() + cooldown
+            logger.warning(f"RPC pool: benching {self.name} for {cooldown:.0f}s after {self.consecutive_errors} consecutive errors")
+            self.consecutive_errors = 0
+
+    def get_stats(self, error_weight: float) -> Dict[str, Any]:
+        p50 = self.latency_quantile(0.5, 1)
+        p90 = self.latency_quantile(0.9, 1)
+        return {
+            'ewma_latency_ms': self.ewma_latency * 1000,
+            'p50_ms': p50 * 1000 if p50 is not None else None,
+            'p90_ms': p90 * 1000 if p90 is not None else None,
+            'error_rate': self.error_rate,
+            'score': self.score(error_weight),
+            'in_flight': self.in_flight,
+            'benched_for': max(0.0, self.benched_until - time.monotonic()),
+            **self._counters,
+        }
+
+
+class RpcPool:
+    """
+    Routes Solana RPC calls over several HTTP endpoints.
+
+    Args:
+        settings: Application settings (``RPC_POOL_*`` values and RPC URLs)
+        primary_client: Existing ``AsyncClient`` for ``SOLANA_RPC_URL`` to reuse
+    """
+
+    def __init__(self, settings=None, primary_client: Optional[AsyncClient] = None):
+        self.endpoints: List[RpcEndpoint] = []
+        self.configure(settings, primary_client)
+
+    def configure(self, settings=None, primary_client: Optional[AsyncClient] = None):
+        """Load ``RPC_POOL_*`` values and build the endpoint list (existing endpoints keep their stats)."""
+        self.settings = settings
+        self.hedging_enabled = bool(getattr(settings, 'RPC_POOL_HEDGING_ENABLED', True))
+        self.request_timeout = float(getattr(settings, 'RPC_POOL_REQUEST_TIMEOUT', 10.0))
+        self.hedge_quantile = float(getattr(settings, 'RPC_POOL_HEDGE_QUANTILE', 0.9))
+        self.hedge_min_delay = float(getattr(settings, 'RPC_POOL_HEDGE_MIN_DELAY', 0.05))
+        self.hedge_max_delay = float(getattr(settings, 'RPC_POOL_HEDGE_MAX_DELAY', 2.0))
+        self.hedge_default_delay = float(getattr(settings, 'RPC_POOL_HEDGE_DEFAULT_DELAY', 0.5))
+        self.min_samples = int(getattr(settings, 'RPC_POOL_MIN_SAMPLES', 10))
+        self.error_weight = float(getattr(settings, 'RPC_POOL_ERROR_WEIGHT', 4.0))
+        self.max_consecutive_errors = int(getattr(settings, 'RPC_POOL_MAX_CONSECUTIVE_ERRORS', 5))
+        self.error_cooldown = float(getattr(settings, 'RPC_POOL_ERROR_COOLDOWN', 30.0))
+        alpha = float(getattr(settings, 'RPC_POOL_EWMA_ALPHA', 0.2))
+
+        urls: List[str] = []
+        for url in (getattr(settings, 'SOLANA_RPC_URL', None),
+                    getattr(settings, 'SOLANA_MAINNET_RPC', None),
+                    *str(getattr(settings, 'RPC_POOL_EXTRA_URLS', '') or '').split(',')):
+            url = (url or '').strip()
+            if url and url.startswith('http') and url not in urls:
+                urls.append(url)
+
+        existing = {endpoint.url: endpoint for endpoint in self.endpoints}
+        endpoints = []
+        for index, url in enumerate(urls):
+            endpoint = existing.get(url)
+            if endpoint is None:
+                name = provider_for_url(url)
+                if any(other.name == name for other in endpoints):
+                    name = f"{name}#{index}"
+                endpoint = RpcEndpoint(url, name, alpha=alpha, initial_latency=self.hedge_default_delay)
+            endpoints.append(endpoint)
+        self.endpoints = endpoints
+
+        if primary_client is not None:
+            self.adopt_client(getattr(settings, 'SOLANA_RPC_URL', None), primary_client)
+
+    def adopt_client(self, url: Optional[str], client: AsyncClient):
+        """Reuse an application-owned client for the endpoint at ``url`` (the pool will not close it)."""
+        for endpoint in self.endpoints:
+            if endpoint.url == url and endpoint.client is None:
+                endpoint.client = client
+                endpoint.owns_client = False
+
+    def ranked(self) -> List[RpcEndpoint]:
+        """Endpoints by score, best first; benched endpoints go last (but are still usable as a last resort)."""
+        now = time.monotonic()
+        scores = {}
+        for endpoint in self.endpoints:
+            scores[endpoint] = endpoint.score(self.error_weight)
+            endpoint._score_gauge.set(scores[endpoint])
+        return sorted(self.endpoints, key=lambda e: (not e.available(now), scores[e]))
+
+    def hedge_delay(self, endpoint: RpcEndpoint) -> float:
+        """How long to wait for ``endpoint`` before sending a hedged duplicate (its p90, clamped)."""
+        delay = endpoint.latency_quantile(self.hedge_quantile, self.min_samples)
+        if delay is None:
+            delay = self.hedge_default_delay
+        return min(self.hedge_max_delay, max(self.hedge_min_delay, delay))
+
+    async def _attempt(self, endpoint: RpcEndpoint, method: str, args: Tuple, kwargs: Dict[str, Any],
+                       priority: int, accept: Optional[Callable[[Any], bool]]):
+        """One call on one endpoint; returns ``(result, accepted)`` or raises."""
+        governor = get_rate_governor()
+        async with governor.slot(provider_for_url(endpoint.url), "rpc", None, priority) as slot:
+            endpoint.in_flight += 1
+            endpoint._counters['calls'] += 1
+            endpoint._calls_counter.inc()
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(getattr(endpoint.get_client(), method)(*args, **kwargs),
+                                                self.request_timeout)
+            except asyncio.CancelledError:
+                # Lost to a hedge: the elapsed time is a lower bound on this call's latency
+                endpoint._counters['cancelled'] += 1
+                endpoint.record_censored(time.monotonic() - started)
+                raise
+            except Exception as e:
+                slot.record(status_from_exception(e))
+                endpoint.record_error(time.monotonic() - started, self.max_consecutive_errors, self.error_cooldown)
+                raise
+            finally:
+                endpoint.in_flight -= 1
+            slot.record(200)
+            endpoint.record_success(time.monotonic() - started)
+            return result, (accept is None or accept(result))
+
+    async def call(self, method: str, *args, hedge: bool = False, accept: Optional[Callable[[Any], bool]] = None,
+                   priority: int = RequestPriority.NORMAL, **kwargs) -> Any:
+        """
+        Call ``AsyncClient.<method>(*args, **kwargs)`` on the best endpoint.
+
+        Args:
+            method: ``AsyncClient`` method name, e.g. ``"get_transaction"``
+            hedge: Send a duplicate to the next endpoint if the first is slower than its p90
+            accept: Predicate on a response; a rejected response (e.g. ``value is None`` on a
+                lagging node) moves on to the next endpoint like an error would
+            priority: RequestPriority for the shared rate governor
+
+        Returns:
+            The first accepted response, else the last response received.
+
+        Raises:
+            The last endpoint error, if no endpoint returned a response.
+        """
+        if not self.endpoints:
+            raise RuntimeError("RPC pool has no endpoints configured")
+
+        pending_endpoints = self.ranked()
+        hedge = hedge and self.hedging_enabled and len(pending_endpoints) > 1
+        tasks: Dict[asyncio.Task, Tuple[RpcEndpoint, bool]] = {}
+        last_result: Any = None
+        have_result = False
+        last_error: Optional[BaseException] = None
+
+        def launch(is_hedge: bool) -> RpcEndpoint:
+            endpoint = pending_endpoints.pop(0)
+            task = asyncio.ensure_future(self._attempt(endpoint, method, args, kwargs, priority, accept))
+            tasks[task] = (endpoint, is_hedge)
+            return endpoint
+
+        first = launch(False)
+        hedge_at = time.monotonic() + self.hedge_delay(first) if hedge else None
+        try:
+            while tasks:
+                timeout = None
+                if hedge_at is not None and pending_endpoints and pending_endpoints[0].available(time.monotonic()):
+                    timeout = max(0.0, hedge_at - time.monotonic())
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Primary is past its p90: send the hedged duplicate
+                    hedge_at = None
+                    endpoint = launch(True)
+                    endpoint._counters['hedges'] += 1
+                    endpoint._hedges_counter.inc()
+                    logger.debug(f"RPC pool: hedging {method} to {endpoint.name} after {self.hedge_delay(first) * 1000:.0f}ms")
+                    continue
+
+                for task in done:
+                    endpoint, is_hedge = tasks.pop(task)
+                    try:
+                        result, accepted = task.result()
+                    except Exception as e:
+                        last_error = e
+                        logger.debug(f"RPC pool: {method} failed on {endpoint.name}: {e!r}")
+                    else:
+                        if accepted:
+                            if is_hedge:
+                                endpoint._counters['hedge_wins'] += 1
+                                endpoint._hedge_wins_counter.inc()
+                            return result
+                        last_result, have_result = result, True
+
+                # Every in-flight attempt failed or was rejected: fall through to the next endpoint now
+                if not tasks and pending_endpoints:
+                    launch(False)
+                    hedge_at = None
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        if have_result:
+            return last_result
+        raise last_error
+
+    async def close(self):
+        """Close the clients the pool created (adopted clients are left to their owners)."""
+        for endpoint in self.endpoints:
+            if endpoint.owns_client and endpoint.client is not None:
+                try:
+                    await endpoint.client.close()
+                except Exception as e:
+                    logger.warning(f"Error closing RPC client for {endpoint.name}: {e}")
+                endpoint.client = None
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint latency EWMA/percentiles, error rate, score and counters, keyed by endpoint name."""
+        return {endpoint.name: endpoint.get_stats(self.error_weight) for endpoint in self.endpoints}
+
+
+# Global pool shared by MarketData and TransactionTracker
+_rpc_pool: Optional[RpcPool] = None
+
+
+def get_rpc_pool(settings=None, primary_client: Optional[AsyncClient] = None) -> RpcPool:
+    """Get or create the global RPC pool (the first caller that passes settings configures it)"""
+    global _rpc_pool
+    if _rpc_pool is None:
+        _rpc_pool = RpcPool(settings, primary_client)
+    else:
+        if settings is not None and _rpc_pool.settings is None:
+            _rpc_pool.configure(settings)
+        if primary_client is not None:
+            _rpc_pool.adopt_client(getattr(_rpc_pool.settings, 'SOLANA_RPC_URL', None), primary_client)
+    return _rpc_pool
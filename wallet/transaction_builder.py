@@ -40,6 +40,7 @@ from solana.rpc.commitment import Processed  # Changed from solders
 import construct
 from utils.helpers import *
 from filters.bonding_curve import BondingCurveCalculator
+from data.mint_metadata import MintMetadataService, get_mint_metadata_service
 from datetime import datetime
 import base58
 import time
@@ -309,16 +310,19 @@ class TransactionBuilder:
     This class primarily handles transaction sending and potentially simple
     instruction building (e.g., transfers, ATA management) if needed.
     """
-    def __init__(self, solana_client: AsyncClient, http_client: Optional[httpx.AsyncClient] = None):
+    def __init__(self, solana_client: AsyncClient, http_client: Optional[httpx.AsyncClient] = None,
+                 mint_metadata: Optional[MintMetadataService] = None):
         """
         Initializes the TransactionBuilder.
 
         Args:
             solana_client: An initialized solana.rpc.async_api.AsyncClient instance.
             http_client: An optional initialized httpx.AsyncClient for external API calls (if any remain).
+            mint_metadata: Optional shared mint metadata service; defaults to the process-wide instance.
         """
         self.client = solana_client # Use the passed Solana client
         self.http_client = http_client # Store the passed http client, if still needed
+        self.mint_metadata = mint_metadata
         logger.info("TransactionBuilder initialized.")
 
     async def _get_mint_info(self, mint_pubkey: Pubkey) -> Tuple[int, Pubkey]:
@@ -326,6 +330,16 @@ class TransactionBuilder:
         if mint_pubkey == SOL_MINT:
             return 9, TOKEN_PROGRAM_ID # Treat WSOL as standard Token Program owned
 
+        mint_metadata = self.mint_metadata or get_mint_metadata_service()
+        if mint_metadata is not None:
+            metadata = await mint_metadata.get(str(mint_pubkey))
+            if metadata is not None and metadata.program_owner:
+                owner = Pubkey.from_string(metadata.program_owner)
+                if owner not in (TOKEN_PROGRAM_ID, TOKEN_2022_PROGRAM_ID):
+                    raise ValueError(f"Unknown mint owner program: {owner} for mint {mint_pubkey}")
+                return metadata.decimals, owner
+            # Unresolved (or decimals-only entry): fall through to a direct account fetch
+
         logger.debug(f"Fetching mint info for {mint_pubkey}...") # Changed level to debug
         try:
             acc_info = await self.client.get_account_info(mint_pubkey)
@@ -7,7 +7,7 @@ import os
 from pathlib import Path
 
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import uvicorn
@@ -18,7 +18,9 @@ from data.token_database import TokenDatabase
 from strategies.paper_trading import PaperTrading
 from wallet.wallet_manager import WalletManager
 from data.price_monitor import PriceMonitor
+from data.tick_store import TickStore
 from utils.logger import get_logger
+from performance.metrics_registry import PROMETHEUS_CONTENT_TYPE, get_metrics_registry
 
 # Initialize logging
 logger = get_logger(__name__)
@@ -37,6 +39,7 @@ class SupertradeXWebApp:
         self.paper_trading = None
         self.wallet_manager = None
         self.price_monitor = None
+        self.tick_store = None
         
         # Real-time data cache
         self.live_data = {
@@ -74,6 +77,11 @@ class SupertradeXWebApp:
             await self.paper_trading.load_persistent_state()
             logger.info("Paper trading initialized")
             
+            # Read-only view of the tick store written by the trading process
+            if self.settings.TICK_STORE_ENABLED:
+                self.tick_store = TickStore(self.settings.TICK_STORE_PATH, read_only=True)
+                logger.info("Tick store reader initialized")
+            
             logger.info("All components initialized successfully")
             
         except Exception as e:
@@ -123,6 +131,11 @@ class SupertradeXWebApp:
             }
             return health_status
         
+        @self.app.get("/metrics", response_class=PlainTextResponse)
+        async def prometheus_metrics():
+            """Metrics registry in the Prometheus text exposition format"""
+            return PlainTextResponse(get_metrics_registry().render_text(), media_type=PROMETHEUS_CONTENT_TYPE)
+        
         @self.app.get("/api/tokens")
         async def get_active_tokens():
             """Get list of active tokens for trading"""
@@ -269,6 +282,45 @@ class SupertradeXWebApp:
                 logger.error(f"Error fetching platform stats: {e}", exc_info=True)
                 raise HTTPException(status_code=500, detail=str(e))
 
+        @self.app.get("/api/ticks/{mint}")
+        async def get_recent_ticks(mint: str, seconds: float = 300.0, limit: int = 1000):
+            """Get recent on-chain swap ticks for a mint from the tick store"""
+            try:
+                if not self.tick_store:
+                    raise HTTPException(status_code=503, detail="Tick store not available")
+                
+                ticks = self.tick_store.read_recent(mint, seconds)
+                timestamps = ticks["timestamp"][-limit:]
+                prices = ticks["price_sol"][-limit:]
+                directions = ticks["direction"][-limit:]
+                tick_list = [
+                    {"timestamp": float(ts), "price_sol": float(px), "direction": int(d)}
+                    for ts, px, d in zip(timestamps, prices, directions)
+                ]
+                return {"mint": mint, "ticks": tick_list, "count": len(tick_list)}
+                
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"Error fetching ticks for {mint}: {e}", exc_info=True)
+                raise HTTPException(status_code=500, detail=str(e))
+        
+        @self.app.get("/api/ticks/{mint}/ohlcv")
+        async def get_tick_ohlcv(mint: str, bar_seconds: float = 60.0, limit: int = 100):
+            """Get OHLCV bars built from stored swap ticks"""
+            try:
+                if not self.tick_store:
+                    raise HTTPException(status_code=503, detail="Tick store not available")
+                
+                bars = self.tick_store.get_ohlcv(mint, bar_seconds, limit)
+                return {"mint": mint, "bar_seconds": bar_seconds, "bars": bars, "count": len(bars)}
+                
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"Error building OHLCV for {mint}: {e}", exc_info=True)
+                raise HTTPException(status_code=500, detail=str(e))
+
 # Create the web application instance
 web_app = SupertradeXWebApp()
 app = web_app.app